@@ -24,4 +24,12 @@ def setup_env():
     os.environ["POSTGRES_USER"] = "postgres"
     os.environ["POSTGRES_PASSWORD"] = "postgres" 
     os.environ["POSTGRES_DB"] = "testdb"
-    yield
\ No newline at end of file
+    yield
+
+@pytest.fixture(autouse=True)
+def isolated_cache(monkeypatch):
+    """Usa uma instância de cache vazia em cada teste (as chaves não dependem mais da instância do repositório)."""
+    from infrastructure.api import cache
+
+    monkeypatch.setattr(cache, "_cache", cache.AsyncLRUCache())
+    yield
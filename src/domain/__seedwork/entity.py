@@ -0,0 +1,89 @@
+import inspect
+from functools import lru_cache
+from typing import Any, Dict, Tuple, Type, TypeVar
+
+E = TypeVar('E', bound='Entity')
+T = TypeVar('T')
+
+
+class FrozenEntityError(AttributeError):
+    pass
+
+
+@lru_cache(maxsize=None)
+def _constructor_fields(cls: type) -> Tuple[str, ...]:
+    parameters = list(inspect.signature(cls.__init__).parameters.values())[1:]
+    return tuple(parameter.name for parameter in parameters if parameter.kind is not inspect.Parameter.VAR_KEYWORD)
+
+
+def from_trusted_source(cls: Type[T], fields: Dict[str, Any]) -> T:
+    """
+    Cria uma instância sem passar pelo construtor nem por `validate`.
+
+    Apenas para dados que já foram validados ao serem gravados, como as
+    linhas lidas do banco pelos repositórios; os campos são atribuídos como
+    estão, então devem ser todos os do construtor e já com os tipos da
+    entidade. Entradas externas continuam passando pelo construtor.
+
+    Args:
+        cls: Classe da entidade
+        fields: Valores de todos os campos do construtor
+
+    Returns:
+        Nova instância (não congelada)
+    """
+    instance = cls.__new__(cls)
+    instance.__dict__.update(fields)
+    return instance
+
+
+class Entity:
+    """
+    Base das entidades de domínio.
+
+    Uma instância congelada com `freeze` (por exemplo ao ser armazenada no
+    cache e compartilhada entre requisições) não aceita alterações; quem
+    precisa alterá-la cria uma nova instância, validada, com `evolve`.
+    """
+
+    # O estado de congelamento fica em um slot, fora de `vars()` e da serialização
+    __slots__ = ('_frozen',)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if getattr(self, '_frozen', False):
+            raise FrozenEntityError(f"{type(self).__name__} is read-only, use evolve() to change '{name}'")
+        super().__setattr__(name, value)
+
+    def __delattr__(self, name: str) -> None:
+        if getattr(self, '_frozen', False):
+            raise FrozenEntityError(f"{type(self).__name__} is read-only, use evolve() to change '{name}'")
+        super().__delattr__(name)
+
+    @property
+    def frozen(self) -> bool:
+        return getattr(self, '_frozen', False)
+
+    def freeze(self: E) -> E:
+        """Torna a instância somente leitura e a retorna."""
+        object.__setattr__(self, '_frozen', True)
+        return self
+
+    def fields(self) -> Dict[str, Any]:
+        """Retorna os valores dos campos do construtor da entidade."""
+        return {name: getattr(self, name) for name in _constructor_fields(type(self))}
+
+    def evolve(self: E, **changes: Any) -> E:
+        """
+        Cria uma nova instância (não congelada) com os campos alterados.
+
+        Exemplo:
+        ```
+        product = product.evolve(price=12.5)
+        ```
+        """
+        fields = self.fields()
+        unknown = set(changes) - set(fields)
+        if unknown:
+            raise TypeError(f"{type(self).__name__} has no field(s) {', '.join(sorted(unknown))}")
+        fields.update(changes)
+        return type(self)(**fields)
@@ -56,6 +56,20 @@ def async_return(value: Any) -> AsyncMock:
     mock.return_value = value
     return mock
 
+def async_iter(items: List[Any]) -> Callable[..., Any]:
+    """
+    Cria uma função que retorna um iterador assíncrono com os itens especificados.
+    
+    Exemplo:
+    ```
+    repository.stream_items = async_iter([item_1, item_2])
+    ```
+    """
+    async def iterate(*args: Any, **kwargs: Any):
+        for item in items:
+            yield item
+    return MagicMock(side_effect=iterate)
+
 def async_side_effect(side_effect: Union[List[Any], Dict[Any, Any], Callable, Exception]) -> AsyncMock:
     """
     Cria um AsyncMock com um side_effect especificado.
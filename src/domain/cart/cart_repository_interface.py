@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import AsyncIterator, Dict, Optional, Tuple
 from uuid import UUID
 
 from domain.cart.cart_entity import Cart
@@ -19,12 +19,20 @@ class CartRepositoryInterface(ABC):
     async def update_cart(self, cart: Cart) -> Cart:
         raise NotImplementedError
 
+    @abstractmethod
+    async def update_cart_total(self, cart_id: UUID) -> Tuple[Optional[Cart], int]:
+        raise NotImplementedError
+
     @abstractmethod
     async def remove_cart(self, cart_id: UUID) -> None:
         raise NotImplementedError
     
     @abstractmethod
-    async def list_carts(self, user_id: UUID) -> List[Cart]:
+    async def list_carts(self, user_id: UUID, cursor: Optional[str] = None, page_size: int = 100) -> Dict:
+        raise NotImplementedError
+
+    @abstractmethod
+    def stream_carts(self, user_id: UUID) -> AsyncIterator[Cart]:
         raise NotImplementedError
 
     @abstractmethod
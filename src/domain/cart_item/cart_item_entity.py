@@ -1,7 +1,9 @@
 from uuid import UUID
 
+from domain.__seedwork.entity import Entity
 
-class CartItem:
+
+class CartItem(Entity):
 
     id: UUID
     cart_id: UUID
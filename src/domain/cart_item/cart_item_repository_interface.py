@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import AsyncIterator, Dict, Iterable, List, Optional
 from uuid import UUID
 
 from domain.cart_item.cart_item_entity import CartItem
@@ -11,6 +11,14 @@ class CartItemRepositoryInterface(ABC):
     async def add_item(self, cart_item: CartItem) -> None:
         raise NotImplementedError
 
+    @abstractmethod
+    async def add_items(self, cart_items: List[CartItem]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def apply_changes(self, cart_id: UUID, upserts: List[CartItem], removed_product_ids: Iterable[int]) -> int:
+        raise NotImplementedError
+
     @abstractmethod
     async def find_item(self, item_id: UUID) -> Optional[CartItem]:
         raise NotImplementedError
@@ -28,7 +36,11 @@ class CartItemRepositoryInterface(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    async def list_items(self) -> Optional[List[CartItem]]:
+    async def list_items(self, cursor: Optional[str] = None, page_size: int = 100) -> Dict:
+        raise NotImplementedError
+    
+    @abstractmethod
+    def stream_items(self) -> AsyncIterator[CartItem]:
         raise NotImplementedError
     
     @abstractmethod
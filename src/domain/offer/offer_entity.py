@@ -1,9 +1,10 @@
 from datetime import datetime
 
+from domain.__seedwork.entity import Entity
 from domain.offer.offer_type_enum import OfferType
 
 
-class Offer:
+class Offer(Entity):
 
     id: int
     discount_type: OfferType
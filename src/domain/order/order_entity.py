@@ -2,11 +2,12 @@ from datetime import datetime
 from decimal import ROUND_HALF_UP, Decimal
 from uuid import UUID
 
+from domain.__seedwork.entity import Entity
 from domain.order.order_status_enum import OrderStatus
 from domain.order.order_type_enum import OrderType
 
 
-class Order:
+class Order(Entity):
     id: UUID
     user_id: UUID
     cart_id: UUID
@@ -1,8 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Dict, Optional
 from uuid import UUID
 
 from domain.order.order_entity import Order
+from domain.order.order_status_enum import OrderStatus
 
 
 class OrderRepositoryInterface(ABC):
@@ -24,11 +25,11 @@ class OrderRepositoryInterface(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    async def list_orders(self, user_id: UUID) -> List[Order]:
+    async def list_orders(self, user_id: UUID, cursor: Optional[str] = None, page_size: int = 20, count: Optional[str] = None) -> Dict:
         raise NotImplementedError
     
     @abstractmethod
-    async def list_all_orders(self) -> List[Order]:
+    async def list_all_orders(self, cursor: Optional[str] = None, page_size: int = 50, status: Optional[OrderStatus] = None, count: Optional[str] = None) -> Dict:
         raise NotImplementedError
     
     @abstractmethod
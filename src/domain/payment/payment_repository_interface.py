@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import AsyncIterator, Dict, Optional
 from uuid import UUID
 
 from domain.payment.payment_entity import Payment
@@ -16,11 +16,19 @@ class PaymentRepositoryInterface(ABC):
         raise NotImplementedError
     
     @abstractmethod
-    async def list_payments(self, user_id: UUID) -> List[Payment]:
+    async def list_payments(self, user_id: UUID, cursor: Optional[str] = None, page_size: int = 100) -> Dict:
         raise NotImplementedError
 
     @abstractmethod
-    async def list_all_payments(self) -> List[Payment]:
+    async def list_all_payments(self, cursor: Optional[str] = None, page_size: int = 100) -> Dict:
+        raise NotImplementedError
+
+    @abstractmethod
+    def stream_payments(self, user_id: UUID) -> AsyncIterator[Payment]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def stream_all_payments(self) -> AsyncIterator[Payment]:
         raise NotImplementedError
 
     @abstractmethod
@@ -1,9 +1,10 @@
 from uuid import UUID
 
+from domain.__seedwork.entity import Entity
 from domain.product.product_category_enum import ProductCategory
 
 
-class Product:
+class Product(Entity):
 
     id: int
     name: str
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import AsyncIterator, Dict, Iterable, Optional
 
 from domain.product.product_entity import Product
 
@@ -14,6 +14,10 @@ class ProductRepositoryInterface(ABC):
     async def find_product(self, product_id: int) -> Optional[Product]:
         raise NotImplementedError
     
+    @abstractmethod
+    async def find_products(self, product_ids: Iterable[int]) -> Dict[int, Product]:
+        raise NotImplementedError
+    
     @abstractmethod
     async def find_product_by_name(self, name: str) -> Product:
         raise NotImplementedError
@@ -23,7 +27,11 @@ class ProductRepositoryInterface(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    async def list_products(self) -> List[Product]:
+    async def list_products(self, cursor: Optional[str] = None, page_size: int = 100) -> Dict:
+        raise NotImplementedError
+
+    @abstractmethod
+    def stream_products(self) -> AsyncIterator[Product]:
         raise NotImplementedError
     
     @abstractmethod
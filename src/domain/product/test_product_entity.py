@@ -1,5 +1,6 @@
 import pytest
 
+from domain.__seedwork.entity import FrozenEntityError
 from domain.__seedwork.test_utils import (async_return, async_side_effect,
                                           run_async)
 from domain.product.product_category_enum import ProductCategory
@@ -70,4 +71,34 @@ async def test_product_invalid_category():
 
     with pytest.raises(Exception) as excinfo:
         Product(id=product_id, name=name, price=price, category="invalid_category")
-    assert str(excinfo.value) == "category must be an instance of ProductCategory"
\ No newline at end of file
+    assert str(excinfo.value) == "category must be an instance of ProductCategory"
+
+@pytest.mark.asyncio
+async def test_product_evolve():
+    product = Product(id=1, name="Test Product", price=100.0, category=ProductCategory.BURGER)
+
+    evolved = product.evolve(price=80.0)
+
+    assert evolved is not product
+    assert evolved.price == 80.0
+    assert evolved.name == product.name
+    assert product.price == 100.0
+
+    with pytest.raises(Exception) as excinfo:
+        product.evolve(price=-1.0)
+    assert str(excinfo.value) == "price must be a non-negative number"
+
+    with pytest.raises(TypeError):
+        product.evolve(color="red")
+
+@pytest.mark.asyncio
+async def test_frozen_product_is_read_only():
+    product = Product(id=1, name="Test Product", price=100.0, category=ProductCategory.BURGER).freeze()
+
+    with pytest.raises(FrozenEntityError):
+        product.price = 80.0
+
+    assert product.frozen
+    assert product.price == 100.0
+    assert "_frozen" not in vars(product)
+    assert not product.evolve(price=80.0).frozen
@@ -1,9 +1,10 @@
 from uuid import UUID
 
+from domain.__seedwork.entity import Entity
 from domain.user.user_gender_enum import UserGender
 
 
-class User:
+class User(Entity):
 
     id: UUID
     name: str
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import AsyncIterator, Dict, Optional
 from uuid import UUID
 
 from domain.user.user_entity import User
@@ -20,7 +20,11 @@ class UserRepositoryInterface(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    async def list_users(self) -> Optional[List[User]]:
+    async def list_users(self, cursor: Optional[str] = None, page_size: int = 100) -> Dict:
+        raise NotImplementedError
+    
+    @abstractmethod
+    def stream_users(self) -> AsyncIterator[User]:
         raise NotImplementedError
     
     @abstractmethod
@@ -0,0 +1,391 @@
+"""
+Importação em massa de produtos e usuários (CSV ou NDJSON).
+
+Cadastrar um catálogo ou os usuários de um teste de carga pelos endpoints
+`POST /products/` e `POST /user/` custa uma requisição, uma transação e uma
+invalidação de cache por linha. A importação lê o arquivo em partes e:
+
+1. valida cada linha com as entidades do domínio (`Product`, `User`), em
+   lotes de `IMPORT_BATCH_SIZE` linhas, guardando os erros por linha;
+2. envia as linhas válidas de cada lote a uma tabela temporária com
+   `copy_records_to_table` do asyncpg (protocolo COPY, sem um INSERT por linha);
+3. ao final, mescla a tabela temporária na tabela definitiva com um único
+   `INSERT ... ON CONFLICT (id) DO UPDATE` (a última ocorrência de um id no
+   arquivo prevalece);
+4. invalida o prefixo de cache da tabela uma única vez.
+
+Tudo acontece em uma transação: a tabela temporária é descartada no commit
+e uma falha no banco desfaz a importação inteira. Linhas inválidas não
+interrompem a importação; elas são apenas reportadas.
+
+Disponível pelo endpoint `POST /db/import/{table}` e pela linha de comando:
+`python -m infrastructure.api.bulk_import products produtos.csv`.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+from typing import (Any, AsyncIterator, Callable, Dict, List, Optional,
+                    Tuple)
+from uuid import UUID, uuid4
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from domain.product.product_category_enum import ProductCategory
+from domain.product.product_entity import Product
+from domain.user.user_entity import User
+from domain.user.user_gender_enum import UserGender
+from infrastructure.api.cache import invalidate_prefix
+from infrastructure.api.database import engine
+from infrastructure.api.export import EXPORT_FORMATS, FORMAT_CSV, FORMAT_NDJSON
+from infrastructure.api.shared_cache import configure_shared_cache
+from infrastructure.api.unit_of_work import get_uow
+from infrastructure.logging_config import logger
+
+# Configuração da importação (pode ser ajustada por variáveis de ambiente)
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+# Quantidade máxima de erros detalhados no relatório (os demais são apenas contados)
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))
+# O command_timeout do pool (segundos) é curto demais para o COPY e a mescla de milhões de linhas
+IMPORT_TIMEOUT = float(os.getenv("IMPORT_TIMEOUT", "3600"))
+# Tamanho das partes lidas do arquivo na linha de comando
+IMPORT_READ_SIZE = 64 * 1024
+
+# Formatos aceitos (os mesmos da exportação)
+IMPORT_FORMATS = EXPORT_FORMATS
+
+
+class ImportTarget:
+    """
+    Tabela de destino de uma importação.
+
+    Descreve as colunas copiadas, o prefixo de cache a invalidar e a função
+    que valida uma linha do arquivo com a entidade do domínio e a converte
+    no registro enviado ao COPY (na ordem de `columns`).
+    """
+
+    def __init__(self, table: str, columns: Tuple[str, ...], cache_prefix: str, to_record: Callable[[Dict[str, Any]], Tuple[Any, ...]]):
+        """
+        Inicializa o destino.
+
+        Args:
+            table: Nome da tabela definitiva
+            columns: Colunas importadas; a primeira é a chave primária
+            cache_prefix: Prefixo das chaves de cache da tabela
+            to_record: Função que valida uma linha e retorna o registro
+        """
+        self.table = table
+        self.columns = columns
+        self.cache_prefix = cache_prefix
+        self.to_record = to_record
+
+    @property
+    def staging_table(self) -> str:
+        """Nome da tabela temporária da importação."""
+        return f"_import_{self.table}"
+
+
+def _to_int(value: Any) -> Any:
+    # Valores do CSV chegam como texto; os demais tipos são validados pela entidade
+    return int(value) if isinstance(value, str) else value
+
+
+def _to_float(value: Any) -> Any:
+    return float(value) if isinstance(value, str) else value
+
+
+def product_record(row: Dict[str, Any]) -> Tuple[Any, ...]:
+    """
+    Valida uma linha de produto com a entidade `Product`.
+
+    Args:
+        row: Linha do arquivo (`id`, `name`, `price`, `category`)
+
+    Returns:
+        Registro com as colunas de `tb_products`
+    """
+    product = Product(
+        id=_to_int(row.get("id")),
+        name=row.get("name"),
+        price=_to_float(row.get("price")),
+        category=ProductCategory(row.get("category")),
+    )
+    return (product.id, product.name, float(product.price), product.category.value)
+
+
+def user_record(row: Dict[str, Any]) -> Tuple[Any, ...]:
+    """
+    Valida uma linha de usuário com a entidade `User`.
+
+    Linhas sem `id` recebem um novo UUID; para que uma nova importação do
+    mesmo arquivo atualize os usuários em vez de duplicá-los, o arquivo deve
+    trazer os ids.
+
+    Args:
+        row: Linha do arquivo (`id`, `name`, `email`, `age`, `gender`, `phone_number`, `password`)
+
+    Returns:
+        Registro com as colunas de `tb_users`
+    """
+    id = row.get("id")
+    user = User(
+        id=UUID(id) if id else uuid4(),
+        name=row.get("name"),
+        email=row.get("email"),
+        age=_to_int(row.get("age")),
+        gender=UserGender(row.get("gender")),
+        phone_number=row.get("phone_number"),
+        password=row.get("password"),
+    )
+    return (user.id, user.name, user.email, user.age, user.gender.value, user.phone_number, user.password)
+
+
+# Destinos aceitos, pelo nome usado no endpoint e na linha de comando
+IMPORT_TARGETS: Dict[str, ImportTarget] = {
+    "products": ImportTarget("tb_products", ("id", "name", "price", "category"), "product", product_record),
+    "users": ImportTarget("tb_users", ("id", "name", "email", "age", "gender", "phone_number", "password"), "user", user_record),
+}
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Divide as partes recebidas em linhas, sem acumular o arquivo.
+
+    Args:
+        chunks: Partes do arquivo (por exemplo `request.stream()`)
+
+    Returns:
+        Iterador assíncrono com as linhas, sem a quebra de linha
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.rstrip(b"\r").decode("utf-8", errors="replace")
+    if buffer:
+        yield buffer.rstrip(b"\r").decode("utf-8", errors="replace")
+
+
+async def _csv_rows(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    header: Optional[List[str]] = None
+    pending: List[str] = []
+    quotes = 0
+    start = line_number = 0
+    async for line in lines:
+        line_number += 1
+        if line_number == 1:
+            # Arquivos exportados por planilhas costumam começar com BOM
+            line = line.lstrip("\ufeff")
+        if not pending:
+            start = line_number
+        pending.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            # Campo entre aspas com quebra de linha: o registro continua na próxima linha
+            continue
+        record = "\n".join(pending)
+        pending, quotes = [], 0
+        if not record.strip():
+            continue
+        values = next(csv.reader([record]))
+        if header is None:
+            header = [column.strip() for column in values]
+            continue
+        if len(values) != len(header):
+            yield start, None, f"expected {len(header)} columns, got {len(values)}"
+            continue
+        yield start, dict(zip(header, values)), None
+    if pending:
+        yield start, None, "unterminated quoted field"
+
+
+async def _ndjson_rows(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"invalid JSON: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, "expected a JSON object"
+            continue
+        yield line_number, row, None
+
+
+def iter_rows(chunks: AsyncIterator[bytes], import_format: str) -> AsyncIterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Lê as linhas de um arquivo CSV (com cabeçalho) ou NDJSON.
+
+    Args:
+        chunks: Partes do arquivo
+        import_format: `csv` ou `ndjson`
+
+    Returns:
+        Iterador assíncrono de `(número da linha, linha, erro)`; linhas que
+        não puderam ser lidas vêm com a linha None e a mensagem de erro
+    """
+    if import_format == FORMAT_CSV:
+        return _csv_rows(iter_lines(chunks))
+    if import_format == FORMAT_NDJSON:
+        return _ndjson_rows(iter_lines(chunks))
+    raise ValueError(f"Invalid import format '{import_format}'")
+
+
+def _merge_sql(target: ImportTarget) -> str:
+    key = target.columns[0]
+    columns = ", ".join(target.columns)
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in target.columns[1:])
+    # DISTINCT ON: o ON CONFLICT não pode alterar a mesma linha duas vezes no mesmo comando
+    # xmax = 0 identifica as linhas inseridas (as atualizadas têm a versão anterior)
+    return f"""
+        WITH merged AS (
+            INSERT INTO {target.table} ({columns})
+            SELECT DISTINCT ON ({key}) {columns} FROM {target.staging_table}
+            ORDER BY {key}, _row DESC
+            ON CONFLICT ({key}) DO UPDATE SET {updates}
+            RETURNING (xmax = 0) AS inserted
+        )
+        SELECT count(*) FILTER (WHERE inserted) AS inserted,
+               count(*) FILTER (WHERE NOT inserted) AS updated
+        FROM merged
+    """
+
+
+async def import_rows(
+    session: AsyncSession,
+    target: ImportTarget,
+    chunks: AsyncIterator[bytes],
+    import_format: str,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    timeout: float = IMPORT_TIMEOUT,
+) -> Dict[str, Any]:
+    """
+    Importa um arquivo para a tabela do destino, na transação da sessão.
+
+    O commit é responsabilidade de quem chama (unidade de trabalho); a
+    invalidação do cache é repetida após o commit.
+
+    Args:
+        session: Sessão do banco de dados (com o driver asyncpg)
+        target: Tabela de destino
+        chunks: Partes do arquivo
+        import_format: `csv` ou `ndjson`
+        batch_size: Quantidade de linhas validadas e copiadas por vez
+        timeout: Tempo máximo de cada COPY e da mescla, em segundos
+
+    Returns:
+        Relatório com as contagens e os erros por linha
+    """
+    rows = iter_rows(chunks, import_format)
+
+    # Executado pela sessão para abrir a transação antes de usar a conexão do driver
+    await session.execute(text(
+        f"CREATE TEMP TABLE {target.staging_table} "
+        f"(LIKE {target.table} INCLUDING DEFAULTS, _row bigint) ON COMMIT DROP"
+    ))
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    driver_connection = raw_connection.driver_connection
+    columns = target.columns + ("_row",)
+
+    report: Dict[str, Any] = {"table": target.table, "received": 0, "valid": 0, "failed": 0, "errors": []}
+
+    def fail(row_number: int, error: str) -> None:
+        report["failed"] += 1
+        if len(report["errors"]) < IMPORT_MAX_ERRORS:
+            report["errors"].append({"row": row_number, "error": error})
+
+    async def copy(records: List[Tuple[Any, ...]]) -> None:
+        if records:
+            await driver_connection.copy_records_to_table(target.staging_table, records=records, columns=columns, timeout=timeout)
+            report["valid"] += len(records)
+
+    batch: List[Tuple[Any, ...]] = []
+    async for row_number, row, error in rows:
+        report["received"] += 1
+        if error is None:
+            try:
+                batch.append(target.to_record(row) + (row_number,))
+            except Exception as e:
+                error = str(e)
+        if error is not None:
+            fail(row_number, error)
+        if len(batch) >= batch_size:
+            await copy(batch)
+            batch = []
+    await copy(batch)
+
+    merged = await driver_connection.fetchrow(_merge_sql(target), timeout=timeout)
+    report["inserted"] = merged["inserted"]
+    report["updated"] = merged["updated"]
+    # Ids repetidos no arquivo: apenas a última ocorrência é gravada
+    report["duplicated"] = report["valid"] - merged["inserted"] - merged["updated"]
+
+    if merged["inserted"] or merged["updated"]:
+        await invalidate_prefix(target.cache_prefix)
+    logger.info(
+        "Importação em %s: %d linhas, %d inseridas, %d atualizadas, %d com erro",
+        target.table, report["received"], report["inserted"], report["updated"], report["failed"],
+    )
+    return report
+
+
+async def read_file(path: str, size: int = IMPORT_READ_SIZE) -> AsyncIterator[bytes]:
+    """
+    Lê um arquivo em partes, sem bloquear o loop de eventos.
+
+    Args:
+        path: Caminho do arquivo
+        size: Tamanho de cada parte em bytes
+
+    Returns:
+        Iterador assíncrono com as partes do arquivo
+    """
+    with open(path, "rb") as file:
+        while True:
+            chunk = await asyncio.to_thread(file.read, size)
+            if not chunk:
+                break
+            yield chunk
+
+
+async def _import_file(table: str, path: str, import_format: str, batch_size: int) -> Dict[str, Any]:
+    # Com o cache compartilhado, a invalidação chega também aos workers da API
+    shared = await configure_shared_cache()
+    try:
+        async with get_uow() as uow:
+            return await import_rows(uow.session, IMPORT_TARGETS[table], read_file(path), import_format, batch_size=batch_size)
+    finally:
+        if shared is not None:
+            await shared.client.close()
+        await engine.dispose()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Importa um arquivo pela linha de comando e imprime o relatório em JSON."""
+    parser = argparse.ArgumentParser(description="Importa produtos ou usuários de um arquivo CSV ou NDJSON")
+    parser.add_argument("table", choices=sorted(IMPORT_TARGETS))
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="padrão: extensão do arquivo")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    import_format = args.format or os.path.splitext(args.path)[1].lstrip(".").lower()
+    if import_format not in IMPORT_FORMATS:
+        parser.error("não foi possível deduzir o formato pela extensão; use --format")
+
+    report = asyncio.run(_import_file(args.table, args.path, import_format, args.batch_size))
+    print(json.dumps(report, indent=2, default=str))
+    if report["failed"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
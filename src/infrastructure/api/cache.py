@@ -1,35 +1,421 @@
 import asyncio
+import copy
+import heapq
+import inspect
+import os
+import string
+import sys
 import time
+from collections import OrderedDict
+from contextvars import ContextVar, Token
+from datetime import date, datetime
+from enum import Enum
 from functools import wraps
-from typing import Any, Callable, Dict, Optional, TypeVar, Union
+from typing import (Any, Callable, Dict, Iterable, List, Optional, Set, Tuple,
+                    TypeVar, Union)
+from uuid import UUID
+
+from infrastructure.logging_config import logger
+from infrastructure.observability.metrics import (increment_cache_coalesced_wait,
+                                                  increment_cache_eviction,
+                                                  increment_cache_expiration,
+                                                  increment_cache_hit,
+                                                  increment_cache_miss,
+                                                  record_cache_load_duration,
+                                                  register_cache_gauges)
 
 T = TypeVar('T')
 
 # Cache simples em memória
 _CACHE: Dict[str, Dict[str, Any]] = {}
 
+# Separador entre as partes de uma chave de cache
+KEY_SEPARATOR = ":"
+
+# Nomes de parâmetros que representam a instância ligada (repositório)
+_BOUND_PARAMETERS = ("self", "cls")
+
+# Tamanhos possíveis de um UUID em texto (hex, canônico e entre chaves)
+_UUID_TEXT_LENGTHS = (32, 36, 38)
+
+
+def normalize_key_part(value: Any) -> str:
+    """
+    Converte um argumento em sua representação canônica dentro da chave.
+    
+    UUIDs são sempre representados na forma canônica em minúsculas (mesmo
+    quando recebidos como string), enums pelo seu valor e números inteiros
+    pela sua forma decimal, de modo que `find_order(UUID(...))` e
+    `find_order("...")` gerem a mesma chave.
+    
+    Args:
+        value: Valor do argumento
+        
+    Returns:
+        Representação textual estável do valor
+    """
+    if value is None:
+        return "None"
+    if isinstance(value, Enum):
+        return normalize_key_part(value.value)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, str):
+        if len(value) in _UUID_TEXT_LENGTHS:
+            try:
+                return str(UUID(value))
+            except ValueError:
+                pass
+        return value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple, set, frozenset)):
+        parts = [normalize_key_part(item) for item in value]
+        if isinstance(value, (set, frozenset)):
+            parts.sort()
+        return "[" + ",".join(parts) + "]"
+    return str(value)
+
+
+class CacheKeyBuilder:
+    """
+    Deriva chaves de cache estáveis para uma função decorada.
+    
+    A assinatura da função é inspecionada uma única vez. Em cada chamada os
+    argumentos são associados aos parâmetros (posicionais ou nomeados, com os
+    valores padrão aplicados) e o parâmetro `self` é descartado, de forma que
+    a chave não dependa da instância do repositório criada por requisição.
+    """
+    
+    def __init__(self, func: Callable[..., Any], prefix: str = ''):
+        """
+        Inicializa o construtor de chaves.
+        
+        Args:
+            func: Função cujas chamadas serão cacheadas
+            prefix: Prefixo para a chave do cache
+        """
+        self.prefix = prefix
+        self.name = func.__name__
+        self.signature = inspect.signature(func)
+        parameters = list(self.signature.parameters)
+        self._skip_first = bool(parameters) and parameters[0] in _BOUND_PARAMETERS
+    
+    @property
+    def is_method(self) -> bool:
+        """Indica se a função recebe a instância (`self`) como primeiro argumento."""
+        return self._skip_first
+    
+    def build(self, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> str:
+        """
+        Constrói a chave de cache para uma chamada.
+        
+        Args:
+            args: Argumentos posicionais da chamada (incluindo `self`)
+            kwargs: Argumentos nomeados da chamada
+            
+        Returns:
+            Chave no formato `prefixo:funcao:param=valor:...`
+        """
+        arguments = self.arguments(args, kwargs)
+        if arguments is None:
+            # Deixa a própria função reportar o erro de chamada
+            return self._fallback(args, kwargs)
+        
+        key_parts = [self.prefix, self.name]
+        for name, value in arguments.items():
+            if self.signature.parameters[name].kind is inspect.Parameter.VAR_KEYWORD:
+                key_parts.extend(f"{k}={normalize_key_part(v)}" for k, v in sorted(value.items()))
+            else:
+                key_parts.append(f"{name}={normalize_key_part(value)}")
+        return KEY_SEPARATOR.join(key_parts)
+    
+    def arguments(self, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Associa os argumentos da chamada aos parâmetros da função.
+        
+        Args:
+            args: Argumentos posicionais da chamada (incluindo `self`)
+            kwargs: Argumentos nomeados da chamada
+            
+        Returns:
+            Dicionário `parâmetro -> valor` sem a instância ligada, ou None se
+            os argumentos não correspondem à assinatura
+        """
+        try:
+            bound = self.signature.bind(*args, **kwargs)
+        except TypeError:
+            return None
+        bound.apply_defaults()
+        
+        arguments = dict(bound.arguments)
+        if self._skip_first:
+            arguments.pop(next(iter(self.signature.parameters)), None)
+        return arguments
+    
+    def key_for(self, *args: Any, **kwargs: Any) -> str:
+        """
+        Constrói a chave a partir dos argumentos de negócio, sem a instância.
+        
+        Exemplo:
+        ```
+        ProductRepository.find_product.cache_key(product_id=1)
+        ```
+        """
+        if self._skip_first:
+            args = (None,) + args
+        return self.build(args, kwargs)
+    
+    def _fallback(self, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> str:
+        if self._skip_first:
+            args = args[1:]
+        key_parts = [self.prefix, self.name]
+        key_parts.extend(normalize_key_part(arg) for arg in args)
+        key_parts.extend(f"{k}={normalize_key_part(v)}" for k, v in sorted(kwargs.items()))
+        return KEY_SEPARATOR.join(key_parts)
+
+
+def key_prefix_of(key: str) -> str:
+    """Retorna o prefixo (primeiro segmento) de uma chave de cache."""
+    return key.split(KEY_SEPARATOR, 1)[0]
+
+
+class _TagFormatter(string.Formatter):
+    """Formata os campos das tags com a mesma normalização usada nas chaves."""
+    
+    def format_field(self, value: Any, format_spec: str) -> str:
+        if format_spec:
+            return format(value, format_spec)
+        return normalize_key_part(value)
+
+
+_tag_formatter = _TagFormatter()
+
+
+def format_tags(templates: Iterable[str], arguments: Dict[str, Any], result: Any = None) -> List[str]:
+    """
+    Resolve os modelos de tag com os argumentos da chamada e o resultado.
+    
+    Os modelos usam a sintaxe de `str.format`, por exemplo
+    `'order:user:{user_id}'` ou `'order:{order.id}'`; o resultado da função
+    fica disponível como `{result}`. Modelos que não puderem ser resolvidos
+    (por exemplo `{result.id}` quando o resultado é None) são ignorados.
+    
+    Args:
+        templates: Modelos de tag
+        arguments: Argumentos da chamada associados aos parâmetros
+        result: Valor retornado pela função
+        
+    Returns:
+        Lista de tags resolvidas
+    """
+    values = dict(arguments)
+    values['result'] = result
+    tags = []
+    for template in templates:
+        try:
+            tags.append(_tag_formatter.format(template, **values))
+        except (AttributeError, KeyError, IndexError, TypeError):
+            continue
+    return tags
+
+
+def estimate_size(value: Any, _seen: Optional[set] = None) -> int:
+    """
+    Estima, em bytes, a memória ocupada por um valor armazenado no cache.
+    
+    Percorre recursivamente coleções e atributos de objetos (entidades de
+    domínio, DTOs pydantic) somando `sys.getsizeof` de cada objeto uma única
+    vez. O resultado é uma aproximação, suficiente para aplicar orçamentos.
+    
+    Args:
+        value: Valor a ser medido
+        
+    Returns:
+        Tamanho estimado em bytes
+    """
+    if _seen is None:
+        _seen = set()
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+    
+    size = sys.getsizeof(value)
+    if isinstance(value, (str, bytes, bytearray, int, float, bool, UUID, Enum, datetime, date)) or value is None:
+        return size
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += estimate_size(k, _seen) + estimate_size(v, _seen)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += estimate_size(item, _seen)
+    elif hasattr(value, '__dict__'):
+        size += estimate_size(vars(value), _seen)
+    elif hasattr(value, '__slots__'):
+        for slot in value.__slots__:
+            if hasattr(value, slot):
+                size += estimate_size(getattr(value, slot), _seen)
+    return size
+
+
+def freeze_value(value: Any) -> Any:
+    """
+    Congela as entidades de um resultado antes de compartilhá-lo pelo cache.
+    
+    O mesmo objeto é entregue a todas as requisições que acertam o cache, então
+    entidades com `freeze` (ver `domain.__seedwork.entity.Entity`) passam a ser
+    somente leitura, inclusive dentro de listas, tuplas e dicionários; quem
+    precisa alterá-las usa `evolve`.
+    
+    Args:
+        value: Resultado da função cacheada
+        
+    Returns:
+        O próprio valor
+    """
+    if isinstance(value, (list, tuple)):
+        for item in value:
+            freeze_value(item)
+    elif isinstance(value, dict):
+        for item in value.values():
+            freeze_value(item)
+    elif not isinstance(value, type) and callable(getattr(value, 'freeze', None)):
+        value.freeze()
+    return value
+
+
+def parse_prefix_budgets(raw: str) -> Dict[str, int]:
+    """
+    Interpreta a configuração de orçamento por prefixo.
+    
+    Args:
+        raw: Texto no formato `product=8388608,order=33554432`
+        
+    Returns:
+        Dicionário `prefixo -> limite em bytes`
+    """
+    budgets: Dict[str, int] = {}
+    for item in raw.split(","):
+        if not item.strip():
+            continue
+        prefix, _, limit = item.partition("=")
+        budgets[prefix.strip()] = int(limit)
+    return budgets
+
+
+# Configuração padrão do cache global (pode ser ajustada por variáveis de ambiente)
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1000"))
+CACHE_DEFAULT_TTL = int(os.getenv("CACHE_DEFAULT_TTL", "300"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_PREFIX_BUDGETS = parse_prefix_budgets(os.getenv("CACHE_PREFIX_BUDGETS", ""))
+
+
+class CacheEntry:
+    """
+    Item armazenado no cache com seu prazo de expiração e tamanho estimado.
+    
+    `fresh_until` marca o fim do TTL "suave": depois dele o item ainda pode ser
+    servido como obsoleto (stale) até `expires_at`, o TTL "rígido". `hits`
+    conta os acertos servidos pelo item desde que foi armazenado.
+    """
+    
+    __slots__ = ('value', 'expires_at', 'fresh_until', 'size', 'prefix', 'tags', 'hits')
+    
+    def __init__(self, value: Any, expires_at: float, size: int, prefix: str, tags: Tuple[str, ...] = (), fresh_until: Optional[float] = None):
+        self.value = value
+        self.expires_at = expires_at
+        self.fresh_until = expires_at if fresh_until is None else fresh_until
+        self.size = size
+        self.prefix = prefix
+        self.tags = tags
+        self.hits = 0
+
+
+class NegativeResult:
+    """
+    Marcador de cache negativo: a consulta não encontrou o registro.
+    
+    Guarda opcionalmente a exceção de "não encontrado" lançada pela função
+    para que ela seja relançada (como uma nova instância) nos acertos.
+    """
+    
+    __slots__ = ('exception_type', 'exception_args')
+    
+    def __init__(self, exception: Optional[BaseException] = None):
+        self.exception_type = type(exception) if exception is not None else None
+        self.exception_args = exception.args if exception is not None else ()
+    
+    def resolve(self) -> None:
+        """Retorna None ou relança a exceção de "não encontrado" original."""
+        if self.exception_type is not None:
+            raise self.exception_type(*self.exception_args)
+        return None
+
 
 class AsyncLRUCache:
     """
     Cache LRU assíncrono para armazenar resultados de funções.
     
-    Implementa um cache simples com base no padrão LRU (Least Recently Used)
-    para armazenar resultados de operações frequentes e lentas, como consultas
+    Implementa um cache com base no padrão LRU (Least Recently Used) para
+    armazenar resultados de operações frequentes e lentas, como consultas
     ao banco de dados.
+    
+    A recência é mantida em um `OrderedDict` (global e por prefixo), de forma
+    que leitura, escrita e remoção do item menos recente sejam O(1). O tempo é
+    medido com `time.monotonic`, imune a ajustes do relógio do sistema. Itens
+    expirados são removidos de forma preguiçosa: na leitura e, nas escritas,
+    consumindo um heap ordenado pelo prazo de expiração.
+    
+    Cada item pode ser associado a tags (por exemplo `order:<id>` ou
+    `order:user:<user_id>`), mantidas em um índice invertido para que as
+    escritas invalidem apenas os itens afetados.
     """
     
-    def __init__(self, max_size: int = 1000, ttl: int = 300):
+    def __init__(
+        self,
+        max_size: int = 1000,
+        ttl: int = 300,
+        max_bytes: Optional[int] = None,
+        prefix_budgets: Optional[Dict[str, int]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
         """
         Inicializa o cache.
         
         Args:
             max_size: Tamanho máximo do cache (número de itens)
-            ttl: Tempo de vida dos itens em segundos
+            ttl: Tempo de vida padrão dos itens em segundos
+            max_bytes: Limite total de memória estimada em bytes (opcional)
+            prefix_budgets: Limite de memória estimada em bytes por prefixo (opcional)
+            clock: Relógio monotônico usado para expiração
         """
         self.max_size = max_size
         self.ttl = ttl
-        self.cache: Dict[str, Dict[str, Any]] = {}
-        self._access_times: Dict[str, float] = {}
+        self.max_bytes = max_bytes
+        self.prefix_budgets: Dict[str, int] = dict(prefix_budgets or {})
+        self._clock = clock
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._prefix_entries: Dict[str, "OrderedDict[str, None]"] = {}
+        self._prefix_bytes: Dict[str, int] = {}
+        self._total_bytes = 0
+        self._expirations: List[Tuple[float, str]] = []
+        self._tag_index: Dict[str, Set[str]] = {}
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, key: str) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry.expires_at > self._clock()
+    
+    @property
+    def total_bytes(self) -> int:
+        """Memória total estimada ocupada pelos itens, em bytes."""
+        return self._total_bytes
     
     async def get(self, key: str) -> Optional[Any]:
         """
@@ -41,43 +427,106 @@ class AsyncLRUCache:
         Returns:
             O valor armazenado no cache, ou None se não existir ou estiver expirado
         """
-        if key not in self.cache:
+        entry = self.get_entry(key)
+        if entry is None or entry.fresh_until <= self._clock():
+            return None
+        return entry.value
+    
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        """
+        Obtém o registro de um item, inclusive se estiver obsoleto (stale).
+        
+        Args:
+            key: Chave do item
+            
+        Returns:
+            O registro do item, ou None se não existir ou tiver passado do TTL rígido
+        """
+        entry = self._entries.get(key)
+        if entry is None:
             return None
         
         # Verifica se o item expirou
-        item = self.cache[key]
-        timestamp = item.get('timestamp', 0)
-        if time.time() - timestamp > self.ttl:
-            # Remove o item expirado
-            del self.cache[key]
-            del self._access_times[key]
+        if entry.expires_at <= self._clock():
+            self._remove(key)
+            increment_cache_expiration(entry.prefix)
             return None
         
-        # Atualiza o tempo de acesso
-        self._access_times[key] = time.time()
-        return item.get('value')
+        # Marca o item como o mais recentemente usado
+        self._entries.move_to_end(key)
+        self._prefix_entries[entry.prefix].move_to_end(key)
+        return entry
     
-    async def set(self, key: str, value: Any) -> None:
+    async def lookup(self, key: str) -> Optional[CacheEntry]:
+        """
+        Versão assíncrona de `get_entry`, usada pelo decorador `async_cached`.
+        
+        Permite que caches em camadas (ver `shared_cache.TieredCache`) consultem
+        um armazenamento externo quando o item não está disponível localmente.
+        
+        Args:
+            key: Chave do item
+            
+        Returns:
+            O registro do item, ou None se não existir ou tiver passado do TTL rígido
+        """
+        return self.get_entry(key)
+    
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """Indica se o item ainda está dentro do TTL suave."""
+        return entry.fresh_until > self._clock()
+    
+    def time_left(self, entry: CacheEntry) -> Tuple[float, float]:
+        """
+        Calcula o tempo restante de um item.
+        
+        Args:
+            entry: Registro do item
+            
+        Returns:
+            Tupla `(segundos até o fim do TTL suave, segundos até o fim do TTL rígido)`
+        """
+        now = self._clock()
+        return entry.fresh_until - now, entry.expires_at - now
+    
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None, tags: Iterable[str] = (), hard_ttl: Optional[int] = None) -> None:
         """
         Adiciona um item ao cache.
         
         Args:
             key: Chave do item
             value: Valor a ser armazenado
+            ttl: Tempo de vida do item em segundos (usa o padrão do cache se omitido)
+            tags: Tags usadas para invalidar o item junto com outros relacionados
+            hard_ttl: Tempo máximo em segundos durante o qual o item pode ser
+                servido como obsoleto após `ttl` (opcional)
         """
-        # Verifica se o cache está cheio
-        if len(self.cache) >= self.max_size:
-            # Remove o item menos recentemente usado
-            oldest_key = min(self._access_times.items(), key=lambda x: x[1])[0]
-            del self.cache[oldest_key]
-            del self._access_times[oldest_key]
+        now = self._clock()
+        self._sweep_expired(now)
+        
+        prefix = key_prefix_of(key)
+        size = estimate_size(value)
+        budget = self.prefix_budgets.get(prefix)
+        if (budget is not None and size > budget) or (self.max_bytes is not None and size > self.max_bytes):
+            # O item sozinho excede o orçamento: não é armazenado
+            self._remove(key)
+            return
+        
+        if key in self._entries:
+            self._remove(key)
         
-        # Adiciona o novo item
-        self.cache[key] = {
-            'value': value,
-            'timestamp': time.time()
-        }
-        self._access_times[key] = time.time()
+        fresh_until = now + (self.ttl if ttl is None else ttl)
+        expires_at = max(fresh_until, now + hard_ttl) if hard_ttl is not None else fresh_until
+        tags = tuple(tags)
+        self._entries[key] = CacheEntry(value=value, expires_at=expires_at, size=size, prefix=prefix, tags=tags, fresh_until=fresh_until)
+        for tag in tags:
+            self._tag_index.setdefault(tag, set()).add(key)
+        self._prefix_entries.setdefault(prefix, OrderedDict())[key] = None
+        self._prefix_bytes[prefix] = self._prefix_bytes.get(prefix, 0) + size
+        self._total_bytes += size
+        heapq.heappush(self._expirations, (expires_at, key))
+        
+        self._enforce_limits(prefix)
     
     async def invalidate(self, key: str) -> None:
         """
@@ -86,88 +535,613 @@ class AsyncLRUCache:
         Args:
             key: Chave do item a ser removido
         """
-        if key in self.cache:
-            del self.cache[key]
-            del self._access_times[key]
+        self._remove(key)
+    
+    async def invalidate_prefix(self, prefix: str) -> int:
+        """
+        Remove todos os itens de um prefixo.
+        
+        Args:
+            prefix: Prefixo das chaves (por exemplo `product`)
+            
+        Returns:
+            Quantidade de itens removidos
+        """
+        keys = list(self._prefix_entries.get(prefix, ()))
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+    
+    async def invalidate_tags(self, *tags: str) -> int:
+        """
+        Remove todos os itens associados a qualquer uma das tags.
+        
+        Args:
+            tags: Tags a serem invalidadas (por exemplo `product:1`)
+            
+        Returns:
+            Quantidade de itens removidos
+        """
+        removed = 0
+        for tag in tags:
+            for key in list(self._tag_index.get(tag, ())):
+                if self._remove(key) is not None:
+                    removed += 1
+        return removed
     
     async def clear(self) -> None:
         """Limpa todo o cache."""
-        self.cache.clear()
-        self._access_times.clear()
+        self._tag_index.clear()
+        self._entries.clear()
+        self._prefix_entries.clear()
+        self._prefix_bytes.clear()
+        self._expirations.clear()
+        self._total_bytes = 0
+    
+    def key_counts(self) -> Dict[str, int]:
+        """
+        Conta as chaves armazenadas agrupadas por prefixo.
+        
+        Returns:
+            Dicionário `prefixo -> quantidade de chaves`
+        """
+        return {prefix: len(keys) for prefix, keys in self._prefix_entries.items() if keys}
+    
+    def byte_counts(self) -> Dict[str, int]:
+        """
+        Memória estimada ocupada agrupada por prefixo.
+        
+        Returns:
+            Dicionário `prefixo -> bytes estimados`
+        """
+        return {prefix: size for prefix, size in self._prefix_bytes.items() if size}
+    
+    def top_keys(self, limit: int = 20) -> List[Tuple[str, int]]:
+        """
+        Lista as chaves com mais acertos.
+        
+        Args:
+            limit: Quantidade máxima de chaves retornadas
+            
+        Returns:
+            Lista de tuplas `(chave, acertos)` em ordem decrescente de acertos
+        """
+        top = heapq.nlargest(limit, self._entries.items(), key=lambda item: item[1].hits)
+        return [(key, entry.hits) for key, entry in top]
+    
+    def _remove(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        prefix_keys = self._prefix_entries.get(entry.prefix)
+        if prefix_keys is not None:
+            prefix_keys.pop(key, None)
+        self._prefix_bytes[entry.prefix] -= entry.size
+        self._total_bytes -= entry.size
+        for tag in entry.tags:
+            tagged_keys = self._tag_index.get(tag)
+            if tagged_keys is not None:
+                tagged_keys.discard(key)
+                if not tagged_keys:
+                    del self._tag_index[tag]
+        return entry
+    
+    def _enforce_limits(self, prefix: str) -> None:
+        # Orçamento do prefixo: remove os itens menos recentes do próprio prefixo
+        budget = self.prefix_budgets.get(prefix)
+        if budget is not None:
+            prefix_keys = self._prefix_entries[prefix]
+            while self._prefix_bytes[prefix] > budget and prefix_keys:
+                self._evict(next(iter(prefix_keys)))
+        
+        # Limites globais: remove os itens menos recentes de todo o cache
+        while len(self._entries) > self.max_size:
+            self._evict(next(iter(self._entries)))
+        if self.max_bytes is not None:
+            while self._total_bytes > self.max_bytes and self._entries:
+                self._evict(next(iter(self._entries)))
+    
+    def _evict(self, key: str) -> None:
+        entry = self._remove(key)
+        if entry is not None:
+            increment_cache_eviction(entry.prefix)
+    
+    def _sweep_expired(self, now: float) -> None:
+        expirations = self._expirations
+        while expirations and expirations[0][0] <= now:
+            expires_at, key = heapq.heappop(expirations)
+            entry = self._entries.get(key)
+            # Ignora registros obsoletos de itens regravados ou já removidos
+            if entry is not None and entry.expires_at == expires_at:
+                self._remove(key)
+                increment_cache_expiration(entry.prefix)
+        
+        # Compacta o heap quando acumula muitos registros obsoletos
+        if len(expirations) > 2 * len(self._entries) + 64:
+            self._expirations = [(entry.expires_at, key) for key, entry in self._entries.items()]
+            heapq.heapify(self._expirations)
+
+
+class _LeaderCancelled(Exception):
+    """Sinaliza aos seguidores que a carga em andamento foi cancelada."""
+
+
+class SingleFlight:
+    """
+    Coalesce cargas concorrentes para a mesma chave em uma única execução.
+    
+    A primeira chamada para uma chave (líder) executa a carga; as chamadas
+    concorrentes (seguidores) aguardam o mesmo resultado, ou a mesma exceção.
+    O cancelamento de um seguidor não afeta a carga compartilhada. Se o líder
+    for cancelado, os seguidores tentam novamente e um deles assume a carga.
+    """
+    
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+    
+    def __len__(self) -> int:
+        return len(self._calls)
+    
+    async def do(self, key: str, loader: Callable[[], Any], on_wait: Optional[Callable[[], None]] = None) -> Any:
+        """
+        Executa `loader` uma única vez para as chamadas concorrentes de `key`.
+        
+        Args:
+            key: Chave que identifica a carga
+            loader: Função assíncrona sem argumentos que produz o valor
+            on_wait: Callback chamado quando a chamada aguarda uma carga existente
+            
+        Returns:
+            O valor produzido pela carga
+        """
+        while True:
+            future = self._calls.get(key)
+            if future is None:
+                break
+            if on_wait is not None:
+                on_wait()
+            try:
+                return await asyncio.shield(future)
+            except _LeaderCancelled:
+                # O líder foi cancelado: tenta novamente
+                continue
+        
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await loader()
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+            # Marca a exceção como recuperada quando não há seguidores
+            if future.done() and not future.cancelled():
+                future.exception()
 
 
-# Instância global do cache
-_cache = AsyncLRUCache()
+class BackgroundRefresher:
+    """
+    Executa recargas de itens obsoletos em tarefas de segundo plano.
+    
+    Garante no máximo uma recarga por chave e limita a quantidade de recargas
+    simultâneas; quando o limite é atingido a recarga é descartada e o valor
+    obsoleto continua sendo servido até a próxima tentativa.
+    """
+    
+    def __init__(self):
+        self._active: Dict[str, asyncio.Task] = {}
+        self._active_by_group: Dict[str, int] = {}
+    
+    def __len__(self) -> int:
+        return len(self._active)
+    
+    def schedule(self, key: str, refresh: Callable[[], Any], group: str = '', limit: int = 4) -> bool:
+        """
+        Agenda a recarga de uma chave.
+        
+        Args:
+            key: Chave do item a ser recarregado
+            refresh: Função assíncrona sem argumentos que realiza a recarga
+            group: Grupo cujo limite de concorrência é aplicado (por exemplo o decorador)
+            limit: Quantidade máxima de recargas simultâneas do grupo
+            
+        Returns:
+            True se a recarga foi agendada
+        """
+        if key in self._active or self._active_by_group.get(group, 0) >= limit:
+            return False
+        
+        task = asyncio.get_running_loop().create_task(refresh())
+        self._active[key] = task
+        self._active_by_group[group] = self._active_by_group.get(group, 0) + 1
+        
+        def done(finished: asyncio.Task) -> None:
+            self._active.pop(key, None)
+            self._active_by_group[group] -= 1
+            if not finished.cancelled() and finished.exception() is not None:
+                logger.warning("Falha ao recarregar o item de cache '%s': %s", key, finished.exception())
+        
+        task.add_done_callback(done)
+        return True
+    
+    async def wait(self) -> None:
+        """Aguarda o término das recargas em andamento."""
+        if self._active:
+            await asyncio.gather(*self._active.values(), return_exceptions=True)
+
+
+# Fábrica de sessões usada pelas recargas em segundo plano
+_refresh_session_factory: Optional[Callable[[], Any]] = None
+
+
+def configure_background_refresh(session_factory: Callable[[], Any]) -> None:
+    """
+    Define a fábrica de sessões usada pelas recargas em segundo plano.
+    
+    As recargas não podem usar a sessão da requisição que encontrou o item
+    obsoleto (ela é fechada ao fim da requisição), então cada recarga abre a
+    sua própria sessão com esta fábrica.
+    
+    Args:
+        session_factory: Fábrica de `AsyncSession` (por exemplo `SessionLocal`)
+    """
+    global _refresh_session_factory
+    _refresh_session_factory = session_factory
+
 
+# Instância global do cache (substituível por `configure_cache`)
+_cache = AsyncLRUCache(
+    max_size=CACHE_MAX_ENTRIES,
+    ttl=CACHE_DEFAULT_TTL,
+    max_bytes=CACHE_MAX_BYTES,
+    prefix_budgets=CACHE_PREFIX_BUDGETS,
+)
 
-def async_cached(ttl: int = 300, prefix: str = ''):
+
+def get_cache() -> AsyncLRUCache:
+    """Retorna a instância global usada por `async_cached` e `invalidate_cache`."""
+    return _cache
+
+
+def configure_cache(cache: AsyncLRUCache) -> AsyncLRUCache:
+    """
+    Substitui a instância global usada por `async_cached` e `invalidate_cache`.
+    
+    Usado na inicialização para instalar um cache em camadas compartilhado
+    entre os workers (ver `shared_cache.configure_shared_cache`).
+    
+    Args:
+        cache: Nova instância, com a mesma interface de `AsyncLRUCache`
+        
+    Returns:
+        A instância anterior
+    """
+    global _cache
+    previous, _cache = _cache, cache
+    return previous
+
+
+# Invalidações feitas dentro de uma unidade de trabalho ainda não confirmada
+_deferred_invalidations: ContextVar[Optional[List[Tuple[str, Any]]]] = ContextVar('cache_deferred_invalidations', default=None)
+
+
+async def _apply_invalidation(kind: str, argument: Any) -> None:
+    if kind == 'tags':
+        await _cache.invalidate_tags(*argument)
+    elif kind == 'prefix':
+        await _cache.invalidate_prefix(argument)
+    else:
+        await _cache.clear()
+
+
+async def _invalidate(invalidation: Tuple[str, Any]) -> None:
+    await _apply_invalidation(*invalidation)
+    
+    # Dentro de uma unidade de trabalho, repete a invalidação após o commit
+    pending = _deferred_invalidations.get()
+    if pending is not None:
+        pending.append(invalidation)
+
+
+async def invalidate_prefix(prefix: str) -> None:
+    """
+    Invalida as chaves de um prefixo fora de um método com `invalidate_cache`.
+    
+    Usado por operações em massa, que alteram muitas linhas de uma vez e
+    invalidam o prefixo uma única vez ao final. Dentro de uma unidade de
+    trabalho a invalidação também é repetida após o commit.
+    
+    Args:
+        prefix: Prefixo das chaves a invalidar
+    """
+    await _invalidate(('prefix', prefix))
+
+
+def begin_deferred_invalidations() -> Token:
+    """
+    Passa a registrar as invalidações feitas por `invalidate_cache` no contexto atual.
+    
+    Dentro de uma transação a invalidação acontece antes do commit; uma
+    requisição concorrente pode ler o valor antigo do banco e repovoar o
+    cache nesse intervalo. As invalidações registradas são repetidas por
+    `end_deferred_invalidations` depois do commit.
+    
+    Returns:
+        Token a ser passado para `end_deferred_invalidations`
+    """
+    return _deferred_invalidations.set([])
+
+
+async def end_deferred_invalidations(token: Token, replay: bool = True, replay_after: float = 0) -> None:
+    """
+    Encerra o registro iniciado por `begin_deferred_invalidations`.
+    
+    Com uma réplica de leitura, uma consulta à réplica ainda atrasada pode
+    repovoar o cache com o valor antigo logo após o commit; `replay_after`
+    repete as invalidações mais uma vez, em segundo plano, depois desse
+    intervalo.
+    
+    Args:
+        token: Token retornado por `begin_deferred_invalidations`
+        replay: Indica se as invalidações registradas devem ser repetidas (após o commit)
+        replay_after: Segundos após os quais as invalidações são repetidas de novo (0 desabilita)
+    """
+    pending = _deferred_invalidations.get() or []
+    _deferred_invalidations.reset(token)
+    if not replay:
+        return
+    invalidations = list(dict.fromkeys(pending))
+    for kind, argument in invalidations:
+        await _apply_invalidation(kind, argument)
+    if invalidations and replay_after > 0:
+        task = asyncio.get_running_loop().create_task(_replay_invalidations(invalidations, replay_after))
+        _delayed_replays.add(task)
+        task.add_done_callback(_delayed_replays.discard)
+
+
+# Repetições de invalidações agendadas por `end_deferred_invalidations`
+_delayed_replays: Set[asyncio.Task] = set()
+
+
+async def _replay_invalidations(invalidations: List[Tuple[str, Any]], delay: float) -> None:
+    await asyncio.sleep(delay)
+    for kind, argument in invalidations:
+        await _apply_invalidation(kind, argument)
+
+
+# Gauges de ocupação por prefixo (consultam a instância global vigente)
+register_cache_gauges(lambda: _cache.key_counts(), lambda: _cache.byte_counts())
+
+# Cargas em andamento por chave, compartilhadas pelo decorador `async_cached`
+_single_flight = SingleFlight()
+
+# Recargas em segundo plano do modo stale-while-revalidate
+_refresher = BackgroundRefresher()
+
+
+def async_cached(
+    ttl: int = 300,
+    prefix: str = '',
+    tags: Iterable[str] = (),
+    hard_ttl: Optional[int] = None,
+    refresh_concurrency: int = 4,
+    negative_ttl: Optional[int] = None,
+    negative_exceptions: Tuple[type, ...] = (),
+):
     """
     Decorador para cache assíncrono de funções.
     
     Exemplo de uso:
     ```
-    @async_cached(ttl=60, prefix='user')
+    @async_cached(ttl=60, prefix='user', tags=('user:{user_id}',))
     async def get_user(user_id: str) -> User:
         # Lógica para buscar o usuário
         return user
     ```
     
+    Em caso de falta no cache, chamadas concorrentes com a mesma chave são
+    coalescidas (ver `SingleFlight`) e executam a função uma única vez.
+    
+    Quando `hard_ttl` é maior que `ttl` o decorador opera em modo
+    stale-while-revalidate: entre `ttl` (TTL suave) e `hard_ttl` (TTL rígido) o
+    valor obsoleto é servido imediatamente e recarregado em segundo plano,
+    com uma sessão própria (ver `configure_background_refresh`).
+    
+    Com `negative_ttl`, resultados "não encontrado" (None ou uma das
+    `negative_exceptions`) também são cacheados, por um tempo menor, com as
+    mesmas tags; o caminho de criação correspondente deve invalidar essas tags.
+    
     Args:
-        ttl: Tempo de vida do cache em segundos
+        ttl: Tempo de vida do cache em segundos (TTL suave no modo stale-while-revalidate)
         prefix: Prefixo para a chave do cache
+        tags: Modelos de tag (ver `format_tags`) associados ao item cacheado
+        hard_ttl: Tempo máximo em segundos durante o qual o item pode ser servido (opcional)
+        refresh_concurrency: Máximo de recargas simultâneas em segundo plano deste decorador
+        negative_ttl: Tempo de vida em segundos dos resultados "não encontrado" (opcional)
+        negative_exceptions: Exceções que indicam "não encontrado" (requer `negative_ttl`)
     """
+    tags = tuple(tags)
+    stale_while_revalidate = hard_ttl is not None and hard_ttl > ttl
+    negative_exceptions = tuple(negative_exceptions) if negative_ttl else ()
+    
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        key_builder = CacheKeyBuilder(func, prefix=prefix)
+        refresh_group = f"{prefix}:{func.__qualname__}"
+        
+        async def store(cache_key: str, result: Any, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> None:
+            entry_tags = format_tags(tags, key_builder.arguments(args, kwargs) or {}, result) if tags else ()
+            freeze_value(result)
+            if isinstance(result, NegativeResult) or (result is None and negative_ttl):
+                # Cache negativo: TTL curto e sem modo stale-while-revalidate
+                await _cache.set(cache_key, result or NegativeResult(), ttl=negative_ttl, tags=entry_tags)
+            else:
+                await _cache.set(cache_key, result, ttl=ttl, tags=entry_tags, hard_ttl=hard_ttl)
+        
+        async def call(args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Any:
+            try:
+                return await func(*args, **kwargs)
+            except negative_exceptions as e:
+                return NegativeResult(e)
+        
+        async def load(cache_key: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]):
+            # Se não estiver no cache, executa a função
+            started = time.perf_counter()
+            result = await call(args, kwargs)
+            record_cache_load_duration(prefix, (time.perf_counter() - started) * 1000)
+            
+            # Armazena o resultado no cache
+            await store(cache_key, result, args, kwargs)
+            if isinstance(result, NegativeResult):
+                return result.resolve()
+            return result
+        
+        async def refresh(cache_key: str, stale_entry: CacheEntry, args: Tuple[Any, ...], kwargs: Dict[str, Any]):
+            instance = args[0]
+            async with _refresh_session_factory() as session:
+                # Cópia do repositório ligada a uma sessão própria
+                repository = copy.copy(instance)
+                repository.session = session
+                result = await call((repository,) + tuple(args[1:]), kwargs)
+            
+            # Não sobrescreve itens invalidados ou regravados durante a recarga
+            if _cache.get_entry(cache_key) is not stale_entry:
+                return
+            await store(cache_key, result, args, kwargs)
+        
+        def record_hit(entry: CacheEntry) -> None:
+            entry.hits += 1
+            increment_cache_hit(prefix)
+        
+        def can_refresh(args: Tuple[Any, ...]) -> bool:
+            return (
+                _refresh_session_factory is not None
+                and key_builder.is_method
+                and bool(args)
+                and hasattr(args[0], 'session')
+            )
+        
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            # Constrói a chave do cache
-            key_parts = [prefix, func.__name__]
-            key_parts.extend(str(arg) for arg in args)
-            key_parts.extend(f"{k}={v}" for k, v in sorted(kwargs.items()))
-            cache_key = ":".join(key_parts)
+            # Constrói a chave do cache (independente da instância do repositório)
+            cache_key = key_builder.build(args, kwargs)
             
             # Tenta obter do cache
-            result = await _cache.get(cache_key)
-            if result is not None:
-                return result
+            entry = await _cache.lookup(cache_key)
+            if entry is not None and isinstance(entry.value, NegativeResult):
+                if _cache.is_fresh(entry):
+                    record_hit(entry)
+                    return entry.value.resolve()
+            elif entry is not None and entry.value is not None:
+                if _cache.is_fresh(entry):
+                    record_hit(entry)
+                    return entry.value
+                if stale_while_revalidate and can_refresh(args):
+                    record_hit(entry)
+                    # Serve o valor obsoleto e recarrega em segundo plano
+                    _refresher.schedule(
+                        cache_key,
+                        lambda: refresh(cache_key, entry, args, kwargs),
+                        group=refresh_group,
+                        limit=refresh_concurrency,
+                    )
+                    return entry.value
             
-            # Se não estiver no cache, executa a função
-            result = await func(*args, **kwargs)
+            # Requisições concorrentes para a mesma chave compartilham uma única consulta
+            increment_cache_miss(prefix)
+            return await _single_flight.do(
+                cache_key,
+                lambda: load(cache_key, args, kwargs),
+                on_wait=lambda: increment_cache_coalesced_wait(prefix),
+            )
+        
+        async def prime(result: Any, *args: Any, **kwargs: Any) -> None:
+            """
+            Armazena um resultado já conhecido como se a função tivesse sido chamada.
             
-            # Armazena o resultado no cache
-            await _cache.set(cache_key, result)
-            return result
+            Usado no aquecimento do cache; recebe os argumentos de negócio, sem a
+            instância do repositório. Exemplo:
+            ```
+            await repository.find_product.prime(product, product_id=product.id)
+            ```
+            """
+            if key_builder.is_method:
+                args = (None,) + args
+            await store(key_builder.build(args, kwargs), result, args, kwargs)
+        
+        async def peek(*args: Any, **kwargs: Any) -> Tuple[bool, Any]:
+            """
+            Consulta o cache sem executar a função em caso de falta.
+            
+            Usado pelas consultas em lote, que buscam no banco apenas as faltas.
+            Recebe os argumentos de negócio, sem a instância do repositório.
+            
+            Returns:
+                Tupla `(acerto, valor)`; em acertos de cache negativo o valor é None
+            """
+            if key_builder.is_method:
+                args = (None,) + args
+            entry = await _cache.lookup(key_builder.build(args, kwargs))
+            if entry is None or entry.value is None or not _cache.is_fresh(entry):
+                return False, None
+            record_hit(entry)
+            if isinstance(entry.value, NegativeResult):
+                return True, None
+            return True, entry.value
+        
+        wrapper.cache_key = key_builder.key_for
+        wrapper.prime = prime
+        wrapper.peek = peek
         return wrapper
     return decorator
 
 
-def invalidate_cache(key_prefix: str = None):
+def invalidate_cache(key_prefix: str = None, tags: Iterable[str] = ()):
     """
     Decorador para invalidar o cache após a execução de uma função.
     
+    Quando `tags` é informado, apenas os itens associados às tags resolvidas
+    são removidos; caso contrário são removidos os itens do prefixo
+    `key_prefix`. Sem nenhum dos dois, o cache inteiro é limpo.
+    
     Exemplo de uso:
     ```
-    @invalidate_cache(key_prefix='user')
-    async def update_user(user_id: str, data: dict) -> User:
+    @invalidate_cache(key_prefix='user', tags=('user:{user.id}',))
+    async def update_user(user: User) -> User:
         # Lógica para atualizar o usuário
         return updated_user
     ```
     
     Args:
         key_prefix: Prefixo para as chaves do cache a serem invalidadas
+        tags: Modelos de tag (ver `format_tags`) a serem invalidados
     """
+    tags = tuple(tags)
+    
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        key_builder = CacheKeyBuilder(func, prefix=key_prefix or '')
+        
         @wraps(func)
         async def wrapper(*args, **kwargs):
             result = await func(*args, **kwargs)
             
-            # Invalida o cache com o prefixo especificado
-            if key_prefix:
-                # Precisa implementar uma lógica mais sofisticada para invalidade
-                # apenas chaves com o prefixo especificado
-                await _cache.clear()
+            if tags:
+                # Invalida apenas as entidades e listagens afetadas
+                arguments = key_builder.arguments(args, kwargs) or {}
+                invalidation = ('tags', tuple(format_tags(tags, arguments, result)))
+            elif key_prefix:
+                # Invalida apenas as chaves com o prefixo especificado
+                invalidation = ('prefix', key_prefix)
             else:
-                await _cache.clear()
-            
+                invalidation = ('clear', None)
+            await _invalidate(invalidation)
             return result
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
@@ -0,0 +1,88 @@
+"""
+Aquecimento do cache na inicialização dos workers.
+
+Após um deploy (ou um `--reload`) cada worker começa com o cache vazio e as
+primeiras requisições de `/cart` e `/order` vão todas ao banco. O
+aquecimento carrega o catálogo de produtos, as ofertas ativas e,
+opcionalmente, os usuários com pedidos mais recentes, com uma consulta por
+repositório, e preenche as chaves das consultas individuais.
+
+Enquanto o aquecimento não termina, o endpoint de saúde reporta "warming".
+"""
+import os
+import time
+from typing import Any, Callable, Dict
+
+from infrastructure.logging_config import logger
+from infrastructure.offer.sqlalchemy.offer_repository import OfferRepository
+from infrastructure.product.sqlalchemy.product_repository import \
+    ProductRepository
+from infrastructure.user.sqlalchemy.user_repository import UserRepository
+
+# Configuração do aquecimento (pode ser ajustada por variáveis de ambiente)
+CACHE_WARMUP_ENABLED = os.getenv("CACHE_WARMUP_ENABLED", "true").lower() in ("1", "true", "yes")
+CACHE_WARMUP_USERS = int(os.getenv("CACHE_WARMUP_USERS", "0"))
+
+# Estados do aquecimento
+WARMUP_PENDING = "pending"
+WARMUP_WARMING = "warming"
+WARMUP_DONE = "done"
+WARMUP_FAILED = "failed"
+WARMUP_DISABLED = "disabled"
+
+
+class CacheWarmup:
+    """
+    Executa o aquecimento do cache e expõe o seu estado para o health check.
+
+    Uma falha no aquecimento não impede o worker de atender: o estado passa a
+    `failed` e o cache é preenchido normalmente pelas requisições.
+    """
+
+    def __init__(self, enabled: bool = CACHE_WARMUP_ENABLED, users_limit: int = CACHE_WARMUP_USERS):
+        """
+        Inicializa o aquecimento.
+
+        Args:
+            enabled: Indica se o aquecimento deve ser executado
+            users_limit: Quantidade de usuários mais recentes a carregar (0 desabilita)
+        """
+        self.enabled = enabled
+        self.users_limit = users_limit
+        self.status = WARMUP_PENDING if enabled else WARMUP_DISABLED
+        self.counts: Dict[str, int] = {}
+
+    @property
+    def ready(self) -> bool:
+        """Indica se o worker já pode receber tráfego."""
+        return self.status not in (WARMUP_PENDING, WARMUP_WARMING)
+
+    async def run(self, session_factory: Callable[[], Any]) -> None:
+        """
+        Carrega produtos, ofertas ativas e usuários recentes no cache.
+
+        Args:
+            session_factory: Fábrica de `AsyncSession` (por exemplo `SessionLocal`)
+        """
+        if not self.enabled:
+            return
+
+        self.status = WARMUP_WARMING
+        started = time.perf_counter()
+        try:
+            async with session_factory() as session:
+                self.counts["product"] = await ProductRepository(session=session).warm_cache()
+                self.counts["offer"] = await OfferRepository(session=session).warm_cache()
+                if self.users_limit > 0:
+                    self.counts["user"] = await UserRepository(session=session).warm_cache(limit=self.users_limit)
+        except Exception as e:
+            self.status = WARMUP_FAILED
+            logger.warning("Falha no aquecimento do cache: %s", e)
+            return
+
+        self.status = WARMUP_DONE
+        logger.info("Cache aquecido em %.0f ms: %s", (time.perf_counter() - started) * 1000, self.counts)
+
+
+# Instância usada pela aplicação
+cache_warmup = CacheWarmup()
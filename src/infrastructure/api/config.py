@@ -1,8 +1,50 @@
+from typing import Literal, Optional
+
 from pydantic import BaseSettings, Field
 
 
 class Settings(BaseSettings):
     CONNECTION: str = Field(..., env="CONNECTION")
 
+    # Orçamento de conexões: max_connections do Postgres, menos as reservadas
+    # (migrações, administração, monitoramento), dividido entre os workers
+    DB_MAX_CONNECTIONS: int = Field(200, env="DB_MAX_CONNECTIONS")
+    DB_RESERVED_CONNECTIONS: int = Field(20, env="DB_RESERVED_CONNECTIONS")
+    WORKERS_COUNT: int = Field(1, env="WORKERS_COUNT")
+    # Fração das conexões de cada worker abertas apenas sob demanda
+    DB_POOL_OVERFLOW_RATIO: float = Field(0.25, env="DB_POOL_OVERFLOW_RATIO")
+    # Espera máxima por uma conexão do pool, em segundos
+    DB_POOL_TIMEOUT: float = Field(2.0, env="DB_POOL_TIMEOUT")
+    # Requisições esperando por uma conexão além das quais o pool recusa (padrão: o dobro das conexões do worker)
+    DB_POOL_MAX_WAITING: Optional[int] = Field(None, env="DB_POOL_MAX_WAITING")
+    DB_POOL_RECYCLE: int = Field(1800, env="DB_POOL_RECYCLE")
+    DB_COMMAND_TIMEOUT: float = Field(10.0, env="DB_COMMAND_TIMEOUT")
+    # Cache de prepared statements: `prepared` (Postgres direto), `pgbouncer`
+    # (pooler em modo transação com prepared statements) ou `disabled`
+    DB_STATEMENT_CACHE_MODE: Literal["prepared", "pgbouncer", "disabled"] = Field("prepared", env="DB_STATEMENT_CACHE_MODE")
+    DB_STATEMENT_CACHE_SIZE: int = Field(100, env="DB_STATEMENT_CACHE_SIZE")
+
+    # Réplica de leitura (opcional): sem ela as leituras também vão ao primário
+    REPLICA_CONNECTION: Optional[str] = Field(None, env="REPLICA_CONNECTION")
+    # Segundos em que as leituras de um usuário que acabou de escrever vão ao primário
+    READ_YOUR_WRITES_WINDOW: int = Field(5, env="READ_YOUR_WRITES_WINDOW")
+
+    @property
+    def database_url(self) -> str:
+        """URL de conexão com o driver asyncpg (aceita `postgresql://` e `postgres://`)."""
+        return asyncpg_url(self.CONNECTION)
+
+    @property
+    def replica_database_url(self) -> Optional[str]:
+        """URL de conexão da réplica com o driver asyncpg, se configurada."""
+        return asyncpg_url(self.REPLICA_CONNECTION) if self.REPLICA_CONNECTION else None
+
+
+def asyncpg_url(url: str) -> str:
+    for scheme in ("postgresql://", "postgres://"):
+        if url.startswith(scheme):
+            return "postgresql+asyncpg://" + url[len(scheme):]
+    return url
+
 
 settings = Settings()
@@ -0,0 +1,173 @@
+"""
+Orçamento de conexões com o banco e fila de admissão do pool.
+
+Cada worker do uvicorn tem o seu próprio pool. Com tamanhos fixos por
+worker, o total de conexões cresce com a quantidade de workers e pode
+passar do `max_connections` do Postgres: as conexões excedentes são
+recusadas pelo servidor no meio de um pico de carga.
+
+O orçamento global (`DB_MAX_CONNECTIONS` menos `DB_RESERVED_CONNECTIONS`
+para migrações, administração e monitoramento) é dividido entre os
+workers. Quando o pool de um worker está esgotado, as requisições esperam
+por uma conexão por no máximo `DB_POOL_TIMEOUT` segundos, e apenas
+`DB_POOL_MAX_WAITING` requisições podem esperar ao mesmo tempo: as demais
+são recusadas imediatamente (HTTP 503), em vez de acumular uma fila que só
+terminaria em timeout.
+
+`instrument_pool` exporta a ocupação do pool, a espera por conexões e o
+ciclo de vida das conexões para o Prometheus.
+"""
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from infrastructure.observability.metrics import (
+    increment_db_pool_connect, increment_db_pool_invalidation,
+    increment_db_pool_pre_ping_failure, increment_db_pool_recycle,
+    record_db_pool_checkout_wait, record_db_pool_connection_age,
+    register_db_pool_gauges)
+
+
+class PoolExhaustedError(PoolTimeoutError):
+    pass
+
+
+def pool_budget(max_connections: int, reserved: int, workers: int, overflow_ratio: float, max_waiting: Optional[int] = None) -> Dict[str, int]:
+    """
+    Divide o orçamento global de conexões entre os workers.
+
+    Args:
+        max_connections: `max_connections` do Postgres
+        reserved: Conexões reservadas fora dos pools da API
+        workers: Quantidade de workers (processos) da API
+        overflow_ratio: Fração das conexões do worker abertas apenas sob demanda (overflow)
+        max_waiting: Requisições que podem esperar por uma conexão (padrão: o dobro das conexões do worker)
+
+    Returns:
+        Dict com `pool_size`, `max_overflow` e `max_waiting` do pool de cada worker
+
+    Raises:
+        ValueError: Se o orçamento não permitir ao menos uma conexão por worker
+    """
+    per_worker = (max_connections - reserved) // max(workers, 1)
+    if per_worker < 1:
+        raise ValueError(
+            f"Connection budget of {max_connections - reserved} cannot be split across {workers} workers"
+        )
+    max_overflow = min(int(per_worker * overflow_ratio), per_worker - 1)
+    return {
+        "pool_size": per_worker - max_overflow,
+        "max_overflow": max_overflow,
+        "max_waiting": per_worker * 2 if max_waiting is None else max_waiting,
+    }
+
+
+class AdmissionQueuePool(AsyncAdaptedQueuePool):
+    """
+    Pool assíncrono com limite de requisições esperando por uma conexão.
+
+    Quando não há conexão livre nem espaço para overflow, a requisição entra
+    na fila do pool (com o `timeout` do pool); com `max_waiting` requisições
+    já na fila, ela é recusada com `PoolExhaustedError`. O pool roda no
+    loop de eventos do worker, então o contador não precisa de trava.
+    """
+
+    # None desabilita o limite (comportamento do AsyncAdaptedQueuePool)
+    max_waiting: Optional[int] = None
+    # Nome do pool nas métricas
+    name: str = "primary"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.waiting = 0
+
+    def _do_get(self):
+        # A espera inclui a abertura de uma conexão nova, quando há espaço para ela
+        start = time.perf_counter()
+        try:
+            return self._admit()
+        finally:
+            record_db_pool_checkout_wait(self.name, (time.perf_counter() - start) * 1000)
+
+    def _admit(self):
+        # Mesma condição de espera do QueuePool: pool vazio e overflow no limite
+        exhausted = self._pool.empty() and self._overflow >= self._max_overflow
+        if not exhausted or self.max_waiting is None:
+            return super()._do_get()
+        if self.waiting >= self.max_waiting:
+            raise PoolExhaustedError(
+                f"Connection pool exhausted ({self.size()} connections, overflow {self.overflow()}, "
+                f"{self.waiting} requests waiting)"
+            )
+        self.waiting += 1
+        try:
+            return super()._do_get()
+        finally:
+            self.waiting -= 1
+
+    def recreate(self) -> "AdmissionQueuePool":
+        # engine.dispose() recria o pool; o limite da fila e o nome são mantidos
+        pool = super().recreate()
+        pool.max_waiting = self.max_waiting
+        pool.name = self.name
+        return pool
+
+    def status(self) -> str:
+        return f"{super().status()} Waiting: {self.waiting}"
+
+    def usage(self) -> Dict[str, int]:
+        return {
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            # overflow() começa em -pool_size enquanto o pool não está cheio
+            "overflow": max(self.overflow(), 0),
+            "waiting": self.waiting,
+        }
+
+
+def instrument_pool(engine: AsyncEngine) -> None:
+    """
+    Registra os eventos do pool do engine nas métricas.
+
+    Os eventos ficam no engine, então continuam valendo para o pool recriado
+    por `engine.dispose()`. A espera por conexões é medida pelo próprio
+    `AdmissionQueuePool`.
+
+    Args:
+        engine: Engine com um `AdmissionQueuePool`
+    """
+    sync_engine = engine.sync_engine
+    name = sync_engine.pool.name
+    recycle = sync_engine.pool._recycle
+
+    @event.listens_for(sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        increment_db_pool_connect(name)
+
+    @event.listens_for(sync_engine, "close")
+    def on_close(dbapi_connection, connection_record):
+        age = time.time() - connection_record.starttime
+        record_db_pool_connection_age(name, age)
+        # O pool_recycle não tem evento próprio: a conexão é fechada no checkout
+        if recycle > -1 and age > recycle:
+            increment_db_pool_recycle(name)
+
+    @event.listens_for(sync_engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        increment_db_pool_invalidation(name)
+
+    @event.listens_for(sync_engine, "soft_invalidate")
+    def on_soft_invalidate(dbapi_connection, connection_record, exception):
+        increment_db_pool_invalidation(name, soft=True)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def on_error(context):
+        if context.is_pre_ping:
+            increment_db_pool_pre_ping_failure(name)
+
+    # Lê o pool atual do engine, que muda a cada engine.dispose()
+    register_db_pool_gauges(name, lambda: sync_engine.pool.usage())
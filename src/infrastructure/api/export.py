@@ -0,0 +1,248 @@
+"""
+Exportação em massa (NDJSON ou CSV) direto do banco para a resposta.
+
+As listagens da API montam entidades e DTOs para cada linha; para despejar
+tabelas inteiras isso mantém todo o resultado na memória do worker. A
+exportação lê as colunas da tabela (sem ORM) e envia o resultado em partes:
+
+- CSV: `COPY (consulta) TO STDOUT` pelo asyncpg, com o CSV gerado pelo
+  próprio Postgres;
+- NDJSON (ou CSV quando o COPY está desabilitado): cursor do lado do
+  servidor lido em lotes de `EXPORT_BATCH_SIZE` linhas.
+
+Nos dois casos apenas um número limitado de partes fica em memória: o
+próximo lote só é lido do banco depois que o anterior foi entregue ao
+cliente. A compressão gzip é opcional e feita parte a parte.
+"""
+import asyncio
+import csv
+import io
+import json
+import os
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional
+from uuid import UUID
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from infrastructure.api.database import ReadSessionLocal
+from infrastructure.logging_config import logger
+
+# Configuração da exportação (pode ser ajustada por variáveis de ambiente)
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "2000"))
+EXPORT_USE_COPY = os.getenv("EXPORT_USE_COPY", "true").lower() in ("1", "true", "yes")
+EXPORT_GZIP_LEVEL = int(os.getenv("EXPORT_GZIP_LEVEL", "5"))
+# O command_timeout do pool (segundos) é curto demais para um COPY de milhões de linhas
+EXPORT_TIMEOUT = float(os.getenv("EXPORT_TIMEOUT", "3600"))
+# Partes do COPY aguardando envio ao cliente (limita a memória se o cliente for lento)
+EXPORT_COPY_QUEUE_SIZE = 16
+
+# Formatos e compressões aceitos
+FORMAT_NDJSON = "ndjson"
+FORMAT_CSV = "csv"
+EXPORT_FORMATS = (FORMAT_NDJSON, FORMAT_CSV)
+COMPRESSION_GZIP = "gzip"
+
+MEDIA_TYPES = {
+    FORMAT_NDJSON: "application/x-ndjson",
+    FORMAT_CSV: "text/csv",
+}
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (UUID, Decimal)):
+        # Decimal como texto para não perder precisão nos valores monetários
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _csv_value(value: Any) -> Any:
+    # Mesma representação do texto do Postgres: NULL vazio, datas com espaço
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return value.value
+    return str(value)
+
+
+def encode_ndjson(rows: Iterable[Dict[str, Any]]) -> bytes:
+    """
+    Serializa um lote de linhas como NDJSON (um objeto JSON por linha).
+
+    Args:
+        rows: Linhas como mapeamentos coluna -> valor
+
+    Returns:
+        Lote serializado
+    """
+    return "".join(
+        json.dumps({column: _json_value(value) for column, value in row.items()}, separators=(",", ":")) + "\n"
+        for row in rows
+    ).encode()
+
+
+def encode_csv(rows: Iterable[Dict[str, Any]], columns: Optional[List[str]] = None) -> bytes:
+    """
+    Serializa um lote de linhas como CSV, no mesmo formato do `COPY ... CSV`.
+
+    Args:
+        rows: Linhas como mapeamentos coluna -> valor
+        columns: Colunas do cabeçalho; None para um lote sem cabeçalho
+
+    Returns:
+        Lote serializado
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if columns is not None:
+        writer.writerow(columns)
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row.values()])
+    return buffer.getvalue().encode()
+
+
+async def cursor_chunks(session: AsyncSession, statement, export_format: str, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[bytes]:
+    """
+    Lê a consulta com um cursor do lado do servidor e serializa cada lote.
+
+    Args:
+        session: Sessão do banco de dados
+        statement: Consulta a exportar
+        export_format: `ndjson` ou `csv`
+        batch_size: Quantidade de linhas buscadas do cursor por vez
+
+    Returns:
+        Iterador assíncrono com as partes serializadas
+    """
+    result = await session.stream(statement.execution_options(yield_per=batch_size))
+    if export_format == FORMAT_CSV:
+        yield encode_csv([], columns=list(result.keys()))
+    async for rows in result.mappings().partitions():
+        yield encode_ndjson(rows) if export_format == FORMAT_NDJSON else encode_csv(rows)
+
+
+async def copy_csv_chunks(session: AsyncSession, statement, timeout: float = EXPORT_TIMEOUT) -> AsyncIterator[bytes]:
+    """
+    Exporta a consulta em CSV com `COPY ... TO STDOUT` pela conexão asyncpg da sessão.
+
+    O asyncpg entrega as partes do COPY a um callback; uma fila limitada
+    repassa as partes ao gerador e segura o COPY enquanto o cliente não
+    consome a resposta.
+
+    Args:
+        session: Sessão do banco de dados (com o driver asyncpg)
+        statement: Consulta a exportar (os parâmetros são renderizados na SQL)
+        timeout: Tempo máximo do COPY em segundos
+
+    Returns:
+        Iterador assíncrono com as partes do CSV, com cabeçalho
+    """
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    sql = str(statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=EXPORT_COPY_QUEUE_SIZE)
+
+    async def output(chunk: bytes) -> None:
+        await queue.put(chunk)
+
+    async def run_copy() -> None:
+        try:
+            await raw_connection.driver_connection.copy_from_query(sql, output=output, format="csv", header=True, timeout=timeout)
+        finally:
+            await queue.put(None)
+
+    task = asyncio.create_task(run_copy())
+    try:
+        while True:
+            chunk = await queue.get()
+            if chunk is None:
+                break
+            yield chunk
+        # Propaga um erro do COPY
+        await task
+    finally:
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes], level: int = EXPORT_GZIP_LEVEL) -> AsyncIterator[bytes]:
+    """
+    Comprime as partes em um único fluxo gzip, sem acumular o conteúdo.
+
+    Args:
+        chunks: Partes a comprimir
+        level: Nível de compressão (1 a 9)
+
+    Returns:
+        Iterador assíncrono com as partes comprimidas
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_response(
+    name: str,
+    statement,
+    export_format: str = FORMAT_NDJSON,
+    compression: Optional[str] = None,
+    session_factory: Callable[[], Any] = ReadSessionLocal,
+    use_copy: bool = EXPORT_USE_COPY,
+) -> StreamingResponse:
+    """
+    Monta a resposta em streaming de uma exportação.
+
+    A compressão é decidida pelo parâmetro `compression`, e não pelo
+    GZipMiddleware da aplicação: sem compressão a resposta é marcada como
+    `identity` e o middleware não a comprime.
+
+    Args:
+        name: Nome base do arquivo (por exemplo `orders`)
+        statement: Consulta com as colunas a exportar
+        export_format: `ndjson` ou `csv`
+        compression: `gzip` ou None
+        session_factory: Fábrica de `AsyncSession` (padrão: somente leitura, na réplica)
+        use_copy: Usa `COPY ... TO STDOUT` nas exportações CSV com asyncpg
+
+    Returns:
+        Resposta em streaming com o arquivo exportado
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Invalid export format '{export_format}'")
+    if compression not in (None, COMPRESSION_GZIP):
+        raise ValueError(f"Invalid compression '{compression}'")
+
+    async def body() -> AsyncIterator[bytes]:
+        try:
+            async with session_factory() as session:
+                if export_format == FORMAT_CSV and use_copy and session.bind.dialect.driver == "asyncpg":
+                    chunks = copy_csv_chunks(session, statement)
+                else:
+                    chunks = cursor_chunks(session, statement, export_format)
+                if compression == COMPRESSION_GZIP:
+                    chunks = gzip_chunks(chunks)
+                async for chunk in chunks:
+                    yield chunk
+        except Exception:
+            # O status já foi enviado; a conexão é encerrada com o arquivo incompleto
+            logger.exception("Falha na exportação '%s'", name)
+            raise
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="{name}.{export_format}"',
+        "Content-Encoding": compression or "identity",
+    }
+    return StreamingResponse(body(), media_type=MEDIA_TYPES[export_format], headers=headers)
@@ -3,16 +3,25 @@ import os
 import threading
 
 from fastapi import FastAPI, Request, Response
+from fastapi.exception_handlers import http_exception_handler
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from starlette.exceptions import HTTPException as StarletteHTTPException
 
+from infrastructure.api.cache import configure_background_refresh
+from infrastructure.api.cache_warmup import cache_warmup
 from infrastructure.api.consumers.order_consumer import (start_consumer,
                                                          start_consumer_async)
-from infrastructure.api.database import alter_payment_columns, create_tables
-from infrastructure.api.routers import (cart_item_routers, cart_routers,
-                                        database_routers, offer_routers,
+from infrastructure.api.database import ReadSessionLocal
+from infrastructure.api.migrations import check_schema_version
+from infrastructure.api.routers import (cache_routers, cart_item_routers,
+                                        cart_routers, database_routers,
+                                        export_routers, offer_routers,
                                         order_routers, payment_routers,
                                         product_routers, user_routers)
+from infrastructure.api.shared_cache import configure_shared_cache
 from infrastructure.observability.middleware import TelemetryMiddleware
 from infrastructure.observability.telemetry import setup_telemetry
 
@@ -64,8 +73,8 @@ async def cache_middleware(request: Request, call_next):
     # Processa normalmente para requests não cacheados
     response = await call_next(request)
     
-    # Armazena em cache se for um GET para endpoints específicos
-    if request.method == "GET" and request.url.path in ["/", "/api/health"]:
+    # Armazena em cache se for um GET bem-sucedido para endpoints específicos
+    if request.method == "GET" and request.url.path in ["/", "/api/health"] and response.status_code == 200:
         response_body = b""
         async for chunk in response.body_iterator:
             response_body += chunk
@@ -84,6 +93,26 @@ async def cache_middleware(request: Request, call_next):
     
     return response
 
+# Pool de conexões esgotado (fila de admissão cheia ou espera acima de DB_POOL_TIMEOUT):
+# 503 com Retry-After, para o cliente ou o balanceador tentarem de novo
+def pool_unavailable_response() -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Database connection pool exhausted, retry later"},
+        headers={"Retry-After": "1"},
+    )
+
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    return pool_unavailable_response()
+
+@app.exception_handler(StarletteHTTPException)
+async def pool_timeout_http_exception_handler(request: Request, exc: StarletteHTTPException):
+    # Os routers convertem qualquer exceção em HTTPException 500, preservando a causa original
+    if isinstance(exc.__cause__, PoolTimeoutError):
+        return pool_unavailable_response()
+    return await http_exception_handler(request, exc)
+
 # Registra os routers
 app.include_router(user_routers.router)
 app.include_router(product_routers.router)
@@ -93,16 +122,35 @@ app.include_router(offer_routers.router)
 app.include_router(payment_routers.router)
 app.include_router(order_routers.router)
 app.include_router(database_routers.router)
+app.include_router(cache_routers.router)
+app.include_router(export_routers.router)
 
 # Variável para armazenar a task do consumer em segundo plano
 consumer_task = None
 
+# Cache em camadas compartilhado entre os workers (None se desabilitado)
+shared_cache = None
+
+# Task do aquecimento do cache em segundo plano
+warmup_task = None
+
 @app.on_event("startup")
 async def startup_event():
     """Inicializa componentes na inicialização da aplicação"""
-    # Inicializa o banco de dados
-    await create_tables()
-    await alter_payment_columns()  # Aplica a alteração nas colunas para permitir NULL
+    # O esquema é criado e alterado por `python -m infrastructure.api.migrations`;
+    # aqui apenas confere se o banco está na versão esperada
+    await check_schema_version()
+    
+    # Recargas stale-while-revalidate do cache usam sessões próprias, de leitura
+    configure_background_refresh(ReadSessionLocal)
+    
+    # Segunda camada de cache compartilhada entre os workers (CACHE_SOCKET_PATH)
+    global shared_cache
+    shared_cache = await configure_shared_cache()
+    
+    # Aquece o cache em segundo plano; o health check reporta "warming" até terminar
+    global warmup_task
+    warmup_task = asyncio.get_running_loop().create_task(cache_warmup.run(ReadSessionLocal))
     
     # Inicia o consumidor de mensagens em uma thread separada
     # para não bloquear a thread principal que processa requisições HTTP
@@ -122,6 +170,9 @@ async def startup_event():
 async def shutdown_event():
     """Limpeza ao encerrar a aplicação"""
     # Encerra graciosamente tasks em segundo plano
+    if warmup_task and not warmup_task.done():
+        warmup_task.cancel()
+    
     global consumer_task
     if consumer_task:
         consumer_task.cancel()
@@ -129,15 +180,26 @@ async def shutdown_event():
             await consumer_task
         except asyncio.CancelledError:
             pass
+    
+    if shared_cache is not None:
+        await shared_cache.client.close()
 
 @app.get("/")
 def read_root():
     return {"message": "API is running"}
 
 @app.get("/api/health")
-def health_check():
+def health_check(response: Response):
     """Endpoint para verificação de saúde da API"""
+    if not cache_warmup.ready:
+        # Ainda aquecendo o cache: não está pronto para receber tráfego
+        response.status_code = 503
+        return {
+            "status": "warming",
+            "version": "1.0.0"
+        }
     return {
         "status": "ok",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "cache_warmup": cache_warmup.status
     }
\ No newline at end of file
@@ -0,0 +1,414 @@
+"""
+Migrações versionadas do esquema do banco.
+
+A criação das tabelas e os ajustes de esquema eram executados por todos os
+workers a cada inicialização, com bloqueios exclusivos nas tabelas enquanto
+o tráfego já chegava. As migrações agora são executadas uma única vez, fora
+da aplicação, com `python -m infrastructure.api.migrations`:
+
+- a tabela `schema_migrations` guarda as versões aplicadas;
+- um advisory lock garante que apenas um processo migra por vez (os demais
+  esperam e encontram o esquema já atualizado);
+- migrações transacionais rodam em uma transação com `lock_timeout`, para
+  desistir em vez de enfileirar o tráfego atrás de um bloqueio exclusivo;
+- migrações não transacionais (`transactional=False`) rodam em autocommit e
+  podem usar `CREATE INDEX CONCURRENTLY`. Devem ser idempotentes: se o
+  processo cair no meio, a migração é executada de novo por inteiro.
+
+Na inicialização a aplicação apenas compara a versão do banco com a última
+migração conhecida (`check_schema_version`).
+"""
+import argparse
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from infrastructure.api.database import engine
+from infrastructure.logging_config import logger
+
+# Configuração das migrações (pode ser ajustada por variáveis de ambiente)
+# Tempo máximo de espera por um bloqueio de tabela antes de desistir da migração
+MIGRATION_LOCK_TIMEOUT = os.getenv("MIGRATION_LOCK_TIMEOUT", "5s")
+# O command_timeout do pool (segundos) é curto demais para criar índices em tabelas grandes
+MIGRATION_COMMAND_TIMEOUT = float(os.getenv("MIGRATION_COMMAND_TIMEOUT", "3600"))
+# Impede a inicialização da aplicação com o banco em uma versão anterior à esperada
+SCHEMA_VERSION_STRICT = os.getenv("SCHEMA_VERSION_STRICT", "true").lower() in ("1", "true", "yes")
+
+# Chave do advisory lock das migrações (identifica esta aplicação no banco)
+MIGRATION_LOCK_KEY = 7_236_501
+VERSION_TABLE = "schema_migrations"
+
+
+class MigrationError(Exception):
+    pass
+
+
+class SchemaVersionError(RuntimeError):
+    pass
+
+
+class Migration:
+    """
+    Uma alteração de esquema com a sua versão.
+
+    A função `upgrade` recebe a conexão da migração: dentro de uma transação
+    quando `transactional` é verdadeiro, em autocommit caso contrário.
+    """
+
+    def __init__(self, version: int, description: str, upgrade: Callable[[AsyncConnection], Awaitable[None]], transactional: bool = True):
+        """
+        Inicializa a migração.
+
+        Args:
+            version: Número da versão (crescente, sem repetição)
+            description: Descrição registrada em `schema_migrations`
+            upgrade: Função assíncrona que aplica a alteração
+            transactional: Indica se a migração roda em uma transação
+        """
+        self.version = version
+        self.description = description
+        self.upgrade = upgrade
+        self.transactional = transactional
+
+
+def sql(*statements: str) -> Callable[[AsyncConnection], Awaitable[None]]:
+    """
+    Monta uma migração que executa comandos SQL em sequência.
+
+    Args:
+        statements: Comandos SQL
+
+    Returns:
+        Função de `upgrade`
+    """
+    async def upgrade(conn: AsyncConnection) -> None:
+        for statement in statements:
+            await conn.execute(text(statement))
+    return upgrade
+
+
+async def create_index_concurrently(conn: AsyncConnection, name: str, table: str, columns: str, unique: bool = False) -> None:
+    """
+    Cria um índice sem bloquear as escritas na tabela.
+
+    Um `CREATE INDEX CONCURRENTLY` interrompido deixa um índice inválido com
+    o mesmo nome, que o `IF NOT EXISTS` não recriaria; esse índice é
+    removido antes de tentar de novo.
+
+    Args:
+        conn: Conexão em autocommit
+        name: Nome do índice
+        table: Tabela
+        columns: Colunas do índice (SQL)
+        unique: Indica se o índice é único
+    """
+    invalid = await conn.scalar(text(
+        "SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"
+    ), {"name": name})
+    if invalid:
+        logger.warning("Removendo o índice inválido %s antes de recriá-lo", name)
+        await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    await conn.execute(text(
+        f"CREATE {'UNIQUE ' if unique else ''}INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns})"
+    ))
+
+
+def concurrent_indexes(*indexes: Sequence[Any]) -> Callable[[AsyncConnection], Awaitable[None]]:
+    """
+    Monta uma migração não transacional que cria índices com `CONCURRENTLY`.
+
+    Args:
+        indexes: Tuplas `(nome, tabela, colunas)` ou `(nome, tabela, colunas, único)`
+
+    Returns:
+        Função de `upgrade`
+    """
+    async def upgrade(conn: AsyncConnection) -> None:
+        for index in indexes:
+            await create_index_concurrently(conn, *index)
+    return upgrade
+
+
+# Esquema anterior às migrações, fixo: os índices e restrições adicionados
+# depois (e refletidos nos modelos) vêm apenas das migrações seguintes.
+# Bancos criados antes das migrações já têm as tabelas: IF NOT EXISTS.
+create_initial_schema = sql(
+    """
+    CREATE TABLE IF NOT EXISTS tb_users (
+        id UUID NOT NULL PRIMARY KEY,
+        name VARCHAR NOT NULL,
+        email VARCHAR NOT NULL,
+        age INTEGER,
+        gender VARCHAR,
+        phone_number VARCHAR NOT NULL,
+        password VARCHAR NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_tb_users_id ON tb_users (id)",
+    """
+    CREATE TABLE IF NOT EXISTS tb_products (
+        id SERIAL NOT NULL PRIMARY KEY,
+        name VARCHAR NOT NULL,
+        price FLOAT NOT NULL,
+        category VARCHAR
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_tb_products_id ON tb_products (id)",
+    """
+    CREATE TABLE IF NOT EXISTS tb_offers (
+        id SERIAL NOT NULL PRIMARY KEY,
+        start_date TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+        end_date TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+        discount_type VARCHAR NOT NULL,
+        discount_value FLOAT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS tb_carts (
+        id UUID NOT NULL PRIMARY KEY,
+        user_id UUID REFERENCES tb_users (id),
+        total_price FLOAT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_tb_carts_id ON tb_carts (id)",
+    """
+    CREATE TABLE IF NOT EXISTS tb_cart_items (
+        id UUID NOT NULL PRIMARY KEY,
+        cart_id UUID NOT NULL REFERENCES tb_carts (id) ON DELETE CASCADE,
+        product_id INTEGER NOT NULL REFERENCES tb_products (id),
+        quantity INTEGER NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_tb_cart_items_id ON tb_cart_items (id)",
+    """
+    CREATE TABLE IF NOT EXISTS tb_orders (
+        id UUID NOT NULL PRIMARY KEY,
+        user_id UUID NOT NULL REFERENCES tb_users (id),
+        cart_id UUID NOT NULL REFERENCES tb_carts (id) ON DELETE CASCADE,
+        offer_id INTEGER REFERENCES tb_offers (id),
+        type VARCHAR NOT NULL,
+        total_price NUMERIC(10, 2) NOT NULL,
+        status VARCHAR NOT NULL,
+        created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+        updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_tb_orders_id ON tb_orders (id)",
+    """
+    CREATE TABLE IF NOT EXISTS tb_payments (
+        id UUID NOT NULL PRIMARY KEY,
+        user_id UUID NOT NULL REFERENCES tb_users (id),
+        order_id UUID NOT NULL REFERENCES tb_orders (id),
+        payment_method VARCHAR,
+        payment_card_gateway VARCHAR,
+        status VARCHAR NOT NULL
+    )
+    """,
+)
+
+
+async def add_unique_order_per_cart(conn: AsyncConnection) -> None:
+    exists = await conn.scalar(text("SELECT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_orders_cart_id')"))
+    if exists:
+        return
+    duplicated = await conn.scalar(text(
+        "SELECT COUNT(*) FROM (SELECT cart_id FROM tb_orders GROUP BY cart_id HAVING COUNT(*) > 1) AS duplicated"
+    ))
+    if duplicated:
+        # Pedidos têm pagamentos associados: os duplicados precisam ser resolvidos manualmente
+        raise MigrationError(f"{duplicated} carts have more than one order; resolve them before adding uq_orders_cart_id")
+    # O índice é criado sem bloquear a tabela e depois promovido a restrição (operação instantânea)
+    await create_index_concurrently(conn, "uq_orders_cart_id", "tb_orders", "cart_id", unique=True)
+    await conn.execute(text("ALTER TABLE tb_orders ADD CONSTRAINT uq_orders_cart_id UNIQUE USING INDEX uq_orders_cart_id"))
+
+
+# Migrações conhecidas, em ordem de versão. Novas migrações entram sempre no final.
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Initial schema", create_initial_schema),
+    Migration(2, "Allow NULL payment method and card gateway", sql(
+        "ALTER TABLE tb_payments ALTER COLUMN payment_method DROP NOT NULL",
+        "ALTER TABLE tb_payments ALTER COLUMN payment_card_gateway DROP NOT NULL",
+    )),
+    Migration(3, "Merge duplicated cart items", sql(
+        """
+        UPDATE tb_cart_items AS item
+        SET quantity = duplicated.total_quantity
+        FROM (
+            SELECT MIN(id::text)::uuid AS id, SUM(quantity) AS total_quantity
+            FROM tb_cart_items
+            GROUP BY cart_id, product_id
+            HAVING COUNT(*) > 1
+        ) AS duplicated
+        WHERE item.id = duplicated.id
+        """,
+        """
+        DELETE FROM tb_cart_items AS item
+        USING tb_cart_items AS kept
+        WHERE item.cart_id = kept.cart_id
+          AND item.product_id = kept.product_id
+          AND item.id::text > kept.id::text
+        """,
+    )),
+    Migration(4, "Unique cart item per product", concurrent_indexes(
+        ("uq_cart_items_cart_product", "tb_cart_items", "cart_id, product_id", True),
+    ), transactional=False),
+    Migration(5, "Indexes for the hot repository queries", concurrent_indexes(
+        ("ix_orders_user_created_at", "tb_orders", "user_id, created_at, id"),
+        ("ix_orders_created_at", "tb_orders", "created_at, id"),
+        ("ix_payments_order_id", "tb_payments", "order_id"),
+        ("ix_payments_user_id", "tb_payments", "user_id, id"),
+        ("ix_carts_user_id", "tb_carts", "user_id, id"),
+        ("ix_users_email", "tb_users", "email"),
+    ), transactional=False),
+    Migration(6, "Unique order per cart", add_unique_order_per_cart, transactional=False),
+]
+
+# Versão esperada pela aplicação
+LATEST_VERSION = max(migration.version for migration in MIGRATIONS)
+
+
+def migration_engine() -> AsyncEngine:
+    """Engine das migrações: mesmo banco da aplicação, sem pool e sem o timeout curto dos comandos."""
+    return create_async_engine(
+        engine.url,
+        poolclass=NullPool,
+        connect_args={"command_timeout": MIGRATION_COMMAND_TIMEOUT},
+    )
+
+
+async def current_version(conn: AsyncConnection) -> int:
+    """
+    Consulta a última versão aplicada.
+
+    Args:
+        conn: Conexão com o banco
+
+    Returns:
+        Última versão aplicada (0 se nenhuma migração foi aplicada)
+    """
+    exists = await conn.scalar(text(f"SELECT to_regclass('{VERSION_TABLE}') IS NOT NULL"))
+    if not exists:
+        return 0
+    return await conn.scalar(text(f"SELECT COALESCE(MAX(version), 0) FROM {VERSION_TABLE}"))
+
+
+async def _apply(target: AsyncEngine, migration: Migration) -> None:
+    record = text(f"INSERT INTO {VERSION_TABLE} (version, description) VALUES (:version, :description)")
+    values = {"version": migration.version, "description": migration.description}
+    if migration.transactional:
+        async with target.begin() as conn:
+            await conn.execute(text(f"SET LOCAL lock_timeout = '{MIGRATION_LOCK_TIMEOUT}'"))
+            await migration.upgrade(conn)
+            await conn.execute(record, values)
+        return
+    async with target.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text(f"SET lock_timeout = '{MIGRATION_LOCK_TIMEOUT}'"))
+        await migration.upgrade(conn)
+        await conn.execute(record, values)
+
+
+async def migrate(target: Optional[AsyncEngine] = None, migrations: Sequence[Migration] = MIGRATIONS) -> List[int]:
+    """
+    Aplica as migrações pendentes, com um único processo migrando por vez.
+
+    O advisory lock é mantido em uma conexão própria durante toda a
+    execução; as migrações usam outras conexões do mesmo engine.
+
+    Args:
+        target: Engine do banco (usa `migration_engine()` se omitido)
+        migrations: Migrações conhecidas
+
+    Returns:
+        Versões aplicadas nesta execução
+    """
+    own_engine = target is None
+    target = target or migration_engine()
+    applied: List[int] = []
+    try:
+        async with target.connect() as lock_conn:
+            lock_conn = await lock_conn.execution_options(isolation_level="AUTOCOMMIT")
+            # Espera outro processo que esteja migrando terminar
+            await lock_conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            try:
+                await lock_conn.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE} ("
+                    "version integer PRIMARY KEY, "
+                    "description text NOT NULL, "
+                    "applied_at timestamptz NOT NULL DEFAULT now())"
+                ))
+                version = await current_version(lock_conn)
+                for migration in sorted(migrations, key=lambda m: m.version):
+                    if migration.version <= version:
+                        continue
+                    logger.info("Aplicando a migração %d: %s", migration.version, migration.description)
+                    await _apply(target, migration)
+                    applied.append(migration.version)
+            finally:
+                await lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+    finally:
+        if own_engine:
+            await target.dispose()
+    return applied
+
+
+async def check_schema_version(target: AsyncEngine = engine, strict: bool = SCHEMA_VERSION_STRICT) -> int:
+    """
+    Compara a versão do banco com a última migração conhecida pela aplicação.
+
+    Um banco em versão posterior é aceito (durante um deploy os workers
+    antigos continuam atendendo depois da migração).
+
+    Args:
+        target: Engine do banco
+        strict: Interrompe a inicialização se houver migrações pendentes
+
+    Returns:
+        Versão atual do banco
+
+    Raises:
+        SchemaVersionError: Se houver migrações pendentes e `strict` for verdadeiro
+    """
+    async with target.connect() as conn:
+        version = await current_version(conn)
+    if version < LATEST_VERSION:
+        message = (
+            f"Database schema is at version {version}, the application expects {LATEST_VERSION}; "
+            "run `python -m infrastructure.api.migrations`"
+        )
+        if strict:
+            raise SchemaVersionError(message)
+        logger.warning(message)
+    return version
+
+
+async def _status() -> int:
+    target = migration_engine()
+    try:
+        async with target.connect() as conn:
+            return await current_version(conn)
+    finally:
+        await target.dispose()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Aplica as migrações pendentes (ou mostra a versão do banco com `--status`)."""
+    parser = argparse.ArgumentParser(description="Migrações do esquema do banco")
+    parser.add_argument("--status", action="store_true", help="mostra a versão atual sem migrar")
+    args = parser.parse_args(argv)
+
+    if args.status:
+        version = asyncio.run(_status())
+        print(f"Versão do banco: {version} (aplicação: {LATEST_VERSION})")
+        return
+
+    applied = asyncio.run(migrate())
+    print(f"Migrações aplicadas: {applied}" if applied else "Nenhuma migração pendente")
+
+
+if __name__ == "__main__":
+    main()
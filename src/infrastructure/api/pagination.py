@@ -0,0 +1,266 @@
+"""
+Paginação por cursor (keyset) e contagem opcional de registros.
+
+A paginação por `OFFSET` percorre e descarta todas as linhas das páginas
+anteriores, e a contagem exata (`SELECT count(*)`) percorre a tabela
+inteira a cada página: ambas ficam mais lentas conforme a tabela cresce.
+Com o cursor, cada página continua a partir da chave `(created_at, id)` do
+último registro retornado, usando o índice de ordenação. Tabelas sem data
+de criação são paginadas pela chave primária (`id_keyset_page`).
+
+O cursor é opaco para o cliente: a chave é codificada em base64 e deve ser
+devolvida sem alterações no parâmetro `cursor` da próxima requisição.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import ClauseElement, Executable
+
+# Modos de contagem do total de registros
+COUNT_EXACT = "exact"
+COUNT_ESTIMATED = "estimated"
+COUNT_MODES = (COUNT_EXACT, COUNT_ESTIMATED)
+
+# Tamanho de página padrão das listagens paginadas pela chave primária
+DEFAULT_PAGE_SIZE = 100
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def _encode_key(*parts: Any) -> str:
+    payload = json.dumps([str(part) for part in parts], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_key(cursor: str) -> List[str]:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    parts = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    if not isinstance(parts, list):
+        raise ValueError("Cursor payload must be a list")
+    return parts
+
+
+def encode_cursor(created_at: datetime, id: Any) -> str:
+    """
+    Codifica a chave de ordenação do último registro de uma página.
+
+    Args:
+        created_at: Data de criação do registro
+        id: Identificador do registro (desempate entre datas iguais)
+
+    Returns:
+        Cursor opaco, seguro para uso em URLs
+    """
+    return _encode_key(created_at.isoformat(), id)
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """
+    Decodifica um cursor gerado por `encode_cursor`.
+
+    Args:
+        cursor: Cursor recebido do cliente
+
+    Returns:
+        Tupla `(created_at, id)` do último registro da página anterior
+
+    Raises:
+        InvalidCursorError: Se o cursor não puder ser decodificado
+    """
+    try:
+        created_at, id = _decode_key(cursor)
+        return datetime.fromisoformat(created_at), UUID(id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Invalid pagination cursor") from e
+
+
+def encode_id_cursor(id: Any) -> str:
+    """
+    Codifica a chave primária do último registro de uma página.
+
+    Args:
+        id: Identificador do registro (UUID ou inteiro)
+
+    Returns:
+        Cursor opaco, seguro para uso em URLs
+    """
+    return _encode_key(id)
+
+
+def decode_id_cursor(cursor: str, id_column) -> Any:
+    """
+    Decodifica um cursor gerado por `encode_id_cursor`.
+
+    Args:
+        cursor: Cursor recebido do cliente
+        id_column: Coluna de identificador (define o tipo do valor: UUID ou inteiro)
+
+    Returns:
+        Identificador do último registro da página anterior
+
+    Raises:
+        InvalidCursorError: Se o cursor não puder ser decodificado
+    """
+    try:
+        (id,) = _decode_key(cursor)
+        return id_column.type.python_type(id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Invalid pagination cursor") from e
+
+
+def keyset_page(statement, created_at_column, id_column, cursor: Optional[str], page_size: int):
+    """
+    Aplica a ordenação decrescente por `(created_at, id)` e o início da página.
+
+    Uma linha a mais é buscada para indicar se há uma próxima página (ver `build_page`).
+
+    Args:
+        statement: Consulta base, já com os filtros
+        created_at_column: Coluna de data de criação
+        id_column: Coluna de identificador
+        cursor: Cursor da página anterior (None para a primeira página)
+        page_size: Tamanho da página
+
+    Returns:
+        Consulta paginada
+    """
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        # Comparação de linha: usa o índice de ordenação e desempata datas iguais pelo id
+        statement = statement.where(
+            tuple_(created_at_column, id_column)
+            < tuple_(literal(created_at, created_at_column.type), literal(id, id_column.type))
+        )
+    return (
+        statement
+        .order_by(created_at_column.desc(), id_column.desc())
+        .limit(page_size + 1)
+    )
+
+
+def build_page(rows: List[Any], page_size: int) -> Tuple[List[Any], Optional[str]]:
+    """
+    Separa a linha extra buscada por `keyset_page` e gera o cursor da próxima página.
+
+    Args:
+        rows: Linhas retornadas pela consulta paginada (com `created_at` e `id`)
+        page_size: Tamanho da página
+
+    Returns:
+        Tupla com as linhas da página e o cursor da próxima página (None na última)
+    """
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    last = rows[-1]
+    return rows, encode_cursor(last.created_at, last.id)
+
+
+def id_keyset_page(statement, id_column, cursor: Optional[str], page_size: int):
+    """
+    Aplica a ordenação crescente pela chave primária e o início da página.
+
+    Usada nas tabelas sem data de criação; a ordem não é cronológica, mas é
+    estável e cada página é lida pelo índice da chave primária.
+
+    Args:
+        statement: Consulta base, já com os filtros
+        id_column: Coluna de identificador
+        cursor: Cursor da página anterior (None para a primeira página)
+        page_size: Tamanho da página
+
+    Returns:
+        Consulta paginada
+    """
+    if cursor:
+        statement = statement.where(id_column > literal(decode_id_cursor(cursor, id_column), id_column.type))
+    return statement.order_by(id_column.asc()).limit(page_size + 1)
+
+
+def build_id_page(rows: List[Any], page_size: int) -> Tuple[List[Any], Optional[str]]:
+    """
+    Separa a linha extra buscada por `id_keyset_page` e gera o cursor da próxima página.
+
+    Args:
+        rows: Linhas retornadas pela consulta paginada (com `id`)
+        page_size: Tamanho da página
+
+    Returns:
+        Tupla com as linhas da página e o cursor da próxima página (None na última)
+    """
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, encode_id_cursor(rows[-1].id)
+
+
+class Explain(Executable, ClauseElement):
+    """Consulta `EXPLAIN (FORMAT JSON)` de outra consulta, com os mesmos parâmetros."""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def estimate_rows(session: AsyncSession, statement) -> int:
+    """
+    Estima a quantidade de linhas de uma consulta pelas estatísticas do planejador.
+
+    Args:
+        session: Sessão do banco de dados
+        statement: Consulta a estimar
+
+    Returns:
+        Quantidade estimada de linhas
+    """
+    result = await session.execute(Explain(statement))
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_total(session: AsyncSession, statement, mode: Optional[str]) -> Optional[int]:
+    """
+    Conta os registros de uma consulta no modo solicitado.
+
+    Args:
+        session: Sessão do banco de dados
+        statement: Consulta base, com os filtros e sem ordenação ou paginação
+        mode: `exact` (count(*)), `estimated` (planejador) ou None (sem contagem)
+
+    Returns:
+        Total de registros, ou None quando a contagem não foi solicitada
+    """
+    if mode is None:
+        return None
+    if mode == COUNT_EXACT:
+        result = await session.execute(select(func.count()).select_from(statement.subquery()))
+        return result.scalar()
+    if mode == COUNT_ESTIMATED:
+        return await estimate_rows(session, statement)
+    raise ValueError(f"Invalid count mode '{mode}'")
+
+
+def pagination_info(page_size: int, next_cursor: Optional[str], total_count: Optional[int], count_mode: Optional[str]) -> Dict[str, Any]:
+    """Monta os metadados de paginação retornados junto com os itens."""
+    return {
+        "page_size": page_size,
+        "next_cursor": next_cursor,
+        "total_count": total_count,
+        "count_mode": count_mode,
+    }
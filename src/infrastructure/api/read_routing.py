@@ -0,0 +1,156 @@
+"""
+Roteamento das sessões de leitura para a réplica.
+
+As consultas (GET) usam `get_read_session`, com transações somente leitura
+na réplica (`REPLICA_CONNECTION`); os casos de uso que alteram dados
+continuam no primário, com `get_uow_session`.
+
+A réplica é atualizada de forma assíncrona e pode estar alguns instantes
+atrás do primário. Para que um usuário veja o que acabou de gravar, cada
+escrita confirmada marca o usuário (cabeçalho `user_id`, ou o `user_id` da
+rota) por `READ_YOUR_WRITES_WINDOW` segundos, e as leituras desse usuário
+vão ao primário durante a janela.
+
+As marcas ficam em um mapa próprio (`RecentWrites`), fora do cache de
+resultados: a remoção por LRU, os orçamentos de memória e as limpezas do
+cache não podem mandar à réplica a leitura de quem acabou de escrever. Com
+o cache compartilhado ativo, cada marca é também enviada aos outros
+workers do host (`notify_workers`).
+
+Sem réplica configurada as leituras usam o primário e nada é marcado.
+"""
+import time
+from typing import AsyncGenerator, Callable, Dict, Optional, Tuple
+from uuid import UUID
+
+from fastapi import Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+from .database import ReadSessionLocal, SessionLocal, engine, replica_engine
+from .shared_cache import notify_workers, subscribe
+
+# Janela de leitura no primário após uma escrita (0 sem réplica)
+READ_YOUR_WRITES_WINDOW = settings.READ_YOUR_WRITES_WINDOW if replica_engine is not engine else 0
+
+# Canal dos avisos de escrita recente entre os workers
+READ_YOUR_WRITES_CHANNEL = "read_your_writes"
+
+
+def request_user_id(request: Optional[Request]) -> Optional[str]:
+    """
+    Identifica o usuário da requisição pelo cabeçalho `user_id` ou pelo `user_id` da rota.
+
+    Args:
+        request: Requisição HTTP (None fora de uma requisição)
+
+    Returns:
+        O id normalizado do usuário, ou None se ausente ou inválido
+    """
+    if request is None:
+        return None
+    # O FastAPI lê o cabeçalho `user_id` como `user-id`
+    raw = request.headers.get("user-id") or request.path_params.get("user_id")
+    try:
+        return str(UUID(str(raw))) if raw else None
+    except ValueError:
+        return None
+
+
+class RecentWrites:
+    """
+    Prazo da leitura no primário de cada usuário que escreveu há pouco.
+
+    Não há limite de entradas nem remoção antes do prazo: o mapa tem no
+    máximo os usuários que escreveram na última janela, e os prazos vencidos
+    são descartados periodicamente. Os prazos usam o relógio do sistema,
+    comum aos workers do host.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self._until: Dict[str, float] = {}
+        self._clock = clock
+        self._next_sweep = 0.0
+
+    def __len__(self) -> int:
+        return len(self._until)
+
+    def mark(self, user_id: str, until: float) -> None:
+        now = self._clock()
+        if until > self._until.get(user_id, 0.0):
+            self._until[user_id] = until
+        if now >= self._next_sweep:
+            self._sweep(now)
+
+    def is_marked(self, user_id: str) -> bool:
+        until = self._until.get(user_id)
+        if until is None:
+            return False
+        if until <= self._clock():
+            self._until.pop(user_id, None)
+            return False
+        return True
+
+    def receive(self, payload: Tuple[str, float]) -> None:
+        '''Record a mark sent by another worker'''
+        user_id, until = payload
+        self.mark(user_id, until)
+
+    def _sweep(self, now: float) -> None:
+        for user_id in [user_id for user_id, until in self._until.items() if until <= now]:
+            del self._until[user_id]
+        self._next_sweep = now + max(READ_YOUR_WRITES_WINDOW, 1)
+
+
+recent_writes = RecentWrites()
+# O mapa é consultado a cada aviso (e não capturado aqui)
+subscribe(READ_YOUR_WRITES_CHANNEL, lambda payload: recent_writes.receive(payload))
+
+
+async def mark_recent_write(user_id: Optional[str], window: int = None) -> None:
+    '''Send the reads of the user to the primary for the read-your-writes window'''
+    window = READ_YOUR_WRITES_WINDOW if window is None else window
+    if user_id and window > 0:
+        until = time.time() + window
+        recent_writes.mark(user_id, until)
+        notify_workers(READ_YOUR_WRITES_CHANNEL, (user_id, until))
+
+
+async def has_recent_write(user_id: Optional[str]) -> bool:
+    '''Whether the user wrote within the read-your-writes window'''
+    return bool(user_id) and recent_writes.is_marked(user_id)
+
+
+async def get_read_session_factory(request: Request) -> Callable[[], AsyncSession]:
+    """
+    Dependência do FastAPI com a fábrica de sessões de leitura da requisição.
+
+    Usada diretamente pelas respostas em streaming, que abrem a sessão no
+    gerador da resposta (ver `streaming.json_array_response`).
+
+    Args:
+        request: Requisição HTTP
+
+    Returns:
+        `SessionLocal` (primário) se o usuário escreveu há pouco, senão `ReadSessionLocal`
+    """
+    if READ_YOUR_WRITES_WINDOW and await has_recent_write(request_user_id(request)):
+        return SessionLocal
+    return ReadSessionLocal
+
+
+async def get_read_session(
+    session_factory: Callable[[], AsyncSession] = Depends(get_read_session_factory),
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependência do FastAPI com uma sessão de leitura.
+
+    Exemplo de uso:
+    ```
+    @router.get("/{order_id}")
+    async def find_order(..., session: AsyncSession = Depends(get_read_session)):
+        ...
+    ```
+    """
+    async with session_factory() as session:
+        yield session
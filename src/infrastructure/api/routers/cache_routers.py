@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Query
+
+from infrastructure.api.cache import get_cache
+
+router = APIRouter(prefix="/cache", tags=["Cache"])
+
+@router.get("/debug/top-keys", status_code=200)
+async def top_keys(limit: int = Query(20, ge=1, le=1000)):
+    """Ocupação do cache do worker e chaves com mais acertos, para dimensionar TTLs e memória."""
+    cache = get_cache()
+    return {
+        "entries": len(cache),
+        "bytes": cache.total_bytes,
+        "entries_by_prefix": cache.key_counts(),
+        "bytes_by_prefix": cache.byte_counts(),
+        "top_keys": [{"key": key, "hits": hits} for key, hits in cache.top_keys(limit)],
+    }
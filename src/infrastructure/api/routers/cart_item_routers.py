@@ -1,14 +1,18 @@
 import traceback
+from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from infrastructure.api.database import get_session
+from infrastructure.api.pagination import InvalidCursorError
+from infrastructure.api.streaming import json_array_response
 from infrastructure.cart_item.sqlalchemy.cart_item_repository import \
     CartItemRepository
 from usecases.cart_item.find_item.find_item_dto import FindItemInputDto
 from usecases.cart_item.find_item.find_item_usecase import FindItemUseCase
+from usecases.cart_item.list_items.list_items_dto import ListItemsInputDto
 from usecases.cart_item.list_items.list_items_usecase import ListItemsUseCase
 from usecases.cart_item.list_items_by_user.list_items_by_user_dto import \
     ListItemsByUserInputDto
@@ -80,14 +84,23 @@ async def find_cart_item(cart_item_id: UUID, session: AsyncSession = Depends(get
 #         raise HTTPException(status_code=500, detail=str(e)) from e
     
 @router.get("/", status_code=200)
-async def list_cart_items(session: AsyncSession = Depends(get_session)):
+async def list_cart_items(
+    cursor: Optional[str] = None,
+    page_size: int = Query(100, ge=1, le=1000),
+    stream: bool = False,
+    session: AsyncSession = Depends(get_session),
+):
+    if stream:
+        return json_array_response("items", lambda session: ListItemsUseCase(cart_item_repository=CartItemRepository(session=session)).stream())
     try:
         cart_item_repository = CartItemRepository(session=session)
         usecase = ListItemsUseCase(cart_item_repository=cart_item_repository)
-        output = await usecase.execute()
+        output = await usecase.execute(input=ListItemsInputDto(cursor=cursor, page_size=page_size))
 
         return output
     
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     except Exception as e:
         error_trace = traceback.format_exc()
         raise HTTPException(status_code=404, detail=f"{str(e)}\n{error_trace}") from e  
@@ -1,10 +1,14 @@
 import traceback
+from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from infrastructure.api.database import get_session
+from infrastructure.api.pagination import InvalidCursorError
+from infrastructure.api.streaming import json_array_response
+from infrastructure.api.unit_of_work import get_uow_session
 from infrastructure.cart.sqlalchemy.cart_repository import CartRepository
 from infrastructure.cart_item.sqlalchemy.cart_item_repository import \
     CartItemRepository
@@ -43,7 +47,7 @@ router = APIRouter(prefix="/cart", tags=["Cart"])
         },
     }
 )
-async def create_cart(request: AddCartInputDto, user_id: UUID = Header(...), session: AsyncSession = Depends(get_session)):
+async def create_cart(request: AddCartInputDto, user_id: UUID = Header(...), session: AsyncSession = Depends(get_uow_session)):
     try:
         user_repository = UserRepository(session=session)
         cart_item_repository = CartItemRepository(session=session)
@@ -88,18 +92,29 @@ async def list_items(cart_id: UUID, user_id: UUID = Header(...), session: AsyncS
         raise HTTPException(status_code=500, detail=f"{str(e)}\n{error_trace}") from e
     
 @router.get("/", status_code=200)
-async def list_carts(user_id: UUID = Header(...), session: AsyncSession = Depends(get_session)):
+async def list_carts(
+    user_id: UUID = Header(...),
+    cursor: Optional[str] = None,
+    page_size: int = Query(100, ge=1, le=1000),
+    stream: bool = False,
+    session: AsyncSession = Depends(get_session),
+):
+    if stream:
+        input = ListCartsInputDto(user_id=user_id)
+        return json_array_response("carts", lambda session: ListCartsUseCase(cart_repository=CartRepository(session=session)).stream(input=input))
     try:
         cart_repository = CartRepository(session=session)
         usecase = ListCartsUseCase(cart_repository=cart_repository)
-        output = await usecase.execute(input=ListCartsInputDto(user_id=user_id))
+        output = await usecase.execute(input=ListCartsInputDto(user_id=user_id, cursor=cursor, page_size=page_size))
         return output
 
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
     
 @router.delete("/{cart_id}", status_code=204)
-async def remove_cart(cart_id: UUID, user_id: UUID = Header(...), session: AsyncSession = Depends(get_session)):
+async def remove_cart(cart_id: UUID, user_id: UUID = Header(...), session: AsyncSession = Depends(get_uow_session)):
     try:
         cart_repository = CartRepository(session=session)
         usecase = RemoveCartUseCase(cart_repository=cart_repository)
@@ -111,7 +126,7 @@ async def remove_cart(cart_id: UUID, user_id: UUID = Header(...), session: Async
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 @router.patch("/{cart_id}", status_code=200)
-async def update_cart(cart_id: UUID, request: UpdateCartInputDto, user_id: UUID = Header(...), session: AsyncSession = Depends(get_session)):
+async def update_cart(cart_id: UUID, request: UpdateCartInputDto, user_id: UUID = Header(...), session: AsyncSession = Depends(get_uow_session)):
     try:
         cart_repository = CartRepository(session=session)
         cart_item_repository = CartItemRepository(session=session)
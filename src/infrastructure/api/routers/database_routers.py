@@ -1,9 +1,11 @@
 import traceback
+from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from infrastructure.api.database import get_session
+from infrastructure.api.bulk_import import IMPORT_TARGETS, import_rows
+from infrastructure.api.unit_of_work import get_uow_session
 from infrastructure.cart.sqlalchemy.cart_repository import CartRepository
 from infrastructure.order.sqlalchemy.order_repository import OrderRepository
 from infrastructure.payment.sqlalchemy.payment_repository import \
@@ -18,7 +20,7 @@ from usecases.payment.delete_all_payments.delete_all_payments_usecase import \
 router = APIRouter(prefix="/db", tags=["DB"])
 
 @router.delete("/delete_carts_orders_and_payments", status_code=204)
-async def delete_carts_orders_and_payments(session: AsyncSession = Depends(get_session)):
+async def delete_carts_orders_and_payments(session: AsyncSession = Depends(get_uow_session)):
     try:
         cart_repository = CartRepository(session=session)
         order_repository = OrderRepository(session=session)
@@ -30,6 +32,20 @@ async def delete_carts_orders_and_payments(session: AsyncSession = Depends(get_s
         usecase = DeleteAllCartsUseCase(cart_repository=cart_repository)
         await usecase.execute()
         return {"message": "All carts, orders and payments deleted"}   
+    except Exception as e:
+        error_trace = traceback.format_exc()
+        raise HTTPException(status_code=500, detail=f"{str(e)}\n{error_trace}") from e
+
+@router.post("/import/{table}", status_code=200)
+async def import_table(
+    table: Literal["products", "users"],
+    request: Request,
+    format: Literal["csv", "ndjson"] = "csv",
+    session: AsyncSession = Depends(get_uow_session),
+):
+    """Importa produtos ou usuários do corpo da requisição (CSV com cabeçalho ou NDJSON), em uma transação."""
+    try:
+        return await import_rows(session, IMPORT_TARGETS[table], request.stream(), format)
     except Exception as e:
         error_trace = traceback.format_exc()
         raise HTTPException(status_code=500, detail=f"{str(e)}\n{error_trace}") from e
\ No newline at end of file
@@ -0,0 +1,48 @@
+from datetime import datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter
+
+from domain.order.order_status_enum import OrderStatus
+from domain.payment.payment_status_enum import PaymentStatus
+from infrastructure.api.export import export_response
+from infrastructure.cart_item.sqlalchemy.cart_item_repository import \
+    CartItemRepository
+from infrastructure.order.sqlalchemy.order_repository import OrderRepository
+from infrastructure.payment.sqlalchemy.payment_repository import \
+    PaymentRepository
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+ExportFormat = Literal["ndjson", "csv"]
+ExportCompression = Optional[Literal["gzip"]]
+
+@router.get("/orders", status_code=200)
+async def export_orders(
+    format: ExportFormat = "ndjson",
+    compression: ExportCompression = None,
+    status: Optional[OrderStatus] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+):
+    """Todos os pedidos (com filtros opcionais), lidos do banco e enviados em partes."""
+    statement = OrderRepository.export_query(status=status, created_from=created_from, created_to=created_to)
+    return export_response("orders", statement, export_format=format, compression=compression)
+
+@router.get("/payments", status_code=200)
+async def export_payments(
+    format: ExportFormat = "ndjson",
+    compression: ExportCompression = None,
+    status: Optional[PaymentStatus] = None,
+):
+    """Todos os pagamentos (com filtro opcional por status), lidos do banco e enviados em partes."""
+    statement = PaymentRepository.export_query(status=status)
+    return export_response("payments", statement, export_format=format, compression=compression)
+
+@router.get("/cart_items", status_code=200)
+async def export_cart_items(
+    format: ExportFormat = "ndjson",
+    compression: ExportCompression = None,
+):
+    """Todos os itens de carrinho, lidos do banco e enviados em partes."""
+    return export_response("cart_items", CartItemRepository.export_query(), export_format=format, compression=compression)
@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends, Header, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from infrastructure.api.database import get_session
+from infrastructure.api.unit_of_work import get_uow_session
 from infrastructure.offer.sqlalchemy.offer_repository import OfferRepository
 from usecases.offer.add_offer.add_offer_dto import AddOfferInputDto
 from usecases.offer.add_offer.add_offer_usecase import AddOfferUseCase
@@ -18,7 +19,7 @@ from usecases.offer.remove_offer.remove_offer_usecase import RemoveOfferUseCase
 router = APIRouter(prefix="/offer", tags=["Offer"])
 
 @router.post("/", status_code=201)
-async def add_offer(request: AddOfferInputDto, session: AsyncSession = Depends(get_session)):
+async def add_offer(request: AddOfferInputDto, session: AsyncSession = Depends(get_uow_session)):
     try:
         offer_repository = OfferRepository(session=session)
         usecase = AddOfferUseCase(offer_repository=offer_repository)
@@ -55,7 +56,7 @@ async def find_offer(offer_id: int, session: AsyncSession = Depends(get_session)
         raise HTTPException(status_code=500, detail=f"{str(e)}\n{error_trace}") from e
     
 @router.delete("/{offer_id}", status_code=204)
-async def remove_offer(offer_id: int, session: AsyncSession = Depends(get_session)):
+async def remove_offer(offer_id: int, session: AsyncSession = Depends(get_uow_session)):
     try:
         offer_repository = OfferRepository(session=session)
         usecase = RemoveOfferUseCase(offer_repository=offer_repository)
@@ -68,11 +69,11 @@ async def remove_offer(offer_id: int, session: AsyncSession = Depends(get_sessio
         raise HTTPException(status_code=500, detail=f"{str(e)}\n{error_trace}") from e
     
 @router.delete("/", status_code=204)
-def remove_all_offers(session: AsyncSession = Depends(get_session)):
+async def remove_all_offers(session: AsyncSession = Depends(get_uow_session)):
     try:
         offer_repository = OfferRepository(session=session)
         usecase = RemoveAllOffersUsecase(offer_repository=offer_repository)
-        usecase.execute()
+        await usecase.execute()
         return None
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e)) from e
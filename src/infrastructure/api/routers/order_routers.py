@@ -1,10 +1,14 @@
 import traceback
+from typing import Literal, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from infrastructure.api.database import get_session
+from domain.order.order_status_enum import OrderStatus
+from infrastructure.api.pagination import InvalidCursorError
+from infrastructure.api.read_routing import get_read_session
+from infrastructure.api.unit_of_work import get_uow_session
 from infrastructure.cart.sqlalchemy.cart_repository import CartRepository
 from infrastructure.offer.sqlalchemy.offer_repository import OfferRepository
 from infrastructure.order.sqlalchemy.order_repository import OrderRepository
@@ -15,6 +19,8 @@ from usecases.order.create_order.create_order_dto import CreateOrderInputDto
 from usecases.order.create_order.create_order_usecase import CreateOrderUseCase
 from usecases.order.find_order.find_order_dto import FindOrderInputDto
 from usecases.order.find_order.find_order_usecase import FindOrderUseCase
+from usecases.order.list_all_orders.list_all_orders_dto import \
+    ListAllOrdersInputDto
 from usecases.order.list_all_orders.list_all_orders_usecase import \
     ListAllOrdersUseCase
 from usecases.order.list_orders.list_orders_dto import ListOrdersInputDto
@@ -25,7 +31,7 @@ from usecases.order.update_order.update_order_usecase import UpdateOrderUseCase
 router = APIRouter(prefix="/order", tags=["Order"])
 
 @router.post("/", status_code=201)
-async def create_order(request: CreateOrderInputDto, user_id: UUID = Header(...), session: AsyncSession = Depends(get_session)):
+async def create_order(request: CreateOrderInputDto, user_id: UUID = Header(...), session: AsyncSession = Depends(get_uow_session)):
     try:
         order_repository = OrderRepository(session=session)
         user_repository = UserRepository(session=session)
@@ -45,29 +51,45 @@ async def create_order(request: CreateOrderInputDto, user_id: UUID = Header(...)
         raise HTTPException(status_code=500, detail=f"{str(e)}\n{error_trace}") from e
     
 @router.get("/", status_code=200)
-async def list_orders(user_id: UUID = Header(...), session: AsyncSession = Depends(get_session)):
+async def list_orders(
+    user_id: UUID = Header(...),
+    cursor: Optional[str] = None,
+    page_size: int = Query(20, ge=1, le=100),
+    count: Optional[Literal["exact", "estimated"]] = None,
+    session: AsyncSession = Depends(get_read_session),
+):
     try:
         order_repository = OrderRepository(session=session)
         usecase = ListOrdersUseCase(order_repository=order_repository)
-        output = await usecase.execute(input=ListOrdersInputDto(user_id=user_id))
+        output = await usecase.execute(input=ListOrdersInputDto(user_id=user_id, cursor=cursor, page_size=page_size, count=count))
         return output
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     except Exception as e:
         error_trace = traceback.format_exc()
         raise HTTPException(status_code=500, detail=f"{str(e)}\n{error_trace}") from e
     
 @router.get("/all_orders", status_code=200)
-async def list_all_orders(session: AsyncSession = Depends(get_session)):
+async def list_all_orders(
+    cursor: Optional[str] = None,
+    page_size: int = Query(50, ge=1, le=500),
+    status: Optional[OrderStatus] = None,
+    count: Optional[Literal["exact", "estimated"]] = None,
+    session: AsyncSession = Depends(get_read_session),
+):
     try:
         order_repository = OrderRepository(session=session)
         usecase = ListAllOrdersUseCase(order_repository=order_repository)
-        output = await usecase.execute()
+        output = await usecase.execute(input=ListAllOrdersInputDto(cursor=cursor, page_size=page_size, status=status, count=count))
         return output
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     except Exception as e:
         error_trace = traceback.format_exc()
         raise HTTPException(status_code=500, detail=f"{str(e)}\n{error_trace}") from e
     
 @router.get("/{order_id}", status_code=200)
-async def find_order(order_id: UUID, user_id: UUID = Header(...), session: AsyncSession = Depends(get_session)):
+async def find_order(order_id: UUID, user_id: UUID = Header(...), session: AsyncSession = Depends(get_read_session)):
     try:
         order_repository = OrderRepository(session=session)
         usecase = FindOrderUseCase(order_repository=order_repository)
@@ -81,13 +103,13 @@ async def find_order(order_id: UUID, user_id: UUID = Header(...), session: Async
         raise HTTPException(status_code=500, detail=f"{str(e)}\n{error_trace}") from e
     
 @router.patch("/internal/{order_id}", status_code=200)
-def update_order(request: UpdateOrderInputDto, order_id: UUID, user_id: UUID = Header(...), session: AsyncSession = Depends(get_session)):
+async def update_order(request: UpdateOrderInputDto, order_id: UUID, user_id: UUID = Header(...), session: AsyncSession = Depends(get_uow_session)):
     try:
         request.id = order_id
         request.user_id = user_id
         order_repository = OrderRepository(session=session)
         usecase = UpdateOrderUseCase(order_repository=order_repository)
-        output = usecase.execute(input=UpdateOrderInputDto(id=request.id, user_id=request.user_id, total_price=request.total_price, type=request.type, status=request.status, offer_id=request.offer_id))
+        output = await usecase.execute(input=UpdateOrderInputDto(id=request.id, user_id=request.user_id, cart_id=request.cart_id, total_price=request.total_price, type=request.type, status=request.status, offer_id=request.offer_id, created_at=request.created_at, updated_at=request.updated_at))
         return output
     except ValueError as e:
         error_trace = traceback.format_exc()
@@ -1,14 +1,19 @@
 import time
 import traceback
 from datetime import datetime
+from typing import Callable, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from domain.order.order_status_enum import OrderStatus
 from domain.payment.payment_status_enum import PaymentStatus
-from infrastructure.api.database import get_session
+from infrastructure.api.pagination import InvalidCursorError
+from infrastructure.api.read_routing import (get_read_session,
+                                             get_read_session_factory)
+from infrastructure.api.streaming import json_array_response
+from infrastructure.api.unit_of_work import get_uow_session
 from infrastructure.messaging.producer import publish_message
 from infrastructure.order.sqlalchemy.order_repository import OrderRepository
 from infrastructure.payment.sqlalchemy.payment_repository import \
@@ -29,6 +34,8 @@ from usecases.payment.find_payment_by_order_id.find_payment_by_order_id_dto impo
     FindPaymentByOrderIdInputDto
 from usecases.payment.find_payment_by_order_id.find_payment_by_order_id_usecase import \
     FindPaymentByOrderIdUsecase
+from usecases.payment.list_all_payments.list_all_payments_dto import \
+    ListAllPaymentsInputDto
 from usecases.payment.list_all_payments.list_all_payments_usecase import \
     ListAllPaymentsUseCase
 from usecases.payment.list_payments.list_payments_dto import \
@@ -39,7 +46,7 @@ from usecases.payment.list_payments.list_payments_usecase import \
 router = APIRouter(prefix="/payment", tags=["Payment"])
 
 @router.post("/{order_id}", status_code=201)
-async def execute_payment(request: ExecutePaymentInputDto, order_id: UUID, user_id: UUID = Header(...), session: AsyncSession = Depends(get_session)):
+async def execute_payment(request: ExecutePaymentInputDto, order_id: UUID, user_id: UUID = Header(...), session: AsyncSession = Depends(get_uow_session)):
     try:
         payment_repository = PaymentRepository(session=session)
         user_repository = UserRepository(session=session)
@@ -61,18 +68,30 @@ async def execute_payment(request: ExecutePaymentInputDto, order_id: UUID, user_
 #         raise Exception(f"Error updating order status: {response.text}")
 
 @router.get("/", status_code=200)
-async def list_payments(user_id: UUID = Header(...), session: AsyncSession = Depends(get_session)):
+async def list_payments(
+    user_id: UUID = Header(...),
+    cursor: Optional[str] = None,
+    page_size: int = Query(100, ge=1, le=1000),
+    stream: bool = False,
+    session_factory: Callable[[], AsyncSession] = Depends(get_read_session_factory),
+    session: AsyncSession = Depends(get_read_session),
+):
+    if stream:
+        input = ListPaymentsInputDto(user_id=user_id)
+        return json_array_response("payments", lambda session: ListPaymentsUseCase(payment_repository=PaymentRepository(session=session)).stream(input=input), session_factory=session_factory)
     try:
         payment_repository = PaymentRepository(session=session)
         usecase = ListPaymentsUseCase(payment_repository=payment_repository)
-        output = await usecase.execute(input=ListPaymentsInputDto(user_id=user_id))
+        output = await usecase.execute(input=ListPaymentsInputDto(user_id=user_id, cursor=cursor, page_size=page_size))
         return output
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     except Exception as e:
         error_trace = traceback.format_exc()
         raise HTTPException(status_code=500, detail=f"{str(e)}\n{error_trace}") from e
     
 @router.get("/id/{payment_id}", status_code=200)
-async def find_payment(payment_id: UUID, user_id: UUID = Header(...), session: AsyncSession = Depends(get_session)):
+async def find_payment(payment_id: UUID, user_id: UUID = Header(...), session: AsyncSession = Depends(get_read_session)):
     try:
         payment_repository = PaymentRepository(session=session)
         user_repository = UserRepository(session=session)
@@ -84,7 +103,7 @@ async def find_payment(payment_id: UUID, user_id: UUID = Header(...), session: A
         raise HTTPException(status_code=500, detail=f"{str(e)}\n{error_trace}") from e
     
 @router.get("/order/{order_id}", status_code=200)
-async def find_payment_by_order_id(order_id: UUID, user_id: UUID = Header(...), session: AsyncSession = Depends(get_session)):
+async def find_payment_by_order_id(order_id: UUID, user_id: UUID = Header(...), session: AsyncSession = Depends(get_read_session)):
     try:
         payment_repository = PaymentRepository(session=session)
         user_repository = UserRepository(session=session)
@@ -99,12 +118,22 @@ async def find_payment_by_order_id(order_id: UUID, user_id: UUID = Header(...),
         raise HTTPException(status_code=500, detail=f"{str(e)}\n{error_trace}") from e
 
 @router.get("/all_payments", status_code=200)
-async def list_all_payments(session: AsyncSession = Depends(get_session)):
+async def list_all_payments(
+    cursor: Optional[str] = None,
+    page_size: int = Query(100, ge=1, le=1000),
+    stream: bool = False,
+    session_factory: Callable[[], AsyncSession] = Depends(get_read_session_factory),
+    session: AsyncSession = Depends(get_read_session),
+):
+    if stream:
+        return json_array_response("payments", lambda session: ListAllPaymentsUseCase(payment_repository=PaymentRepository(session=session)).stream(), session_factory=session_factory)
     try:
         payment_repository = PaymentRepository(session=session)
         usecase = ListAllPaymentsUseCase(payment_repository=payment_repository)
-        output = await usecase.execute()
+        output = await usecase.execute(input=ListAllPaymentsInputDto(cursor=cursor, page_size=page_size))
         return output
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     except Exception as e:
         error_trace = traceback.format_exc()
         raise HTTPException(status_code=500, detail=f"{str(e)}\n{error_trace}") from e
@@ -1,10 +1,15 @@
 import logging
 import traceback
+from typing import Callable, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from infrastructure.api.database import get_session
+from infrastructure.api.pagination import InvalidCursorError
+from infrastructure.api.read_routing import (get_read_session,
+                                             get_read_session_factory)
+from infrastructure.api.streaming import json_array_response
+from infrastructure.api.unit_of_work import get_uow_session
 from infrastructure.product.sqlalchemy.product_repository import \
     ProductRepository
 from usecases.product.add_product.add_product_dto import AddProductInputDto
@@ -18,6 +23,8 @@ from usecases.product.delete_product.delete_product_usecase import \
 from usecases.product.find_product.find_product_dto import FindProductInputDto
 from usecases.product.find_product.find_product_usecase import \
     FindProductUsecase
+from usecases.product.list_products.list_products_dto import \
+    ListProductsInputDto
 from usecases.product.list_products.list_products_usecase import \
     ListProductsUseCase
 from usecases.product.update_product.update_product_dto import \
@@ -29,7 +36,7 @@ logger = logging.getLogger("uvicorn")
 router = APIRouter(prefix="/products", tags=["Products"])
 
 @router.post("/", status_code=201)
-async def add_product(request: AddProductInputDto, session: AsyncSession = Depends(get_session)):
+async def add_product(request: AddProductInputDto, session: AsyncSession = Depends(get_uow_session)):
     try:
         product_repository = ProductRepository(session=session)
         usecase = AddProductUseCase(product_repository=product_repository)
@@ -42,18 +49,28 @@ async def add_product(request: AddProductInputDto, session: AsyncSession = Depen
         raise HTTPException(status_code=500, detail=f"{str(e)}\n{error_trace}") from e  
     
 @router.get("/", status_code=200)
-async def list_products(session: AsyncSession = Depends(get_session)):
+async def list_products(
+    cursor: Optional[str] = None,
+    page_size: int = Query(100, ge=1, le=1000),
+    stream: bool = False,
+    session_factory: Callable[[], AsyncSession] = Depends(get_read_session_factory),
+    session: AsyncSession = Depends(get_read_session),
+):
+    if stream:
+        return json_array_response("products", lambda session: ListProductsUseCase(product_repository=ProductRepository(session=session)).stream(), session_factory=session_factory)
     try:
         product_repository = ProductRepository(session=session)
         usecase = ListProductsUseCase(product_repository=product_repository)
-        output = await usecase.execute()
+        output = await usecase.execute(input=ListProductsInputDto(cursor=cursor, page_size=page_size))
         return output
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     except Exception as e:
         error_trace = traceback.format_exc()
         raise HTTPException(status_code=404, detail=f"{str(e)}\n{error_trace}") from e    
 
 @router.get("/{product_id}", status_code=200)
-async def find_product(product_id: int, session: AsyncSession = Depends(get_session)):
+async def find_product(product_id: int, session: AsyncSession = Depends(get_read_session)):
     try:
         product_repository = ProductRepository(session=session)
         usecase = FindProductUsecase(product_repository=product_repository)
@@ -66,7 +83,7 @@ async def find_product(product_id: int, session: AsyncSession = Depends(get_sess
         raise HTTPException(status_code=500, detail=str(e)) from e
     
 @router.patch("/{product_id}", status_code=200)
-async def update_product(product_id: int, request: UpdateProductInputDto, session: AsyncSession = Depends(get_session)):
+async def update_product(product_id: int, request: UpdateProductInputDto, session: AsyncSession = Depends(get_uow_session)):
     try:
         product_repository = ProductRepository(session=session)
         product_found = await product_repository.find_product(product_id=product_id)
@@ -74,8 +91,7 @@ async def update_product(product_id: int, request: UpdateProductInputDto, sessio
             raise HTTPException(status_code=404, detail=f"Product with id '{product_id}' not found")
         
         update_data = request.dict(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(product_found, key, value)
+        product_found = product_found.evolve(**update_data)
 
         usecase = UpdateProductUseCase(product_repository=product_repository)
         output = await usecase.execute(
@@ -92,7 +108,7 @@ async def update_product(product_id: int, request: UpdateProductInputDto, sessio
         raise HTTPException(status_code=404, detail=f"{str(e)}\n{error_trace}") from e   
     
 @router.delete("/{product_id}", status_code=204)
-async def delete_product(product_id: int, session: AsyncSession = Depends(get_session)):
+async def delete_product(product_id: int, session: AsyncSession = Depends(get_uow_session)):
     try:
         product_repository = ProductRepository(session=session)
         product_found = await product_repository.find_product(product_id=product_id)
@@ -107,7 +123,7 @@ async def delete_product(product_id: int, session: AsyncSession = Depends(get_se
         raise HTTPException(status_code=404, detail=str(e)) from e
     
 @router.delete("/", status_code=204)
-async def delete_all_products(session: AsyncSession = Depends(get_session)):
+async def delete_all_products(session: AsyncSession = Depends(get_uow_session)):
     try:
         product_repository = ProductRepository(session=session)
         usecase = DeleteAllProductsUseCase(product_repository=product_repository)
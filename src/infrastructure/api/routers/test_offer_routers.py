@@ -0,0 +1,40 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from infrastructure.api import cache
+from infrastructure.api.routers import offer_routers
+
+
+@pytest.fixture
+def session():
+    mock = MagicMock()
+    mock.execute = AsyncMock()
+    mock.commit = AsyncMock()
+    mock.rollback = AsyncMock()
+    mock.close = AsyncMock()
+    return mock
+
+@pytest.fixture
+def client(session):
+    app = FastAPI()
+    app.include_router(offer_routers.router)
+    with patch('infrastructure.api.unit_of_work.SessionLocal', return_value=session):
+        yield TestClient(app)
+
+def test_remove_all_offers_commits_and_invalidates_after_commit(client, session):
+    key = "offer:list_offers:"
+
+    async def commit():
+        # Uma leitura concorrente repovoa o cache antes do commit
+        await cache.get_cache().set(key, [{"id": 1}], tags=("offer:list",))
+    session.commit.side_effect = commit
+
+    response = client.delete("/offer/")
+
+    assert response.status_code == 204
+    assert str(session.execute.await_args.args[0]).startswith("DELETE FROM tb_offers")
+    session.commit.assert_awaited_once()
+    assert key not in cache.get_cache()
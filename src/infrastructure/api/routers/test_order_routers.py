@@ -0,0 +1,68 @@
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+from uuid import uuid4
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from domain.order.order_entity import Order
+from domain.order.order_status_enum import OrderStatus
+from domain.order.order_type_enum import OrderType
+from infrastructure.api import read_routing
+from infrastructure.api.routers import order_routers
+
+
+@pytest.fixture
+def session():
+    mock = MagicMock()
+    mock.commit = AsyncMock()
+    mock.rollback = AsyncMock()
+    mock.close = AsyncMock()
+    return mock
+
+@pytest.fixture
+def client(session, monkeypatch):
+    monkeypatch.setattr(read_routing, "READ_YOUR_WRITES_WINDOW", 5)
+    monkeypatch.setattr(read_routing, "recent_writes", read_routing.RecentWrites())
+    app = FastAPI()
+    app.include_router(order_routers.router)
+    with patch('infrastructure.api.unit_of_work.SessionLocal', return_value=session):
+        yield TestClient(app)
+
+def test_update_order_commits_the_change(client, session):
+    order = Order(id=uuid4(), user_id=uuid4(), cart_id=uuid4(), total_price=100.0, type=OrderType.IN_STORE, status=OrderStatus.PENDING, created_at=datetime.now(), updated_at=datetime.now(), offer_id=1)
+    order_repository = Mock()
+    order_repository.find_order = AsyncMock(return_value=order)
+    order_repository.update_order = AsyncMock(side_effect=lambda order: order)
+    body = {
+        "id": str(order.id), "user_id": str(order.user_id), "cart_id": str(order.cart_id), "offer_id": 1,
+        "type": OrderType.IN_STORE.value, "total_price": 100.0, "status": OrderStatus.CONFIRMED.value,
+        "created_at": order.created_at.isoformat(), "updated_at": order.updated_at.isoformat(),
+    }
+
+    with patch.object(order_routers, "OrderRepository", return_value=order_repository):
+        response = client.patch(f"/order/internal/{order.id}", json=body, headers={"user-id": str(order.user_id)})
+
+    assert response.status_code == 200
+    assert response.json()["status"] == OrderStatus.CONFIRMED.value
+    order_repository.update_order.assert_awaited_once()
+    session.commit.assert_awaited_once()
+    assert read_routing.recent_writes.is_marked(str(order.user_id))
+
+def test_update_order_not_found_rolls_back(client, session):
+    order_id, user_id = uuid4(), uuid4()
+    order_repository = Mock()
+    order_repository.find_order = AsyncMock(return_value=None)
+    body = {
+        "id": str(order_id), "user_id": str(user_id), "cart_id": str(uuid4()), "offer_id": 1,
+        "type": OrderType.IN_STORE.value, "total_price": 100.0, "status": OrderStatus.CONFIRMED.value,
+        "created_at": datetime.now().isoformat(), "updated_at": datetime.now().isoformat(),
+    }
+
+    with patch.object(order_routers, "OrderRepository", return_value=order_repository):
+        response = client.patch(f"/order/internal/{order_id}", json=body, headers={"user-id": str(user_id)})
+
+    assert response.status_code == 404
+    session.rollback.assert_awaited_once()
+    session.commit.assert_not_awaited()
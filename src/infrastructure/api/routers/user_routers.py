@@ -1,15 +1,21 @@
 import traceback
+from typing import Callable, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from infrastructure.api.database import get_session
+from infrastructure.api.pagination import InvalidCursorError
+from infrastructure.api.read_routing import (get_read_session,
+                                             get_read_session_factory)
+from infrastructure.api.streaming import json_array_response
+from infrastructure.api.unit_of_work import get_uow_session
 from infrastructure.user.sqlalchemy.user_repository import UserRepository
 from usecases.user.add_user.add_user_dto import AddUserInputDto
 from usecases.user.add_user.add_user_usecase import AddUserUseCase
 from usecases.user.find_user.find_user_dto import FindUserInputDto
 from usecases.user.find_user.find_user_usecase import FindUserUseCase
+from usecases.user.list_users.list_users_dto import ListUsersInputDto
 from usecases.user.list_users.list_users_usecase import ListUsersUseCase
 from usecases.user.update_user.update_user_dto import UpdateUserInputDto
 from usecases.user.update_user.update_user_usecase import UpdateUserUseCase
@@ -17,7 +23,7 @@ from usecases.user.update_user.update_user_usecase import UpdateUserUseCase
 router = APIRouter(prefix="/users", tags=["Users"])
 
 @router.post("/", status_code=201)
-async def add_user(request: AddUserInputDto, session: AsyncSession = Depends(get_session)):
+async def add_user(request: AddUserInputDto, session: AsyncSession = Depends(get_uow_session)):
     try:
         user_repository = UserRepository(session=session)
         find_user_by_email = await user_repository.find_user_by_email(email=request.email)
@@ -30,7 +36,7 @@ async def add_user(request: AddUserInputDto, session: AsyncSession = Depends(get
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 @router.get("/{user_id}")
-async def find_user(user_id: UUID, session: AsyncSession = Depends(get_session)):
+async def find_user(user_id: UUID, session: AsyncSession = Depends(get_read_session)):
     try:
         user_repository = UserRepository(session=session)
         usecase = FindUserUseCase(user_repository=user_repository)
@@ -41,11 +47,20 @@ async def find_user(user_id: UUID, session: AsyncSession = Depends(get_session))
         raise HTTPException(status_code=404, detail=f"User with id '{user_id}' not found") from e
 
 @router.get("/")
-async def list_users(session: AsyncSession = Depends(get_session)):
+async def list_users(
+    cursor: Optional[str] = None,
+    page_size: int = Query(100, ge=1, le=1000),
+    stream: bool = False,
+    session_factory: Callable[[], AsyncSession] = Depends(get_read_session_factory),
+    session: AsyncSession = Depends(get_read_session),
+):
+    if stream:
+        # Todos os usuários, lidos do banco em lotes e enviados conforme são lidos
+        return json_array_response("users", lambda session: ListUsersUseCase(user_repository=UserRepository(session=session)).stream(), session_factory=session_factory)
     try:
         user_repository = UserRepository(session=session)
         usecase = ListUsersUseCase(user_repository=user_repository)
-        output = await usecase.execute()
+        output = await usecase.execute(input=ListUsersInputDto(cursor=cursor, page_size=page_size))
         user_ids = [user.id for user in output.users]
         # crie um arquivo que contenha os ids dos usuários, cada um em uma linha
         with open("user_ids.txt", "w") as f:
@@ -54,19 +69,20 @@ async def list_users(session: AsyncSession = Depends(get_session)):
 
         return output
 
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     except Exception as e:
         error_trace = traceback.format_exc()
         raise HTTPException(status_code=500, detail=f"{str(e)}\n{error_trace}") from e  
     
 @router.patch("/{user_id}")
-async def update_user(user_id: UUID, request: UpdateUserInputDto, session: AsyncSession = Depends(get_session)):
+async def update_user(user_id: UUID, request: UpdateUserInputDto, session: AsyncSession = Depends(get_uow_session)):
     try:
         user_repository = UserRepository(session=session)
         user_found = await user_repository.find_user(user_id=user_id)
         
         update_data = request.dict(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(user_found, key, value)
+        user_found = user_found.evolve(**update_data)
 
         usecase = UpdateUserUseCase(user_repository=user_repository)
         output = await usecase.execute(
@@ -74,6 +90,8 @@ async def update_user(user_id: UUID, request: UpdateUserInputDto, session: Async
             input=UpdateUserInputDto(
                 name=user_found.name,
                 email=user_found.email,
+                age=user_found.age,
+                gender=user_found.gender,
                 phone_number=user_found.phone_number,
                 password=user_found.password
             )
@@ -86,7 +104,7 @@ async def update_user(user_id: UUID, request: UpdateUserInputDto, session: Async
     
 
 @router.delete("/{user_id}", status_code=204)
-async def delete_user(user_id: UUID, session: AsyncSession = Depends(get_session)):
+async def delete_user(user_id: UUID, session: AsyncSession = Depends(get_uow_session)):
     try:
         user_repository = UserRepository(session=session)
         await user_repository.find_user(user_id=user_id)
@@ -0,0 +1,72 @@
+"""
+Leitura de linhas do SQLAlchemy Core direto para entidades de domínio.
+
+Uma consulta `select(Model)` pelo ORM cria uma instância do modelo para cada
+linha, registra a instância no identity map da sessão e, no repositório, os
+atributos ainda são copiados para a entidade, cujo construtor valida de
+novo cada campo. Nas leituras nada disso é necessário: os dados foram
+validados ao serem gravados e a entidade não volta para a sessão.
+
+Com `RowMapper` a consulta seleciona as colunas da tabela (Core, sem o
+plugin do ORM) e cada linha vira a entidade com `from_trusted_source`, sem
+passar pelo construtor. Os tipos das colunas (enums, UUID) continuam sendo
+aplicados pelo SQLAlchemy na leitura; conversões que o construtor fazia
+(como `Numeric` para `float`) ficam em `converters`.
+
+As consultas fixas dos repositórios são montadas uma vez, no módulo, com
+`bindparam`: a cada execução o SQLAlchemy reaproveita a SQL compilada do
+seu cache e o asyncpg o statement preparado na conexão (ver
+`statement_cache`), sem montar a consulta de novo.
+"""
+from typing import (Any, Callable, Dict, Generic, Iterable, List, Optional,
+                    Type, TypeVar)
+
+from sqlalchemy import Select, Table, select
+
+from domain.__seedwork.entity import from_trusted_source
+
+T = TypeVar('T')
+
+
+class RowMapper(Generic[T]):
+    """
+    Converte as linhas de um `select` das colunas de uma tabela em entidades.
+
+    As colunas da tabela devem ter os mesmos nomes dos campos do construtor
+    da entidade.
+
+    Exemplo:
+    ```
+    ORDER_ROWS = RowMapper(Order, OrderModel.__table__, converters={"total_price": float})
+    FIND_ORDER = ORDER_ROWS.select().where(ORDER_ROWS.c.id == bindparam("order_id"))
+
+    result = await session.execute(FIND_ORDER, {"order_id": order_id})
+    order = ORDER_ROWS.first(result)
+    ```
+    """
+
+    def __init__(self, entity: Type[T], table: Table, converters: Optional[Dict[str, Callable[[Any], Any]]] = None):
+        self.entity = entity
+        self.table = table
+        self.c = table.c
+        self.fields = tuple(column.name for column in table.columns)
+        self.converters = tuple((converters or {}).items())
+
+    def select(self) -> Select:
+        '''Select of every column of the table, in the order of `fields`'''
+        return select(*self.table.columns)
+
+    def to_entity(self, row: Iterable[Any]) -> T:
+        values = dict(zip(self.fields, row))
+        for name, convert in self.converters:
+            if values[name] is not None:
+                values[name] = convert(values[name])
+        return from_trusted_source(self.entity, values)
+
+    def to_entities(self, rows: Iterable[Iterable[Any]]) -> List[T]:
+        return [self.to_entity(row) for row in rows]
+
+    def first(self, result) -> Optional[T]:
+        '''Entity of the first row of a result, or None if it is empty'''
+        row = result.first()
+        return None if row is None else self.to_entity(row)
@@ -0,0 +1,596 @@
+"""
+Camada de cache compartilhada entre os workers do uvicorn.
+
+Cada worker mantém o seu `AsyncLRUCache` local (L1). Esta camada adiciona um
+segundo nível (L2) mantido por um processo de cache local, acessado por um
+socket Unix, compartilhado por todos os workers do host:
+
+- uma falta no L1 consulta o L2 antes de ir ao banco, de modo que um item
+  carregado por um worker é reaproveitado pelos demais;
+- as invalidações (por chave, tag, prefixo ou limpeza total) são aplicadas
+  no L2 e retransmitidas aos outros workers, que removem os itens do seu L1;
+- avisos (`notify_workers`) são apenas retransmitidos aos outros workers,
+  que os entregam às funções registradas no canal com `subscribe`.
+
+O processo servidor é iniciado com `python -m infrastructure.api.shared_cache`.
+Os valores trafegam serializados com `pickle`; por isso o socket é criado com
+permissão restrita ao usuário do processo e deve ficar em um diretório local.
+Se o servidor estiver indisponível, os workers operam apenas com o L1.
+"""
+import asyncio
+import os
+import pickle
+import struct
+import time
+from typing import (Any, Callable, Dict, Iterable, List, Optional, Set,
+                    Tuple)
+
+from infrastructure.api.cache import (CACHE_DEFAULT_TTL, CACHE_MAX_BYTES,
+                                      CACHE_MAX_ENTRIES, CACHE_PREFIX_BUDGETS,
+                                      AsyncLRUCache, CacheEntry,
+                                      configure_cache, get_cache)
+from infrastructure.logging_config import logger
+
+# Configuração da camada compartilhada (pode ser ajustada por variáveis de ambiente)
+CACHE_SOCKET_PATH = os.getenv("CACHE_SOCKET_PATH", "")
+CACHE_SHARED_TIMEOUT = float(os.getenv("CACHE_SHARED_TIMEOUT", "0.05"))
+CACHE_SHARED_RETRY_INTERVAL = float(os.getenv("CACHE_SHARED_RETRY_INTERVAL", "5"))
+CACHE_SHARED_MAX_ENTRIES = int(os.getenv("CACHE_SHARED_MAX_ENTRIES", "100000"))
+CACHE_SHARED_MAX_BYTES = int(os.getenv("CACHE_SHARED_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Cabeçalho de cada mensagem: tamanho do corpo em bytes
+_HEADER = struct.Struct("!I")
+
+# Mensagens de invalidação, retransmitidas pelo servidor aos demais workers
+INVALIDATION_OPERATIONS = ("invalidate", "invalidate_tags", "invalidate_prefix", "clear")
+# Aviso `(notify, canal, dados)` entre os workers: retransmitido, nunca armazenado
+NOTIFY_OPERATION = "notify"
+
+# Funções que recebem os avisos de outros workers, por canal
+_subscribers: Dict[str, List[Callable[[Any], None]]] = {}
+
+
+def encode_message(message: Tuple[Any, ...]) -> bytes:
+    """
+    Serializa uma mensagem do protocolo com o seu cabeçalho de tamanho.
+
+    Args:
+        message: Tupla `(operação, *argumentos)`
+
+    Returns:
+        Bytes prontos para escrita no socket
+    """
+    body = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    return _HEADER.pack(len(body)) + body
+
+
+async def read_message(reader: asyncio.StreamReader) -> Tuple[Any, ...]:
+    """
+    Lê uma mensagem do protocolo.
+
+    Args:
+        reader: Stream de leitura da conexão
+
+    Returns:
+        Tupla `(operação, *argumentos)`
+    """
+    header = await reader.readexactly(_HEADER.size)
+    (length,) = _HEADER.unpack(header)
+    return pickle.loads(await reader.readexactly(length))
+
+
+class SharedCacheServer:
+    """
+    Processo de cache compartilhado pelos workers do host.
+
+    Armazena os valores já serializados em um `AsyncLRUCache` (com os mesmos
+    TTLs suave e rígido, tags e orçamentos) e retransmite as invalidações
+    recebidas de um worker para todos os outros conectados.
+    """
+
+    def __init__(self, path: str, store: Optional[AsyncLRUCache] = None):
+        """
+        Inicializa o servidor.
+
+        Args:
+            path: Caminho do socket Unix
+            store: Armazenamento dos itens (usa os limites `CACHE_SHARED_*` se omitido)
+        """
+        self.path = path
+        self.store = store if store is not None else AsyncLRUCache(
+            max_size=CACHE_SHARED_MAX_ENTRIES,
+            ttl=CACHE_DEFAULT_TTL,
+            max_bytes=CACHE_SHARED_MAX_BYTES,
+        )
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._clients: Set[asyncio.StreamWriter] = set()
+
+    async def start(self) -> None:
+        """Cria o socket e passa a aceitar conexões."""
+        if os.path.exists(self.path):
+            # Socket remanescente de uma execução anterior
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._handle, path=self.path)
+        os.chmod(self.path, 0o600)
+        logger.info("Cache compartilhado ouvindo em %s", self.path)
+
+    async def serve_forever(self) -> None:
+        """Inicia o servidor e atende conexões até ser cancelado."""
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """Encerra o servidor e as conexões abertas."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for writer in list(self._clients):
+            writer.close()
+        self._clients.clear()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._clients.add(writer)
+        try:
+            while True:
+                message = await read_message(reader)
+                await self._dispatch(message, writer)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            logger.warning("Conexão do cache compartilhado encerrada por erro: %s", e)
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+    async def _dispatch(self, message: Tuple[Any, ...], origin: asyncio.StreamWriter) -> None:
+        operation = message[0]
+        if operation == "get":
+            _, request_id, key = message
+            entry = self.store.get_entry(key)
+            payload = None
+            if entry is not None:
+                fresh_left, hard_left = self.store.time_left(entry)
+                payload = (entry.value, fresh_left, hard_left, entry.tags)
+            origin.write(encode_message(("result", request_id, payload)))
+        elif operation == "set":
+            _, key, blob, ttl, hard_ttl, tags = message
+            await self.store.set(key, blob, ttl=ttl, tags=tags, hard_ttl=hard_ttl)
+        elif operation in INVALIDATION_OPERATIONS:
+            await apply_invalidation(self.store, message)
+            self._broadcast(message, origin)
+        elif operation == NOTIFY_OPERATION:
+            self._broadcast(message, origin)
+        else:
+            logger.warning("Operação desconhecida no cache compartilhado: %s", operation)
+
+    def _broadcast(self, message: Tuple[Any, ...], origin: asyncio.StreamWriter) -> None:
+        frame = encode_message(message)
+        for writer in self._clients:
+            if writer is not origin and not writer.is_closing():
+                writer.write(frame)
+
+
+async def apply_invalidation(cache: AsyncLRUCache, message: Tuple[Any, ...]) -> None:
+    """
+    Aplica uma mensagem de invalidação a um cache.
+
+    Args:
+        cache: Cache local ou armazenamento do servidor
+        message: Tupla `(operação, *argumentos)` de `INVALIDATION_OPERATIONS`
+    """
+    operation = message[0]
+    if operation == "invalidate":
+        await cache.invalidate(message[1])
+    elif operation == "invalidate_tags":
+        await cache.invalidate_tags(*message[1])
+    elif operation == "invalidate_prefix":
+        await cache.invalidate_prefix(message[1])
+    elif operation == "clear":
+        await cache.clear()
+
+
+class SharedCacheClient:
+    """
+    Conexão de um worker com o `SharedCacheServer`.
+
+    Escritas e invalidações são enviadas sem aguardar resposta; leituras
+    aguardam no máximo `timeout` segundos e, em caso de atraso ou falha,
+    são tratadas como falta. Após uma queda de conexão o cliente tenta
+    reconectar, no máximo uma vez a cada `retry_interval` segundos.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        timeout: float = CACHE_SHARED_TIMEOUT,
+        retry_interval: float = CACHE_SHARED_RETRY_INTERVAL,
+        on_message: Optional[Callable[[Tuple[Any, ...]], Any]] = None,
+        on_reset: Optional[Callable[[], Any]] = None,
+    ):
+        """
+        Inicializa o cliente.
+
+        Args:
+            path: Caminho do socket Unix do servidor
+            timeout: Tempo máximo de espera por uma leitura, em segundos
+            retry_interval: Intervalo mínimo entre tentativas de conexão, em segundos
+            on_message: Callback assíncrono para as invalidações retransmitidas
+            on_reset: Callback assíncrono chamado ao conectar e ao perder a conexão
+        """
+        self.path = path
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+        self.on_message = on_message
+        self.on_reset = on_reset
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._read_task: Optional[asyncio.Task] = None
+        self._connect_task: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._next_request_id = 0
+        self._last_attempt: Optional[float] = None
+
+    @property
+    def connected(self) -> bool:
+        """Indica se há uma conexão ativa com o servidor."""
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def connect(self) -> bool:
+        """
+        Conecta ao servidor.
+
+        Returns:
+            True se a conexão foi estabelecida
+        """
+        self._last_attempt = time.monotonic()
+        try:
+            self._reader, self._writer = await asyncio.open_unix_connection(self.path)
+        except OSError as e:
+            logger.warning("Cache compartilhado indisponível em %s: %s", self.path, e)
+            return False
+
+        # Invalidações perdidas enquanto desconectado: descarta o cache local
+        if self.on_reset is not None:
+            await self.on_reset()
+        self._read_task = asyncio.get_running_loop().create_task(self._read_loop(self._reader))
+        logger.info("Conectado ao cache compartilhado em %s", self.path)
+        return True
+
+    async def close(self) -> None:
+        """Encerra a conexão com o servidor."""
+        for task in (self._connect_task, self._read_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._connect_task = self._read_task = None
+        self._disconnect()
+
+    async def get(self, key: str) -> Optional[Tuple[bytes, float, float, Tuple[str, ...]]]:
+        """
+        Consulta um item no servidor.
+
+        Args:
+            key: Chave do item
+
+        Returns:
+            Tupla `(valor serializado, TTL suave restante, TTL rígido restante, tags)`,
+            ou None em caso de falta, atraso ou indisponibilidade
+        """
+        if not self._ensure_connected():
+            return None
+
+        self._next_request_id += 1
+        request_id = self._next_request_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            self._writer.write(encode_message(("get", request_id, key)))
+            return await asyncio.wait_for(future, self.timeout)
+        except (asyncio.TimeoutError, ConnectionError):
+            return None
+        finally:
+            self._pending.pop(request_id, None)
+
+    def send(self, message: Tuple[Any, ...]) -> None:
+        """
+        Envia uma escrita ou invalidação sem aguardar resposta.
+
+        Args:
+            message: Tupla `(operação, *argumentos)`
+        """
+        if self._ensure_connected():
+            self._writer.write(encode_message(message))
+
+    def _ensure_connected(self) -> bool:
+        if self.connected:
+            return True
+        # Reconecta em segundo plano, respeitando o intervalo entre tentativas
+        retry_due = self._last_attempt is None or time.monotonic() - self._last_attempt >= self.retry_interval
+        if retry_due and (self._connect_task is None or self._connect_task.done()):
+            self._last_attempt = time.monotonic()
+            self._connect_task = asyncio.get_running_loop().create_task(self.connect())
+        return False
+
+    async def _read_loop(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                message = await read_message(reader)
+                if message[0] == "result":
+                    _, request_id, payload = message
+                    future = self._pending.get(request_id)
+                    if future is not None and not future.done():
+                        future.set_result(payload)
+                elif self.on_message is not None:
+                    await self.on_message(message)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            logger.warning("Conexão com o cache compartilhado perdida")
+        finally:
+            # Ignora o encerramento de uma conexão já substituída por outra
+            if self._reader is reader:
+                self._disconnect()
+                if self.on_reset is not None:
+                    await self.on_reset()
+
+    def _disconnect(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+        for future in self._pending.values():
+            if not future.done():
+                future.set_result(None)
+        self._pending.clear()
+
+
+class TieredCache:
+    """
+    Cache em duas camadas com a mesma interface de `AsyncLRUCache`.
+
+    O L1 é o cache local do worker; o L2 é o `SharedCacheServer`. Os itens
+    trazidos do L2 são copiados para o L1 com o tempo de vida restante, e as
+    escritas e invalidações são propagadas ao L2 (que as retransmite aos
+    demais workers).
+    """
+
+    def __init__(self, local: AsyncLRUCache, client: SharedCacheClient):
+        """
+        Inicializa o cache em camadas.
+
+        Args:
+            local: Cache local do worker (L1)
+            client: Cliente do cache compartilhado (L2)
+        """
+        self.local = local
+        self.client = client
+        client.on_message = self._apply_remote
+        client.on_reset = self.local.clear
+
+    def __len__(self) -> int:
+        return len(self.local)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.local
+
+    @property
+    def ttl(self) -> int:
+        """Tempo de vida padrão dos itens em segundos."""
+        return self.local.ttl
+
+    @property
+    def total_bytes(self) -> int:
+        """Memória total estimada ocupada pelos itens do L1, em bytes."""
+        return self.local.total_bytes
+
+    async def get(self, key: str) -> Optional[Any]:
+        """
+        Obtém um item do cache.
+
+        Args:
+            key: Chave do item
+
+        Returns:
+            O valor armazenado no cache, ou None se não existir ou estiver expirado
+        """
+        entry = await self.lookup(key)
+        if entry is None or not self.local.is_fresh(entry):
+            return None
+        return entry.value
+
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        """Obtém o registro de um item do L1 (ver `AsyncLRUCache.get_entry`)."""
+        return self.local.get_entry(key)
+
+    async def lookup(self, key: str) -> Optional[CacheEntry]:
+        """
+        Obtém o registro de um item do L1 ou, se ausente ou obsoleto, do L2.
+
+        Args:
+            key: Chave do item
+
+        Returns:
+            O registro do item no L1, ou None se não existir em nenhuma camada
+        """
+        entry = self.local.get_entry(key)
+        if entry is not None and self.local.is_fresh(entry):
+            return entry
+
+        shared = await self.client.get(key)
+        if shared is None:
+            return entry
+        blob, fresh_left, hard_left, tags = shared
+        if entry is not None and fresh_left <= 0:
+            # O L2 também está obsoleto: mantém o registro local (e a recarga em andamento)
+            return entry
+
+        try:
+            value = pickle.loads(blob)
+        except Exception as e:
+            logger.warning("Item '%s' do cache compartilhado ilegível: %s", key, e)
+            return entry
+        await self.local.set(key, value, ttl=max(fresh_left, 0), tags=tags, hard_ttl=hard_left)
+        return self.local.get_entry(key)
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """Indica se o item ainda está dentro do TTL suave."""
+        return self.local.is_fresh(entry)
+
+    def time_left(self, entry: CacheEntry) -> Tuple[float, float]:
+        """Calcula o tempo restante de um item (ver `AsyncLRUCache.time_left`)."""
+        return self.local.time_left(entry)
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None, tags: Iterable[str] = (), hard_ttl: Optional[int] = None) -> None:
+        """
+        Adiciona um item ao L1 e ao L2.
+
+        Args:
+            key: Chave do item
+            value: Valor a ser armazenado
+            ttl: Tempo de vida do item em segundos (usa o padrão do cache se omitido)
+            tags: Tags usadas para invalidar o item junto com outros relacionados
+            hard_ttl: Tempo máximo em segundos durante o qual o item pode ser
+                servido como obsoleto após `ttl` (opcional)
+        """
+        tags = tuple(tags)
+        await self.local.set(key, value, ttl=ttl, tags=tags, hard_ttl=hard_ttl)
+        if key not in self.local:
+            # Excedeu o orçamento local: também não é compartilhado
+            return
+
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.debug("Item '%s' não serializável; mantido apenas no cache local: %s", key, e)
+            return
+        self.client.send(("set", key, blob, self.local.ttl if ttl is None else ttl, hard_ttl, tags))
+
+    async def invalidate(self, key: str) -> None:
+        """
+        Remove um item do cache em todos os workers.
+
+        Args:
+            key: Chave do item a ser removido
+        """
+        await self.local.invalidate(key)
+        self.client.send(("invalidate", key))
+
+    async def invalidate_prefix(self, prefix: str) -> int:
+        """
+        Remove todos os itens de um prefixo em todos os workers.
+
+        Args:
+            prefix: Prefixo das chaves (por exemplo `product`)
+
+        Returns:
+            Quantidade de itens removidos do L1
+        """
+        removed = await self.local.invalidate_prefix(prefix)
+        self.client.send(("invalidate_prefix", prefix))
+        return removed
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        """
+        Remove todos os itens associados a qualquer uma das tags em todos os workers.
+
+        Args:
+            tags: Tags a serem invalidadas (por exemplo `product:1`)
+
+        Returns:
+            Quantidade de itens removidos do L1
+        """
+        removed = await self.local.invalidate_tags(*tags)
+        self.client.send(("invalidate_tags", tuple(tags)))
+        return removed
+
+    async def clear(self) -> None:
+        """Limpa todo o cache em todos os workers."""
+        await self.local.clear()
+        self.client.send(("clear",))
+
+    def key_counts(self) -> Dict[str, int]:
+        """Conta as chaves do L1 agrupadas por prefixo."""
+        return self.local.key_counts()
+
+    def byte_counts(self) -> Dict[str, int]:
+        """Memória estimada ocupada no L1 agrupada por prefixo."""
+        return self.local.byte_counts()
+
+    def top_keys(self, limit: int = 20) -> List[Tuple[str, int]]:
+        """Lista as chaves do L1 com mais acertos (ver `AsyncLRUCache.top_keys`)."""
+        return self.local.top_keys(limit)
+
+    async def _apply_remote(self, message: Tuple[Any, ...]) -> None:
+        if message[0] == NOTIFY_OPERATION:
+            _, channel, payload = message
+            for callback in _subscribers.get(channel, ()):
+                callback(payload)
+            return
+        # Invalidação feita por outro worker: aplica somente ao L1
+        await apply_invalidation(self.local, message)
+
+
+def subscribe(channel: str, callback: Callable[[Any], None]) -> None:
+    '''Receive the notifications sent by the other workers on a channel'''
+    _subscribers.setdefault(channel, []).append(callback)
+
+
+def notify_workers(channel: str, payload: Any) -> None:
+    """
+    Envia um aviso aos outros workers do host.
+
+    Sem o cache compartilhado (ou com o servidor indisponível) o aviso é
+    descartado: quem envia deve registrar a informação também localmente.
+
+    Args:
+        channel: Canal do aviso (ver `subscribe`)
+        payload: Dados do aviso (serializáveis com `pickle`)
+    """
+    cache = get_cache()
+    if isinstance(cache, TieredCache):
+        cache.client.send((NOTIFY_OPERATION, channel, payload))
+
+
+async def configure_shared_cache(path: str = CACHE_SOCKET_PATH) -> Optional[TieredCache]:
+    """
+    Instala o cache em camadas como cache global do worker.
+
+    Args:
+        path: Caminho do socket Unix do servidor (desabilitado se vazio)
+
+    Returns:
+        O cache em camadas instalado, ou None se desabilitado
+    """
+    if not path:
+        return None
+
+    local = AsyncLRUCache(
+        max_size=CACHE_MAX_ENTRIES,
+        ttl=CACHE_DEFAULT_TTL,
+        max_bytes=CACHE_MAX_BYTES,
+        prefix_budgets=CACHE_PREFIX_BUDGETS,
+    )
+    client = SharedCacheClient(path)
+    tiered = TieredCache(local, client)
+    # Sem servidor o worker segue apenas com o L1 e tenta reconectar depois
+    await client.connect()
+    configure_cache(tiered)
+    return tiered
+
+
+def main() -> None:
+    """Executa o servidor de cache compartilhado até ser interrompido."""
+    if not CACHE_SOCKET_PATH:
+        raise SystemExit("CACHE_SOCKET_PATH não configurado")
+    try:
+        asyncio.run(SharedCacheServer(CACHE_SOCKET_PATH).serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Cache de prepared statements do asyncpg.
+
+O adaptador asyncpg do SQLAlchemy prepara cada consulta no servidor e mantém
+os prepared statements por conexão (`prepared_statement_cache_size`); as
+consultas executadas direto no driver (COPY da importação, por exemplo) usam
+o cache do próprio asyncpg (`statement_cache_size`). Com os caches ativos as
+consultas fixas dos repositórios (`find_user`, `find_order`,
+`find_payment_by_order_id`...) são analisadas e planejadas uma vez por
+conexão, e não a cada execução.
+
+Modos (`DB_STATEMENT_CACHE_MODE`):
+
+- `prepared`: conexão direta com o Postgres, os dois caches ativos;
+- `pgbouncer`: PgBouncer em modo transação com suporte a prepared statements
+  (1.21+, `max_prepared_statements` > 0). O cache do SQLAlchemy continua
+  ativo e os statements recebem nomes únicos, que não colidem entre as
+  conexões do servidor compartilhadas pelo pooler; o cache do asyncpg, com
+  nomes sequenciais por conexão, fica desligado;
+- `disabled`: pooler sem suporte a prepared statements. Nenhum cache, e os
+  nomes únicos evitam o erro "prepared statement already exists".
+
+Quando uma migração altera uma tabela, os statements preparados antes dela
+passam a falhar ("cached plan must not change result type"); um pooler que
+troca a conexão do servidor pode ainda perder o statement ("prepared
+statement does not exist"). Nos dois casos `instrument_statement_cache`
+invalida os caches de todas as conexões do worker, que preparam os
+statements de novo no próximo uso; apenas a consulta que encontrou o erro
+falha.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List
+from uuid import uuid4
+
+from asyncpg.exceptions import (InvalidCachedStatementError,
+                                InvalidSQLStatementNameError)
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import (AsyncEngine, AsyncSession,
+                                    create_async_engine)
+
+from infrastructure.logging_config import logger
+
+STATEMENT_CACHE_MODES = ("prepared", "pgbouncer", "disabled")
+
+# Configuração do benchmark (pode ser ajustada por variáveis de ambiente)
+BENCHMARK_ITERATIONS = int(os.getenv("STATEMENT_CACHE_BENCHMARK_ITERATIONS", "200"))
+
+# Erros de statements preparados que ficaram inválidos no servidor
+STALE_STATEMENT_ERRORS = (InvalidCachedStatementError, InvalidSQLStatementNameError)
+
+
+def unique_statement_name() -> str:
+    return f"__asyncpg_{uuid4()}__"
+
+
+def statement_cache_args(mode: str, size: int) -> Dict[str, Any]:
+    """
+    Monta os `connect_args` do asyncpg para um modo de cache de statements.
+
+    Args:
+        mode: Um de `STATEMENT_CACHE_MODES`
+        size: Quantidade de statements mantidos por conexão
+
+    Returns:
+        Dict com os argumentos de cache para o `create_async_engine`
+
+    Raises:
+        ValueError: Se o modo não for conhecido
+    """
+    if mode == "prepared":
+        return {"statement_cache_size": size, "prepared_statement_cache_size": size}
+    if mode == "pgbouncer":
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": size,
+            "prepared_statement_name_func": unique_statement_name,
+        }
+    if mode == "disabled":
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": unique_statement_name,
+        }
+    raise ValueError(f"Unknown statement cache mode '{mode}', expected one of {', '.join(STATEMENT_CACHE_MODES)}")
+
+
+def invalidate_statement_cache(engine: AsyncEngine) -> None:
+    '''Make every pooled connection drop its prepared statements before the next query'''
+    engine.sync_engine.dialect._invalidate_schema_cache()
+
+
+def instrument_statement_cache(engine: AsyncEngine) -> None:
+    """
+    Invalida os caches de statements do engine quando um statement preparado fica inválido.
+
+    O SQLAlchemy já invalida os caches em "cached plan must not change result
+    type"; o listener estende a invalidação ao "prepared statement does not
+    exist" dos poolers e registra o evento no log.
+
+    Args:
+        engine: Engine da aplicação
+    """
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def on_error(context):
+        original = getattr(context.original_exception, "__cause__", None)
+        if isinstance(original, STALE_STATEMENT_ERRORS):
+            logger.warning(f"Prepared statement invalidated ({original}), clearing statement caches")
+            invalidate_statement_cache(engine)
+
+
+# Consultas de formato fixo mais frequentes, sem o cache de resultados dos repositórios
+def _benchmark_queries() -> Dict[str, Callable[[AsyncSession], Awaitable[Any]]]:
+    from infrastructure.order.sqlalchemy.order_repository import \
+        OrderRepository
+    from infrastructure.payment.sqlalchemy.payment_repository import \
+        PaymentRepository
+    from infrastructure.user.sqlalchemy.user_repository import \
+        UserRepository
+
+    async def find_user(session):
+        try:
+            await UserRepository.find_user.__wrapped__(UserRepository(session), user_id=uuid4())
+        except ValueError:
+            pass
+
+    async def find_order(session):
+        try:
+            await OrderRepository.find_order.__wrapped__(OrderRepository(session), order_id=uuid4(), user_id=uuid4())
+        except ValueError:
+            pass
+
+    async def find_payment_by_order_id(session):
+        await PaymentRepository(session).find_payment_by_order_id(order_id=uuid4())
+
+    async def list_orders(session):
+        await OrderRepository.list_orders.__wrapped__(OrderRepository(session), user_id=uuid4())
+
+    return {
+        "find_user": find_user,
+        "find_order": find_order,
+        "find_payment_by_order_id": find_payment_by_order_id,
+        "list_orders": list_orders,
+    }
+
+
+def summarize(timings: Iterable[float]) -> Dict[str, float]:
+    """
+    Resume as latências de uma consulta.
+
+    Args:
+        timings: Latências em milissegundos
+
+    Returns:
+        Dict com `mean`, `p50` e `p95` em milissegundos
+    """
+    values = sorted(timings)
+    return {
+        "mean": statistics.fmean(values),
+        "p50": values[len(values) // 2],
+        "p95": values[min(len(values) - 1, int(len(values) * 0.95))],
+    }
+
+
+async def benchmark_mode(
+    url: str,
+    mode: str,
+    iterations: int = BENCHMARK_ITERATIONS,
+    size: int = 100,
+    queries: Dict[str, Callable[[AsyncSession], Awaitable[Any]]] = None,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Mede a latência de cada consulta com um modo de cache, em uma única conexão.
+
+    Args:
+        url: URL do banco (driver asyncpg)
+        mode: Modo de cache de statements
+        iterations: Execuções medidas por consulta
+        size: Tamanho do cache de statements
+        queries: Consultas medidas (padrão: as consultas fixas dos repositórios)
+
+    Returns:
+        Dict `consulta -> {mean, p50, p95}` em milissegundos
+    """
+    queries = queries or _benchmark_queries()
+    engine = create_async_engine(url, pool_size=1, max_overflow=0, connect_args=statement_cache_args(mode, size))
+    timings: Dict[str, List[float]] = {name: [] for name in queries}
+    try:
+        # Primeira execução fora da medição: conexão, introspecção de tipos e preparo
+        async with AsyncSession(engine) as session:
+            for query in queries.values():
+                await query(session)
+        for _ in range(iterations):
+            for name, query in queries.items():
+                async with AsyncSession(engine) as session:
+                    # A medição começa com a transação já aberta
+                    await session.connection()
+                    start = time.perf_counter()
+                    await query(session)
+                    timings[name].append((time.perf_counter() - start) * 1000)
+    finally:
+        await engine.dispose()
+    return {name: summarize(values) for name, values in timings.items()}
+
+
+def format_report(results: Dict[str, Dict[str, Dict[str, float]]]) -> str:
+    modes = list(results)
+    baseline = results[modes[-1]]
+    lines = [f"{'query':<26}{'mode':<11}{'mean ms':>9}{'p50 ms':>9}{'p95 ms':>9}{'vs ' + modes[-1]:>14}"]
+    for name in baseline:
+        for mode in modes:
+            stats = results[mode][name]
+            speedup = baseline[name]["mean"] / stats["mean"] if stats["mean"] else float("inf")
+            lines.append(
+                f"{name:<26}{mode:<11}{stats['mean']:>9.3f}{stats['p50']:>9.3f}{stats['p95']:>9.3f}{speedup:>13.2f}x"
+            )
+    return "\n".join(lines)
+
+
+async def run_benchmark(url: str, modes: Iterable[str], iterations: int) -> Dict[str, Dict[str, Dict[str, float]]]:
+    return {mode: await benchmark_mode(url, mode, iterations) for mode in modes}
+
+
+def main() -> None:
+    from infrastructure.api.config import settings
+
+    parser = argparse.ArgumentParser(description="Compara a latência das consultas dos repositórios por modo de cache de statements")
+    parser.add_argument("--iterations", type=int, default=BENCHMARK_ITERATIONS)
+    parser.add_argument("--modes", nargs="+", choices=STATEMENT_CACHE_MODES, default=["prepared", "disabled"])
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmark(settings.database_url, args.modes, args.iterations))
+    print(format_report(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Listagens em streaming com cursores do lado do servidor.
+
+As listagens paginadas limitam a memória por requisição, mas um cliente que
+precisa de todos os registros faz uma requisição por página. No modo
+streaming a consulta é lida do banco em lotes (`yield_per`, com cursor do
+lado do servidor no asyncpg) e cada lote é serializado e enviado ao cliente
+antes de o próximo ser buscado: a memória fica limitada ao tamanho do lote,
+qualquer que seja o tamanho da tabela.
+
+A resposta tem o mesmo formato JSON da listagem completa
+(`{"users": [...]}`), montado incrementalmente.
+"""
+import os
+from typing import Any, AsyncIterator, Callable
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from infrastructure.api.database import SessionLocal
+from infrastructure.logging_config import logger
+
+# Quantidade de linhas lidas do cursor (e enviadas ao cliente) por vez
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "500"))
+
+
+async def stream_scalars(session: AsyncSession, statement, batch_size: int = STREAM_BATCH_SIZE) -> AsyncIterator[Any]:
+    """
+    Percorre o resultado de uma consulta com um cursor do lado do servidor.
+
+    Args:
+        session: Sessão do banco de dados
+        statement: Consulta a percorrer
+        batch_size: Quantidade de linhas buscadas do cursor por vez
+
+    Returns:
+        Iterador assíncrono com as entidades ORM da consulta
+    """
+    result = await session.stream_scalars(statement.execution_options(yield_per=batch_size))
+    async for row in result:
+        yield row
+
+
+def json_array_response(
+    key: str,
+    produce: Callable[[AsyncSession], AsyncIterator[BaseModel]],
+    session_factory: Callable[[], Any] = SessionLocal,
+    batch_size: int = STREAM_BATCH_SIZE,
+) -> StreamingResponse:
+    """
+    Monta uma resposta `{"<key>": [...]}` enviada em partes.
+
+    A sessão é aberta dentro do gerador da resposta: as dependências do
+    FastAPI (como `get_session`) são encerradas antes de o corpo de uma
+    `StreamingResponse` ser enviado.
+
+    Args:
+        key: Nome do campo com a lista na resposta
+        produce: Função que recebe a sessão e retorna os DTOs a enviar
+        session_factory: Fábrica de `AsyncSession`
+        batch_size: Quantidade de itens serializados por parte da resposta
+
+    Returns:
+        Resposta em streaming com o corpo JSON
+    """
+    async def body() -> AsyncIterator[str]:
+        yield f'{{"{key}":['
+        separator = ""
+        chunk = []
+        try:
+            async with session_factory() as session:
+                async for item in produce(session):
+                    chunk.append(separator + item.json())
+                    separator = ","
+                    if len(chunk) >= batch_size:
+                        yield "".join(chunk)
+                        chunk = []
+        except Exception:
+            # O status já foi enviado; a conexão é encerrada com o JSON incompleto
+            logger.exception("Falha no streaming da listagem '%s'", key)
+            raise
+        yield "".join(chunk) + "]}"
+
+    return StreamingResponse(body(), media_type="application/json")
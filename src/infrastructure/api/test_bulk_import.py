@@ -0,0 +1,111 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import UUID
+
+import pytest
+
+from domain.__seedwork.test_utils import async_iter, async_return
+from infrastructure.api.bulk_import import (IMPORT_TARGETS, import_rows,
+                                            iter_rows, product_record,
+                                            user_record)
+
+
+def chunks(*parts: bytes):
+    return async_iter(list(parts))()
+
+async def read_rows(rows):
+    return [row async for row in rows]
+
+def import_session(inserted=0, updated=0):
+    session = MagicMock()
+    session.execute = AsyncMock()
+    driver_connection = MagicMock()
+    driver_connection.copy_records_to_table = AsyncMock()
+    driver_connection.fetchrow = AsyncMock(return_value={"inserted": inserted, "updated": updated})
+    raw_connection = MagicMock()
+    raw_connection.driver_connection = driver_connection
+    connection = MagicMock()
+    connection.get_raw_connection = async_return(raw_connection)
+    session.connection = async_return(connection)
+    return session, driver_connection
+
+@pytest.mark.asyncio
+async def test_iter_rows_csv_across_chunks_and_quoted_newlines():
+    rows = await read_rows(iter_rows(chunks(b'\xef\xbb\xbfid,name\r\n1,Bur', b'ger\r\n2,"X-\nSalada"\n3\n'), "csv"))
+
+    assert rows == [
+        (2, {"id": "1", "name": "Burger"}, None),
+        (3, {"id": "2", "name": "X-\nSalada"}, None),
+        (5, None, "expected 2 columns, got 1"),
+    ]
+
+@pytest.mark.asyncio
+async def test_iter_rows_ndjson_reports_invalid_lines():
+    rows = await read_rows(iter_rows(chunks(b'{"id": 1}\n\nnot json\n[1]\n{"id": 2}'), "ndjson"))
+
+    assert rows[0] == (1, {"id": 1}, None)
+    assert rows[1][0] == 3 and rows[1][1] is None and rows[1][2].startswith("invalid JSON")
+    assert rows[2] == (4, None, "expected a JSON object")
+    assert rows[3] == (5, {"id": 2}, None)
+
+def test_iter_rows_invalid_format():
+    with pytest.raises(ValueError):
+        iter_rows(chunks(b""), "xml")
+
+def test_product_record_validates_with_entity():
+    assert product_record({"id": "3", "name": "Coke", "price": "5.5", "category": "DRINK"}) == (3, "Coke", 5.5, "DRINK")
+
+    with pytest.raises(Exception, match="price must be a non-negative number"):
+        product_record({"id": 3, "name": "Coke", "price": -1, "category": "DRINK"})
+    with pytest.raises(ValueError):
+        product_record({"id": "3", "name": "Coke", "price": "5", "category": "PIZZA"})
+
+def test_user_record_generates_id_when_missing():
+    row = {"name": "Ana", "email": "ana@example.com", "age": "30", "gender": "female", "phone_number": "123", "password": "secret"}
+
+    record = user_record(row)
+
+    assert isinstance(record[0], UUID)
+    assert record[1:] == ("Ana", "ana@example.com", 30, "female", "123", "secret")
+    with pytest.raises(Exception, match="age must be greater than 18"):
+        user_record({**row, "age": 17})
+
+@pytest.mark.asyncio
+async def test_import_rows_copies_valid_rows_in_batches_and_merges_once():
+    session, driver_connection = import_session(inserted=2, updated=1)
+    body = b"id,name,price,category\n1,Burger,10,BURGER\n2,Coke,5,DRINK\n0,Bad,1,DRINK\n3,Fries,4,SIDE_DISH\n1,Burger,12,BURGER\n"
+
+    with patch("infrastructure.api.bulk_import.invalidate_prefix", new_callable=AsyncMock) as invalidate:
+        report = await import_rows(session, IMPORT_TARGETS["products"], chunks(body), "csv", batch_size=2)
+
+    assert "CREATE TEMP TABLE _import_tb_products (LIKE tb_products" in str(session.execute.await_args.args[0])
+    copies = driver_connection.copy_records_to_table.await_args_list
+    assert [call.kwargs["records"] for call in copies] == [
+        [(1, "Burger", 10.0, "BURGER", 2), (2, "Coke", 5.0, "DRINK", 3)],
+        [(3, "Fries", 4.0, "SIDE_DISH", 5), (1, "Burger", 12.0, "BURGER", 6)],
+    ]
+    assert copies[0].args == ("_import_tb_products",)
+    assert copies[0].kwargs["columns"] == ("id", "name", "price", "category", "_row")
+    merge_sql = driver_connection.fetchrow.await_args.args[0]
+    assert "ON CONFLICT (id) DO UPDATE" in merge_sql and "DISTINCT ON (id)" in merge_sql
+    invalidate.assert_awaited_once_with("product")
+    assert report == {
+        "table": "tb_products",
+        "received": 5,
+        "valid": 4,
+        "failed": 1,
+        "errors": [{"row": 4, "error": "id must be an integer greater than 0"}],
+        "inserted": 2,
+        "updated": 1,
+        "duplicated": 1,
+    }
+
+@pytest.mark.asyncio
+async def test_import_rows_without_changes_keeps_cache():
+    session, driver_connection = import_session()
+
+    with patch("infrastructure.api.bulk_import.invalidate_prefix", new_callable=AsyncMock) as invalidate:
+        report = await import_rows(session, IMPORT_TARGETS["users"], chunks(b'{"name": ""}\n'), "ndjson")
+
+    driver_connection.copy_records_to_table.assert_not_awaited()
+    invalidate.assert_not_awaited()
+    assert report["errors"] == [{"row": 1, "error": "None is not a valid UserGender"}]
@@ -0,0 +1,638 @@
+import asyncio
+import pickle
+from unittest.mock import patch
+from uuid import UUID, uuid4
+
+import pytest
+
+from domain.__seedwork.entity import FrozenEntityError
+from domain.order.order_status_enum import OrderStatus
+from domain.product.product_category_enum import ProductCategory
+from domain.product.product_entity import Product
+from infrastructure.api import cache
+from infrastructure.api.cache import (AsyncLRUCache, CacheKeyBuilder,
+                                      SingleFlight, async_cached, format_tags,
+                                      invalidate_cache, normalize_key_part)
+
+
+class FakeRepository:
+    def __init__(self):
+        self.calls = 0
+
+    @async_cached(ttl=60, prefix='product')
+    async def find_product(self, product_id: int):
+        self.calls += 1
+        return {"id": product_id}
+
+    @async_cached(ttl=60, prefix='order')
+    async def list_all_orders(self, page: int = 1, page_size: int = 50, status: OrderStatus = None):
+        self.calls += 1
+        return {"page": page, "status": status}
+
+
+def test_normalize_key_part():
+    order_id = uuid4()
+
+    assert normalize_key_part(order_id) == str(order_id)
+    assert normalize_key_part(str(order_id).upper()) == str(order_id)
+    assert normalize_key_part(order_id.hex) == str(order_id)
+    assert normalize_key_part(OrderStatus.PENDING) == OrderStatus.PENDING.value
+    assert normalize_key_part(10) == "10"
+    assert normalize_key_part(True) == "true"
+    assert normalize_key_part(None) == "None"
+    assert normalize_key_part("Product A") == "Product A"
+
+
+def test_key_builder_ignores_bound_instance():
+    builder = CacheKeyBuilder(FakeRepository.find_product.__wrapped__, prefix='product')
+
+    key_a = builder.build((FakeRepository(), 1), {})
+    key_b = builder.build((FakeRepository(),), {"product_id": 1})
+
+    assert key_a == key_b == "product:find_product:product_id=1"
+
+
+def test_key_builder_applies_defaults():
+    builder = CacheKeyBuilder(FakeRepository.list_all_orders.__wrapped__, prefix='order')
+
+    key_a = builder.build((None,), {})
+    key_b = builder.build((None, 1, 50), {"status": None})
+
+    assert key_a == key_b
+
+
+def test_cache_key_helper():
+    order_id = uuid4()
+
+    assert FakeRepository.find_product.cache_key(1) == "product:find_product:product_id=1"
+    assert FakeRepository.find_product.cache_key(product_id=1) == "product:find_product:product_id=1"
+    assert isinstance(UUID(normalize_key_part(str(order_id))), UUID)
+
+
+@pytest.mark.asyncio
+async def test_async_cached_hits_across_instances():
+    first = FakeRepository()
+    second = FakeRepository()
+
+    assert await first.find_product(1) == {"id": 1}
+    assert await second.find_product(product_id=1) == {"id": 1}
+
+    assert first.calls == 1
+    assert second.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_key_counts_by_prefix():
+    repository = FakeRepository()
+
+    await repository.find_product(1)
+    await repository.find_product(2)
+    await repository.list_all_orders()
+
+    assert cache._cache.key_counts() == {"product": 2, "order": 1}
+
+
+@pytest.mark.asyncio
+async def test_async_lru_cache_get_set_invalidate():
+    lru = AsyncLRUCache(max_size=2, ttl=60)
+
+    await lru.set("product:a", 1)
+    assert await lru.get("product:a") == 1
+
+    await lru.invalidate("product:a")
+    assert await lru.get("product:a") is None
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_async_lru_cache_evicts_least_recently_used():
+    lru = AsyncLRUCache(max_size=2, ttl=60)
+
+    await lru.set("product:a", 1)
+    await lru.set("product:b", 2)
+    # "a" passa a ser o mais recente
+    assert await lru.get("product:a") == 1
+    await lru.set("product:c", 3)
+
+    assert await lru.get("product:b") is None
+    assert await lru.get("product:a") == 1
+    assert await lru.get("product:c") == 3
+    assert len(lru) == 2
+
+
+@pytest.mark.asyncio
+async def test_async_lru_cache_entry_ttl_uses_clock():
+    clock = FakeClock()
+    lru = AsyncLRUCache(max_size=10, ttl=60, clock=clock)
+
+    await lru.set("product:a", 1, ttl=10)
+    await lru.set("product:b", 2)
+
+    clock.now += 11
+    assert await lru.get("product:a") is None
+    assert await lru.get("product:b") == 2
+
+
+@pytest.mark.asyncio
+async def test_async_lru_cache_sweeps_expired_entries_on_write():
+    clock = FakeClock()
+    lru = AsyncLRUCache(max_size=10, ttl=5, clock=clock)
+
+    await lru.set("product:a", 1)
+    await lru.set("order:b", 2)
+    clock.now += 6
+    await lru.set("user:c", 3)
+
+    assert lru.key_counts() == {"user": 1}
+
+
+@pytest.mark.asyncio
+async def test_async_lru_cache_prefix_budget_only_evicts_same_prefix():
+    item_size = cache.estimate_size("x" * 100)
+    lru = AsyncLRUCache(max_size=100, ttl=60, prefix_budgets={"order": item_size * 2})
+
+    await lru.set("product:a", "x" * 100)
+    await lru.set("order:a", "x" * 100)
+    await lru.set("order:b", "x" * 100)
+    await lru.set("order:c", "x" * 100)
+
+    assert lru.key_counts() == {"product": 1, "order": 2}
+    assert await lru.get("order:a") is None
+    assert lru.byte_counts()["order"] == item_size * 2
+
+
+@pytest.mark.asyncio
+async def test_async_lru_cache_rejects_items_larger_than_budget():
+    lru = AsyncLRUCache(max_size=100, ttl=60, max_bytes=100)
+
+    await lru.set("order:page", ["x" * 200])
+
+    assert await lru.get("order:page") is None
+    assert lru.total_bytes == 0
+
+
+@pytest.mark.asyncio
+async def test_async_lru_cache_overwrite_updates_size():
+    lru = AsyncLRUCache(max_size=100, ttl=60)
+
+    await lru.set("product:a", "x" * 100)
+    await lru.set("product:a", "x")
+
+    assert lru.total_bytes == cache.estimate_size("x")
+    assert len(lru) == 1
+
+
+def test_parse_prefix_budgets():
+    assert cache.parse_prefix_budgets("product=1024, order=2048") == {"product": 1024, "order": 2048}
+    assert cache.parse_prefix_budgets("") == {}
+
+
+class FakeOrder:
+    def __init__(self, id, user_id):
+        self.id = id
+        self.user_id = user_id
+
+
+class FakeOrderRepository:
+    def __init__(self):
+        self.calls = 0
+
+    @async_cached(ttl=60, prefix='order', tags=('order:{order_id}',))
+    async def find_order(self, order_id, user_id):
+        self.calls += 1
+        return FakeOrder(id=order_id, user_id=user_id)
+
+    @async_cached(ttl=60, prefix='order', tags=('order:user:{user_id}',))
+    async def list_orders(self, user_id, page: int = 1):
+        self.calls += 1
+        return [page]
+
+    @invalidate_cache(key_prefix='order', tags=('order:{order.id}', 'order:user:{order.user_id}'))
+    async def update_order(self, order):
+        return order
+
+    @invalidate_cache(key_prefix='order')
+    async def delete_all_orders(self):
+        return None
+
+
+def test_format_tags():
+    order = FakeOrder(id=uuid4(), user_id=uuid4())
+
+    tags = format_tags(('order:{order.id}', 'order:user:{order.user_id}', 'order:{result.id}'), {"order": order}, None)
+
+    assert tags == [f"order:{order.id}", f"order:user:{order.user_id}"]
+
+
+@pytest.mark.asyncio
+async def test_invalidate_cache_by_tags_keeps_unrelated_entries():
+    repository = FakeOrderRepository()
+    products = FakeRepository()
+    user_id = uuid4()
+    other_user_id = uuid4()
+    order_id = uuid4()
+
+    await repository.find_order(order_id, user_id)
+    await repository.list_orders(user_id, page=1)
+    await repository.list_orders(user_id, page=2)
+    await repository.list_orders(other_user_id)
+    await products.find_product(1)
+
+    await repository.update_order(FakeOrder(id=order_id, user_id=user_id))
+
+    assert cache._cache.key_counts() == {"order": 1, "product": 1}
+    await repository.list_orders(other_user_id)
+    assert repository.calls == 4
+
+
+@pytest.mark.asyncio
+async def test_invalidate_cache_by_prefix():
+    repository = FakeOrderRepository()
+    products = FakeRepository()
+
+    await repository.find_order(uuid4(), uuid4())
+    await products.find_product(1)
+
+    await repository.delete_all_orders()
+
+    assert cache._cache.key_counts() == {"product": 1}
+
+
+@pytest.mark.asyncio
+async def test_async_lru_cache_tag_index_is_cleaned_on_eviction():
+    lru = AsyncLRUCache(max_size=1, ttl=60)
+
+    await lru.set("product:a", 1, tags=("product:1",))
+    await lru.set("product:b", 2, tags=("product:2",))
+
+    assert await lru.invalidate_tags("product:1") == 0
+    assert await lru.invalidate_tags("product:2") == 1
+    assert len(lru) == 0
+
+
+class SlowRepository:
+    def __init__(self, release: asyncio.Event, error: Exception = None):
+        self.release = release
+        self.error = error
+        self.calls = 0
+
+    @async_cached(ttl=60, prefix='offer')
+    async def find_offer(self, offer_id: int):
+        self.calls += 1
+        await self.release.wait()
+        if self.error:
+            raise self.error
+        return {"id": offer_id}
+
+
+@pytest.mark.asyncio
+async def test_async_cached_coalesces_concurrent_misses():
+    release = asyncio.Event()
+    repository = SlowRepository(release)
+
+    with patch('infrastructure.api.cache.increment_cache_coalesced_wait') as mock_wait:
+        tasks = [asyncio.ensure_future(repository.find_offer(1)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+    assert results == [{"id": 1}] * 5
+    assert repository.calls == 1
+    assert mock_wait.call_count == 4
+    mock_wait.assert_called_with('offer')
+
+
+@pytest.mark.asyncio
+async def test_async_cached_propagates_exception_to_waiters():
+    release = asyncio.Event()
+    repository = SlowRepository(release, error=RuntimeError("db down"))
+
+    tasks = [asyncio.ensure_future(repository.find_offer(1)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert repository.calls == 1
+    assert await cache._cache.get("offer:find_offer:offer_id=1") is None
+
+
+@pytest.mark.asyncio
+async def test_single_flight_waiter_retries_when_leader_is_cancelled():
+    single_flight = SingleFlight()
+    started = asyncio.Event()
+    release = asyncio.Event()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        started.set()
+        await release.wait()
+        return "value"
+
+    leader = asyncio.ensure_future(single_flight.do("key", loader))
+    await started.wait()
+    follower = asyncio.ensure_future(single_flight.do("key", loader))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await follower == "value"
+    assert leader.cancelled()
+    assert len(calls) == 2
+    assert len(single_flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_waiter_cancellation_does_not_cancel_load():
+    single_flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def loader():
+        await release.wait()
+        return "value"
+
+    leader = asyncio.ensure_future(single_flight.do("key", loader))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(single_flight.do("key", loader))
+    await asyncio.sleep(0)
+
+    follower.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await leader == "value"
+    assert follower.cancelled()
+
+
+class FakeSession:
+    def __init__(self, name):
+        self.name = name
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.closed = True
+
+
+class CatalogRepository:
+    def __init__(self, session):
+        self.session = session
+        self.sessions_used = []
+        self.version = 1
+
+    @async_cached(ttl=10, prefix='product', tags=('product:list',), hard_ttl=100, refresh_concurrency=1)
+    async def list_products(self):
+        self.sessions_used.append(self.session.name)
+        return [f"v{self.version}"]
+
+
+@pytest.fixture
+def swr_cache(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache, "_cache", AsyncLRUCache(clock=clock))
+    sessions = []
+
+    def session_factory():
+        session = FakeSession(f"background-{len(sessions)}")
+        sessions.append(session)
+        return session
+
+    monkeypatch.setattr(cache, "_refresh_session_factory", session_factory)
+    return clock, sessions
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate_serves_stale_and_refreshes_in_background(swr_cache):
+    clock, sessions = swr_cache
+    repository = CatalogRepository(FakeSession("request"))
+
+    assert await repository.list_products() == ["v1"]
+    repository.version = 2
+    clock.now += 11
+
+    # Serve o valor obsoleto sem acessar o banco no caminho da requisição
+    assert await repository.list_products() == ["v1"]
+    await cache._refresher.wait()
+
+    assert await repository.list_products() == ["v2"]
+    # A recarga usou uma sessão própria, não a da requisição
+    assert repository.sessions_used == ["request", "background-0"]
+    assert repository.session.name == "request"
+    assert len(sessions) == 1
+    assert sessions[0].closed
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate_reloads_after_hard_ttl(swr_cache):
+    clock, sessions = swr_cache
+    repository = CatalogRepository(FakeSession("request"))
+
+    await repository.list_products()
+    repository.version = 2
+    clock.now += 101
+
+    assert await repository.list_products() == ["v2"]
+    assert repository.sessions_used == ["request", "request"]
+    assert sessions == []
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate_does_not_overwrite_invalidated_entry(swr_cache):
+    clock, sessions = swr_cache
+    repository = CatalogRepository(FakeSession("request"))
+
+    await repository.list_products()
+    clock.now += 11
+    await repository.list_products()
+    await cache._cache.invalidate_tags("product:list")
+    await cache._refresher.wait()
+
+    assert cache._cache.key_counts() == {}
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate_without_session_factory_loads_inline(swr_cache, monkeypatch):
+    clock, sessions = swr_cache
+    monkeypatch.setattr(cache, "_refresh_session_factory", None)
+    repository = CatalogRepository(FakeSession("request"))
+
+    await repository.list_products()
+    repository.version = 2
+    clock.now += 11
+
+    assert await repository.list_products() == ["v2"]
+    assert len(cache._refresher) == 0
+
+
+@pytest.mark.asyncio
+async def test_background_refresher_limits_concurrency():
+    refresher = cache.BackgroundRefresher()
+    release = asyncio.Event()
+
+    async def refresh():
+        await release.wait()
+
+    assert refresher.schedule("product:a", refresh, group="product", limit=1)
+    assert not refresher.schedule("product:a", refresh, group="product", limit=1)
+    assert not refresher.schedule("product:b", refresh, group="product", limit=1)
+    assert refresher.schedule("offer:a", refresh, group="offer", limit=1)
+
+    release.set()
+    await refresher.wait()
+    assert len(refresher) == 0
+
+
+class LookupRepository:
+    def __init__(self):
+        self.calls = 0
+        self.rows = {}
+
+    @async_cached(ttl=60, prefix='order', tags=('order:cart:{cart_id}',), negative_ttl=5)
+    async def find_order_by_cart_id(self, cart_id):
+        self.calls += 1
+        return self.rows.get(cart_id)
+
+    @async_cached(ttl=60, prefix='user', tags=('user:{user_id}',), negative_ttl=5, negative_exceptions=(ValueError,))
+    async def find_user(self, user_id):
+        self.calls += 1
+        if user_id not in self.rows:
+            raise ValueError(f"User with id '{user_id}' not found")
+        return self.rows[user_id]
+
+    @invalidate_cache(key_prefix='order', tags=('order:cart:{cart_id}',))
+    async def create_order(self, cart_id):
+        self.rows[cart_id] = {"cart_id": cart_id}
+        return self.rows[cart_id]
+
+
+@pytest.mark.asyncio
+async def test_negative_cache_for_none_results(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache, "_cache", AsyncLRUCache(clock=clock))
+    repository = LookupRepository()
+    cart_id = uuid4()
+
+    assert await repository.find_order_by_cart_id(cart_id) is None
+    assert await repository.find_order_by_cart_id(cart_id) is None
+    assert repository.calls == 1
+
+    clock.now += 6
+    assert await repository.find_order_by_cart_id(cart_id) is None
+    assert repository.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_negative_cache_is_invalidated_by_create_path():
+    repository = LookupRepository()
+    cart_id = uuid4()
+
+    assert await repository.find_order_by_cart_id(cart_id) is None
+    await repository.create_order(cart_id)
+
+    assert await repository.find_order_by_cart_id(cart_id) == {"cart_id": cart_id}
+    assert repository.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_negative_cache_for_not_found_exceptions():
+    repository = LookupRepository()
+    user_id = uuid4()
+
+    for _ in range(2):
+        with pytest.raises(ValueError) as excinfo:
+            await repository.find_user(user_id)
+        assert str(excinfo.value) == f"User with id '{user_id}' not found"
+
+    assert repository.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_none_results_are_not_cached_without_negative_ttl():
+    repository = FakeOrderRepository()
+
+    @async_cached(ttl=60, prefix='offer')
+    async def find_offer(offer_id):
+        repository.calls += 1
+        return None
+
+    await find_offer(1)
+    await find_offer(1)
+
+    assert repository.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_async_cached_records_hits_and_misses():
+    repository = FakeRepository()
+
+    with patch('infrastructure.api.cache.increment_cache_hit') as mock_hit, \
+            patch('infrastructure.api.cache.increment_cache_miss') as mock_miss, \
+            patch('infrastructure.api.cache.record_cache_load_duration') as mock_duration:
+        await repository.find_product(1)
+        await repository.find_product(1)
+        await repository.find_product(1)
+
+    mock_miss.assert_called_once_with('product')
+    assert mock_hit.call_count == 2
+    mock_hit.assert_called_with('product')
+    assert mock_duration.call_args[0][0] == 'product'
+
+
+@pytest.mark.asyncio
+async def test_cache_records_evictions_and_expirations():
+    clock = FakeClock()
+    lru = AsyncLRUCache(max_size=2, ttl=10, clock=clock)
+
+    with patch('infrastructure.api.cache.increment_cache_eviction') as mock_eviction, \
+            patch('infrastructure.api.cache.increment_cache_expiration') as mock_expiration:
+        await lru.set("product:1", 1)
+        await lru.set("product:2", 2)
+        await lru.set("order:1", 1)
+        clock.now += 20
+        assert lru.get_entry("product:2") is None
+
+    mock_eviction.assert_called_once_with('product')
+    mock_expiration.assert_called_once_with('product')
+
+
+@pytest.mark.asyncio
+async def test_top_keys_by_hit_count():
+    repository = FakeRepository()
+
+    for product_id, hits in ((1, 3), (2, 1), (3, 0)):
+        for _ in range(hits + 1):
+            await repository.find_product(product_id)
+
+    assert cache.get_cache().top_keys(2) == [
+        ("product:find_product:product_id=1", 3),
+        ("product:find_product:product_id=2", 1),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_async_cached_shares_frozen_entities():
+    @async_cached(ttl=60, prefix='product')
+    async def list_products():
+        return [Product(id=1, name="Burger", price=10.0, category=ProductCategory.BURGER)]
+
+    first = await list_products()
+    second = await list_products()
+
+    assert first[0] is second[0]
+    with pytest.raises(FrozenEntityError):
+        first[0].price = 0.0
+
+    # Cópias serializadas (cache compartilhado) continuam somente leitura
+    assert pickle.loads(pickle.dumps(first[0])).frozen
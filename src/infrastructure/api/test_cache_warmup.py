@@ -0,0 +1,73 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from infrastructure.api.cache_warmup import (WARMUP_DISABLED, WARMUP_DONE,
+                                             WARMUP_FAILED, WARMUP_PENDING,
+                                             CacheWarmup)
+
+
+class FakeSessionFactory:
+    def __init__(self):
+        self.session = MagicMock()
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self.session
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+@pytest.mark.asyncio
+async def test_warmup_loads_products_offers_and_users():
+    warmup = CacheWarmup(enabled=True, users_limit=50)
+
+    with patch('infrastructure.api.cache_warmup.ProductRepository.warm_cache', AsyncMock(return_value=10)), \
+            patch('infrastructure.api.cache_warmup.OfferRepository.warm_cache', AsyncMock(return_value=2)), \
+            patch('infrastructure.api.cache_warmup.UserRepository.warm_cache', AsyncMock(return_value=50)) as mock_users:
+        assert warmup.status == WARMUP_PENDING
+        assert not warmup.ready
+
+        await warmup.run(FakeSessionFactory())
+
+    assert warmup.status == WARMUP_DONE
+    assert warmup.ready
+    assert warmup.counts == {"product": 10, "offer": 2, "user": 50}
+    mock_users.assert_awaited_once_with(limit=50)
+
+
+@pytest.mark.asyncio
+async def test_warmup_skips_users_without_limit():
+    warmup = CacheWarmup(enabled=True, users_limit=0)
+
+    with patch('infrastructure.api.cache_warmup.ProductRepository.warm_cache', AsyncMock(return_value=1)), \
+            patch('infrastructure.api.cache_warmup.OfferRepository.warm_cache', AsyncMock(return_value=0)), \
+            patch('infrastructure.api.cache_warmup.UserRepository.warm_cache', AsyncMock()) as mock_users:
+        await warmup.run(FakeSessionFactory())
+
+    mock_users.assert_not_awaited()
+    assert warmup.counts == {"product": 1, "offer": 0}
+
+
+@pytest.mark.asyncio
+async def test_warmup_failure_does_not_block_readiness():
+    warmup = CacheWarmup(enabled=True)
+
+    with patch('infrastructure.api.cache_warmup.ProductRepository.warm_cache', AsyncMock(side_effect=RuntimeError("db down"))):
+        await warmup.run(FakeSessionFactory())
+
+    assert warmup.status == WARMUP_FAILED
+    assert warmup.ready
+
+
+@pytest.mark.asyncio
+async def test_disabled_warmup_is_ready():
+    warmup = CacheWarmup(enabled=False)
+
+    await warmup.run(FakeSessionFactory())
+
+    assert warmup.status == WARMUP_DISABLED
+    assert warmup.ready
@@ -0,0 +1,169 @@
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.util import greenlet_spawn
+
+from infrastructure.api import connection_pool, main
+from infrastructure.api.config import Settings
+from infrastructure.api.connection_pool import (AdmissionQueuePool,
+                                                PoolExhaustedError,
+                                                instrument_pool, pool_budget)
+from infrastructure.observability import metrics
+
+
+class FakeDBAPIConnection:
+    def close(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def make_pool(pool_size=1, max_overflow=0, max_waiting=0):
+    pool = AdmissionQueuePool(FakeDBAPIConnection, pool_size=pool_size, max_overflow=max_overflow, timeout=0.01)
+    pool.max_waiting = max_waiting
+    return pool
+
+
+def test_pool_budget_splits_connections_across_workers():
+    # (200 - 20) // 8 = 22 conexões por worker: 17 fixas e 5 de overflow
+    budget = pool_budget(max_connections=200, reserved=20, workers=8, overflow_ratio=0.25)
+
+    assert budget == {"pool_size": 17, "max_overflow": 5, "max_waiting": 44}
+    assert (budget["pool_size"] + budget["max_overflow"]) * 8 <= 200 - 20
+
+def test_pool_budget_keeps_at_least_one_fixed_connection():
+    budget = pool_budget(max_connections=12, reserved=10, workers=1, overflow_ratio=1.0, max_waiting=3)
+
+    assert budget == {"pool_size": 1, "max_overflow": 1, "max_waiting": 3}
+
+def test_pool_budget_rejects_more_workers_than_connections():
+    with pytest.raises(ValueError, match="cannot be split across 8 workers"):
+        pool_budget(max_connections=25, reserved=20, workers=8, overflow_ratio=0.25)
+
+@pytest.mark.asyncio
+async def test_admission_queue_rejects_when_exhausted():
+    pool = make_pool(max_waiting=0)
+    connection = await greenlet_spawn(pool.connect)
+
+    with pytest.raises(PoolExhaustedError, match="0 requests waiting"):
+        await greenlet_spawn(pool.connect)
+
+    connection.close()
+    (await greenlet_spawn(pool.connect)).close()
+    assert pool.waiting == 0
+
+@pytest.mark.asyncio
+async def test_admission_queue_waits_up_to_pool_timeout():
+    pool = make_pool(max_waiting=1)
+    connection = await greenlet_spawn(pool.connect)
+
+    # Há vaga na fila: a requisição espera e termina no timeout do pool
+    with pytest.raises(PoolTimeoutError) as exc_info:
+        await greenlet_spawn(pool.connect)
+
+    assert not isinstance(exc_info.value, PoolExhaustedError)
+    assert pool.waiting == 0
+    connection.close()
+
+def test_admission_queue_survives_recreate():
+    pool = make_pool(max_waiting=4)
+
+    recreated = pool.recreate()
+
+    assert isinstance(recreated, AsyncAdaptedQueuePool)
+    assert recreated.max_waiting == 4
+    assert "Waiting: 0" in recreated.status()
+
+@pytest.mark.asyncio
+async def test_checkout_wait_is_recorded_for_the_request(monkeypatch):
+    histogram = MagicMock()
+    monkeypatch.setattr(metrics, "db_pool_checkout_wait", histogram)
+    pool = make_pool(pool_size=2)
+    pool.name = "replica"
+
+    with metrics.track_db_pool_checkout_wait() as waits:
+        first = await greenlet_spawn(pool.connect)
+        second = await greenlet_spawn(pool.connect)
+
+    assert len(waits) == 2
+    assert histogram.record.call_args.args[1] == {"pool": "replica"}
+    assert pool.usage() == {"checked_out": 2, "idle": 0, "overflow": 0, "waiting": 0}
+    first.close()
+    second.close()
+    # Fora de uma requisição a espera vai apenas para o histograma
+    (await greenlet_spawn(pool.connect)).close()
+    assert len(waits) == 2
+    assert pool.usage()["idle"] == 2
+
+def test_instrument_pool_counts_connection_lifecycle(monkeypatch):
+    counters = {}
+    for name in ("increment_db_pool_connect", "increment_db_pool_invalidation", "increment_db_pool_recycle",
+                 "increment_db_pool_pre_ping_failure", "record_db_pool_connection_age", "register_db_pool_gauges"):
+        counters[name] = MagicMock()
+        monkeypatch.setattr(connection_pool, name, counters[name])
+    engine = create_async_engine("postgresql+asyncpg://u:p@localhost/db", poolclass=AdmissionQueuePool, pool_recycle=60)
+
+    instrument_pool(engine)
+    # Os eventos continuam registrados no pool recriado por engine.dispose()
+    engine.sync_engine.pool = engine.sync_engine.pool.recreate()
+    dispatch = engine.sync_engine.pool.dispatch
+    # O evento connect do engine também inicializa o dialeto: dispara apenas o listener do pool
+    for listener in dispatch.connect:
+        if getattr(listener, "__name__", "") == "on_connect":
+            listener(MagicMock(), MagicMock())
+    dispatch.close(MagicMock(), MagicMock(starttime=time.time() - 120))
+    dispatch.close(MagicMock(), MagicMock(starttime=time.time()))
+    dispatch.invalidate(MagicMock(), MagicMock(), None)
+    dispatch.soft_invalidate(MagicMock(), MagicMock(), None)
+    engine.sync_engine.dialect.dispatch.handle_error(MagicMock(is_pre_ping=True))
+    engine.sync_engine.dialect.dispatch.handle_error(MagicMock(is_pre_ping=False))
+
+    counters["increment_db_pool_connect"].assert_called_once_with("primary")
+    assert counters["record_db_pool_connection_age"].call_count == 2
+    counters["increment_db_pool_recycle"].assert_called_once_with("primary")
+    assert [call.kwargs for call in counters["increment_db_pool_invalidation"].call_args_list] == [{}, {"soft": True}]
+    counters["increment_db_pool_pre_ping_failure"].assert_called_once_with("primary")
+    pool_name, usage = counters["register_db_pool_gauges"].call_args.args
+    assert pool_name == "primary"
+    assert usage() == engine.sync_engine.pool.usage()
+
+def test_settings_database_url_uses_asyncpg():
+    assert Settings(CONNECTION="postgresql://u:p@db/app").database_url == "postgresql+asyncpg://u:p@db/app"
+    assert Settings(CONNECTION="postgres://u:p@db/app").database_url == "postgresql+asyncpg://u:p@db/app"
+    assert Settings(CONNECTION="postgresql+asyncpg://u:p@db/app").database_url == "postgresql+asyncpg://u:p@db/app"
+
+def test_pool_timeout_returns_service_unavailable():
+    app = FastAPI()
+    app.add_exception_handler(PoolExhaustedError, main.pool_timeout_handler)
+    app.add_exception_handler(HTTPException, main.pool_timeout_http_exception_handler)
+
+    @app.get("/direct")
+    async def direct():
+        raise PoolExhaustedError("exhausted")
+
+    @app.get("/wrapped")
+    async def wrapped():
+        # Mesmo padrão dos routers: a exceção original vira HTTPException 500
+        try:
+            raise PoolExhaustedError("exhausted")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e)) from e
+
+    @app.get("/not-found")
+    async def not_found():
+        raise HTTPException(status_code=404, detail="missing")
+
+    client = TestClient(app)
+
+    for path in ("/direct", "/wrapped"):
+        response = client.get(path)
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+    assert client.get("/not-found").status_code == 404
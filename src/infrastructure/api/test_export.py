@@ -0,0 +1,170 @@
+import asyncio
+import gzip
+import json
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+
+from domain.__seedwork.test_utils import async_iter, async_return
+from domain.order.order_status_enum import OrderStatus
+from infrastructure.api.export import (copy_csv_chunks, cursor_chunks,
+                                       encode_csv, encode_ndjson,
+                                       export_response, gzip_chunks)
+from infrastructure.order.sqlalchemy.order_repository import OrderRepository
+
+
+class FakeSessionFactory:
+    def __init__(self, session):
+        self.session = session
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self.session
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+
+def stream_session(columns, batches):
+    session = MagicMock()
+    result = MagicMock()
+    result.keys.return_value = columns
+    result.mappings.return_value.partitions = async_iter(batches)
+    session.stream = async_return(result)
+    session.bind.dialect.driver = "asyncpg"
+    return session
+
+def copy_session(copy_from_query):
+    session = MagicMock()
+    connection = MagicMock()
+    connection.dialect = asyncpg_dialect()
+    raw_connection = MagicMock()
+    raw_connection.driver_connection.copy_from_query = copy_from_query
+    connection.get_raw_connection = async_return(raw_connection)
+    session.connection = async_return(connection)
+    return session
+
+async def read(chunks) -> bytes:
+    return b"".join([chunk async for chunk in chunks])
+
+def test_encode_ndjson():
+    order_id = uuid4()
+    row = {"id": order_id, "status": OrderStatus.PENDING, "total_price": Decimal("10.50"), "created_at": datetime(2024, 1, 2, 3, 4, 5), "offer_id": None}
+
+    lines = encode_ndjson([row, row]).decode().splitlines()
+
+    assert len(lines) == 2
+    assert json.loads(lines[0]) == {"id": str(order_id), "status": "PENDING", "total_price": "10.50", "created_at": "2024-01-02T03:04:05", "offer_id": None}
+
+def test_encode_csv_matches_copy_output():
+    row = {"id": 1, "status": OrderStatus.PENDING, "name": "a,b", "created_at": datetime(2024, 1, 2, 3, 4, 5), "offer_id": None}
+
+    assert encode_csv([row], columns=list(row)) == b'id,status,name,created_at,offer_id\n1,PENDING,"a,b",2024-01-02 03:04:05,\n'
+
+@pytest.mark.asyncio
+async def test_cursor_chunks_one_chunk_per_batch():
+    session = stream_session(["id", "quantity"], [[{"id": 1, "quantity": 2}, {"id": 2, "quantity": 3}], [{"id": 3, "quantity": 1}]])
+    statement = MagicMock()
+
+    chunks = [chunk async for chunk in cursor_chunks(session, statement, "csv", batch_size=2)]
+
+    assert chunks == [b"id,quantity\n", b"1,2\n2,3\n", b"3,1\n"]
+    statement.execution_options.assert_called_once_with(yield_per=2)
+
+@pytest.mark.asyncio
+async def test_copy_csv_chunks():
+    queries = []
+
+    async def copy_from_query(sql, output, **kwargs):
+        queries.append((sql, kwargs))
+        for chunk in (b"id,status\n", b"1,PENDING\n", b"2,PENDING\n"):
+            await output(chunk)
+
+    session = copy_session(copy_from_query)
+
+    body = await read(copy_csv_chunks(session, OrderRepository.export_query(status=OrderStatus.PENDING), timeout=30))
+
+    assert body == b"id,status\n1,PENDING\n2,PENDING\n"
+    sql, kwargs = queries[0]
+    # Parâmetros renderizados na SQL do COPY
+    assert "tb_orders.status = 'PENDING'" in sql
+    assert kwargs == {"format": "csv", "header": True, "timeout": 30}
+
+@pytest.mark.asyncio
+async def test_copy_csv_chunks_propagates_errors():
+    async def copy_from_query(sql, output, **kwargs):
+        await output(b"id\n")
+        raise RuntimeError("copy failed")
+
+    with pytest.raises(RuntimeError):
+        await read(copy_csv_chunks(copy_session(copy_from_query), OrderRepository.export_query()))
+
+@pytest.mark.asyncio
+async def test_copy_csv_chunks_stops_copy_when_client_leaves():
+    cancelled = asyncio.Event()
+
+    async def copy_from_query(sql, output, **kwargs):
+        try:
+            while True:
+                await output(b"1\n")
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    chunks = copy_csv_chunks(copy_session(copy_from_query), OrderRepository.export_query())
+    assert await chunks.__anext__() == b"1\n"
+    await chunks.aclose()
+
+    assert cancelled.is_set()
+
+@pytest.mark.asyncio
+async def test_gzip_chunks_round_trip():
+    chunks = [b"line %d\n" % number for number in range(1000)]
+
+    compressed = await read(gzip_chunks(async_iter(chunks)(), level=1))
+
+    assert gzip.decompress(compressed) == b"".join(chunks)
+
+@pytest.mark.asyncio
+async def test_export_response_ndjson_without_compression():
+    session = stream_session(["id"], [[{"id": 1}], [{"id": 2}]])
+
+    response = export_response("orders", MagicMock(), export_format="ndjson", session_factory=FakeSessionFactory(session))
+
+    assert response.media_type == "application/x-ndjson"
+    # Marcada como identity para o GZipMiddleware não comprimir de novo
+    assert response.headers["content-encoding"] == "identity"
+    assert response.headers["content-disposition"] == 'attachment; filename="orders.ndjson"'
+    assert await read(response.body_iterator) == b'{"id":1}\n{"id":2}\n'
+
+@pytest.mark.asyncio
+async def test_export_response_csv_uses_copy_with_gzip():
+    async def copy_from_query(sql, output, **kwargs):
+        await output(b"id\n1\n")
+
+    session = copy_session(copy_from_query)
+    session.bind.dialect.driver = "asyncpg"
+
+    response = export_response("payments", OrderRepository.export_query(), export_format="csv", compression="gzip", session_factory=FakeSessionFactory(session))
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(await read(response.body_iterator)) == b"id\n1\n"
+
+def test_export_response_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        export_response("orders", MagicMock(), export_format="xml")
+
+def test_order_export_query_filters():
+    statement = OrderRepository.export_query(status=OrderStatus.CONFIRMED, created_from=datetime(2024, 1, 1), created_to=datetime(2024, 2, 1))
+
+    sql = str(statement)
+    assert "tb_orders.status = :status_1" in sql
+    assert "tb_orders.created_at >= :created_at_1" in sql
+    assert "tb_orders.created_at < :created_at_2" in sql
+    assert "ORDER BY" not in sql
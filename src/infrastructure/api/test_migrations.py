@@ -0,0 +1,168 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from infrastructure.api import migrations
+from infrastructure.api.migrations import (LATEST_VERSION, MIGRATIONS,
+                                           Migration, MigrationError,
+                                           SchemaVersionError,
+                                           add_unique_order_per_cart,
+                                           check_schema_version,
+                                           create_index_concurrently, migrate)
+
+
+class FakeConnection:
+    def __init__(self, scalars=()):
+        self.execute = AsyncMock()
+        self.scalar = AsyncMock(side_effect=list(scalars))
+        self.isolation_level = None
+
+    async def execution_options(self, isolation_level=None):
+        self.isolation_level = isolation_level
+        return self
+
+    def statements(self):
+        return [str(call.args[0]) for call in self.execute.await_args_list]
+
+
+class FakeContext:
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def __aenter__(self):
+        return self.conn
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+
+class FakeEngine:
+    def __init__(self, lock_conn):
+        self.lock_conn = lock_conn
+        self.connections = []
+        self.transactions = []
+        self.dispose = AsyncMock()
+
+    def connect(self):
+        # A primeira conexão é a do advisory lock
+        conn = self.lock_conn if not self.connections else FakeConnection()
+        self.connections.append(conn)
+        return FakeContext(conn)
+
+    def begin(self):
+        conn = FakeConnection()
+        self.transactions.append(conn)
+        return FakeContext(conn)
+
+
+def test_migration_versions_are_unique_and_ordered():
+    versions = [migration.version for migration in MIGRATIONS]
+
+    assert versions == sorted(set(versions))
+    assert LATEST_VERSION == versions[-1]
+
+@pytest.mark.asyncio
+async def test_initial_schema_is_pinned_to_the_baseline_tables():
+    conn = FakeConnection()
+
+    await MIGRATIONS[0].upgrade(conn)
+
+    ddl = "\n".join(conn.statements())
+    for table in ("tb_users", "tb_products", "tb_offers", "tb_carts", "tb_cart_items", "tb_orders", "tb_payments"):
+        assert f"CREATE TABLE IF NOT EXISTS {table} (" in ddl
+    # Índices e restrições posteriores vêm apenas das suas migrações
+    for name in ("uq_cart_items_cart_product", "uq_orders_cart_id", "ix_orders_user_created_at", "ix_payments_order_id", "ix_users_email"):
+        assert name not in ddl
+
+@pytest.mark.asyncio
+async def test_migrate_applies_only_pending_migrations_under_lock():
+    lock_conn = FakeConnection(scalars=[True, 1])
+    engine = FakeEngine(lock_conn)
+    calls = []
+
+    def record(name):
+        async def upgrade(conn):
+            calls.append((name, conn))
+        return upgrade
+
+    known = [
+        Migration(1, "applied", record("first")),
+        Migration(3, "concurrent", record("third"), transactional=False),
+        Migration(2, "transactional", record("second")),
+    ]
+
+    applied = await migrate(engine, known)
+
+    assert applied == [2, 3]
+    assert [name for name, _ in calls] == ["second", "third"]
+    # Migração transacional na transação, com lock_timeout local
+    transaction = engine.transactions[0]
+    assert calls[0][1] is transaction
+    assert "SET LOCAL lock_timeout" in transaction.statements()[0]
+    assert transaction.execute.await_args_list[-1].args[1] == {"version": 2, "description": "transactional"}
+    # Migração não transacional em autocommit (CREATE INDEX CONCURRENTLY)
+    concurrent = engine.connections[1]
+    assert calls[1][1] is concurrent
+    assert concurrent.isolation_level == "AUTOCOMMIT"
+    statements = lock_conn.statements()
+    assert "pg_advisory_lock" in statements[0]
+    assert "pg_advisory_unlock" in statements[-1]
+    engine.dispose.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_migrate_releases_lock_on_failure():
+    lock_conn = FakeConnection(scalars=[False])
+    engine = FakeEngine(lock_conn)
+
+    async def fail(conn):
+        raise MigrationError("boom")
+
+    with pytest.raises(MigrationError):
+        await migrate(engine, [Migration(1, "fails", fail)])
+
+    assert "pg_advisory_unlock" in lock_conn.statements()[-1]
+
+@pytest.mark.asyncio
+async def test_check_schema_version(monkeypatch):
+    warning = MagicMock()
+    monkeypatch.setattr(migrations.logger, "warning", warning)
+
+    with pytest.raises(SchemaVersionError):
+        await check_schema_version(FakeEngine(FakeConnection(scalars=[False])), strict=True)
+
+    assert await check_schema_version(FakeEngine(FakeConnection(scalars=[True, LATEST_VERSION - 1])), strict=False) == LATEST_VERSION - 1
+    warning.assert_called_once()
+    # Banco já migrado por uma versão mais nova da aplicação
+    assert await check_schema_version(FakeEngine(FakeConnection(scalars=[True, LATEST_VERSION + 1])), strict=True) == LATEST_VERSION + 1
+
+@pytest.mark.asyncio
+async def test_create_index_concurrently_replaces_invalid_index():
+    conn = FakeConnection(scalars=[True])
+
+    await create_index_concurrently(conn, "ix_users_email", "tb_users", "email")
+
+    statements = conn.statements()
+    assert statements == [
+        "DROP INDEX CONCURRENTLY IF EXISTS ix_users_email",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_email ON tb_users (email)",
+    ]
+
+@pytest.mark.asyncio
+async def test_unique_order_per_cart_refuses_duplicates():
+    conn = FakeConnection(scalars=[False, 3])
+
+    with pytest.raises(MigrationError, match="3 carts have more than one order"):
+        await add_unique_order_per_cart(conn)
+
+    conn.execute.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_unique_order_per_cart_promotes_concurrent_index():
+    conn = FakeConnection(scalars=[False, 0, None])
+
+    await add_unique_order_per_cart(conn)
+
+    assert conn.statements() == [
+        "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_orders_cart_id ON tb_orders (cart_id)",
+        "ALTER TABLE tb_orders ADD CONSTRAINT uq_orders_cart_id UNIQUE USING INDEX uq_orders_cart_id",
+    ]
@@ -0,0 +1,61 @@
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from infrastructure.api.pagination import (InvalidCursorError, build_id_page,
+                                           build_page, decode_cursor,
+                                           decode_id_cursor, encode_cursor,
+                                           encode_id_cursor)
+from infrastructure.product.sqlalchemy.product_model import ProductModel
+from infrastructure.user.sqlalchemy.user_model import UserModel
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 17, 13, 45, 12, 123456)
+    order_id = uuid4()
+
+    cursor = encode_cursor(created_at, order_id)
+
+    assert decode_cursor(cursor) == (created_at, order_id)
+    # Cursor opaco e seguro para URLs
+    assert str(order_id) not in cursor
+    assert not set(cursor) & set("+/=")
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_cursor(datetime(2024, 1, 1), "not-an-uuid")])
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+def test_build_page_without_next_page():
+    rows = [SimpleNamespace(created_at=datetime(2024, 1, 1), id=uuid4()) for _ in range(2)]
+
+    assert build_page(rows, page_size=2) == (rows, None)
+
+def test_build_page_with_next_page():
+    rows = [SimpleNamespace(created_at=datetime(2024, 1, day), id=uuid4()) for day in (3, 2, 1)]
+
+    page, next_cursor = build_page(rows, page_size=2)
+
+    assert page == rows[:2]
+    assert decode_cursor(next_cursor) == (rows[1].created_at, rows[1].id)
+
+def test_id_cursor_round_trip():
+    user_id = uuid4()
+
+    assert decode_id_cursor(encode_id_cursor(user_id), UserModel.id) == user_id
+    assert decode_id_cursor(encode_id_cursor(42), ProductModel.id) == 42
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_id_cursor("abc"), encode_cursor(datetime(2024, 1, 1), 1)])
+def test_invalid_id_cursor(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_id_cursor(cursor, ProductModel.id)
+
+def test_build_id_page_with_next_page():
+    rows = [SimpleNamespace(id=id) for id in (1, 2, 3)]
+
+    page, next_cursor = build_id_page(rows, page_size=2)
+
+    assert page == rows[:2]
+    assert decode_id_cursor(next_cursor, ProductModel.id) == 2
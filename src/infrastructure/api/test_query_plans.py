@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Iterator, List
+from uuid import UUID
+
+import pytest
+from sqlalchemy import Select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlalchemy.sql.dml import UpdateBase
+
+from domain.order.order_status_enum import OrderStatus
+from infrastructure.api.database import Base
+from infrastructure.api.pagination import Explain, encode_id_cursor
+from infrastructure.cart.sqlalchemy.cart_repository import CartRepository
+from infrastructure.cart_item.sqlalchemy.cart_item_repository import \
+    CartItemRepository
+from infrastructure.offer.sqlalchemy.offer_model import OfferModel  # noqa: F401 (FK de tb_orders)
+from infrastructure.order.sqlalchemy.order_repository import OrderRepository
+from infrastructure.payment.sqlalchemy.payment_repository import \
+    PaymentRepository
+from infrastructure.user.sqlalchemy.user_repository import UserRepository
+
+# Verifica os planos das consultas dos repositórios em um Postgres local populado.
+# Sem banco disponível (QUERY_PLAN_DATABASE_URL ou CONNECTION) os testes são ignorados.
+PLAN_SCHEMA = "query_plans"
+USERS = 20000
+CARTS = 50000
+ORDERS = 50000
+CART_ITEMS = 100000
+PRODUCTS = 200
+
+# Tabelas grandes em produção: uma leitura sequencial nelas é uma regressão
+LARGE_TABLES = {"tb_users", "tb_carts", "tb_cart_items", "tb_orders", "tb_payments"}
+
+SEED_STATEMENTS = (
+    f"""INSERT INTO tb_users (id, name, email, age, gender, phone_number, password)
+        SELECT md5('user' || i)::uuid, 'User ' || i, 'user' || i || '@example.com', 18 + i % 60,
+               CASE WHEN i % 2 = 0 THEN 'male' ELSE 'female' END, '5511' || i, 'password'
+        FROM generate_series(1, {USERS}) AS i""",
+    f"""INSERT INTO tb_products (id, name, price, category)
+        SELECT i, 'Product ' || i, 10 + i % 30, 'BURGER' FROM generate_series(1, {PRODUCTS}) AS i""",
+    f"""INSERT INTO tb_carts (id, user_id, total_price)
+        SELECT md5('cart' || i)::uuid, md5('user' || (1 + i % {USERS}))::uuid, 0
+        FROM generate_series(1, {CARTS}) AS i""",
+    f"""INSERT INTO tb_cart_items (id, cart_id, product_id, quantity)
+        SELECT md5('item' || i)::uuid, md5('cart' || (1 + i % {CARTS}))::uuid, 1 + i / {CARTS}, 1
+        FROM generate_series(0, {CART_ITEMS} - 1) AS i""",
+    f"""INSERT INTO tb_orders (id, user_id, cart_id, offer_id, type, total_price, status, created_at, updated_at)
+        SELECT md5('order' || i)::uuid, md5('user' || (1 + i % {USERS}))::uuid, md5('cart' || i)::uuid, NULL,
+               'delivery', 10, (ARRAY['PENDING', 'CONFIRMED', 'CANCELLED'])[1 + i % 3],
+               timestamp '2024-01-01' + i * interval '1 minute', timestamp '2024-01-01' + i * interval '1 minute'
+        FROM generate_series(1, {ORDERS}) AS i""",
+    f"""INSERT INTO tb_payments (id, user_id, order_id, payment_method, payment_card_gateway, status)
+        SELECT md5('payment' || i)::uuid, md5('user' || (1 + i % {USERS}))::uuid, md5('order' || i)::uuid,
+               'card', NULL, 'PENDING'
+        FROM generate_series(1, {ORDERS}) AS i""",
+    "ANALYZE",
+)
+
+_seeded = False
+
+
+def seeded_id(kind: str, number: int) -> UUID:
+    return UUID(hashlib.md5(f"{kind}{number}".encode()).hexdigest())
+
+
+def database_url() -> str:
+    url = os.getenv("QUERY_PLAN_DATABASE_URL") or os.getenv("CONNECTION", "")
+    return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+
+def seq_scans(plan: Dict[str, Any]) -> Iterator[str]:
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in LARGE_TABLES:
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", ()):
+        yield from seq_scans(child)
+
+
+class ExplainingSession:
+    """Repassa as chamadas para a sessão, executando antes um EXPLAIN de cada consulta."""
+
+    def __init__(self, session: AsyncSession):
+        self._session = session
+        self.plans: List[Dict[str, Any]] = []
+
+    async def _explain(self, statement, params=None) -> None:
+        if isinstance(statement, Select):
+            # As consultas fixas dos repositórios recebem os valores por bindparam
+            result = await self._session.execute(Explain(statement), params)
+        elif isinstance(statement, UpdateBase):
+            # Explain só compila consultas; UPDATE e DELETE vão com os parâmetros na SQL
+            connection = await self._session.connection()
+            sql = statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+            result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")
+        else:
+            return
+        plan = result.scalar()
+        self.plans.append(json.loads(plan) if isinstance(plan, str) else plan)
+
+    async def execute(self, statement, *args, **kwargs):
+        await self._explain(statement, args[0] if args else None)
+        return await self._session.execute(statement, *args, **kwargs)
+
+    async def stream_scalars(self, statement, *args, **kwargs):
+        await self._explain(statement)
+        return await self._session.stream_scalars(statement, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+
+@asynccontextmanager
+async def plan_session():
+    global _seeded
+    engine = create_async_engine(
+        database_url(),
+        poolclass=NullPool,
+        connect_args={"server_settings": {"search_path": PLAN_SCHEMA}, "timeout": 5},
+    )
+    try:
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        except Exception as e:
+            pytest.skip(f"Postgres indisponível para os testes de plano: {e}")
+
+        if not _seeded:
+            async with engine.begin() as conn:
+                # Recria o esquema a cada execução: os índices acompanham os modelos
+                await conn.execute(text(f"DROP SCHEMA IF EXISTS {PLAN_SCHEMA} CASCADE"))
+                await conn.execute(text(f"CREATE SCHEMA {PLAN_SCHEMA}"))
+                await conn.run_sync(Base.metadata.create_all)
+                for statement in SEED_STATEMENTS:
+                    await conn.execute(text(statement))
+            _seeded = True
+
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield ExplainingSession(session)
+            # Consultas com escrita (como update_cart_total) são desfeitas
+            await session.rollback()
+    finally:
+        await engine.dispose()
+
+
+QUERIES = {
+    "find_user": lambda s: UserRepository(s).find_user(user_id=seeded_id("user", 10)),
+    "find_user_by_email": lambda s: UserRepository(s).find_user_by_email("user10@example.com"),
+    "list_users": lambda s: UserRepository(s).list_users(cursor=encode_id_cursor(seeded_id("user", 10))),
+    "find_order": lambda s: OrderRepository(s).find_order(order_id=seeded_id("order", 10), user_id=seeded_id("user", 11)),
+    "find_order_by_cart_id": lambda s: OrderRepository(s).find_order_by_cart_id(cart_id=seeded_id("cart", 10)),
+    "list_orders": lambda s: OrderRepository(s).list_orders(user_id=seeded_id("user", 11)),
+    "list_all_orders": lambda s: OrderRepository(s).list_all_orders(),
+    "list_all_orders_by_status": lambda s: OrderRepository(s).list_all_orders(status=OrderStatus.PENDING),
+    "find_payment": lambda s: PaymentRepository(s).find_payment(payment_id=seeded_id("payment", 10)),
+    "find_payment_by_order_id": lambda s: PaymentRepository(s).find_payment_by_order_id(order_id=seeded_id("order", 10)),
+    "list_payments": lambda s: PaymentRepository(s).list_payments(user_id=seeded_id("user", 11)),
+    "list_all_payments": lambda s: PaymentRepository(s).list_all_payments(),
+    "find_cart": lambda s: CartRepository(s).find_cart(cart_id=seeded_id("cart", 10), user_id=seeded_id("user", 11)),
+    "list_carts": lambda s: CartRepository(s).list_carts(user_id=seeded_id("user", 11)),
+    "update_cart_total": lambda s: CartRepository(s).update_cart_total(cart_id=seeded_id("cart", 10)),
+    "find_item": lambda s: CartItemRepository(s).find_item(item_id=seeded_id("item", 10)),
+    "find_items_by_cart_id": lambda s: CartItemRepository(s).find_items_by_cart_id(cart_id=seeded_id("cart", 10)),
+    "list_items_by_user": lambda s: CartItemRepository(s).list_items_by_user(user_id=seeded_id("user", 11)),
+    "list_items": lambda s: CartItemRepository(s).list_items(),
+}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", sorted(QUERIES))
+async def test_repository_query_does_not_scan_large_tables(name):
+    async with plan_session() as session:
+        await QUERIES[name](session)
+
+    assert session.plans, f"{name} não executou nenhuma consulta"
+    for plan in session.plans:
+        scanned = list(seq_scans(plan[0]["Plan"]))
+        assert not scanned, f"{name} lê sequencialmente {scanned}:\n{json.dumps(plan, indent=2)}"
+
+
+def test_seq_scans_walks_nested_plans():
+    plan = {
+        "Node Type": "Limit",
+        "Plans": [
+            {"Node Type": "Nested Loop", "Plans": [
+                {"Node Type": "Seq Scan", "Relation Name": "tb_products"},
+                {"Node Type": "Seq Scan", "Relation Name": "tb_orders"},
+                {"Node Type": "Index Scan", "Relation Name": "tb_users"},
+            ]},
+        ],
+    }
+
+    assert list(seq_scans(plan)) == ["tb_orders"]
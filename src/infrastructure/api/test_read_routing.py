@@ -0,0 +1,142 @@
+import os
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from infrastructure.api import cache, read_routing, shared_cache
+from infrastructure.api.cache import AsyncLRUCache
+from infrastructure.api.config import Settings
+from infrastructure.api.database import (ReadSessionLocal, SessionLocal,
+                                         create_engine_from_settings)
+from infrastructure.api.read_routing import (READ_YOUR_WRITES_CHANNEL,
+                                             RecentWrites, get_read_session,
+                                             get_read_session_factory,
+                                             has_recent_write,
+                                             mark_recent_write,
+                                             request_user_id)
+
+USER_ID = "3f2b7c1e-8a4d-4c55-9b1e-2d6f0a7c9e10"
+
+
+def make_request(headers=None, path_params=None):
+    request = MagicMock()
+    request.headers = headers or {}
+    request.path_params = path_params or {}
+    return request
+
+
+@pytest.fixture
+def replica_configured(monkeypatch):
+    monkeypatch.setattr(read_routing, "READ_YOUR_WRITES_WINDOW", 5)
+
+@pytest.fixture(autouse=True)
+def recent_writes(monkeypatch):
+    marks = RecentWrites()
+    monkeypatch.setattr(read_routing, "recent_writes", marks)
+    return marks
+
+def test_request_user_id_from_header_or_path():
+    assert request_user_id(make_request(headers={"user-id": USER_ID.upper()})) == USER_ID
+    assert request_user_id(make_request(path_params={"user_id": USER_ID})) == USER_ID
+    assert request_user_id(make_request(headers={"user-id": "not-a-uuid"})) is None
+    assert request_user_id(make_request()) is None
+    assert request_user_id(None) is None
+
+@pytest.mark.asyncio
+async def test_reads_go_to_the_replica_by_default(replica_configured):
+    assert await get_read_session_factory(make_request(headers={"user-id": USER_ID})) is ReadSessionLocal
+
+@pytest.mark.asyncio
+async def test_reads_after_a_write_go_to_the_primary(replica_configured):
+    await mark_recent_write(USER_ID)
+
+    assert await has_recent_write(USER_ID)
+    assert await get_read_session_factory(make_request(headers={"user-id": USER_ID})) is SessionLocal
+    # Outros usuários continuam na réplica
+    other = "0c9d4b7e-1f2a-4e3b-8c5d-6a7b8c9d0e1f"
+    assert await get_read_session_factory(make_request(headers={"user-id": other})) is ReadSessionLocal
+
+@pytest.mark.asyncio
+async def test_marks_survive_cache_eviction_and_clear(replica_configured, monkeypatch):
+    small_cache = AsyncLRUCache(max_size=10)
+    monkeypatch.setattr(cache, "_cache", small_cache)
+
+    await mark_recent_write(USER_ID)
+    for number in range(100):
+        await small_cache.set(f"product:find_product:product_id={number}", {"id": number})
+    await small_cache.clear()
+
+    assert await has_recent_write(USER_ID)
+
+def test_marks_expire_after_the_window():
+    now = [1000.0]
+    marks = RecentWrites(clock=lambda: now[0])
+
+    marks.mark(USER_ID, until=1005.0)
+    # Um aviso mais antigo de outro worker não encurta o prazo
+    marks.receive((USER_ID, 1002.0))
+    now[0] = 1004.0
+    assert marks.is_marked(USER_ID)
+
+    now[0] = 1006.0
+    assert not marks.is_marked(USER_ID)
+    assert len(marks) == 0
+
+@pytest.mark.asyncio
+async def test_marks_are_sent_to_the_other_workers(replica_configured, monkeypatch):
+    notify = MagicMock()
+    monkeypatch.setattr(read_routing, "notify_workers", notify)
+
+    await mark_recent_write(USER_ID)
+
+    channel, (user_id, until) = notify.call_args.args
+    assert (channel, user_id) == (READ_YOUR_WRITES_CHANNEL, USER_ID)
+    # Aviso recebido de outro worker
+    other = "0c9d4b7e-1f2a-4e3b-8c5d-6a7b8c9d0e1f"
+    for callback in shared_cache._subscribers[READ_YOUR_WRITES_CHANNEL]:
+        callback((other, until))
+    assert await has_recent_write(other)
+
+@pytest.mark.asyncio
+async def test_without_replica_nothing_is_marked(monkeypatch):
+    monkeypatch.setattr(read_routing, "READ_YOUR_WRITES_WINDOW", 0)
+
+    await mark_recent_write(USER_ID)
+
+    assert not await has_recent_write(USER_ID)
+    assert await get_read_session_factory(make_request(headers={"user-id": USER_ID})) is ReadSessionLocal
+
+@pytest.mark.asyncio
+async def test_get_read_session_closes_the_session():
+    session = MagicMock()
+    factory = MagicMock()
+    factory.return_value.__aenter__.return_value = session
+
+    dependency = get_read_session(session_factory=factory)
+
+    assert await dependency.__anext__() is session
+    with pytest.raises(StopAsyncIteration):
+        await dependency.__anext__()
+    factory.return_value.__aexit__.assert_awaited_once()
+
+def test_read_sessions_are_read_only():
+    assert ReadSessionLocal.kw["bind"].get_execution_options()["postgresql_readonly"] is True
+
+@pytest.mark.asyncio
+async def test_replica_stand_in_rejects_writes():
+    # Segundo Postgres local fazendo o papel de réplica (serviço `postgres-replica` do docker-compose)
+    replica_url = os.getenv("REPLICA_TEST_DATABASE_URL")
+    if not replica_url:
+        pytest.skip("REPLICA_TEST_DATABASE_URL não configurada")
+    config = Settings(CONNECTION=os.getenv("CONNECTION"), REPLICA_CONNECTION=replica_url, WORKERS_COUNT=1)
+    replica = create_engine_from_settings(config, config.replica_database_url, pool_name="replica")
+    try:
+        async with AsyncSession(replica.execution_options(postgresql_readonly=True)) as session:
+            assert await session.scalar(text("SHOW transaction_read_only")) == "on"
+            with pytest.raises(DBAPIError, match="read-only transaction"):
+                await session.execute(text("CREATE TEMP TABLE read_routing_probe (id int)"))
+    finally:
+        await replica.dispose()
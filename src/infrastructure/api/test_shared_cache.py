@@ -0,0 +1,217 @@
+import asyncio
+import tempfile
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import pytest
+
+from infrastructure.api import cache
+from infrastructure.api.cache import AsyncLRUCache, async_cached
+from infrastructure.api import shared_cache as shared
+from infrastructure.api.shared_cache import (SharedCacheClient,
+                                             SharedCacheServer, TieredCache,
+                                             notify_workers, subscribe)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingRepository:
+    def __init__(self):
+        self.calls = 0
+
+    @async_cached(ttl=60, prefix='product', tags=('product:{product_id}',))
+    async def find_product(self, product_id: int):
+        self.calls += 1
+        return {"id": product_id}
+
+
+async def wait_until(condition, timeout=1.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        if loop.time() > deadline:
+            raise AssertionError("condição não atingida")
+        await asyncio.sleep(0.005)
+
+
+async def flush(worker: TieredCache):
+    # A resposta de uma leitura garante que as mensagens anteriores foram processadas
+    await worker.client.get("flush")
+
+
+@asynccontextmanager
+async def shared_cache(workers=2, server_clock=None):
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "cache.sock")
+        server = SharedCacheServer(path, store=AsyncLRUCache(clock=server_clock) if server_clock else None)
+        await server.start()
+        tiers = [TieredCache(AsyncLRUCache(), SharedCacheClient(path, timeout=1.0)) for _ in range(workers)]
+        for tier in tiers:
+            assert await tier.client.connect()
+        try:
+            yield server, tiers
+        finally:
+            for tier in tiers:
+                await tier.client.close()
+            await server.close()
+
+
+@pytest.mark.asyncio
+async def test_lookup_falls_back_to_shared_tier():
+    async with shared_cache() as (_, (worker_a, worker_b)):
+        await worker_a.set("product:find_product:product_id=1", {"id": 1}, ttl=60, tags=("product:1",))
+        await flush(worker_a)
+
+        entry = await worker_b.lookup("product:find_product:product_id=1")
+
+        assert entry.value == {"id": 1}
+        assert entry.tags == ("product:1",)
+        # O item foi copiado para o L1 do worker
+        assert "product:find_product:product_id=1" in worker_b.local
+
+
+@pytest.mark.asyncio
+async def test_lookup_miss_in_both_tiers():
+    async with shared_cache() as (_, (worker_a, _)):
+        assert await worker_a.lookup("product:find_product:product_id=404") is None
+        assert await worker_a.get("product:find_product:product_id=404") is None
+
+
+@pytest.mark.asyncio
+async def test_invalidations_are_broadcast_to_other_workers():
+    async with shared_cache(workers=3) as (server, (worker_a, worker_b, worker_c)):
+        for worker in (worker_a, worker_b, worker_c):
+            await worker.set("product:find_product:product_id=1", {"id": 1}, tags=("product:1",))
+            await worker.set("order:find_order:order_id=1", {"id": 1})
+            await flush(worker)
+
+        await worker_a.invalidate_tags("product:1")
+        await wait_until(lambda: "product:find_product:product_id=1" not in worker_b.local)
+        await wait_until(lambda: "product:find_product:product_id=1" not in worker_c.local)
+        assert "product:find_product:product_id=1" not in worker_a.local
+        assert "product:find_product:product_id=1" not in server.store
+
+        await worker_b.invalidate_prefix("order")
+        await wait_until(lambda: "order:find_order:order_id=1" not in worker_a.local)
+        await wait_until(lambda: "order:find_order:order_id=1" not in worker_c.local)
+
+
+@pytest.mark.asyncio
+async def test_clear_is_broadcast_to_other_workers():
+    async with shared_cache() as (server, (worker_a, worker_b)):
+        await worker_b.set("product:find_product:product_id=1", {"id": 1})
+        await flush(worker_b)
+
+        await worker_a.clear()
+
+        await wait_until(lambda: len(worker_b.local) == 0)
+        assert len(server.store) == 0
+
+
+@pytest.mark.asyncio
+async def test_notifications_are_relayed_to_other_workers(monkeypatch):
+    monkeypatch.setattr(shared, "_subscribers", {})
+    received = []
+    subscribe("test_channel", received.append)
+
+    async with shared_cache() as (server, (worker_a, _)):
+        monkeypatch.setattr(cache, "_cache", worker_a)
+        notify_workers("test_channel", ("user", 1.0))
+
+        # Entregue apenas aos outros workers, sem ocupar o cache
+        await wait_until(lambda: received == [("user", 1.0)])
+        assert len(server.store) == 0
+
+    # Sem o cache compartilhado o aviso é descartado
+    monkeypatch.setattr(cache, "_cache", AsyncLRUCache())
+    notify_workers("test_channel", ("user", 2.0))
+    assert received == [("user", 1.0)]
+
+
+@pytest.mark.asyncio
+async def test_stale_shared_entry_does_not_replace_local_entry():
+    clock = FakeClock()
+    async with shared_cache(server_clock=clock) as (_, (worker_a, worker_b)):
+        worker_b.local = AsyncLRUCache(clock=clock)
+        await worker_a.set("product:list_products", ["a"], ttl=10, hard_ttl=60)
+        await worker_b.local.set("product:list_products", ["a"], ttl=10, hard_ttl=60)
+        await flush(worker_a)
+        clock.now += 20
+        stale_entry = worker_b.get_entry("product:list_products")
+
+        # O registro local é mantido para não descartar a recarga em andamento
+        assert await worker_b.lookup("product:list_products") is stale_entry
+
+
+@pytest.mark.asyncio
+async def test_fresh_shared_entry_replaces_stale_local_entry():
+    clock = FakeClock()
+    async with shared_cache() as (_, (worker_a, worker_b)):
+        worker_b.local = AsyncLRUCache(clock=clock)
+        await worker_b.local.set("product:list_products", ["old"], ttl=10, hard_ttl=60)
+        clock.now += 20
+        await worker_a.set("product:list_products", ["new"], ttl=10, hard_ttl=60)
+        await flush(worker_a)
+
+        entry = await worker_b.lookup("product:list_products")
+
+        assert entry.value == ["new"]
+        assert worker_b.is_fresh(entry)
+
+
+@pytest.mark.asyncio
+async def test_async_cached_reuses_loads_from_other_workers(monkeypatch):
+    async with shared_cache() as (_, (worker_a, worker_b)):
+        repository = CountingRepository()
+
+        monkeypatch.setattr(cache, "_cache", worker_a)
+        assert await repository.find_product(1) == {"id": 1}
+        await flush(worker_a)
+
+        monkeypatch.setattr(cache, "_cache", worker_b)
+        assert await repository.find_product(1) == {"id": 1}
+
+        assert repository.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_unserializable_values_stay_local():
+    async with shared_cache() as (server, (worker_a, _)):
+        await worker_a.set("product:callback", lambda: None)
+        await flush(worker_a)
+
+        assert "product:callback" in worker_a.local
+        assert "product:callback" not in server.store
+
+
+@pytest.mark.asyncio
+async def test_unavailable_server_falls_back_to_local_cache():
+    with tempfile.TemporaryDirectory() as directory:
+        client = SharedCacheClient(str(Path(directory) / "missing.sock"), retry_interval=60)
+        worker = TieredCache(AsyncLRUCache(), client)
+
+        assert not await client.connect()
+        await worker.set("product:find_product:product_id=1", {"id": 1})
+        await worker.invalidate_tags("product:1")
+
+        assert await worker.get("product:find_product:product_id=1") == {"id": 1}
+        assert await worker.lookup("product:find_product:product_id=2") is None
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_connection_loss_clears_local_tier():
+    async with shared_cache(workers=1) as (server, (worker,)):
+        await worker.set("product:find_product:product_id=1", {"id": 1})
+        await flush(worker)
+
+        await server.close()
+
+        await wait_until(lambda: not worker.client.connected)
+        assert len(worker.local) == 0
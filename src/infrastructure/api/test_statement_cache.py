@@ -0,0 +1,119 @@
+import os
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from asyncpg.exceptions import (InvalidCachedStatementError,
+                                InvalidSQLStatementNameError,
+                                UniqueViolationError)
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from infrastructure.api import database
+from infrastructure.api.config import Settings
+from infrastructure.api.statement_cache import (STATEMENT_CACHE_MODES,
+                                                benchmark_mode, format_report,
+                                                instrument_statement_cache,
+                                                statement_cache_args,
+                                                summarize,
+                                                unique_statement_name)
+
+
+def dbapi_error(cause):
+    error = Exception(str(cause))
+    error.__cause__ = cause
+    return error
+
+
+def test_statement_cache_args_per_mode():
+    assert statement_cache_args("prepared", 50) == {"statement_cache_size": 50, "prepared_statement_cache_size": 50}
+
+    pgbouncer = statement_cache_args("pgbouncer", 50)
+    assert pgbouncer["statement_cache_size"] == 0
+    assert pgbouncer["prepared_statement_cache_size"] == 50
+    assert pgbouncer["prepared_statement_name_func"] is unique_statement_name
+
+    disabled = statement_cache_args("disabled", 50)
+    assert disabled["statement_cache_size"] == disabled["prepared_statement_cache_size"] == 0
+
+    with pytest.raises(ValueError, match="Unknown statement cache mode 'session'"):
+        statement_cache_args("session", 50)
+
+def test_unique_statement_names_do_not_repeat():
+    names = {unique_statement_name() for _ in range(100)}
+
+    assert len(names) == 100
+    assert all(name.startswith("__asyncpg_") for name in names)
+
+def test_engine_uses_configured_statement_cache_mode(monkeypatch):
+    create_async_engine_mock = MagicMock()
+    monkeypatch.setattr(database, "create_async_engine", create_async_engine_mock)
+    monkeypatch.setattr(database, "instrument_pool", MagicMock())
+    monkeypatch.setattr(database, "instrument_statement_cache", MagicMock())
+
+    database.create_engine_from_settings(Settings(CONNECTION="postgresql://u:p@db/app", DB_STATEMENT_CACHE_MODE="pgbouncer", DB_STATEMENT_CACHE_SIZE=20))
+
+    connect_args = create_async_engine_mock.call_args.kwargs["connect_args"]
+    assert connect_args["statement_cache_size"] == 0
+    assert connect_args["prepared_statement_cache_size"] == 20
+    assert connect_args["prepared_statement_name_func"] is unique_statement_name
+    database.instrument_statement_cache.assert_called_once_with(create_async_engine_mock.return_value)
+
+@pytest.mark.parametrize("cause", [
+    InvalidCachedStatementError("cached plan must not change result type"),
+    InvalidSQLStatementNameError('prepared statement "__asyncpg_stmt_1__" does not exist'),
+])
+def test_stale_statements_invalidate_every_connection(cause):
+    engine = create_async_engine("postgresql+asyncpg://u:p@localhost/db")
+    instrument_statement_cache(engine)
+    dialect = engine.sync_engine.dialect
+    before = dialect._invalidate_schema_cache_asof
+
+    dialect.dispatch.handle_error(MagicMock(original_exception=dbapi_error(cause)))
+
+    assert dialect._invalidate_schema_cache_asof > before
+
+def test_other_errors_keep_the_statement_cache():
+    engine = create_async_engine("postgresql+asyncpg://u:p@localhost/db")
+    instrument_statement_cache(engine)
+    dialect = engine.sync_engine.dialect
+    before = dialect._invalidate_schema_cache_asof
+
+    dialect.dispatch.handle_error(MagicMock(original_exception=dbapi_error(UniqueViolationError("duplicate"))))
+
+    assert dialect._invalidate_schema_cache_asof == before
+
+def test_summarize_and_report():
+    stats = summarize([float(value) for value in range(1, 101)])
+
+    assert stats == {"mean": 50.5, "p50": 51.0, "p95": 96.0}
+
+    report = format_report({
+        "prepared": {"find_user": {"mean": 0.5, "p50": 0.5, "p95": 0.7}},
+        "disabled": {"find_user": {"mean": 1.0, "p50": 1.0, "p95": 1.2}},
+    })
+    assert "vs disabled" in report
+    assert "2.00x" in report
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", STATEMENT_CACHE_MODES)
+async def test_benchmark_runs_against_postgres(mode):
+    url = (os.getenv("QUERY_PLAN_DATABASE_URL") or os.getenv("CONNECTION", "")).replace("postgresql://", "postgresql+asyncpg://", 1)
+    probe = create_async_engine(url, poolclass=NullPool, connect_args={"timeout": 5})
+    try:
+        async with probe.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except Exception as e:
+        pytest.skip(f"Postgres indisponível para o benchmark: {e}")
+    finally:
+        await probe.dispose()
+
+    query = AsyncMock()
+    async def select_one(session):
+        await query()
+        await session.execute(text("SELECT 1"))
+
+    results = await benchmark_mode(url, mode, iterations=5, queries={"select_one": select_one})
+
+    assert query.await_count == 6
+    assert set(results["select_one"]) == {"mean", "p50", "p95"}
@@ -0,0 +1,81 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from pydantic import BaseModel
+
+from domain.__seedwork.test_utils import async_iter, async_return
+from infrastructure.api.streaming import json_array_response, stream_scalars
+
+
+class ItemDto(BaseModel):
+    id: int
+    name: str
+
+
+class FakeSessionFactory:
+    def __init__(self):
+        self.session = MagicMock()
+        self.closed = False
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self.session
+
+    async def __aexit__(self, *exc_info):
+        self.closed = True
+
+
+async def read_body(response) -> str:
+    return "".join([chunk async for chunk in response.body_iterator])
+
+@pytest.mark.asyncio
+async def test_stream_scalars_uses_yield_per():
+    session = MagicMock()
+    session.stream_scalars = async_return(async_iter(["a", "b"])())
+
+    statement = MagicMock()
+
+    rows = [row async for row in stream_scalars(session, statement, batch_size=50)]
+
+    assert rows == ["a", "b"]
+    statement.execution_options.assert_called_once_with(yield_per=50)
+    session.stream_scalars.assert_awaited_once_with(statement.execution_options.return_value)
+
+@pytest.mark.asyncio
+async def test_json_array_response_in_batches():
+    session_factory = FakeSessionFactory()
+    items = [ItemDto(id=id, name=f"item {id}") for id in range(5)]
+    produce = MagicMock(side_effect=lambda session: async_iter(items)())
+
+    response = json_array_response("items", produce, session_factory=session_factory, batch_size=2)
+    chunks = [chunk async for chunk in response.body_iterator]
+
+    assert response.media_type == "application/json"
+    assert json.loads("".join(chunks)) == {"items": [item.dict() for item in items]}
+    # Abertura, dois lotes de 2 itens e o último item com o fechamento
+    assert len(chunks) == 4
+    produce.assert_called_once_with(session_factory.session)
+    assert session_factory.closed
+
+@pytest.mark.asyncio
+async def test_json_array_response_empty():
+    response = json_array_response("items", lambda session: async_iter([])(), session_factory=FakeSessionFactory())
+
+    assert json.loads(await read_body(response)) == {"items": []}
+
+@pytest.mark.asyncio
+async def test_json_array_response_failure_closes_session():
+    session_factory = FakeSessionFactory()
+
+    async def produce(session):
+        yield ItemDto(id=1, name="item 1")
+        raise RuntimeError("connection lost")
+
+    response = json_array_response("items", produce, session_factory=session_factory)
+
+    with pytest.raises(RuntimeError):
+        await read_body(response)
+    assert session_factory.closed
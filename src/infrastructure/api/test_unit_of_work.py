@@ -0,0 +1,129 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from infrastructure.api import cache, read_routing, unit_of_work
+from infrastructure.api.cache import (AsyncLRUCache, invalidate_cache,
+                                      invalidate_prefix)
+from infrastructure.api.unit_of_work import AsyncUnitOfWork, get_uow_session
+
+
+class ProductWriter:
+    @invalidate_cache(key_prefix='product', tags=('product:{product_id}',))
+    async def update_product(self, product_id: int):
+        return None
+
+
+@pytest.fixture
+def session():
+    mock = MagicMock()
+    mock.commit = AsyncMock()
+    mock.rollback = AsyncMock()
+    mock.close = AsyncMock()
+    return mock
+
+@pytest.fixture(autouse=True)
+def session_factory(session):
+    with patch('infrastructure.api.unit_of_work.SessionLocal', return_value=session) as factory:
+        yield factory
+
+@pytest.fixture
+def local_cache(monkeypatch):
+    local = AsyncLRUCache()
+    monkeypatch.setattr(cache, "_cache", local)
+    return local
+
+@pytest.mark.asyncio
+async def test_commits_once_on_success(session):
+    async with AsyncUnitOfWork() as uow:
+        assert uow.session is session
+
+    session.commit.assert_awaited_once()
+    session.rollback.assert_not_awaited()
+    session.close.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_rolls_back_on_exception(session):
+    with pytest.raises(ValueError):
+        async with AsyncUnitOfWork():
+            raise ValueError("Cart not found")
+
+    session.rollback.assert_awaited_once()
+    session.commit.assert_not_awaited()
+    session.close.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_get_uow_session_wraps_request_in_one_transaction(session):
+    dependency = get_uow_session()
+
+    assert await dependency.__anext__() is session
+    with pytest.raises(StopAsyncIteration):
+        await dependency.__anext__()
+
+    session.commit.assert_awaited_once()
+    session.close.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_invalidations_are_repeated_after_commit(local_cache, session):
+    key = "product:find_product:product_id=1"
+
+    async with AsyncUnitOfWork():
+        await ProductWriter().update_product(1)
+        # Uma requisição concorrente repovoa o cache com o valor ainda não confirmado
+        await local_cache.set(key, {"id": 1, "price": 10.0}, tags=("product:1",))
+
+    assert key not in local_cache
+
+@pytest.mark.asyncio
+async def test_invalidations_are_not_repeated_after_rollback(local_cache, session):
+    key = "product:find_product:product_id=1"
+
+    with pytest.raises(ValueError):
+        async with AsyncUnitOfWork():
+            await ProductWriter().update_product(1)
+            await local_cache.set(key, {"id": 1, "price": 10.0}, tags=("product:1",))
+            raise ValueError("invalid price")
+
+    # Nada foi alterado no banco, o valor repovoado continua válido
+    assert key in local_cache
+    assert cache._deferred_invalidations.get() is None
+
+@pytest.mark.asyncio
+async def test_invalidate_prefix_is_repeated_after_commit(local_cache, session):
+    key = "product:find_product:product_id=1"
+
+    async with AsyncUnitOfWork():
+        await invalidate_prefix("product")
+        await local_cache.set(key, {"id": 1, "price": 10.0}, tags=("product:1",))
+
+    assert key not in local_cache
+
+@pytest.mark.asyncio
+async def test_invalidations_are_repeated_after_replica_lag(local_cache, session, monkeypatch):
+    monkeypatch.setattr(unit_of_work, "READ_YOUR_WRITES_WINDOW", 0.01)
+    key = "product:find_product:product_id=1"
+
+    async with AsyncUnitOfWork():
+        await ProductWriter().update_product(1)
+
+    # Uma leitura na réplica ainda atrasada repovoa o cache com o valor antigo
+    await local_cache.set(key, {"id": 1, "price": 10.0}, tags=("product:1",))
+    await asyncio.sleep(0.05)
+
+    assert key not in local_cache
+
+@pytest.mark.asyncio
+async def test_commit_marks_the_user_for_read_your_writes(session, monkeypatch):
+    monkeypatch.setattr(read_routing, "READ_YOUR_WRITES_WINDOW", 5)
+    monkeypatch.setattr(read_routing, "recent_writes", read_routing.RecentWrites())
+    user_id = "3f2b7c1e-8a4d-4c55-9b1e-2d6f0a7c9e10"
+
+    with pytest.raises(ValueError):
+        async with AsyncUnitOfWork(user_id=user_id):
+            raise ValueError("Cart not found")
+    assert not await read_routing.has_recent_write(user_id)
+
+    async with AsyncUnitOfWork(user_id=user_id):
+        pass
+    assert await read_routing.has_recent_write(user_id)
@@ -1,9 +1,13 @@
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator, Callable, TypeVar
+from typing import AsyncGenerator, Callable, Optional, TypeVar
 
+from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from .cache import begin_deferred_invalidations, end_deferred_invalidations
 from .database import SessionLocal
+from .read_routing import (READ_YOUR_WRITES_WINDOW, mark_recent_write,
+                           request_user_id)
 
 T = TypeVar('T')
 
@@ -13,21 +17,36 @@ class AsyncUnitOfWork:
     
     Permite agrupar múltiplas operações de banco de dados em uma única transação,
     com commit automático em caso de sucesso e rollback em caso de exceção.
+    
+    Após o commit, as leituras de `user_id` vão ao primário durante a janela
+    de read-your-writes (ver `read_routing`).
     """
     
-    def __init__(self):
+    def __init__(self, user_id: Optional[str] = None):
         self.session: AsyncSession = None
+        self.user_id = user_id
+        self._invalidations = None
     
     async def __aenter__(self) -> 'AsyncUnitOfWork':
         self.session = SessionLocal()
+        self._invalidations = begin_deferred_invalidations()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if exc_type is not None:
-            await self.rollback()
-        else:
-            await self.commit()
-        await self.session.close()
+        committed = False
+        try:
+            if exc_type is not None:
+                await self.rollback()
+            else:
+                await self.commit()
+                committed = True
+        finally:
+            await self.session.close()
+            # Invalida de novo o que foi alterado, agora que as mudanças estão visíveis
+            # (e outra vez depois do atraso da réplica)
+            await end_deferred_invalidations(self._invalidations, replay=committed, replay_after=READ_YOUR_WRITES_WINDOW)
+        if committed:
+            await mark_recent_write(self.user_id)
     
     async def commit(self):
         await self.session.commit()
@@ -68,4 +87,24 @@ async def run_in_transaction(
     """
     async with AsyncUnitOfWork() as uow:
         result = await func(uow.session)
-        return result
\ No newline at end of file
+        return result
+
+
+async def get_uow_session(request: Request = None) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependência do FastAPI que executa a requisição em uma única transação.
+    
+    Os repositórios apenas enviam as alterações (`flush`); o commit é feito
+    uma única vez ao final da requisição, e qualquer exceção (inclusive
+    `HTTPException`) desfaz todas as alterações. O usuário da requisição
+    passa a ler do primário após o commit (ver `read_routing`).
+    
+    Exemplo de uso:
+    ```
+    @router.post("/")
+    async def create_order(..., session: AsyncSession = Depends(get_uow_session)):
+        ...
+    ```
+    """
+    async with AsyncUnitOfWork(user_id=request_user_id(request)) as uow:
+        yield uow.session
@@ -1,4 +1,4 @@
-from sqlalchemy import (Column, Float, ForeignKey)
+from sqlalchemy import (Column, Float, ForeignKey, Index)
 from sqlalchemy.dialects.postgresql import UUID
 
 from infrastructure.api.database import Base
@@ -6,6 +6,8 @@ from infrastructure.api.database import Base
 
 class CartModel(Base):
     __tablename__ = "tb_carts"
+    # Carrinhos do usuário, paginados pelo id
+    __table_args__ = (Index("ix_carts_user_id", "user_id", "id"),)
 
     id = Column(UUID, primary_key=True, index=True)
     user_id = Column(UUID, ForeignKey("tb_users.id"))
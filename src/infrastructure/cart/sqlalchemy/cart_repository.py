@@ -1,11 +1,18 @@
+from typing import AsyncIterator, Dict, Optional, Tuple
 from uuid import UUID
 
+from sqlalchemy import func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from domain.cart.cart_entity import Cart
 from domain.cart.cart_repository_interface import CartRepositoryInterface
+from infrastructure.api.pagination import (DEFAULT_PAGE_SIZE, build_id_page,
+                                           id_keyset_page, pagination_info)
+from infrastructure.api.streaming import stream_scalars
 from infrastructure.cart.sqlalchemy.cart_model import CartModel
+from infrastructure.cart_item.sqlalchemy.cart_item_model import CartItemModel
+from infrastructure.product.sqlalchemy.product_model import ProductModel
 
 
 class CartRepository(CartRepositoryInterface):
@@ -31,7 +38,7 @@ class CartRepository(CartRepositoryInterface):
         )
 
         self.session.add(cart_model)
-        await self.session.commit()
+        await self.session.flush()
 
         return None
 
@@ -45,7 +52,6 @@ class CartRepository(CartRepositoryInterface):
             .where(CartModel.id == cart.id)
             .values(total_price=cart.total_price)
         )
-        await self.session.commit()
 
         # Fetch the updated cart
         result = await self.session.execute(
@@ -61,6 +67,34 @@ class CartRepository(CartRepositoryInterface):
 
         return updated_cart
 
+    async def update_cart_total(self, cart_id: UUID) -> Tuple[Optional[Cart], int]:
+        '''Recompute the total from the cart items in one UPDATE and return the cart with its item count'''
+
+        items_total = (
+            select(func.coalesce(func.sum(CartItemModel.quantity * ProductModel.price), 0.0))
+            .join(ProductModel, ProductModel.id == CartItemModel.product_id)
+            .where(CartItemModel.cart_id == CartModel.id)
+            .scalar_subquery()
+        )
+        items_count = (
+            select(func.count(CartItemModel.id))
+            .where(CartItemModel.cart_id == CartModel.id)
+            .scalar_subquery()
+        )
+
+        result = await self.session.execute(
+            update(CartModel)
+            .where(CartModel.id == cart_id)
+            .values(total_price=items_total)
+            .returning(CartModel.id, CartModel.user_id, CartModel.total_price, items_count)
+        )
+        row = result.first()
+
+        if row is None:
+            return None, 0
+
+        return Cart(id=row[0], user_id=row[1], total_price=row[2]), row[3]
+
     async def remove_cart(self, cart_id: UUID):
         # In SQLAlchemy 2.0, we need to use delete() differently for async
         from sqlalchemy import delete
@@ -69,20 +103,36 @@ class CartRepository(CartRepositoryInterface):
         await self.session.execute(
             delete(CartModel).where(CartModel.id == cart_id)
         )
-        await self.session.commit()
 
         return None
 
-    async def list_carts(self, user_id: UUID):
-        result = await self.session.execute(
-            select(CartModel).filter(CartModel.user_id == user_id)
-        )
-        carts = result.scalars().all()
-
-        if not carts:
-            return None
-
-        return [Cart(id=cart.id, user_id=cart.user_id, total_price=cart.total_price) for cart in carts]
+    async def list_carts(self, user_id: UUID, cursor: Optional[str] = None, page_size: int = DEFAULT_PAGE_SIZE) -> Dict:
+        """
+        Lista carrinhos de um usuário com paginação por cursor (ordenados pelo id).
+        
+        Args:
+            user_id: ID do usuário
+            cursor: Cursor da página anterior (`next_cursor`), None para a primeira página
+            page_size: Tamanho da página
+            
+        Returns:
+            Dict contendo os carrinhos da página e metadados da paginação
+        """
+        query = id_keyset_page(select(CartModel).filter(CartModel.user_id == user_id), CartModel.id, cursor, page_size)
+        result = await self.session.execute(query)
+        carts, next_cursor = build_id_page(result.scalars().all(), page_size)
+
+        return {
+            "items": [Cart(id=cart.id, user_id=cart.user_id, total_price=cart.total_price) for cart in carts],
+            "pagination": pagination_info(page_size, next_cursor, None, None),
+        }
+
+    async def stream_carts(self, user_id: UUID) -> AsyncIterator[Cart]:
+        '''Iterate over the carts of a user with a server-side cursor'''
+
+        statement = select(CartModel).filter(CartModel.user_id == user_id).order_by(CartModel.id)
+        async for cart in stream_scalars(self.session, statement):
+            yield Cart(id=cart.id, user_id=cart.user_id, total_price=cart.total_price)
 
     async def delete_all_carts(self):
         # In SQLAlchemy 2.0, we need to use delete() differently for async
@@ -92,6 +142,5 @@ class CartRepository(CartRepositoryInterface):
         await self.session.execute(
             delete(CartModel)
         )
-        await self.session.commit()
 
         return None
\ No newline at end of file
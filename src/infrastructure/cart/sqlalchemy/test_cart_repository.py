@@ -3,8 +3,8 @@ from uuid import uuid4
 
 import pytest
 
-from domain.__seedwork.test_utils import (async_return, async_side_effect,
-                                          run_async)
+from domain.__seedwork.test_utils import (async_iter, async_return,
+                                          async_side_effect, run_async)
 from domain.cart.cart_entity import Cart
 from infrastructure.cart.sqlalchemy.cart_model import CartModel
 from infrastructure.cart.sqlalchemy.cart_repository import CartRepository
@@ -57,12 +57,14 @@ async def test_add_cart(cart_repository, session):
         total_price=100.0
     )
     session.commit = async_return(None)
+    session.flush = async_return(None)
 
     await cart_repository.add_cart(cart)
 
-    # Check that the session methods were called
+    # O INSERT é enviado, mas o commit fica com a unidade de trabalho
     assert session.add.called
-    assert session.commit.called
+    session.flush.assert_awaited_once()
+    session.commit.assert_not_awaited()
 
 @pytest.mark.asyncio
 async def test_update_cart(cart_repository, session):
@@ -90,20 +92,45 @@ async def test_update_cart(cart_repository, session):
     session.execute = AsyncMock()
     session.execute.side_effect = [update_execute_result, select_execute_result]
     
-    # Set up commit to be awaitable
     session.commit = AsyncMock()
 
     updated_cart = await cart_repository.update_cart(cart)
 
     # Verify method was called
     assert session.execute.call_count == 2
-    assert session.commit.called
+    assert not session.commit.called
     
     # Verify the returned cart has the correct values
     assert updated_cart.id == cart_id
     assert updated_cart.user_id == user_id
     assert updated_cart.total_price == 100.0
 
+@pytest.mark.asyncio
+async def test_update_cart_total(cart_repository, session):
+    cart_id = uuid4()
+    user_id = uuid4()
+    session.execute = async_return(MagicMock())
+    session.execute.return_value.first.return_value = (cart_id, user_id, 150.0, 3)
+
+    updated_cart, items_count = await cart_repository.update_cart_total(cart_id)
+
+    # Total calculado com um único UPDATE com join em tb_products
+    session.execute.assert_awaited_once()
+    statement = str(session.execute.await_args[0][0])
+    assert statement.startswith("UPDATE tb_carts SET total_price=(SELECT")
+    assert "JOIN tb_products ON tb_products.id = tb_cart_items.product_id" in statement
+    assert updated_cart.id == cart_id
+    assert updated_cart.user_id == user_id
+    assert updated_cart.total_price == 150.0
+    assert items_count == 3
+
+@pytest.mark.asyncio
+async def test_update_cart_total_cart_not_found(cart_repository, session):
+    session.execute = async_return(MagicMock())
+    session.execute.return_value.first.return_value = None
+
+    assert await cart_repository.update_cart_total(uuid4()) == (None, 0)
+
 @pytest.mark.asyncio
 async def test_remove_cart(cart_repository, session):
     cart_id = uuid4()
@@ -114,7 +141,7 @@ async def test_remove_cart(cart_repository, session):
     await cart_repository.remove_cart(cart_id)
 
     assert session.execute.called
-    assert session.commit.called
+    assert not session.commit.called
 
 @pytest.mark.asyncio
 async def test_list_carts(cart_repository, session):
@@ -133,11 +160,28 @@ async def test_list_carts(cart_repository, session):
     session.execute = async_return(MagicMock())
     session.execute.return_value.scalars.return_value.all.return_value = [cart_model_1, cart_model_2]
 
-    carts = await cart_repository.list_carts(user_id)
+    page = await cart_repository.list_carts(user_id)
+    carts = page["items"]
 
     assert len(carts) == 2
     assert carts[0].id == cart_model_1.id
     assert carts[1].id == cart_model_2.id
+    assert page["pagination"]["next_cursor"] is None
+
+@pytest.mark.asyncio
+async def test_list_carts_next_page(cart_repository, session):
+    user_id = uuid4()
+    cart_models = [CartModel(id=uuid4(), user_id=user_id, total_price=10.0) for _ in range(3)]
+    session.execute = async_return(MagicMock())
+    session.execute.return_value.scalars.return_value.all.return_value = cart_models
+
+    page = await cart_repository.list_carts(user_id, page_size=2)
+
+    # A linha extra indica a próxima página e não é retornada
+    assert [cart.id for cart in page["items"]] == [cart_models[0].id, cart_models[1].id]
+    assert page["pagination"]["next_cursor"] is not None
+    statement = session.execute.call_args.args[0]
+    assert statement._limit_clause.value == 3
 
 @pytest.mark.asyncio
 async def test_list_carts_not_found(cart_repository, session):
@@ -145,9 +189,22 @@ async def test_list_carts_not_found(cart_repository, session):
     session.execute = async_return(MagicMock())
     session.execute.return_value.scalars.return_value.all.return_value = []
 
-    carts = await cart_repository.list_carts(user_id)
+    page = await cart_repository.list_carts(user_id)
+
+    assert page["items"] == []
+    assert page["pagination"]["next_cursor"] is None
+
+@pytest.mark.asyncio
+async def test_stream_carts(cart_repository, session):
+    user_id = uuid4()
+    cart_models = [CartModel(id=uuid4(), user_id=user_id, total_price=10.0), CartModel(id=uuid4(), user_id=user_id, total_price=20.0)]
+    session.stream_scalars = async_return(async_iter(cart_models)())
+
+    carts = [cart async for cart in cart_repository.stream_carts(user_id)]
 
-    assert carts is None
+    assert [cart.total_price for cart in carts] == [10.0, 20.0]
+    statement = session.stream_scalars.call_args.args[0]
+    assert statement.get_execution_options()["yield_per"] > 0
 
 @pytest.mark.asyncio
 async def test_delete_all_carts(cart_repository, session):
@@ -157,4 +214,4 @@ async def test_delete_all_carts(cart_repository, session):
     await cart_repository.delete_all_carts()
 
     assert session.execute.called
-    assert session.commit.called
\ No newline at end of file
+    assert not session.commit.called
\ No newline at end of file
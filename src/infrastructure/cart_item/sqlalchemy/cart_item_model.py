@@ -1,4 +1,4 @@
-from sqlalchemy import (Column, ForeignKey, Integer)
+from sqlalchemy import Column, ForeignKey, Index, Integer
 from sqlalchemy.dialects.postgresql import UUID
 
 from infrastructure.api.database import Base
@@ -6,6 +6,9 @@ from infrastructure.api.database import Base
 
 class CartItemModel(Base):
     __tablename__ = "tb_cart_items"
+    # Um produto aparece uma única vez por carrinho (alvo do ON CONFLICT em apply_changes);
+    # o índice começa por cart_id e também atende as consultas pelos itens do carrinho
+    __table_args__ = (Index("uq_cart_items_cart_product", "cart_id", "product_id", unique=True),)
 
     id = Column(UUID, primary_key=True, index=True)
     cart_id = Column(UUID, ForeignKey("tb_carts.id", ondelete="CASCADE"), nullable=False)
@@ -1,16 +1,30 @@
-from typing import List, Optional
+from typing import AsyncIterator, Dict, Iterable, List, Optional
 from uuid import UUID
 
-from sqlalchemy import and_
+from sqlalchemy import and_, bindparam, delete, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from domain.cart_item.cart_item_entity import CartItem
 from domain.cart_item.cart_item_repository_interface import \
     CartItemRepositoryInterface
+from infrastructure.api.pagination import (DEFAULT_PAGE_SIZE, build_id_page,
+                                           id_keyset_page, pagination_info)
+from infrastructure.api.row_mapping import RowMapper
+from infrastructure.api.streaming import stream_scalars
 from infrastructure.cart.sqlalchemy.cart_model import CartModel
 from infrastructure.cart_item.sqlalchemy.cart_item_model import CartItemModel
-from infrastructure.logging_config import logger
+
+# Leituras pelas colunas da tabela, direto para a entidade (ver row_mapping)
+CART_ITEM_ROWS = RowMapper(CartItem, CartItemModel.__table__)
+_FIND_ITEM = CART_ITEM_ROWS.select().where(CART_ITEM_ROWS.c.id == bindparam("item_id"))
+_FIND_ITEMS_BY_CART_ID = CART_ITEM_ROWS.select().where(CART_ITEM_ROWS.c.cart_id == bindparam("cart_id"))
+_LIST_ITEMS_BY_USER = (
+    CART_ITEM_ROWS.select()
+    .join(CartModel.__table__, CART_ITEM_ROWS.c.cart_id == CartModel.__table__.c.id)
+    .where(CartModel.__table__.c.user_id == bindparam("user_id"))
+)
 
 
 class CartItemRepository(CartItemRepositoryInterface):
@@ -27,27 +41,66 @@ class CartItemRepository(CartItemRepositoryInterface):
         )
 
         self.session.add(cart_item_model)
-        await self.session.commit()
+        await self.session.flush()
 
         return None
 
-    async def find_item(self, item_id: UUID) -> Optional[CartItem]:
-        result = await self.session.execute(
-            select(CartItemModel).filter(CartItemModel.id == item_id)
-        )
-        cart_item_in_db = result.scalars().first()
-        
-        if not cart_item_in_db:
-            return None
-        
-        cart_item = CartItem(
-            id=cart_item_in_db.id,
-            cart_id=cart_item_in_db.cart_id,
-            product_id=cart_item_in_db.product_id,
-            quantity=cart_item_in_db.quantity
-        )
+    async def add_items(self, cart_items: List[CartItem]) -> None:
+        '''Insert several items with a single executemany INSERT'''
+
+        if cart_items:
+            await self.session.execute(
+                insert(CartItemModel),
+                [
+                    {
+                        "id": cart_item.id,
+                        "cart_id": cart_item.cart_id,
+                        "product_id": cart_item.product_id,
+                        "quantity": cart_item.quantity,
+                    }
+                    for cart_item in cart_items
+                ],
+            )
+
+        return None
+
+    async def apply_changes(self, cart_id: UUID, upserts: List[CartItem], removed_product_ids: Iterable[int]) -> int:
+        '''Upsert and delete the cart items in at most two statements, whatever the number of items; returns the number of removed items'''
+
+        if upserts:
+            statement = pg_insert(CartItemModel).values([
+                {
+                    "id": cart_item.id,
+                    "cart_id": cart_item.cart_id,
+                    "product_id": cart_item.product_id,
+                    "quantity": cart_item.quantity,
+                }
+                for cart_item in upserts
+            ])
+            # Itens já existentes mantêm o id e têm apenas a quantidade atualizada
+            await self.session.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[CartItemModel.cart_id, CartItemModel.product_id],
+                    set_={"quantity": statement.excluded.quantity},
+                )
+            )
+
+        removed_items = 0
+        removed_product_ids = list(removed_product_ids)
+        if removed_product_ids:
+            result = await self.session.execute(
+                delete(CartItemModel).where(
+                    CartItemModel.cart_id == cart_id,
+                    CartItemModel.product_id.in_(removed_product_ids),
+                )
+            )
+            removed_items = result.rowcount
+
+        return removed_items
 
-        return cart_item
+    async def find_item(self, item_id: UUID) -> Optional[CartItem]:
+        result = await self.session.execute(_FIND_ITEM, {"item_id": item_id})
+        return CART_ITEM_ROWS.first(result)
     
     async def update_item(self, item: CartItem) -> None:
         stmt = select(CartItemModel).filter(CartItemModel.id == item.id)
@@ -58,7 +111,7 @@ class CartItemRepository(CartItemRepositoryInterface):
             cart_item_model.cart_id = item.cart_id
             cart_item_model.product_id = item.product_id
             cart_item_model.quantity = item.quantity
-            await self.session.commit()
+            await self.session.flush()
 
         return None
 
@@ -69,66 +122,59 @@ class CartItemRepository(CartItemRepositoryInterface):
         
         if cart_item:
             await self.session.delete(cart_item)
-            await self.session.commit()
+            await self.session.flush()
 
         return None
 
-    async def list_items(self) -> Optional[List[CartItem]]:
-        result = await self.session.execute(select(CartItemModel))
-        cart_items_in_db = result.scalars().all()
-
-        logger.info(f"cart_items_in_db: {cart_items_in_db}")
-
-        cart_items = []
-
-        for cart_item_in_db in cart_items_in_db:
-            cart_items.append(CartItem(
-                id=cart_item_in_db.id,
-                cart_id=cart_item_in_db.cart_id,
-                product_id=cart_item_in_db.product_id,
-                quantity=cart_item_in_db.quantity
-            ))
-        logger.info(f"cart_items: {cart_items}")
-
-        return cart_items
+    async def list_items(self, cursor: Optional[str] = None, page_size: int = DEFAULT_PAGE_SIZE) -> Dict:
+        """
+        Lista os itens de todos os carrinhos com paginação por cursor (ordenados pelo id).
+        
+        Args:
+            cursor: Cursor da página anterior (`next_cursor`), None para a primeira página
+            page_size: Tamanho da página
+            
+        Returns:
+            Dict contendo os itens da página e metadados da paginação
+        """
+        result = await self.session.execute(id_keyset_page(CART_ITEM_ROWS.select(), CART_ITEM_ROWS.c.id, cursor, page_size))
+        rows, next_cursor = build_id_page(result.all(), page_size)
+
+        return {
+            "items": CART_ITEM_ROWS.to_entities(rows),
+            "pagination": pagination_info(page_size, next_cursor, None, None),
+        }
+
+    async def stream_items(self) -> AsyncIterator[CartItem]:
+        '''Iterate over every cart item with a server-side cursor'''
+
+        async for cart_item_in_db in stream_scalars(self.session, select(CartItemModel).order_by(CartItemModel.id)):
+            yield self._to_entity(cart_item_in_db)
+
+    @staticmethod
+    def export_query():
+        '''Columns of every cart item for an export, without ordering or entities'''
+
+        return select(CartItemModel.__table__)
+
+    @staticmethod
+    def _to_entity(cart_item_in_db: CartItemModel) -> CartItem:
+        return CartItem(
+            id=cart_item_in_db.id,
+            cart_id=cart_item_in_db.cart_id,
+            product_id=cart_item_in_db.product_id,
+            quantity=cart_item_in_db.quantity
+        )
     
     async def list_items_by_user(self, user_id: UUID) -> List[CartItem]:
-        result = await self.session.execute(
-            select(CartItemModel)
-            .join(CartModel, CartItemModel.cart_id == CartModel.id)
-            .filter(CartModel.user_id == user_id)
-        )
-        cart_items_in_db = result.scalars().all()
-
-        cart_items = []
-
-        for cart_item_in_db in cart_items_in_db:
-            cart_items.append(CartItem(
-                id=cart_item_in_db.id,
-                cart_id=cart_item_in_db.cart_id,
-                product_id=cart_item_in_db.product_id,
-                quantity=cart_item_in_db.quantity
-            ))
-
-        return cart_items
+        result = await self.session.execute(_LIST_ITEMS_BY_USER, {"user_id": user_id})
+        return CART_ITEM_ROWS.to_entities(result.all())
     
     async def find_items_by_cart_id(self, cart_id: UUID) -> Optional[List[CartItem]]:
-        result = await self.session.execute(
-            select(CartItemModel).filter(CartItemModel.cart_id == cart_id)
-        )
-        cart_items_in_db = result.scalars().all()
+        result = await self.session.execute(_FIND_ITEMS_BY_CART_ID, {"cart_id": cart_id})
+        rows = result.all()
 
-        if not cart_items_in_db:
+        if not rows:
             return None
 
-        cart_items = []
-
-        for cart_item_in_db in cart_items_in_db:
-            cart_items.append(CartItem(
-                id=cart_item_in_db.id,
-                cart_id=cart_item_in_db.cart_id,
-                product_id=cart_item_in_db.product_id,
-                quantity=cart_item_in_db.quantity
-            ))
-
-        return cart_items
\ No newline at end of file
+        return CART_ITEM_ROWS.to_entities(rows)
\ No newline at end of file
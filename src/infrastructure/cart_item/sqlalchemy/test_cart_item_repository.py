@@ -0,0 +1,134 @@
+from collections import namedtuple
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from domain.__seedwork.test_utils import async_iter, async_return
+from domain.cart_item.cart_item_entity import CartItem
+from infrastructure.cart_item.sqlalchemy.cart_item_model import CartItemModel
+from infrastructure.cart_item.sqlalchemy.cart_item_repository import (
+    CART_ITEM_ROWS, CartItemRepository)
+
+CartItemRow = namedtuple("CartItemRow", CART_ITEM_ROWS.fields)
+
+
+def cart_item_row(cart_item_model):
+    # Linha do Core com as colunas da tabela, como lida pelo repositório
+    return CartItemRow(*(getattr(cart_item_model, name) for name in CART_ITEM_ROWS.fields))
+
+
+@pytest.fixture
+def session():
+    mock = MagicMock()
+    mock.execute = async_return(MagicMock())
+    mock.commit = async_return(None)
+    return mock
+
+@pytest.fixture
+def cart_item_repository(session):
+    return CartItemRepository(session)
+
+@pytest.mark.asyncio
+async def test_add_items(cart_item_repository, session):
+    cart_id = uuid4()
+    cart_items = [CartItem(id=uuid4(), cart_id=cart_id, product_id=product_id, quantity=2) for product_id in range(1, 16)]
+
+    await cart_item_repository.add_items(cart_items)
+
+    # Um único INSERT (executemany) para todos os itens, sem commit
+    session.execute.assert_awaited_once()
+    statement, rows = session.execute.await_args[0]
+    assert "INSERT INTO tb_cart_items" in str(statement)
+    assert [row["product_id"] for row in rows] == list(range(1, 16))
+    assert all(row["cart_id"] == cart_id for row in rows)
+    session.commit.assert_not_awaited()
+    assert not session.add.called
+
+@pytest.mark.asyncio
+async def test_add_items_empty(cart_item_repository, session):
+    await cart_item_repository.add_items([])
+
+    session.execute.assert_not_awaited()
+    session.commit.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_apply_changes(cart_item_repository, session):
+    cart_id = uuid4()
+    upserts = [CartItem(id=uuid4(), cart_id=cart_id, product_id=product_id, quantity=3) for product_id in range(1, 31)]
+
+    await cart_item_repository.apply_changes(cart_id=cart_id, upserts=upserts, removed_product_ids=[40, 41])
+
+    # Um upsert e um delete, independentemente da quantidade de itens
+    assert session.execute.await_count == 2
+    upsert_statement = str(session.execute.await_args_list[0][0][0].compile(dialect=postgresql.dialect()))
+    delete_statement = str(session.execute.await_args_list[1][0][0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (cart_id, product_id) DO UPDATE SET quantity = excluded.quantity" in upsert_statement
+    assert delete_statement.startswith("DELETE FROM tb_cart_items")
+    session.commit.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_apply_changes_only_removals(cart_item_repository, session):
+    session.execute = async_return(MagicMock(rowcount=1))
+
+    removed_items = await cart_item_repository.apply_changes(cart_id=uuid4(), upserts=[], removed_product_ids=[1])
+
+    assert removed_items == 1
+    session.execute.assert_awaited_once()
+    assert str(session.execute.await_args[0][0]).startswith("DELETE FROM tb_cart_items")
+
+@pytest.mark.asyncio
+async def test_list_items(cart_item_repository, session):
+    cart_id = uuid4()
+    item_models = [CartItemModel(id=uuid4(), cart_id=cart_id, product_id=product_id, quantity=1) for product_id in (1, 2, 3)]
+    session.execute.return_value.all.return_value = [cart_item_row(item_model) for item_model in item_models]
+
+    page = await cart_item_repository.list_items(page_size=2)
+
+    assert [item.product_id for item in page["items"]] == [1, 2]
+    assert page["pagination"]["next_cursor"] is not None
+    statement = session.execute.await_args[0][0]
+    assert "ORDER BY tb_cart_items.id ASC" in str(statement)
+
+@pytest.mark.asyncio
+async def test_find_item(cart_item_repository, session):
+    item_model = CartItemModel(id=uuid4(), cart_id=uuid4(), product_id=1, quantity=3)
+    session.execute.return_value.first.return_value = cart_item_row(item_model)
+
+    item = await cart_item_repository.find_item(item_model.id)
+
+    assert isinstance(item, CartItem)
+    assert item.fields() == {"id": item_model.id, "cart_id": item_model.cart_id, "product_id": 1, "quantity": 3}
+    assert session.execute.await_args[0][1] == {"item_id": item_model.id}
+
+    session.execute.return_value.first.return_value = None
+    assert await cart_item_repository.find_item(uuid4()) is None
+
+@pytest.mark.asyncio
+async def test_items_by_cart_and_by_user(cart_item_repository, session):
+    cart_id = uuid4()
+    user_id = uuid4()
+    item_models = [CartItemModel(id=uuid4(), cart_id=cart_id, product_id=product_id, quantity=1) for product_id in (1, 2)]
+    session.execute.return_value.all.return_value = [cart_item_row(item_model) for item_model in item_models]
+
+    assert [item.product_id for item in await cart_item_repository.find_items_by_cart_id(cart_id)] == [1, 2]
+    assert [item.product_id for item in await cart_item_repository.list_items_by_user(user_id)] == [1, 2]
+    statement, params = session.execute.await_args[0]
+    assert "JOIN tb_carts ON tb_cart_items.cart_id = tb_carts.id" in str(statement)
+    assert params == {"user_id": user_id}
+
+    session.execute.return_value.all.return_value = []
+    assert await cart_item_repository.find_items_by_cart_id(cart_id) is None
+    assert await cart_item_repository.list_items_by_user(user_id) == []
+
+@pytest.mark.asyncio
+async def test_stream_items(cart_item_repository, session):
+    cart_id = uuid4()
+    item_models = [CartItemModel(id=uuid4(), cart_id=cart_id, product_id=product_id, quantity=2) for product_id in (1, 2)]
+    session.stream_scalars = async_return(async_iter(item_models)())
+
+    items = [item async for item in cart_item_repository.stream_items()]
+
+    assert [item.product_id for item in items] == [1, 2]
+    assert all(item.quantity == 2 for item in items)
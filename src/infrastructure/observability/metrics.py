@@ -1,8 +1,11 @@
 """Módulo para métricas personalizadas da aplicação."""
 import os
-from typing import Any, Dict, List, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
 
 from opentelemetry import metrics
+from opentelemetry.metrics import CallbackOptions, Observation
 from opentelemetry.sdk.metrics import MeterProvider
 from opentelemetry.sdk.resources import Resource
 
@@ -52,6 +55,159 @@ error_counter = meter.create_counter(
     unit="1",
 )
 
+# Contador de requisições que aguardaram uma carga de cache já em andamento
+cache_coalesced_wait_counter = meter.create_counter(
+    name="cache_coalesced_waits",
+    description="Contador de requisições que aguardaram uma carga de cache em andamento",
+    unit="1",
+)
+
+# Contadores de acertos, faltas, remoções por limite e expirações do cache, por prefixo
+cache_hit_counter = meter.create_counter(
+    name="cache_hits",
+    description="Contador de acertos no cache",
+    unit="1",
+)
+
+cache_miss_counter = meter.create_counter(
+    name="cache_misses",
+    description="Contador de faltas no cache",
+    unit="1",
+)
+
+cache_eviction_counter = meter.create_counter(
+    name="cache_evictions",
+    description="Contador de itens removidos do cache por limite de itens ou memória",
+    unit="1",
+)
+
+cache_expiration_counter = meter.create_counter(
+    name="cache_expirations",
+    description="Contador de itens removidos do cache por expiração",
+    unit="1",
+)
+
+# Histograma da duração das cargas executadas em faltas no cache
+cache_load_duration = meter.create_histogram(
+    name="cache_load_duration",
+    description="Latência das cargas executadas em faltas no cache",
+    unit="ms",
+)
+
+# Fontes dos gauges de ocupação do cache (registradas pelo módulo de cache)
+_cache_key_counts: Optional[Callable[[], Dict[str, int]]] = None
+_cache_byte_counts: Optional[Callable[[], Dict[str, int]]] = None
+
+
+def _observe_by_prefix(source: Optional[Callable[[], Dict[str, int]]]) -> Iterable[Observation]:
+    if source is None:
+        return []
+    return [Observation(value, {"prefix": prefix}) for prefix, value in source().items()]
+
+
+def _observe_cache_entries(options: CallbackOptions) -> Iterable[Observation]:
+    return _observe_by_prefix(_cache_key_counts)
+
+
+def _observe_cache_bytes(options: CallbackOptions) -> Iterable[Observation]:
+    return _observe_by_prefix(_cache_byte_counts)
+
+
+# Gauges com a quantidade de itens e a memória estimada do cache, por prefixo
+cache_entries_gauge = meter.create_observable_gauge(
+    name="cache_entries",
+    callbacks=[_observe_cache_entries],
+    description="Quantidade de itens no cache",
+    unit="1",
+)
+
+cache_bytes_gauge = meter.create_observable_gauge(
+    name="cache_bytes",
+    callbacks=[_observe_cache_bytes],
+    description="Memória estimada ocupada pelos itens do cache",
+    unit="By",
+)
+
+# Histogramas do pool de conexões com o banco, por pool (`primary`, réplicas)
+db_pool_checkout_wait = meter.create_histogram(
+    name="db_pool_checkout_wait",
+    description="Tempo de espera por uma conexão do pool",
+    unit="ms",
+)
+
+db_pool_connection_age = meter.create_histogram(
+    name="db_pool_connection_age",
+    description="Idade das conexões do pool ao serem fechadas",
+    unit="s",
+)
+
+# Contadores de conexões abertas, invalidadas, recicladas e que falharam no pre-ping
+db_pool_connect_counter = meter.create_counter(
+    name="db_pool_connects",
+    description="Contador de conexões abertas pelo pool",
+    unit="1",
+)
+
+db_pool_invalidation_counter = meter.create_counter(
+    name="db_pool_invalidations",
+    description="Contador de conexões invalidadas no pool",
+    unit="1",
+)
+
+db_pool_recycle_counter = meter.create_counter(
+    name="db_pool_recycles",
+    description="Contador de conexões recicladas pelo pool_recycle",
+    unit="1",
+)
+
+db_pool_pre_ping_failure_counter = meter.create_counter(
+    name="db_pool_pre_ping_failures",
+    description="Contador de conexões que falharam no pool_pre_ping",
+    unit="1",
+)
+
+# Fontes dos gauges de ocupação dos pools (registradas pelo módulo do banco), por pool
+_db_pool_stats: Dict[str, Callable[[], Dict[str, int]]] = {}
+
+# Esperas por conexão da requisição atual (ver `track_db_pool_checkout_wait`)
+_db_pool_request_waits: ContextVar[Optional[List[float]]] = ContextVar("db_pool_request_waits", default=None)
+
+
+def _observe_db_pool(stat: str) -> Callable[[CallbackOptions], Iterable[Observation]]:
+    def observe(options: CallbackOptions) -> Iterable[Observation]:
+        return [Observation(stats()[stat], {"pool": pool}) for pool, stats in list(_db_pool_stats.items())]
+    return observe
+
+
+# Gauges com as conexões em uso, livres, de overflow e requisições esperando, por pool
+db_pool_checked_out_gauge = meter.create_observable_gauge(
+    name="db_pool_checked_out",
+    callbacks=[_observe_db_pool("checked_out")],
+    description="Conexões do pool em uso",
+    unit="1",
+)
+
+db_pool_idle_gauge = meter.create_observable_gauge(
+    name="db_pool_idle",
+    callbacks=[_observe_db_pool("idle")],
+    description="Conexões livres no pool",
+    unit="1",
+)
+
+db_pool_overflow_gauge = meter.create_observable_gauge(
+    name="db_pool_overflow",
+    callbacks=[_observe_db_pool("overflow")],
+    description="Conexões abertas além do pool_size",
+    unit="1",
+)
+
+db_pool_waiting_gauge = meter.create_observable_gauge(
+    name="db_pool_waiting",
+    callbacks=[_observe_db_pool("waiting")],
+    description="Requisições esperando por uma conexão do pool",
+    unit="1",
+)
+
 # Funções para incrementar os contadores
 
 def increment_internal_request(endpoint: str, method: str) -> None:
@@ -110,4 +266,159 @@ def increment_error(error_type: str, endpoint: Optional[str] = None) -> None:
     if endpoint:
         attributes["endpoint"] = endpoint
     
-    error_counter.add(1, attributes) 
\ No newline at end of file
+    error_counter.add(1, attributes)
+
+def increment_cache_coalesced_wait(prefix: str) -> None:
+    """
+    Incrementa o contador de esperas coalescidas no cache.
+    
+    Args:
+        prefix: Prefixo da chave de cache (por exemplo `product`)
+    """
+    cache_coalesced_wait_counter.add(1, {"prefix": prefix})
+
+def increment_cache_hit(prefix: str) -> None:
+    """
+    Incrementa o contador de acertos no cache.
+    
+    Args:
+        prefix: Prefixo da chave de cache (por exemplo `product`)
+    """
+    cache_hit_counter.add(1, {"prefix": prefix})
+
+def increment_cache_miss(prefix: str) -> None:
+    """
+    Incrementa o contador de faltas no cache.
+    
+    Args:
+        prefix: Prefixo da chave de cache (por exemplo `product`)
+    """
+    cache_miss_counter.add(1, {"prefix": prefix})
+
+def increment_cache_eviction(prefix: str) -> None:
+    """
+    Incrementa o contador de itens removidos do cache por limite.
+    
+    Args:
+        prefix: Prefixo da chave de cache (por exemplo `product`)
+    """
+    cache_eviction_counter.add(1, {"prefix": prefix})
+
+def increment_cache_expiration(prefix: str) -> None:
+    """
+    Incrementa o contador de itens removidos do cache por expiração.
+    
+    Args:
+        prefix: Prefixo da chave de cache (por exemplo `product`)
+    """
+    cache_expiration_counter.add(1, {"prefix": prefix})
+
+def record_cache_load_duration(prefix: str, duration_ms: float) -> None:
+    """
+    Registra a duração de uma carga executada em uma falta no cache.
+    
+    Args:
+        prefix: Prefixo da chave de cache (por exemplo `product`)
+        duration_ms: Duração da carga em milissegundos
+    """
+    cache_load_duration.record(duration_ms, {"prefix": prefix})
+
+def register_cache_gauges(key_counts: Callable[[], Dict[str, int]], byte_counts: Callable[[], Dict[str, int]]) -> None:
+    """
+    Registra as fontes dos gauges de ocupação do cache.
+    
+    Args:
+        key_counts: Função que retorna `prefixo -> quantidade de itens`
+        byte_counts: Função que retorna `prefixo -> bytes estimados`
+    """
+    global _cache_key_counts, _cache_byte_counts
+    _cache_key_counts = key_counts
+    _cache_byte_counts = byte_counts
+
+def record_db_pool_checkout_wait(pool: str, duration_ms: float) -> None:
+    """
+    Registra a espera por uma conexão do pool e a soma às esperas da requisição atual.
+    
+    Args:
+        pool: Nome do pool (por exemplo `primary`)
+        duration_ms: Duração da espera em milissegundos
+    """
+    db_pool_checkout_wait.record(duration_ms, {"pool": pool})
+    waits = _db_pool_request_waits.get()
+    if waits is not None:
+        waits.append(duration_ms)
+
+def record_db_pool_connection_age(pool: str, age_s: float) -> None:
+    """
+    Registra a idade de uma conexão fechada pelo pool.
+    
+    Args:
+        pool: Nome do pool (por exemplo `primary`)
+        age_s: Idade da conexão em segundos
+    """
+    db_pool_connection_age.record(age_s, {"pool": pool})
+
+def increment_db_pool_connect(pool: str) -> None:
+    """
+    Incrementa o contador de conexões abertas pelo pool.
+    
+    Args:
+        pool: Nome do pool (por exemplo `primary`)
+    """
+    db_pool_connect_counter.add(1, {"pool": pool})
+
+def increment_db_pool_invalidation(pool: str, soft: bool = False) -> None:
+    """
+    Incrementa o contador de conexões invalidadas no pool.
+    
+    Args:
+        pool: Nome do pool (por exemplo `primary`)
+        soft: Se a invalidação é suave (a conexão é fechada ao voltar para o pool)
+    """
+    db_pool_invalidation_counter.add(1, {"pool": pool, "soft": soft})
+
+def increment_db_pool_recycle(pool: str) -> None:
+    """
+    Incrementa o contador de conexões recicladas pelo pool_recycle.
+    
+    Args:
+        pool: Nome do pool (por exemplo `primary`)
+    """
+    db_pool_recycle_counter.add(1, {"pool": pool})
+
+def increment_db_pool_pre_ping_failure(pool: str) -> None:
+    """
+    Incrementa o contador de conexões que falharam no pool_pre_ping.
+    
+    Args:
+        pool: Nome do pool (por exemplo `primary`)
+    """
+    db_pool_pre_ping_failure_counter.add(1, {"pool": pool})
+
+def register_db_pool_gauges(pool: str, stats: Callable[[], Dict[str, int]]) -> None:
+    """
+    Registra a fonte dos gauges de ocupação de um pool de conexões.
+    
+    Args:
+        pool: Nome do pool (por exemplo `primary`)
+        stats: Função que retorna `checked_out`, `idle`, `overflow` e `waiting`
+    """
+    _db_pool_stats[pool] = stats
+
+@contextmanager
+def track_db_pool_checkout_wait() -> Iterator[List[float]]:
+    """
+    Acumula as esperas por conexão do pool registradas dentro do bloco.
+    
+    As tasks criadas no bloco herdam o contexto, então as esperas das
+    sessões abertas pelos handlers da requisição também são acumuladas.
+    
+    Returns:
+        Lista com a duração de cada espera, em milissegundos
+    """
+    waits: List[float] = []
+    token = _db_pool_request_waits.set(waits)
+    try:
+        yield waits
+    finally:
+        _db_pool_request_waits.reset(token)
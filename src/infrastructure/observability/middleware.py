@@ -3,12 +3,13 @@ import time
 from typing import Callable, Dict, Optional
 
 from fastapi import Request, Response
+from opentelemetry import trace
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.types import ASGIApp
 
 from infrastructure.observability.metrics import (
     increment_error, increment_internal_request,
-    record_internal_request_duration)
+    record_internal_request_duration, track_db_pool_checkout_wait)
 from infrastructure.observability.telemetry import create_span
 
 
@@ -58,8 +59,15 @@ class TelemetryMiddleware(BaseHTTPMiddleware):
         create_span(span_name, attributes)
         
         try:
-            # Processa a requisição
-            response = await call_next(request)
+            # Processa a requisição, acumulando a espera por conexões do banco
+            with track_db_pool_checkout_wait() as waits:
+                try:
+                    response = await call_next(request)
+                finally:
+                    # O span atual é o da requisição, criado pela instrumentação do FastAPI
+                    span = trace.get_current_span()
+                    span.set_attribute("db.pool.checkout_wait_ms", sum(waits))
+                    span.set_attribute("db.pool.checkouts", len(waits))
             
             # Registra o fim da requisição
             duration = time.perf_counter() - start_time
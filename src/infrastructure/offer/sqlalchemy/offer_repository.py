@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import List
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -5,7 +6,7 @@ from sqlalchemy.future import select
 
 from domain.offer.offer_entity import Offer
 from domain.offer.offer_repository_interface import OfferRepositoryInterface
-from infrastructure.api.cache import async_cached
+from infrastructure.api.cache import async_cached, invalidate_cache
 from infrastructure.offer.sqlalchemy.offer_model import OfferModel
 
 
@@ -13,6 +14,7 @@ class OfferRepository(OfferRepositoryInterface):
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    @invalidate_cache(key_prefix='offer', tags=('offer:list', 'offer:{offer.id}'))
     async def add_offer(self, offer: Offer) -> Offer:
 
         offer_model = OfferModel(
@@ -24,7 +26,7 @@ class OfferRepository(OfferRepositoryInterface):
         )
 
         self.session.add(offer_model)
-        await self.session.commit()
+        await self.session.flush()
         await self.session.refresh(offer_model)
 
         added_offer = Offer(
@@ -37,7 +39,7 @@ class OfferRepository(OfferRepositoryInterface):
 
         return added_offer
 
-    @async_cached(ttl=600, prefix='offer')
+    @async_cached(ttl=600, prefix='offer', tags=('offer:{offer_id}',), negative_ttl=30)
     async def find_offer(self, offer_id: int) -> Offer:
         result = await self.session.execute(
             select(OfferModel).filter(OfferModel.id == offer_id)
@@ -57,7 +59,8 @@ class OfferRepository(OfferRepositoryInterface):
 
         return offer
 
-    @async_cached(ttl=600, prefix='offer')
+    # Até 30 minutos serve o valor obsoleto enquanto recarrega em segundo plano
+    @async_cached(ttl=600, prefix='offer', tags=('offer:list',), hard_ttl=1800, refresh_concurrency=1)
     async def list_offers(self) -> List[Offer]:
         result = await self.session.execute(select(OfferModel))
         offers_in_db = result.scalars().all()
@@ -78,6 +81,28 @@ class OfferRepository(OfferRepositoryInterface):
 
         return offers
 
+    async def warm_cache(self) -> int:
+        '''Load the active offers with a single query and prime the offer lookups'''
+        now = datetime.now()
+        result = await self.session.execute(
+            select(OfferModel).filter(OfferModel.start_date <= now, OfferModel.end_date > now)
+        )
+
+        count = 0
+        for offer_in_db in result.scalars().all():
+            offer = Offer(
+                id=offer_in_db.id,
+                start_date=offer_in_db.start_date,
+                end_date=offer_in_db.end_date,
+                discount_type=offer_in_db.discount_type,
+                discount_value=offer_in_db.discount_value
+            )
+            await self.find_offer.prime(offer, offer_id=offer.id)
+            count += 1
+
+        return count
+
+    @invalidate_cache(key_prefix='offer', tags=('offer:list', 'offer:{offer_id}'))
     async def remove_offer(self, offer_id: int) -> None:
         stmt = select(OfferModel).filter(OfferModel.id == offer_id)
         result = await self.session.execute(stmt)
@@ -85,11 +110,13 @@ class OfferRepository(OfferRepositoryInterface):
         
         if offer:
             await self.session.delete(offer)
-            await self.session.commit()
+            await self.session.flush()
 
         return None
         
+    @invalidate_cache(key_prefix='offer')
     async def remove_all_offers(self) -> None:
-        await self.session.execute("DELETE FROM tb_offers")
-        await self.session.commit()
+        await self.session.execute(
+            OfferModel.__table__.delete()
+        )
         return None
\ No newline at end of file
@@ -31,13 +31,15 @@ async def test_add_offer(offer_repository, session):
     
     # Mock the session's async methods
     session.commit = async_return(None)
+    session.flush = async_return(None)
     session.refresh = async_return(None)
 
     added_offer = await offer_repository.add_offer(offer)
 
     # Check that the session methods were called
     assert session.add.called
-    assert session.commit.called
+    assert session.flush.called
+    assert not session.commit.called
     assert session.refresh.called
     assert added_offer.id == offer.id
     assert added_offer.start_date == offer.start_date
@@ -135,13 +137,15 @@ async def test_remove_offer(offer_repository, session):
     session.execute.return_value.scalars.return_value.first.return_value = offer_model
     session.delete = async_return(None)
     session.commit = async_return(None)
+    session.flush = async_return(None)
 
     await offer_repository.remove_offer(offer_id)
 
     # Verify the methods were called
     assert session.execute.called
     assert session.delete.called
-    assert session.commit.called
+    assert session.flush.called
+    assert not session.commit.called
 
 @pytest.mark.asyncio
 async def test_remove_all_offers_success(offer_repository, session):
@@ -154,5 +158,23 @@ async def test_remove_all_offers_success(offer_repository, session):
 
     # Assert
     assert session.execute.called
-    assert session.commit.called
-    assert result is None
\ No newline at end of file
+    assert not session.commit.called
+    assert result is None
+@pytest.mark.asyncio
+async def test_warm_cache(offer_repository, session):
+    offer_model = OfferModel(
+        id=1,
+        start_date=datetime.now() - timedelta(days=1),
+        end_date=datetime.now() + timedelta(days=1),
+        discount_type=OfferType.PERCENTAGE,
+        discount_value=10.0
+    )
+    session.execute = AsyncMock(return_value=MagicMock())
+    session.execute.return_value.scalars.return_value.all.return_value = [offer_model]
+
+    assert await offer_repository.warm_cache() == 1
+
+    found_offer = await offer_repository.find_offer(1)
+
+    assert found_offer.id == offer_model.id
+    assert session.execute.await_count == 1
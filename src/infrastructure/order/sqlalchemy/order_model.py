@@ -1,5 +1,5 @@
-from sqlalchemy import (Column, DateTime, ForeignKey, Integer, Numeric,
-                        String, TypeDecorator)
+from sqlalchemy import (Column, DateTime, ForeignKey, Index, Integer,
+                        Numeric, String, TypeDecorator, UniqueConstraint)
 from sqlalchemy.dialects.postgresql import UUID
 
 from domain.order.order_status_enum import OrderStatus
@@ -35,6 +35,13 @@ class OrderTType(TypeDecorator):
 
 class OrderModel(Base):
     __tablename__ = "tb_orders"
+    __table_args__ = (
+        # Um pedido por carrinho (consultado por find_order_by_cart_id a cada novo pedido)
+        UniqueConstraint("cart_id", name="uq_orders_cart_id"),
+        # Ordenação da paginação por cursor: pedidos do usuário e listagem geral
+        Index("ix_orders_user_created_at", "user_id", "created_at", "id"),
+        Index("ix_orders_created_at", "created_at", "id"),
+    )
 
     id = Column(UUID, primary_key=True, index=True)
     user_id = Column(UUID, ForeignKey("tb_users.id"), nullable=False)
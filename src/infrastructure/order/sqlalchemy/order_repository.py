@@ -2,7 +2,8 @@ from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from uuid import UUID
 
-from sqlalchemy import func, update
+from sqlalchemy import bindparam, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
@@ -11,213 +12,139 @@ from domain.order.order_repository_interface import OrderRepositoryInterface
 from domain.order.order_status_enum import OrderStatus
 from domain.order.order_type_enum import OrderType
 from infrastructure.api.cache import async_cached, invalidate_cache
+from infrastructure.api.pagination import (build_page, count_total,
+                                           keyset_page, pagination_info)
+from infrastructure.api.row_mapping import RowMapper
 from infrastructure.order.sqlalchemy.order_model import OrderModel
 
+# Leituras pelas colunas da tabela, direto para a entidade (ver row_mapping)
+ORDER_ROWS = RowMapper(Order, OrderModel.__table__, converters={"total_price": float})
+_FIND_ORDER = ORDER_ROWS.select().where(ORDER_ROWS.c.id == bindparam("order_id"), ORDER_ROWS.c.user_id == bindparam("user_id"))
+_FIND_ORDER_BY_CART_ID = ORDER_ROWS.select().where(ORDER_ROWS.c.cart_id == bindparam("cart_id"))
+
 
 class OrderRepository(OrderRepositoryInterface):
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    @invalidate_cache(key_prefix='order')
+    @invalidate_cache(key_prefix='order', tags=('order:{order.id}', 'order:user:{order.user_id}', 'order:cart:{order.cart_id}', 'order:all'))
     async def create_order(self, order: Order):
         order_model = OrderModel(id=order.id, user_id=order.user_id, cart_id=order.cart_id, type=order.type, total_price=order.total_price, status=order.status, created_at=order.created_at, updated_at=order.updated_at, offer_id=order.offer_id)
         self.session.add(order_model)
-        await self.session.commit()
+        try:
+            await self.session.flush()
+        except IntegrityError as e:
+            # Outra requisição criou o pedido do mesmo carrinho depois da verificação do caso de uso
+            if "uq_orders_cart_id" in str(e.orig):
+                raise ValueError(f"Order for cart_id '{order.cart_id}' already exists") from e
+            raise
         # Removendo a chamada para refresh que adiciona uma consulta extra
         return order
 
-    @async_cached(ttl=300, prefix='order')
+    @async_cached(ttl=300, prefix='order', tags=('order:{order_id}',), negative_ttl=15)
     async def find_order(self, order_id: UUID, user_id: UUID) -> Order:
-        result = await self.session.execute(
-            select(OrderModel).filter(OrderModel.id == order_id, OrderModel.user_id == user_id)
-        )
-        order = result.scalars().first()
+        result = await self.session.execute(_FIND_ORDER, {"order_id": order_id, "user_id": user_id})
+        return ORDER_ROWS.first(result)
 
-        if not order:
-            return None
-        
-        return Order(id=order.id, user_id=order.user_id, cart_id=order.cart_id, type=order.type, total_price=float(order.total_price), status=order.status, created_at=order.created_at, updated_at=order.updated_at, offer_id=order.offer_id)
-
-    @async_cached(ttl=300, prefix='order')
+    # "Não encontrado" é o caso comum na criação de pedidos; invalidado por create_order
+    @async_cached(ttl=300, prefix='order', tags=('order:cart:{cart_id}', 'order:{result.id}'), negative_ttl=30)
     async def find_order_by_cart_id(self, cart_id: UUID) -> Order:
-        result = await self.session.execute(
-            select(OrderModel).filter(OrderModel.cart_id == cart_id)
-        )
-        order = result.scalars().first()
+        result = await self.session.execute(_FIND_ORDER_BY_CART_ID, {"cart_id": cart_id})
+        return ORDER_ROWS.first(result)
 
-        if not order:
-            return None
-        
-        return Order(id=order.id, user_id=order.user_id, cart_id=order.cart_id, type=order.type, total_price=float(order.total_price), status=order.status, created_at=order.created_at, updated_at=order.updated_at, offer_id=order.offer_id)
-
-    @invalidate_cache(key_prefix='order')
+    @invalidate_cache(key_prefix='order', tags=('order:{order.id}', 'order:user:{order.user_id}', 'order:cart:{order.cart_id}', 'order:all'))
     async def update_order(self, order: Order) -> Order:
-        try:
-            await self.session.execute(
-                update(OrderModel)
-                .where(OrderModel.id == order.id)
-                .values(
-                    type=order.type,
-                    total_price=order.total_price,
-                    status=OrderStatus(order.status),
-                    updated_at=datetime.now()
-                )
+        await self.session.execute(
+            update(OrderModel)
+            .where(OrderModel.id == order.id)
+            .values(
+                type=order.type,
+                total_price=order.total_price,
+                status=OrderStatus(order.status),
+                updated_at=datetime.now()
             )
-            await self.session.commit()
-            
-            # Não precisamos fazer uma nova consulta, já temos as informações do order
-            return order
-        except Exception as e:
-            await self.session.rollback()
-            raise e
+        )
+        
+        # Não precisamos fazer uma nova consulta, já temos as informações do order
+        return order
     
-    @async_cached(ttl=120, prefix='order')
-    async def list_orders(self, user_id, page: int = 1, page_size: int = 20) -> Dict:
+    @async_cached(ttl=120, prefix='order', tags=('order:user:{user_id}',))
+    async def list_orders(self, user_id, cursor: Optional[str] = None, page_size: int = 20, count: Optional[str] = None) -> Dict:
         """
-        Lista pedidos de um usuário com paginação.
+        Lista pedidos de um usuário com paginação por cursor.
         
         Args:
             user_id: ID do usuário
-            page: Página atual (começa em 1)
+            cursor: Cursor da página anterior (`next_cursor`), None para a primeira página
             page_size: Tamanho da página
+            count: Modo de contagem do total (`exact`, `estimated` ou None para não contar)
             
         Returns:
-            Dict contendo os pedidos paginados e metadados da paginação
+            Dict contendo os pedidos da página e metadados da paginação
         """
-        # Calcula o offset baseado na página
-        offset = (page - 1) * page_size
-        
-        # Consulta para contar o total de registros
-        count_query = select(func.count()).select_from(OrderModel).filter(OrderModel.user_id == user_id)
-        count_result = await self.session.execute(count_query)
-        total_count = count_result.scalar()
+        base_query = ORDER_ROWS.select().where(ORDER_ROWS.c.user_id == user_id)
+        return await self._list_page(base_query, cursor, page_size, count)
         
-        # Consulta para obter os dados paginados
-        query = (
-            select(OrderModel)
-            .filter(OrderModel.user_id == user_id)
-            .order_by(OrderModel.created_at.desc())  # Ordena por data de criação (mais recentes primeiro)
-            .offset(offset)
-            .limit(page_size)
-        )
-        
-        result = await self.session.execute(query)
-        orders = result.scalars().all()
-        
-        if not orders:
-            return {
-                "items": [],
-                "pagination": {
-                    "page": page,
-                    "page_size": page_size,
-                    "total_count": total_count,
-                    "total_pages": (total_count + page_size - 1) // page_size
-                }
-            }
-        
-        order_list = [
-            Order(
-                id=order.id, 
-                user_id=order.user_id, 
-                cart_id=order.cart_id, 
-                type=order.type, 
-                total_price=float(order.total_price), 
-                status=order.status, 
-                created_at=order.created_at, 
-                updated_at=order.updated_at, 
-                offer_id=order.offer_id
-            ) 
-            for order in orders
-        ]
-        
-        return {
-            "items": order_list,
-            "pagination": {
-                "page": page,
-                "page_size": page_size,
-                "total_count": total_count,
-                "total_pages": (total_count + page_size - 1) // page_size
-            }
-        }
-        
-    @async_cached(ttl=60, prefix='order')
-    async def list_all_orders(self, page: int = 1, page_size: int = 50, status: Optional[OrderStatus] = None) -> Dict:
+    @async_cached(ttl=60, prefix='order', tags=('order:all',))
+    async def list_all_orders(self, cursor: Optional[str] = None, page_size: int = 50, status: Optional[OrderStatus] = None, count: Optional[str] = None) -> Dict:
         """
-        Lista todos os pedidos com paginação e filtragem opcional por status.
+        Lista todos os pedidos com paginação por cursor e filtragem opcional por status.
         
         Args:
-            page: Página atual (começa em 1)
+            cursor: Cursor da página anterior (`next_cursor`), None para a primeira página
             page_size: Tamanho da página
             status: Status para filtrar os pedidos (opcional)
+            count: Modo de contagem do total (`exact`, `estimated` ou None para não contar)
             
         Returns:
-            Dict contendo os pedidos paginados e metadados da paginação
+            Dict contendo os pedidos da página e metadados da paginação
         """
-        # Calcula o offset baseado na página
-        offset = (page - 1) * page_size
-        
-        # Prepara a consulta base
-        base_query = select(OrderModel)
-        count_query = select(func.count()).select_from(OrderModel)
+        base_query = ORDER_ROWS.select()
         
         # Aplica filtro por status se fornecido
         if status is not None:
-            base_query = base_query.filter(OrderModel.status == status)
-            count_query = count_query.filter(OrderModel.status == status)
-        
-        # Consulta para contar o total de registros
-        count_result = await self.session.execute(count_query)
-        total_count = count_result.scalar()
+            base_query = base_query.where(ORDER_ROWS.c.status == status)
         
-        # Consulta para obter os dados paginados
-        query = (
-            base_query
-            .order_by(OrderModel.created_at.desc())  # Ordena por data de criação (mais recentes primeiro)
-            .offset(offset)
-            .limit(page_size)
-        )
+        page = await self._list_page(base_query, cursor, page_size, count)
+        page["pagination"]["status_filter"] = status.value if status else None
+        return page
+
+    async def _list_page(self, base_query, cursor: Optional[str], page_size: int, count: Optional[str]) -> Dict:
+        # A contagem só é feita quando solicitada; "estimated" usa as estatísticas do planejador
+        total_count = await count_total(self.session, base_query, count)
         
+        # Pedidos mais recentes primeiro, continuando a partir do cursor (sem OFFSET)
+        query = keyset_page(base_query, ORDER_ROWS.c.created_at, ORDER_ROWS.c.id, cursor, page_size)
         result = await self.session.execute(query)
-        orders = result.scalars().all()
-        
-        if not orders:
-            return {
-                "items": [],
-                "pagination": {
-                    "page": page,
-                    "page_size": page_size,
-                    "total_count": total_count,
-                    "total_pages": (total_count + page_size - 1) // page_size,
-                    "status_filter": status.value if status else None
-                }
-            }
-        
-        order_list = [
-            Order(
-                id=order.id, 
-                user_id=order.user_id, 
-                cart_id=order.cart_id, 
-                type=order.type, 
-                total_price=float(order.total_price), 
-                status=order.status, 
-                created_at=order.created_at, 
-                updated_at=order.updated_at, 
-                offer_id=order.offer_id
-            ) 
-            for order in orders
-        ]
+        rows, next_cursor = build_page(result.all(), page_size)
         
         return {
-            "items": order_list,
-            "pagination": {
-                "page": page,
-                "page_size": page_size,
-                "total_count": total_count,
-                "total_pages": (total_count + page_size - 1) // page_size,
-                "status_filter": status.value if status else None
-            }
+            "items": ORDER_ROWS.to_entities(rows),
+            "pagination": pagination_info(page_size, next_cursor, total_count, count),
         }
 
+    @staticmethod
+    def export_query(status: Optional[OrderStatus] = None, created_from: Optional[datetime] = None, created_to: Optional[datetime] = None):
+        """
+        Consulta das colunas de pedidos para exportação (sem ordenação nem entidades).
+        
+        Args:
+            status: Status para filtrar os pedidos (opcional)
+            created_from: Data de criação inicial, inclusiva (opcional)
+            created_to: Data de criação final, exclusiva (opcional)
+            
+        Returns:
+            Consulta a ser lida com um cursor do lado do servidor ou com COPY
+        """
+        query = select(OrderModel.__table__)
+        if status is not None:
+            query = query.where(OrderModel.status == status)
+        if created_from is not None:
+            query = query.where(OrderModel.created_at >= created_from)
+        if created_to is not None:
+            query = query.where(OrderModel.created_at < created_to)
+        return query
+
     @invalidate_cache(key_prefix='order')
     async def remove_order(self, order_id: UUID) -> UUID:
         # Need to provide user_id for find_order
@@ -230,7 +157,7 @@ class OrderRepository(OrderRepositoryInterface):
             return None
             
         await self.session.delete(order)
-        await self.session.commit()
+        await self.session.flush()
 
         return order.id
         
@@ -239,5 +166,4 @@ class OrderRepository(OrderRepositoryInterface):
         await self.session.execute(
             OrderModel.__table__.delete()
         )
-        await self.session.commit()
         return None
\ No newline at end of file
@@ -1,16 +1,29 @@
+from collections import namedtuple
 from datetime import datetime
+from decimal import Decimal
 from unittest.mock import AsyncMock, MagicMock
 from uuid import uuid4
 
 import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
 
 from domain.__seedwork.test_utils import (async_return, async_side_effect,
                                           run_async)
 from domain.order.order_entity import Order
 from domain.order.order_status_enum import OrderStatus
 from domain.order.order_type_enum import OrderType
+from infrastructure.api.pagination import InvalidCursorError, decode_cursor
 from infrastructure.order.sqlalchemy.order_model import OrderModel
-from infrastructure.order.sqlalchemy.order_repository import OrderRepository
+from infrastructure.order.sqlalchemy.order_repository import (ORDER_ROWS,
+                                                              OrderRepository)
+
+OrderRow = namedtuple("OrderRow", ORDER_ROWS.fields)
+
+
+def order_row(order_model):
+    # Linha do Core com as colunas da tabela, como lida pelo repositório
+    return OrderRow(*(getattr(order_model, name) for name in ORDER_ROWS.fields))
 
 
 @pytest.fixture
@@ -37,12 +50,14 @@ async def test_create_order(order_repository, session):
     
     # Mock the session's async methods
     session.commit = async_return(None)
+    session.flush = async_return(None)
 
     created_order = await order_repository.create_order(order)
 
     # Check that the session methods were called
     assert session.add.called
-    assert session.commit.called
+    assert session.flush.called
+    assert not session.commit.called
     
     # Verifica que refresh NÃO é mais chamado (otimização implementada)
     assert not session.refresh.called
@@ -51,6 +66,15 @@ async def test_create_order(order_repository, session):
     assert created_order is order
     assert created_order.id == order.id
 
+@pytest.mark.asyncio
+async def test_create_order_duplicated_cart(order_repository, session):
+    order = Order(id=uuid4(), user_id=uuid4(), cart_id=uuid4(), offer_id=None, type=OrderType.DELIVERY, total_price=100.00, status=OrderStatus.PENDING, created_at=datetime.now(), updated_at=datetime.now())
+    error = IntegrityError("INSERT INTO tb_orders", {}, Exception('duplicate key value violates unique constraint "uq_orders_cart_id"'))
+    session.flush = AsyncMock(side_effect=error)
+
+    with pytest.raises(ValueError, match=f"Order for cart_id '{order.cart_id}' already exists"):
+        await order_repository.create_order(order)
+
 @pytest.mark.asyncio
 async def test_find_order(order_repository, session):
     order_id = uuid4()
@@ -69,12 +93,31 @@ async def test_find_order(order_repository, session):
     
     # Mock the execute method for the query
     session.execute = async_return(MagicMock())
-    session.execute.return_value.scalars.return_value.first.return_value = order_model
+    session.execute.return_value.first.return_value = order_row(order_model)
 
     found_order = await order_repository.find_order(order_id, user_id)
 
     assert found_order.id == order_id
     assert found_order.user_id == user_id
+    # Consulta fixa do Core, com os valores por parâmetro
+    statement, params = session.execute.await_args[0]
+    assert statement.compile().params == {"order_id": None, "user_id": None}
+    assert params == {"order_id": order_id, "user_id": user_id}
+
+@pytest.mark.asyncio
+async def test_find_order_maps_row_without_revalidating(order_repository, session, monkeypatch):
+    order_model = make_order_models(uuid4(), 1)[0]
+    order_model.total_price = Decimal("10.50")
+    session.execute = async_return(MagicMock())
+    session.execute.return_value.first.return_value = order_row(order_model)
+    monkeypatch.setattr(Order, "validate", MagicMock(side_effect=AssertionError("validate called")))
+
+    found_order = await order_repository.find_order(order_model.id, order_model.user_id)
+
+    assert isinstance(found_order, Order)
+    assert found_order.fields() == {name: getattr(order_model, name) for name in ORDER_ROWS.fields}
+    # Numeric do banco convertido para o float da entidade
+    assert found_order.total_price == 10.5 and isinstance(found_order.total_price, float)
 
 @pytest.mark.asyncio
 async def test_update_order(order_repository, session):
@@ -98,7 +141,7 @@ async def test_update_order(order_repository, session):
 
     # Verify the session methods were called
     assert session.execute.called
-    assert session.commit.called
+    assert not session.commit.called
     
     # Verificar que não estamos fazendo nova consulta após o update
     # e que o objeto retornado é o mesmo que foi passado
@@ -124,6 +167,7 @@ async def test_remove_order(order_repository, session):
     session.execute.return_value.scalars.return_value.first.return_value = order_model
     session.delete = async_return(None)
     session.commit = async_return(None)
+    session.flush = async_return(None)
 
     # Only pass order_id as that's what the actual method expects
     removed_order_id = await order_repository.remove_order(order_id)
@@ -131,7 +175,8 @@ async def test_remove_order(order_repository, session):
     # Verify the session methods were called
     assert session.execute.called
     assert session.delete.called
-    assert session.commit.called
+    assert session.flush.called
+    assert not session.commit.called
     assert removed_order_id == order_id
 
 @pytest.mark.asyncio
@@ -141,7 +186,7 @@ async def test_find_order_without_order_found(order_repository, session):
     
     # Mock the execute method for the query
     session.execute = async_return(MagicMock())
-    session.execute.return_value.scalars.return_value.first.return_value = None
+    session.execute.return_value.first.return_value = None
 
     found_order = await order_repository.find_order(order_id, user_id)
 
@@ -164,7 +209,7 @@ async def test_find_order_by_cart_id(order_repository, session):
     
     # Mock the execute method for the query
     session.execute = async_return(MagicMock())
-    session.execute.return_value.scalars.return_value.first.return_value = order_model
+    session.execute.return_value.first.return_value = order_row(order_model)
 
     found_order = await order_repository.find_order_by_cart_id(cart_id)
 
@@ -176,7 +221,7 @@ async def test_find_order_by_cart_id_without_order_found(order_repository, sessi
     
     # Mock the execute method for the query
     session.execute = async_return(MagicMock())
-    session.execute.return_value.scalars.return_value.first.return_value = None
+    session.execute.return_value.first.return_value = None
 
     found_order = await order_repository.find_order_by_cart_id(cart_id)
 
@@ -199,7 +244,7 @@ async def test_list_orders(order_repository, session):
     
     # Mock para resultado da consulta de dados
     query_result = MagicMock()
-    query_result.scalars.return_value.all.return_value = [order_model]
+    query_result.all.return_value = [order_row(order_model)]
     
     # Mock para resultado da consulta count
     count_result = MagicMock()
@@ -223,9 +268,11 @@ async def test_list_orders(order_repository, session):
     assert "items" in result
     assert "pagination" in result
     assert len(result["items"]) == 1
-    assert result["pagination"]["page"] == 1
     assert result["pagination"]["page_size"] == 20
-    assert result["pagination"]["total_count"] == 1
+    assert result["pagination"]["next_cursor"] is None
+    # Sem contagem por padrão: apenas a consulta da página é executada
+    assert result["pagination"]["total_count"] is None
+    assert len(calls) == 1
 
 @pytest.mark.asyncio
 async def test_list_orders_without_orders(order_repository, session):
@@ -233,7 +280,7 @@ async def test_list_orders_without_orders(order_repository, session):
     
     # Mock para resultado da consulta de dados - vazia
     query_result = MagicMock()
-    query_result.scalars.return_value.all.return_value = []
+    query_result.all.return_value = []
     
     # Mock para resultado da consulta count
     count_result = MagicMock()
@@ -257,9 +304,11 @@ async def test_list_orders_without_orders(order_repository, session):
     assert "items" in result
     assert "pagination" in result
     assert len(result["items"]) == 0
-    assert result["pagination"]["page"] == 1
     assert result["pagination"]["page_size"] == 20
-    assert result["pagination"]["total_count"] == 0
+    assert result["pagination"]["next_cursor"] is None
+    # Sem contagem por padrão: apenas a consulta da página é executada
+    assert result["pagination"]["total_count"] is None
+    assert len(calls) == 1
 
 @pytest.mark.asyncio
 async def test_list_all_orders(order_repository, session):
@@ -277,7 +326,7 @@ async def test_list_all_orders(order_repository, session):
     
     # Mock para resultado da consulta de dados
     query_result = MagicMock()
-    query_result.scalars.return_value.all.return_value = [order_model]
+    query_result.all.return_value = [order_row(order_model)]
     
     # Mock para resultado da consulta count
     count_result = MagicMock()
@@ -301,15 +350,17 @@ async def test_list_all_orders(order_repository, session):
     assert "items" in result
     assert "pagination" in result
     assert len(result["items"]) == 1
-    assert result["pagination"]["page"] == 1
     assert result["pagination"]["page_size"] == 50
-    assert result["pagination"]["total_count"] == 1
+    assert result["pagination"]["next_cursor"] is None
+    # Sem contagem por padrão: apenas a consulta da página é executada
+    assert result["pagination"]["total_count"] is None
+    assert len(calls) == 1
 
 @pytest.mark.asyncio
 async def test_list_all_orders_without_orders(order_repository, session):
     # Mock para resultado da consulta de dados - vazia
     query_result = MagicMock()
-    query_result.scalars.return_value.all.return_value = []
+    query_result.all.return_value = []
     
     # Mock para resultado da consulta count
     count_result = MagicMock()
@@ -333,9 +384,83 @@ async def test_list_all_orders_without_orders(order_repository, session):
     assert "items" in result
     assert "pagination" in result
     assert len(result["items"]) == 0
-    assert result["pagination"]["page"] == 1
     assert result["pagination"]["page_size"] == 50
-    assert result["pagination"]["total_count"] == 0
+    assert result["pagination"]["next_cursor"] is None
+    # Sem contagem por padrão: apenas a consulta da página é executada
+    assert result["pagination"]["total_count"] is None
+    assert len(calls) == 1
+
+def make_order_models(user_id, count):
+    created_at = datetime(2024, 1, 1, 12, 0)
+    return [
+        OrderModel(id=uuid4(), user_id=user_id, cart_id=uuid4(), offer_id=None, type=OrderType.DELIVERY, total_price=10.0, status=OrderStatus.PENDING, created_at=created_at, updated_at=created_at)
+        for _ in range(count)
+    ]
+
+@pytest.mark.asyncio
+async def test_list_orders_keyset_pages(order_repository, session):
+    user_id = uuid4()
+    order_models = make_order_models(user_id, 3)
+    query_result = MagicMock()
+    # page_size + 1 linhas indicam que existe uma próxima página
+    query_result.all.return_value = [order_row(order_model) for order_model in order_models]
+    session.execute = AsyncMock(return_value=query_result)
+
+    result = await order_repository.list_orders(user_id, page_size=2)
+
+    assert [order.id for order in result["items"]] == [order_models[0].id, order_models[1].id]
+    assert decode_cursor(result["pagination"]["next_cursor"]) == (order_models[1].created_at, order_models[1].id)
+    first_page_query = str(session.execute.await_args[0][0])
+    assert "OFFSET" not in first_page_query.upper()
+    assert "ORDER BY tb_orders.created_at DESC, tb_orders.id DESC" in first_page_query
+
+    query_result.all.return_value = [order_row(order_model) for order_model in order_models[2:]]
+    result = await order_repository.list_orders(user_id, cursor=result["pagination"]["next_cursor"], page_size=2)
+
+    assert [order.id for order in result["items"]] == [order_models[2].id]
+    assert result["pagination"]["next_cursor"] is None
+    next_page_query = str(session.execute.await_args[0][0])
+    assert "(tb_orders.created_at, tb_orders.id) < (" in next_page_query
+
+@pytest.mark.asyncio
+async def test_list_orders_invalid_cursor(order_repository, session):
+    session.execute = AsyncMock()
+
+    with pytest.raises(InvalidCursorError):
+        await order_repository.list_orders(uuid4(), cursor="not-a-cursor")
+
+    session.execute.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_list_all_orders_exact_count(order_repository, session):
+    count_result = MagicMock()
+    count_result.scalar.return_value = 7
+    query_result = MagicMock()
+    query_result.all.return_value = []
+    session.execute = AsyncMock(side_effect=[count_result, query_result])
+
+    result = await order_repository.list_all_orders(status=OrderStatus.PENDING, count="exact")
+
+    assert result["pagination"]["total_count"] == 7
+    assert result["pagination"]["count_mode"] == "exact"
+    assert result["pagination"]["status_filter"] == OrderStatus.PENDING.value
+    assert "count(*)" in str(session.execute.await_args_list[0][0][0])
+
+@pytest.mark.asyncio
+async def test_list_all_orders_estimated_count(order_repository, session):
+    explain_result = MagicMock()
+    explain_result.scalar.return_value = [{"Plan": {"Node Type": "Seq Scan", "Plan Rows": 1250000}}]
+    query_result = MagicMock()
+    query_result.all.return_value = []
+    session.execute = AsyncMock(side_effect=[explain_result, query_result])
+
+    result = await order_repository.list_all_orders(count="estimated")
+
+    # O total vem das estatísticas do planejador, sem percorrer a tabela
+    assert result["pagination"]["total_count"] == 1250000
+    assert result["pagination"]["count_mode"] == "estimated"
+    explain = session.execute.await_args_list[0][0][0].compile(dialect=postgresql.dialect())
+    assert str(explain).startswith("EXPLAIN (FORMAT JSON) SELECT")
 
 @pytest.mark.asyncio
 async def test_remove_order_without_order_found(order_repository, session):
@@ -360,7 +485,7 @@ async def test_delete_all_orders(order_repository, session):
 
     # Verify the session methods were called
     assert session.execute.called
-    assert session.commit.called
+    assert not session.commit.called
     assert deleted_orders is None  # delete_all_orders retorna None
 
 @pytest.mark.asyncio
@@ -386,5 +511,5 @@ async def test_update_order_operation_error(order_repository, session):
     with pytest.raises(Exception, match="Database error"):
         await order_repository.update_order(order)
     
-    # Deve chamar rollback após erro
-    session.rollback.assert_called_once()
\ No newline at end of file
+    # O rollback fica com a unidade de trabalho da requisição
+    session.rollback.assert_not_called()
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import (Column, ForeignKey, String,
+from sqlalchemy import (Column, ForeignKey, Index, String,
                         TypeDecorator)
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -49,6 +49,11 @@ class PaymentStatusType(TypeDecorator):
 
 class PaymentModel(Base):
     __tablename__ = 'tb_payments'
+    __table_args__ = (
+        Index('ix_payments_order_id', 'order_id'),
+        # Pagamentos do usuário, paginados pelo id
+        Index('ix_payments_user_id', 'user_id', 'id'),
+    )
 
     id = Column(UUID, primary_key=True)
     user_id = Column(UUID, ForeignKey('tb_users.id'), nullable=False)
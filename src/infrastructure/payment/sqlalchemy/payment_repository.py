@@ -1,125 +1,120 @@
-import asyncio
-from typing import List
+from typing import AsyncIterator, Dict, Optional
 from uuid import UUID
 
-import psycopg2
-from sqlalchemy import update
+from sqlalchemy import bindparam, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from domain.payment.payment_entity import Payment
 from domain.payment.payment_repository_interface import \
     PaymentRepositoryInterface
+from domain.payment.payment_status_enum import PaymentStatus
+from infrastructure.api.pagination import (DEFAULT_PAGE_SIZE, build_id_page,
+                                           id_keyset_page, pagination_info)
+from infrastructure.api.row_mapping import RowMapper
+from infrastructure.api.streaming import stream_scalars
 from infrastructure.payment.sqlalchemy.payment_model import PaymentModel
 
+# Leituras pelas colunas da tabela, direto para a entidade (ver row_mapping)
+PAYMENT_ROWS = RowMapper(Payment, PaymentModel.__table__)
+_FIND_PAYMENT = PAYMENT_ROWS.select().where(PAYMENT_ROWS.c.id == bindparam("payment_id"))
+_FIND_PAYMENT_BY_ORDER_ID = PAYMENT_ROWS.select().where(PAYMENT_ROWS.c.order_id == bindparam("order_id"))
+
 
 class PaymentRepository(PaymentRepositoryInterface):
     def __init__(self, session: AsyncSession):
         self.session = session
 
     async def create_payment(self, payment: Payment) -> Payment:
-        max_retries = 3
-        retries = 0
-
-        while retries < max_retries:
-            try:
-                payment_model = PaymentModel(id=payment.id, user_id=payment.user_id, order_id=payment.order_id, payment_method=payment.payment_method, payment_card_gateway=payment.payment_card_gateway, status=payment.status)
-                self.session.add(payment_model)
-                await self.session.commit()
-                # Evitando a chamada para refresh que causa uma consulta adicional ao banco
-                return payment
-            except psycopg2.errors.DeadlockDetected:
-                await self.session.rollback()
-                retries += 1
-                # Reduzindo o tempo de espera para melhorar throughput
-                await asyncio.sleep(0.1 * retries)  # Linear backoff com tempo menor
-            except Exception as e:
-                await self.session.rollback()
-                raise e
-        raise Exception("Max retries exceeded for create_payment")
+        payment_model = PaymentModel(id=payment.id, user_id=payment.user_id, order_id=payment.order_id, payment_method=payment.payment_method, payment_card_gateway=payment.payment_card_gateway, status=payment.status)
+        self.session.add(payment_model)
+        # O commit (e o rollback em caso de erro) fica com a unidade de trabalho da requisição
+        await self.session.flush()
+        # Evitando a chamada para refresh que causa uma consulta adicional ao banco
+        return payment
 
     async def execute_payment(self, payment: Payment) -> Payment:
-        max_retries = 3
-        retries = 0
-
-        while retries < max_retries:
-            try:
-                query = update(PaymentModel).where(PaymentModel.id == payment.id).values(
-                    payment_method=payment.payment_method,
-                    payment_card_gateway=payment.payment_card_gateway,
-                    status=payment.status
-                )
-                await self.session.execute(query)
-                await self.session.commit()
-                # Já temos todas as informações do payment, não precisamos consultar novamente
-                return payment
-            
-            except psycopg2.errors.DeadlockDetected:
-                await self.session.rollback()
-                retries += 1
-                # Reduzindo o tempo de espera para melhorar throughput
-                await asyncio.sleep(0.1 * retries)  # Linear backoff com tempo menor
-            except Exception as e:
-                await self.session.rollback()
-                raise e
-        raise Exception("Max retries exceeded for execute_payment")
-                
+        query = update(PaymentModel).where(PaymentModel.id == payment.id).values(
+            payment_method=payment.payment_method,
+            payment_card_gateway=payment.payment_card_gateway,
+            status=payment.status
+        )
+        await self.session.execute(query)
+        # Já temos todas as informações do payment, não precisamos consultar novamente
+        return payment
 
     async def find_payment(self, payment_id: UUID) -> Payment:
-        result = await self.session.execute(
-            select(PaymentModel).filter(PaymentModel.id == payment_id)
-        )
-        payment_found = result.scalars().first()
+        result = await self.session.execute(_FIND_PAYMENT, {"payment_id": payment_id})
+        return PAYMENT_ROWS.first(result)
 
-        if payment_found is None:
-            return None
+    async def list_payments(self, user_id: UUID, cursor: Optional[str] = None, page_size: int = DEFAULT_PAGE_SIZE) -> Dict:
+        """
+        Lista pagamentos de um usuário com paginação por cursor (ordenados pelo id).
         
-        return Payment(id=payment_found.id, user_id=payment_found.user_id, order_id=payment_found.order_id, payment_method=payment_found.payment_method, payment_card_gateway=payment_found.payment_card_gateway, status=payment_found.status)	
+        Args:
+            user_id: ID do usuário
+            cursor: Cursor da página anterior (`next_cursor`), None para a primeira página
+            page_size: Tamanho da página
+            
+        Returns:
+            Dict contendo os pagamentos da página e metadados da paginação
+        """
+        return await self._list_page(PAYMENT_ROWS.select().where(PAYMENT_ROWS.c.user_id == user_id), cursor, page_size)
+    
+    async def list_all_payments(self, cursor: Optional[str] = None, page_size: int = DEFAULT_PAGE_SIZE) -> Dict:
+        """
+        Lista todos os pagamentos com paginação por cursor (ordenados pelo id).
+        
+        Args:
+            cursor: Cursor da página anterior (`next_cursor`), None para a primeira página
+            page_size: Tamanho da página
+            
+        Returns:
+            Dict contendo os pagamentos da página e metadados da paginação
+        """
+        return await self._list_page(PAYMENT_ROWS.select(), cursor, page_size)
 
-    async def list_payments(self, user_id: UUID) -> List[Payment]:
-        result = await self.session.execute(
-            select(PaymentModel).filter(PaymentModel.user_id == user_id)
-        )
-        payments_found = result.scalars().all()
+    async def stream_payments(self, user_id: UUID) -> AsyncIterator[Payment]:
+        '''Iterate over the payments of a user with a server-side cursor'''
 
-        if not payments_found:
-            return []
-        
-        return [Payment(id=payment.id, user_id=payment.user_id, order_id=payment.order_id, payment_method=payment.payment_method, payment_card_gateway=payment.payment_card_gateway, status=payment.status) for payment in payments_found]
-    
-    async def list_all_payments(self) -> List[Payment]:
-        result = await self.session.execute(select(PaymentModel))
-        payments_found = result.scalars().all()
+        statement = select(PaymentModel).filter(PaymentModel.user_id == user_id).order_by(PaymentModel.id)
+        async for payment in stream_scalars(self.session, statement):
+            yield self._to_entity(payment)
 
-        if not payments_found:
-            return []
-        
-        return [
-            {
-                "id": payment.id,
-                "user_id": payment.user_id,
-                "order_id": payment.order_id,
-                "payment_method": payment.payment_method,
-                "payment_card_gateway": payment.payment_card_gateway,
-                "status": payment.status
-            }
-            for payment in payments_found
-        ]
+    async def stream_all_payments(self) -> AsyncIterator[Payment]:
+        '''Iterate over every payment with a server-side cursor'''
+
+        async for payment in stream_scalars(self.session, select(PaymentModel).order_by(PaymentModel.id)):
+            yield self._to_entity(payment)
+
+    @staticmethod
+    def export_query(status: Optional[PaymentStatus] = None):
+        '''Columns of the payments for an export, without ordering or entities'''
+
+        query = select(PaymentModel.__table__)
+        if status is not None:
+            query = query.where(PaymentModel.status == status)
+        return query
+
+    async def _list_page(self, base_query, cursor: Optional[str], page_size: int) -> Dict:
+        result = await self.session.execute(id_keyset_page(base_query, PAYMENT_ROWS.c.id, cursor, page_size))
+        rows, next_cursor = build_id_page(result.all(), page_size)
+
+        return {
+            "items": PAYMENT_ROWS.to_entities(rows),
+            "pagination": pagination_info(page_size, next_cursor, None, None),
+        }
+
+    @staticmethod
+    def _to_entity(payment: PaymentModel) -> Payment:
+        return Payment(id=payment.id, user_id=payment.user_id, order_id=payment.order_id, payment_method=payment.payment_method, payment_card_gateway=payment.payment_card_gateway, status=payment.status)
         
     async def delete_all_payments(self) -> None:
         await self.session.execute(
             PaymentModel.__table__.delete()
         )
-        await self.session.commit()
         
     
     async def find_payment_by_order_id(self, order_id: UUID) -> Payment:
-        result = await self.session.execute(
-            select(PaymentModel).filter(PaymentModel.order_id == order_id)
-        )
-        payment_found = result.scalars().first()
-
-        if payment_found is None:
-            return None
-        
-        return Payment(id=payment_found.id, user_id=payment_found.user_id, order_id=payment_found.order_id, payment_method=payment_found.payment_method, payment_card_gateway=payment_found.payment_card_gateway, status=payment_found.status)
\ No newline at end of file
+        result = await self.session.execute(_FIND_PAYMENT_BY_ORDER_ID, {"order_id": order_id})
+        return PAYMENT_ROWS.first(result)
\ No newline at end of file
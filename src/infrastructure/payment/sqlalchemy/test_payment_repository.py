@@ -1,4 +1,5 @@
-from unittest.mock import AsyncMock, MagicMock, patch
+from collections import namedtuple
+from unittest.mock import AsyncMock, MagicMock
 from uuid import uuid4
 
 import psycopg2
@@ -6,15 +7,23 @@ import pytest
 from sqlalchemy import select
 from sqlalchemy.exc import OperationalError
 
-from domain.__seedwork.test_utils import (async_return, async_side_effect,
-                                          run_async)
+from domain.__seedwork.test_utils import (async_iter, async_return,
+                                          async_side_effect, run_async)
 from domain.payment.payment_card_gateway_enum import PaymentCardGateway
 from domain.payment.payment_entity import Payment
 from domain.payment.payment_method_enum import PaymentMethod
 from domain.payment.payment_status_enum import PaymentStatus
+from infrastructure.api.pagination import InvalidCursorError
 from infrastructure.payment.sqlalchemy.payment_model import PaymentModel
-from infrastructure.payment.sqlalchemy.payment_repository import \
-    PaymentRepository
+from infrastructure.payment.sqlalchemy.payment_repository import (
+    PAYMENT_ROWS, PaymentRepository)
+
+PaymentRow = namedtuple("PaymentRow", PAYMENT_ROWS.fields)
+
+
+def payment_row(payment_model):
+    # Linha do Core com as colunas da tabela, como lida pelo repositório
+    return PaymentRow(*(getattr(payment_model, name) for name in PAYMENT_ROWS.fields))
 
 
 @pytest.fixture
@@ -23,11 +32,11 @@ def session():
     mock = MagicMock()
     
     # Configurando o método execute para retornar um resultado assíncrono apropriado
-    # que pode ter scalars().first() ou scalars().all() chamados sobre ele
+    # que pode ter first() ou all() chamados sobre ele
     async def mock_execute(*args, **kwargs):
         execute_result = MagicMock()
-        execute_result.scalars.return_value.first.return_value = None
-        execute_result.scalars.return_value.all.return_value = []
+        execute_result.first.return_value = None
+        execute_result.all.return_value = []
         return execute_result
     
     mock.execute = mock_execute
@@ -59,12 +68,14 @@ async def test_create_payment(payment_repository, session):
     # Configure session methods
     session.add = MagicMock()
     session.commit = AsyncMock()
+    session.flush = AsyncMock()
 
     created_payment = await payment_repository.create_payment(payment)
 
-    # Assert that commit was called after add
+    # O INSERT é enviado com flush; o commit fica com a unidade de trabalho
     session.add.assert_called_once()
-    session.commit.assert_called_once()
+    session.flush.assert_awaited_once()
+    session.commit.assert_not_called()
     
     # Verificar que refresh NÃO foi chamado (otimização implementada)
     assert not session.refresh.called
@@ -96,14 +107,12 @@ async def test_create_payment_deadlock(payment_repository, session):
     # Deve ser usada uma assíncrona
     session.execute = AsyncMock(side_effect=psycopg2.errors.DeadlockDetected("Deadlock detected"))
 
-    # Patch no asyncio.sleep para evitar atrasos reais no teste
-    with patch('asyncio.sleep', return_value=None):
-        # Deve falhar com Max retries após algumas tentativas com deadlock
-        with pytest.raises(Exception, match="Max retries exceeded for execute_payment"):
-            await payment_repository.execute_payment(payment)
+    # O erro é propagado sem novas tentativas: a transação inteira é desfeita pela unidade de trabalho
+    with pytest.raises(psycopg2.errors.DeadlockDetected):
+        await payment_repository.execute_payment(payment)
 
-    # Verificar se rollback foi chamado
-    session.rollback.assert_called()
+    session.execute.assert_awaited_once()
+    session.rollback.assert_not_called()
 
 @pytest.mark.asyncio
 async def test_create_payment_operational_error(payment_repository, session):
@@ -125,81 +134,27 @@ async def test_create_payment_operational_error(payment_repository, session):
     with pytest.raises(OperationalError):
         await payment_repository.execute_payment(payment)
 
-    # Verificar se rollback foi chamado
-    session.rollback.assert_called_once()
-
-@pytest.mark.asyncio
-async def test_execute_payment_deadlock(payment_repository, session):
-    payment_id = uuid4()
-    user_id = uuid4()
-    order_id = uuid4()
-    payment = Payment(
-        id=payment_id,
-        user_id=user_id,
-        order_id=order_id,
-        payment_method=PaymentMethod.CARD,
-        payment_card_gateway=PaymentCardGateway.ADYEN,
-        status=PaymentStatus.PAID
-    )
-    
-    # Configurar execute para sucesso e commit para falhar com deadlock
-    session.execute = AsyncMock(return_value=MagicMock())
-    session.commit = AsyncMock(side_effect=psycopg2.errors.DeadlockDetected("Deadlock detected"))
-
-    with patch('asyncio.sleep', return_value=None):
-        with pytest.raises(Exception, match="Max retries exceeded for execute_payment"):
-            await payment_repository.execute_payment(payment)
-
-    # Verificar que rollback foi chamado após cada tentativa
-    assert session.rollback.called
-
-@pytest.mark.asyncio
-async def test_execute_payment_operational_error(payment_repository, session):
-    payment_id = uuid4()
-    user_id = uuid4()
-    order_id = uuid4()
-    payment = Payment(
-        id=payment_id,
-        user_id=user_id,
-        order_id=order_id,
-        payment_method=PaymentMethod.CARD,
-        payment_card_gateway=PaymentCardGateway.ADYEN,
-        status=PaymentStatus.PAID
-    )
-    
-    # Configure execute para sucesso e commit para falhar com OperationalError
-    session.execute = AsyncMock(return_value=MagicMock())
-    session.commit = AsyncMock(side_effect=OperationalError("Operational error", None, None))
-
-    with pytest.raises(OperationalError):
-        await payment_repository.execute_payment(payment)
-
-    # Verificar que rollback foi chamado após o erro
-    session.rollback.assert_called_once()
+    # O rollback fica com a unidade de trabalho da requisição
+    session.rollback.assert_not_called()
 
 @pytest.mark.asyncio
-async def test_execute_payment_generic_exception(payment_repository, session):
-    payment_id = uuid4()
-    user_id = uuid4()
-    order_id = uuid4()
+async def test_execute_payment(payment_repository, session):
     payment = Payment(
-        id=payment_id,
-        user_id=user_id,
-        order_id=order_id,
+        id=uuid4(),
+        user_id=uuid4(),
+        order_id=uuid4(),
         payment_method=PaymentMethod.CARD,
         payment_card_gateway=PaymentCardGateway.ADYEN,
         status=PaymentStatus.PAID
     )
-    
-    # Configurar execute para sucesso e commit para lançar exceção genérica
     session.execute = AsyncMock(return_value=MagicMock())
-    session.commit = AsyncMock(side_effect=Exception("Generic error"))
 
-    with pytest.raises(Exception, match="Generic error"):
-        await payment_repository.execute_payment(payment)
+    executed_payment = await payment_repository.execute_payment(payment)
 
-    # Verificar que rollback foi chamado após a exceção
-    session.rollback.assert_called_once()
+    # Apenas o UPDATE é enviado, sem commit
+    session.execute.assert_awaited_once()
+    session.commit.assert_not_called()
+    assert executed_payment is payment
 
 @pytest.mark.asyncio
 async def test_find_payment(payment_repository, session):
@@ -216,9 +171,7 @@ async def test_find_payment(payment_repository, session):
     # Configurando mock específico para este teste
     async def mock_execute_with_payment(*args, **kwargs):
         result = MagicMock()
-        scalar_result = MagicMock()
-        scalar_result.first.return_value = payment_model
-        result.scalars.return_value = scalar_result
+        result.first.return_value = payment_row(payment_model)
         return result
     
     # Substituindo o mock padrão pelo específico para este teste
@@ -226,7 +179,7 @@ async def test_find_payment(payment_repository, session):
 
     found_payment = await payment_repository.find_payment(payment_id)
 
-    assert found_payment is not None
+    assert isinstance(found_payment, Payment)
     assert found_payment.id == payment_id
     assert found_payment.user_id == payment_model.user_id
     assert found_payment.order_id == payment_model.order_id
@@ -240,9 +193,7 @@ async def test_find_payment_not_found(payment_repository, session):
     
     # Set up the execute mock result
     execute_result = MagicMock()
-    scalars_result = MagicMock()
-    scalars_result.first.return_value = None
-    execute_result.scalars.return_value = scalars_result
+    execute_result.first.return_value = None
     session.execute.return_value = async_return(execute_result)
 
     found_payment = await payment_repository.find_payment(payment_id)
@@ -264,9 +215,7 @@ async def test_find_payment_by_order_id(payment_repository, session):
     # Configurando mock específico para este teste
     async def mock_execute_with_payment(*args, **kwargs):
         result = MagicMock()
-        scalar_result = MagicMock()
-        scalar_result.first.return_value = payment_model
-        result.scalars.return_value = scalar_result
+        result.first.return_value = payment_row(payment_model)
         return result
     
     # Substituindo o mock padrão pelo específico para este teste
@@ -288,9 +237,7 @@ async def test_find_payment_by_order_id_not_found(payment_repository, session):
     
     # Set up the execute mock result
     execute_result = MagicMock()
-    scalars_result = MagicMock()
-    scalars_result.first.return_value = None
-    execute_result.scalars.return_value = scalars_result
+    execute_result.first.return_value = None
     session.execute.return_value = async_return(execute_result)
 
     found_payment = await payment_repository.find_payment_by_order_id(order_id)
@@ -321,15 +268,13 @@ async def test_list_payments(payment_repository, session):
     # Configurando mock específico para este teste
     async def mock_execute_with_payments(*args, **kwargs):
         result = MagicMock()
-        scalar_result = MagicMock()
-        scalar_result.all.return_value = [payment_model_1, payment_model_2]
-        result.scalars.return_value = scalar_result
+        result.all.return_value = [payment_row(payment_model_1), payment_row(payment_model_2)]
         return result
     
     # Substituindo o mock padrão pelo específico para este teste
     session.execute = mock_execute_with_payments
 
-    payments = await payment_repository.list_payments(user_id)
+    payments = (await payment_repository.list_payments(user_id))["items"]
 
     assert len(payments) == 2
     assert payments[0].id == payment_model_1.id
@@ -341,14 +286,13 @@ async def test_list_payments_empty(payment_repository, session):
     
     # Set up the execute mock result
     execute_result = MagicMock()
-    scalars_result = MagicMock()
-    scalars_result.all.return_value = []
-    execute_result.scalars.return_value = scalars_result
+    execute_result.all.return_value = []
     session.execute.return_value = async_return(execute_result)
 
-    payments = await payment_repository.list_payments(user_id)
+    page = await payment_repository.list_payments(user_id)
 
-    assert payments == []
+    assert page["items"] == []
+    assert page["pagination"]["next_cursor"] is None
 
 @pytest.mark.asyncio
 async def test_list_all_payments(payment_repository, session):
@@ -373,32 +317,52 @@ async def test_list_all_payments(payment_repository, session):
     # Configurando mock específico para este teste
     async def mock_execute_with_payments(*args, **kwargs):
         result = MagicMock()
-        scalar_result = MagicMock()
-        scalar_result.all.return_value = [payment_model_1, payment_model_2]
-        result.scalars.return_value = scalar_result
+        result.all.return_value = [payment_row(payment_model_1), payment_row(payment_model_2)]
         return result
     
     # Substituindo o mock padrão pelo específico para este teste
     session.execute = mock_execute_with_payments
 
-    payments = await payment_repository.list_all_payments()
+    payments = (await payment_repository.list_all_payments())["items"]
 
     assert len(payments) == 2
-    assert payments[0]["id"] == payment_model_1.id  # Note o uso de acesso por índice ["id"] em vez de .id
-    assert payments[1]["id"] == payment_model_2.id
+    assert payments[0].id == payment_model_1.id
+    assert payments[1].id == payment_model_2.id
+    assert payments[1].payment_method == PaymentMethod.CASH
 
 @pytest.mark.asyncio
 async def test_list_all_payments_empty(payment_repository, session):
     # Set up the execute mock result
     execute_result = MagicMock()
-    scalars_result = MagicMock()
-    scalars_result.all.return_value = []
-    execute_result.scalars.return_value = scalars_result
+    execute_result.all.return_value = []
     session.execute.return_value = async_return(execute_result)
 
-    payments = await payment_repository.list_all_payments()
+    page = await payment_repository.list_all_payments()
+
+    assert page["items"] == []
+
+@pytest.mark.asyncio
+async def test_list_all_payments_invalid_cursor(payment_repository, session):
+    with pytest.raises(InvalidCursorError):
+        await payment_repository.list_all_payments(cursor="not-a-cursor")
+
+@pytest.mark.asyncio
+async def test_stream_all_payments(payment_repository, session):
+    payment_model = PaymentModel(
+        id=uuid4(),
+        user_id=uuid4(),
+        order_id=uuid4(),
+        payment_method=PaymentMethod.CARD,
+        payment_card_gateway=PaymentCardGateway.ADYEN,
+        status=PaymentStatus.PAID
+    )
+    session.stream_scalars = async_return(async_iter([payment_model])())
+
+    payments = [payment async for payment in payment_repository.stream_all_payments()]
 
-    assert payments == []
+    assert len(payments) == 1
+    assert payments[0].id == payment_model.id
+    assert payments[0].status == PaymentStatus.PAID
 
 @pytest.mark.asyncio
 async def test_delete_all_payments(payment_repository, session):
@@ -421,37 +385,21 @@ async def test_delete_all_payments(payment_repository, session):
     assert True  # Se chegarmos aqui sem exceção, o teste passou
 
 @pytest.mark.asyncio
-async def test_create_payment_deadlock_shorter_wait(payment_repository, session):
-    payment_id = uuid4()
-    user_id = uuid4()
-    order_id = uuid4()
+async def test_create_payment_flush_error_is_not_retried(payment_repository, session):
     payment = Payment(
-        id=payment_id,
-        user_id=user_id,
-        order_id=order_id,
+        id=uuid4(),
+        user_id=uuid4(),
+        order_id=uuid4(),
         payment_method=PaymentMethod.CARD,
         payment_card_gateway=PaymentCardGateway.ADYEN,
         status=PaymentStatus.PAID
     )
-
-    # Configuração do mock para simular deadlock durante a execução
     session.add = MagicMock()
-    session.commit = AsyncMock(side_effect=psycopg2.errors.DeadlockDetected("Deadlock detected"))
-    
-    # Mock para asyncio.sleep para verificar os valores passados
-    sleep_mock = AsyncMock()
-    
-    # Patch no asyncio.sleep para capturar os tempos de espera
-    with patch('asyncio.sleep', sleep_mock):
-        # Deve falhar com Max retries após algumas tentativas com deadlock
-        with pytest.raises(Exception, match="Max retries exceeded for create_payment"):
-            await payment_repository.create_payment(payment)
-
-    # Verificar que sleep foi chamado com tempos lineares reduzidos
-    # Em vez de exponenciais 2**1=2, 2**2=4, 2**3=8
-    # Agora deve ser 0.1*1=0.1, 0.1*2=0.2, 0.1*3=0.3
-    assert sleep_mock.call_count == 3
-    assert sleep_mock.call_args_list[0][0][0] == 0.1
-    assert sleep_mock.call_args_list[1][0][0] == 0.2
-    # Usando uma comparação com tolerância para evitar problemas de precisão de ponto flutuante
-    assert abs(sleep_mock.call_args_list[2][0][0] - 0.3) < 0.000001
\ No newline at end of file
+    session.flush = AsyncMock(side_effect=psycopg2.errors.DeadlockDetected("Deadlock detected"))
+
+    with pytest.raises(psycopg2.errors.DeadlockDetected):
+        await payment_repository.create_payment(payment)
+
+    session.add.assert_called_once()
+    session.flush.assert_awaited_once()
+    session.rollback.assert_not_called()
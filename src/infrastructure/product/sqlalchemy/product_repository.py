@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import AsyncIterator, Dict, Iterable, List, Optional
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -9,6 +9,9 @@ from domain.product.product_entity import Product
 from domain.product.product_repository_interface import \
     ProductRepositoryInterface
 from infrastructure.api.cache import async_cached, invalidate_cache
+from infrastructure.api.pagination import (DEFAULT_PAGE_SIZE, build_id_page,
+                                           id_keyset_page, pagination_info)
+from infrastructure.api.streaming import stream_scalars
 from infrastructure.product.sqlalchemy.product_model import ProductModel
 from usecases.product.list_products.list_products_dto import ListProductsDto
 
@@ -18,18 +21,19 @@ class ProductRepository(ProductRepositoryInterface):
     def __init__(self, session: AsyncSession):
         self.session: AsyncSession = session
 
-    @invalidate_cache(key_prefix='product')
+    @invalidate_cache(key_prefix='product', tags=('product:list', 'product:{product.id}', 'product:name:{product.name}'))
     async def add_product(self, product: Product) -> ProductModel:
         
         product_model = ProductModel(id=product.id, name=product.name, price=product.price, category=product.category)
         
         self.session.add(product_model)
-        await self.session.commit()
+        await self.session.flush()
         await self.session.refresh(product_model)
         
         return product_model
     
-    @async_cached(ttl=600, prefix='product')  # Cache por 10 minutos
+    # Cache por 10 minutos; até 30 minutos serve o valor obsoleto enquanto recarrega em segundo plano
+    @async_cached(ttl=600, prefix='product', tags=('product:{product_id}',), hard_ttl=1800, refresh_concurrency=8, negative_ttl=30)
     async def find_product(self, product_id: int) -> Optional[Product]:
         
         result = await self.session.execute(select(ProductModel).filter(ProductModel.id == product_id))
@@ -42,7 +46,33 @@ class ProductRepository(ProductRepositoryInterface):
         
         return product
     
-    @async_cached(ttl=600, prefix='product')  # Cache por 10 minutos
+    async def find_products(self, product_ids: Iterable[int]) -> Dict[int, Product]:
+        '''Find several products at once: cache hits are merged with a single IN query for the misses'''
+
+        products: Dict[int, Product] = {}
+        misses = []
+        for product_id in dict.fromkeys(product_ids):
+            hit, product = await self.find_product.peek(product_id=product_id)
+            if not hit:
+                misses.append(product_id)
+            elif product is not None:
+                products[product_id] = product
+
+        if misses:
+            result = await self.session.execute(select(ProductModel).filter(ProductModel.id.in_(misses)))
+            for product_in_db in result.scalars().all():
+                product = Product(id=product_in_db.id, name=product_in_db.name, price=product_in_db.price, category=product_in_db.category)
+                await self.find_product.prime(product, product_id=product.id)
+                products[product.id] = product
+
+            # Também guarda as ausências no cache negativo de find_product
+            for product_id in misses:
+                if product_id not in products:
+                    await self.find_product.prime(None, product_id=product_id)
+
+        return products
+    
+    @async_cached(ttl=600, prefix='product', tags=('product:name:{name}', 'product:{result.id}'))  # Cache por 10 minutos
     async def find_product_by_name(self, name: str) -> Optional[Product]:
         
         result = await self.session.execute(select(ProductModel).filter(ProductModel.name == name))
@@ -55,7 +85,7 @@ class ProductRepository(ProductRepositoryInterface):
         
         return product
     
-    @async_cached(ttl=600, prefix='product')  # Cache por 10 minutos
+    @async_cached(ttl=600, prefix='product', tags=('product:{result.id}',))  # Cache por 10 minutos
     async def find_product_by_code(self, product_code: int) -> Optional[Product]:
         '''Find a product by its code'''
         
@@ -69,7 +99,7 @@ class ProductRepository(ProductRepositoryInterface):
         
     #     return product
     
-    @invalidate_cache(key_prefix='product')
+    @invalidate_cache(key_prefix='product', tags=('product:list', 'product:{product.id}', 'product:name:{product.name}'))
     async def update_product(self, product: Product) -> None:
         
         stmt = select(ProductModel).filter(ProductModel.id == product.id)
@@ -80,28 +110,62 @@ class ProductRepository(ProductRepositoryInterface):
             product_model.name = product.name
             product_model.price = product.price
             product_model.category = product.category
-            await self.session.commit()
+            await self.session.flush()
         
         return None
     
-    @async_cached(ttl=300, prefix='product')  # Cache por 5 minutos
-    async def list_products(self) -> List[Product]:
+    # Cache por 5 minutos; até 15 minutos serve o valor obsoleto enquanto recarrega em segundo plano
+    @async_cached(ttl=300, prefix='product', tags=('product:list',), hard_ttl=900, refresh_concurrency=1)
+    async def list_products(self, cursor: Optional[str] = None, page_size: int = DEFAULT_PAGE_SIZE) -> Dict:
+        """
+        Lista produtos com paginação por cursor (ordenados pelo id).
+        
+        Args:
+            cursor: Cursor da página anterior (`next_cursor`), None para a primeira página
+            page_size: Tamanho da página
+            
+        Returns:
+            Dict contendo os produtos da página e metadados da paginação
+        """
+        result = await self.session.execute(id_keyset_page(select(ProductModel), ProductModel.id, cursor, page_size))
+        products_in_db, next_cursor = build_id_page(result.scalars().all(), page_size)
 
-        result = await self.session.execute(select(ProductModel))
-        products_in_db = result.scalars().all()
+        return self._products_page([self._to_entity(product_in_db) for product_in_db in products_in_db], page_size, next_cursor)
 
-        products = []
+    async def stream_products(self) -> AsyncIterator[Product]:
+        '''Iterate over the whole catalog with a server-side cursor'''
 
-        for product_in_db in products_in_db:
-            category = ProductCategory(product_in_db.category)
-            products.append(Product(id=product_in_db.id, name=product_in_db.name, price=product_in_db.price, category=category))
+        async for product_in_db in stream_scalars(self.session, select(ProductModel).order_by(ProductModel.id)):
+            yield self._to_entity(product_in_db)
+    
+    async def warm_cache(self) -> int:
+        '''Load the whole catalog with a single query and prime the product lookups'''
+
+        result = await self.session.execute(select(ProductModel).order_by(ProductModel.id))
+        products = [self._to_entity(product_in_db) for product_in_db in result.scalars().all()]
+
+        for product in products:
+            await self.find_product.prime(product, product_id=product.id)
+            await self.find_product_by_name.prime(product, name=product.name)
 
-        products_dicts = [product.__dict__ for product in products]
-        products_dto = [ListProductsDto(**product_dict) for product_dict in products_dicts]
+        # Apenas a primeira página da listagem (a chamada sem cursor) é aquecida
+        first_page, next_cursor = build_id_page(products, DEFAULT_PAGE_SIZE)
+        await self.list_products.prime(self._products_page(first_page, DEFAULT_PAGE_SIZE, next_cursor))
 
-        return products_dto
+        return len(products)
+
+    @staticmethod
+    def _to_entity(product_in_db: ProductModel) -> Product:
+        return Product(id=product_in_db.id, name=product_in_db.name, price=product_in_db.price, category=ProductCategory(product_in_db.category))
+
+    @staticmethod
+    def _products_page(products: List[Product], page_size: int, next_cursor: Optional[str]) -> Dict:
+        return {
+            "items": [ListProductsDto(**product.fields()) for product in products],
+            "pagination": pagination_info(page_size, next_cursor, None, None),
+        }
     
-    @invalidate_cache(key_prefix='product')
+    @invalidate_cache(key_prefix='product', tags=('product:list', 'product:{product_id}'))
     async def delete_product(self, product_id: UUID) -> None:
         
         stmt = select(ProductModel).filter(ProductModel.id == product_id)
@@ -110,7 +174,7 @@ class ProductRepository(ProductRepositoryInterface):
         
         if product_model:
             await self.session.delete(product_model)
-            await self.session.commit()
+            await self.session.flush()
         
         return None
     
@@ -125,6 +189,6 @@ class ProductRepository(ProductRepositoryInterface):
             await self.session.delete(product)
             count += 1
         
-        await self.session.commit()
+        await self.session.flush()
         
         return count
\ No newline at end of file
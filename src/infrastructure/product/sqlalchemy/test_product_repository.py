@@ -5,8 +5,8 @@ from uuid import uuid4
 import pytest
 from sqlalchemy import select
 
-from domain.__seedwork.test_utils import (async_return, async_side_effect,
-                                          run_async)
+from domain.__seedwork.test_utils import (async_iter, async_return,
+                                          async_side_effect, run_async)
 from domain.product.product_category_enum import ProductCategory
 from domain.product.product_entity import Product
 from infrastructure.product.sqlalchemy.product_model import ProductModel
@@ -30,6 +30,7 @@ def session():
     
     mock.execute = mock_execute
     mock.commit = async_return(None)
+    mock.flush = async_return(None)
     mock.refresh = async_return(None)
     return mock
 
@@ -59,7 +60,8 @@ async def test_add_product(product_repository, session):
     added_product = await product_repository.add_product(product)
 
     assert session.add.called
-    assert session.commit.called
+    assert session.flush.called
+    assert not session.commit.called
     assert added_product.id == product.id
     assert added_product.name == product.name
     assert added_product.price == product.price
@@ -209,12 +211,45 @@ async def test_list_products(product_repository, session):
     # Replace the session.execute with our custom function
     session.execute = mock_execute_with_products
 
-    products = await product_repository.list_products()
+    products = (await product_repository.list_products())["items"]
 
     assert len(products) == 2
     assert products[0].id == product_model_1.id
     assert products[1].id == product_model_2.id
 
+@pytest.mark.asyncio
+async def test_list_products_caches_each_page(product_repository, session):
+    product_models = [ProductModel(id=id, name=f"Product {id}", price=10.0, category=ProductCategory.BURGER) for id in (1, 2, 3)]
+    queries = []
+
+    async def mock_execute_with_products(statement, *args, **kwargs):
+        queries.append(statement)
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = product_models[:3] if len(queries) == 1 else product_models[2:]
+        return result
+
+    session.execute = mock_execute_with_products
+
+    first_page = await product_repository.list_products(page_size=2)
+    second_page = await product_repository.list_products(cursor=first_page["pagination"]["next_cursor"], page_size=2)
+    await product_repository.list_products(page_size=2)
+
+    assert [product.id for product in first_page["items"]] == [1, 2]
+    assert [product.id for product in second_page["items"]] == [3]
+    assert second_page["pagination"]["next_cursor"] is None
+    # A segunda página continua depois do último id da primeira
+    assert "tb_products.id >" in str(queries[1])
+    assert len(queries) == 2
+
+@pytest.mark.asyncio
+async def test_stream_products(product_repository, session):
+    product_models = [ProductModel(id=1, name="Product A", price=10.0, category=ProductCategory.BURGER)]
+    session.stream_scalars = async_return(async_iter(product_models)())
+
+    products = [product async for product in product_repository.stream_products()]
+
+    assert [product.name for product in products] == ["Product A"]
+
 @pytest.mark.asyncio
 async def test_delete_product(product_repository, session):
     product_id = uuid4()
@@ -239,7 +274,8 @@ async def test_delete_product(product_repository, session):
 
     # Agora podemos verificar se os métodos foram chamados
     assert session.delete.called
-    assert session.commit.called
+    assert session.flush.called
+    assert not session.commit.called
 
 @pytest.mark.asyncio
 async def test_delete_all_products_success(product_repository, session):
@@ -259,6 +295,7 @@ async def test_delete_all_products_success(product_repository, session):
     session.execute = mock_execute_with_products
     session.delete = AsyncMock()
     session.commit = AsyncMock()
+    session.flush = AsyncMock()
 
     # Executar o método
     result = await product_repository.delete_all_products()
@@ -267,5 +304,62 @@ async def test_delete_all_products_success(product_repository, session):
     assert result == 2
     # Verificar que session.delete foi chamado duas vezes (uma para cada produto)
     assert session.delete.call_count == 2
-    # Verificar que session.commit foi chamado uma vez
-    assert session.commit.call_count == 1
\ No newline at end of file
+    # Verificar que as remoções foram enviadas com um único flush, sem commit
+    assert session.flush.call_count == 1
+    assert session.commit.call_count == 0
+@pytest.mark.asyncio
+async def test_warm_cache(product_repository, session):
+    product_models = [
+        ProductModel(id=1, name="Product A", price=10.0, category=ProductCategory.BURGER),
+        ProductModel(id=2, name="Product B", price=5.0, category=ProductCategory.DRINK),
+    ]
+    queries = []
+
+    async def mock_execute_with_products(*args, **kwargs):
+        queries.append(args)
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = product_models
+        return result
+
+    session.execute = mock_execute_with_products
+
+    assert await product_repository.warm_cache() == 2
+
+    # As consultas seguintes são servidas pelo cache aquecido
+    found_product = await product_repository.find_product(2)
+    found_by_name = await product_repository.find_product_by_name("Product A")
+    page = await product_repository.list_products()
+
+    assert len(queries) == 1
+    assert found_product.name == "Product B"
+    assert found_by_name.id == 1
+    assert [product.id for product in page["items"]] == [1, 2]
+    assert page["pagination"]["next_cursor"] is None
+
+@pytest.mark.asyncio
+async def test_find_products_merges_cache_hits_with_one_query(product_repository, session):
+    cached_product = Product(id=1, name="Product A", price=10.0, category=ProductCategory.BURGER)
+    await product_repository.find_product.prime(cached_product, product_id=1)
+    queries = []
+
+    async def mock_execute_with_products(statement, *args, **kwargs):
+        queries.append(statement)
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = [
+            ProductModel(id=2, name="Product B", price=5.0, category=ProductCategory.DRINK),
+        ]
+        return result
+
+    session.execute = mock_execute_with_products
+
+    products = await product_repository.find_products([1, 2, 3, 2])
+
+    assert products == {1: cached_product, 2: products[2]}
+    assert products[2].name == "Product B"
+    assert len(queries) == 1
+    assert "IN" in str(queries[0])
+
+    # Encontrados e ausentes ficam no cache de find_product
+    assert await product_repository.find_products([2, 3]) == {2: products[2]}
+    assert await product_repository.find_product(3) is None
+    assert len(queries) == 1
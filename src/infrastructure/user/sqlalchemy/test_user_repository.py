@@ -1,15 +1,25 @@
+from collections import namedtuple
 from unittest.mock import AsyncMock, MagicMock
 from uuid import uuid4
 
 import pytest
 from sqlalchemy import select
 
-from domain.__seedwork.test_utils import (async_return, async_side_effect,
-                                          run_async)
+from domain.__seedwork.test_utils import (async_iter, async_return,
+                                          async_side_effect, run_async)
 from domain.user.user_entity import User
 from domain.user.user_gender_enum import UserGender
+from infrastructure.api.pagination import encode_id_cursor
 from infrastructure.user.sqlalchemy.user_model import UserModel
-from infrastructure.user.sqlalchemy.user_repository import UserRepository
+from infrastructure.user.sqlalchemy.user_repository import (USER_ROWS,
+                                                            UserRepository)
+
+UserRow = namedtuple("UserRow", USER_ROWS.fields)
+
+
+def user_row(user_model):
+    # Linha do Core com as colunas da tabela, como lida pelo repositório
+    return UserRow(*(getattr(user_model, name) for name in USER_ROWS.fields))
 
 
 @pytest.fixture
@@ -24,10 +34,13 @@ def session():
         scalar_result.first.return_value = None
         scalar_result.all.return_value = []
         result.scalars.return_value = scalar_result
+        result.first.return_value = None
+        result.all.return_value = []
         return result
     
     mock.execute = mock_execute
     mock.commit = AsyncMock()
+    mock.flush = AsyncMock()
     mock.refresh = AsyncMock()
     return mock
 
@@ -51,9 +64,7 @@ async def test_find_user(user_repository, session):
     # Configure a proper async function for this test
     async def mock_execute_with_user(*args, **kwargs):
         result = MagicMock()
-        scalar_result = MagicMock()
-        scalar_result.first.return_value = user_model
-        result.scalars.return_value = scalar_result
+        result.first.return_value = user_row(user_model)
         return result
     
     # Replace the session execute method
@@ -75,9 +86,7 @@ async def test_find_user_not_found(user_repository, session):
     
     # Set up the execute mock result
     execute_result = MagicMock()
-    scalars_result = MagicMock()
-    scalars_result.first.return_value = None
-    execute_result.scalars.return_value = scalars_result
+    execute_result.first.return_value = None
     session.execute.return_value = async_return(execute_result)
 
     with pytest.raises(ValueError, match=f"User with id '{user_id}' not found"):
@@ -100,9 +109,7 @@ async def test_find_user_by_email(user_repository, session):
     # Configure a proper async function for this test
     async def mock_execute_with_user(*args, **kwargs):
         result = MagicMock()
-        scalar_result = MagicMock()
-        scalar_result.first.return_value = user_model
-        result.scalars.return_value = scalar_result
+        result.first.return_value = user_row(user_model)
         return result
     
     # Replace the session execute method
@@ -124,9 +131,7 @@ async def test_find_user_by_email_not_found(user_repository, session):
     
     # Set up the execute mock result
     execute_result = MagicMock()
-    scalars_result = MagicMock()
-    scalars_result.first.return_value = None
-    execute_result.scalars.return_value = scalars_result
+    execute_result.first.return_value = None
     session.execute.return_value = async_return(execute_result)
 
     found_user = await user_repository.find_user_by_email(email)
@@ -157,32 +162,59 @@ async def test_list_users(user_repository, session):
     # Configurar mock assíncrono correto para este teste
     async def mock_execute_with_users(*args, **kwargs):
         result = MagicMock()
-        scalar_result = MagicMock()
-        scalar_result.all.return_value = [user_model_1, user_model_2]
-        result.scalars.return_value = scalar_result
+        result.all.return_value = [user_row(user_model_1), user_row(user_model_2)]
         return result
     
     # Substituir session.execute pelo nosso mock personalizado
     session.execute = mock_execute_with_users
 
-    users = await user_repository.list_users()
+    page = await user_repository.list_users()
+    users = page["items"]
 
     assert len(users) == 2
     assert users[0].id == user_model_1.id
     assert users[1].id == user_model_2.id
+    assert page["pagination"]["next_cursor"] is None
 
 @pytest.mark.asyncio
 async def test_list_users_empty(user_repository, session):
     # Set up the execute mock result
     execute_result = MagicMock()
-    scalars_result = MagicMock()
-    scalars_result.all.return_value = []
-    execute_result.scalars.return_value = scalars_result
+    execute_result.all.return_value = []
     session.execute.return_value = async_return(execute_result)
 
-    users = await user_repository.list_users()
+    page = await user_repository.list_users()
+
+    assert page["items"] == []
+    assert page["pagination"]["next_cursor"] is None
+
+@pytest.mark.asyncio
+async def test_list_users_from_cursor(user_repository, session):
+    statements = []
+
+    async def mock_execute(statement, *args, **kwargs):
+        statements.append(statement)
+        result = MagicMock()
+        result.all.return_value = []
+        return result
+
+    session.execute = mock_execute
+    last_user_id = uuid4()
+
+    await user_repository.list_users(cursor=encode_id_cursor(last_user_id), page_size=10)
 
-    assert users is None
+    compiled = statements[0].compile()
+    assert "tb_users.id >" in str(compiled)
+    assert last_user_id in compiled.params.values()
+
+@pytest.mark.asyncio
+async def test_stream_users(user_repository, session):
+    user_model = UserModel(id=uuid4(), name="John Doe", email="john.doe@example.com", age=30, gender=UserGender.MALE, phone_number="1234567890", password="password")
+    session.stream_scalars = async_return(async_iter([user_model])())
+
+    users = [user async for user in user_repository.stream_users()]
+
+    assert [user.email for user in users] == ["john.doe@example.com"]
 
 @pytest.mark.asyncio
 async def test_update_user(user_repository, session):
@@ -209,7 +241,8 @@ async def test_update_user(user_repository, session):
 
     # Verificar se os métodos AsyncMock foram chamados
     assert session.execute.called
-    assert session.commit.called
+    assert session.flush.called
+    assert not session.commit.called
 
 @pytest.mark.asyncio
 async def test_delete_user(user_repository, session):
@@ -246,4 +279,27 @@ async def test_delete_user(user_repository, session):
 
     # Verificar que os métodos foram chamados corretamente
     session.delete.assert_awaited_once_with(user_model)
-    session.commit.assert_awaited_once()
\ No newline at end of file
+    session.flush.assert_awaited_once()
+    session.commit.assert_not_awaited()
+@pytest.mark.asyncio
+async def test_warm_cache(user_repository, session):
+    user_id = uuid4()
+    user_model = UserModel(
+        id=user_id,
+        name="John Doe",
+        email="john.doe@example.com",
+        age=30,
+        gender=UserGender.MALE,
+        phone_number="1234567890",
+        password="password"
+    )
+    session.execute = AsyncMock(return_value=MagicMock())
+    session.execute.return_value.scalars.return_value.all.return_value = [user_model]
+
+    assert await user_repository.warm_cache(limit=100) == 1
+
+    found_user = await user_repository.find_user(user_id)
+
+    assert found_user.id == user_id
+    assert session.execute.await_count == 1
+    assert "LIMIT" in str(session.execute.await_args[0][0])
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, TypeDecorator
+from sqlalchemy import Column, Index, Integer, String, TypeDecorator
 from sqlalchemy.dialects.postgresql import UUID
 
 from domain.user.user_gender_enum import UserGender
@@ -20,6 +20,7 @@ class UserGenderType(TypeDecorator):
 
 class UserModel(Base):
     __tablename__ = "tb_users"
+    __table_args__ = (Index("ix_users_email", "email"),)
 
     id = Column(UUID, primary_key=True, index=True)
     name = Column(String, nullable=False)
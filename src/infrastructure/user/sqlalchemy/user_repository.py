@@ -1,78 +1,116 @@
-from typing import List, Optional
+from typing import AsyncIterator, Dict, Optional
 from uuid import UUID
 
+from sqlalchemy import bindparam, desc, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from domain.user.user_entity import User
 from domain.user.user_repository_interface import UserRepositoryInterface
-from infrastructure.api.cache import async_cached
+from infrastructure.api.cache import async_cached, invalidate_cache
+from infrastructure.api.pagination import (DEFAULT_PAGE_SIZE, build_id_page,
+                                           id_keyset_page, pagination_info)
+from infrastructure.api.row_mapping import RowMapper
+from infrastructure.api.streaming import stream_scalars
+from infrastructure.order.sqlalchemy.order_model import OrderModel
 from infrastructure.user.sqlalchemy.user_model import UserModel
 
+# Leituras pelas colunas da tabela, direto para a entidade (ver row_mapping)
+USER_ROWS = RowMapper(User, UserModel.__table__)
+_FIND_USER = USER_ROWS.select().where(USER_ROWS.c.id == bindparam("user_id"))
+_FIND_USER_BY_EMAIL = USER_ROWS.select().where(USER_ROWS.c.email == bindparam("email"))
+
 
 class UserRepository(UserRepositoryInterface):
 
     def __init__(self, session: AsyncSession):
         self.session: AsyncSession = session
 
+    @invalidate_cache(key_prefix='user', tags=('user:{user.id}',))
     async def add_user(self, user: User) -> User:
 
         user_model = UserModel(id=user.id, name=user.name, email=user.email, age=user.age, gender=user.gender, phone_number=user.phone_number, password=user.password)
 
         self.session.add(user_model)
-        await self.session.commit()
+        await self.session.flush()
         await self.session.refresh(user_model)
 
         return User(id=user_model.id, name=user_model.name, email=user_model.email, age=user_model.age, gender=user_model.gender, phone_number=user_model.phone_number, password=user_model.password)
 
-    @async_cached(ttl=600, prefix='user')
+    @async_cached(ttl=600, prefix='user', tags=('user:{user_id}',), negative_ttl=30, negative_exceptions=(ValueError,))
     async def find_user(self, user_id: UUID) -> User:
 
-        result = await self.session.execute(select(UserModel).filter(UserModel.id == user_id))
-        user_in_db = result.scalars().first()
+        result = await self.session.execute(_FIND_USER, {"user_id": user_id})
+        user = USER_ROWS.first(result)
         
-        if not user_in_db:
+        if not user:
             raise ValueError(f"User with id '{user_id}' not found")
-        
-        user = User(id=user_in_db.id, name=user_in_db.name, email=user_in_db.email, age=user_in_db.age, gender=user_in_db.gender, phone_number=user_in_db.phone_number, password=user_in_db.password)
 
         return user
     
+    async def warm_cache(self, limit: int) -> int:
+        '''Load the users with the most recent orders with a single query and prime the user lookups'''
+
+        recent_users = (
+            select(OrderModel.user_id, func.max(OrderModel.updated_at).label("last_activity"))
+            .group_by(OrderModel.user_id)
+            .order_by(desc("last_activity"))
+            .limit(limit)
+            .subquery()
+        )
+        result = await self.session.execute(select(UserModel).join(recent_users, UserModel.id == recent_users.c.user_id))
+
+        count = 0
+        for user_in_db in result.scalars().all():
+            user = User(id=user_in_db.id, name=user_in_db.name, email=user_in_db.email, age=user_in_db.age, gender=user_in_db.gender, phone_number=user_in_db.phone_number, password=user_in_db.password)
+            await self.find_user.prime(user, user_id=user.id)
+            count += 1
+
+        return count
+    
     async def find_user_by_email(self, email: str) -> Optional[User]:
 
-        result = await self.session.execute(select(UserModel).filter(UserModel.email == email))
-        user_in_db = result.scalars().first()
-        
-        if not user_in_db:
-            return None
-       
-        user = User(id=user_in_db.id, name=user_in_db.name, email=user_in_db.email, age=user_in_db.age, gender=user_in_db.gender, phone_number=user_in_db.phone_number, password=user_in_db.password)
-
-        return user
-
-    async def list_users(self) -> Optional[List[User]]:
-
-        result = await self.session.execute(select(UserModel))
-        users_in_db = result.scalars().all()
+        result = await self.session.execute(_FIND_USER_BY_EMAIL, {"email": email})
+        return USER_ROWS.first(result)
 
-        if not users_in_db:
-            return None
-
-        users = []
+    async def list_users(self, cursor: Optional[str] = None, page_size: int = DEFAULT_PAGE_SIZE) -> Dict:
+        """
+        Lista usuários com paginação por cursor (ordenados pelo id).
         
-        for user_in_db in users_in_db:
-            users.append(User(
-                id=user_in_db.id, 
-                name=user_in_db.name, 
-                email=user_in_db.email, 
-                age=user_in_db.age,
-                gender=user_in_db.gender,
-                phone_number=user_in_db.phone_number, 
-                password=user_in_db.password
-            ))
-
-        return users
-
+        Args:
+            cursor: Cursor da página anterior (`next_cursor`), None para a primeira página
+            page_size: Tamanho da página
+            
+        Returns:
+            Dict contendo os usuários da página e metadados da paginação
+        """
+        result = await self.session.execute(id_keyset_page(USER_ROWS.select(), USER_ROWS.c.id, cursor, page_size))
+        rows, next_cursor = build_id_page(result.all(), page_size)
+
+        return {
+            "items": USER_ROWS.to_entities(rows),
+            "pagination": pagination_info(page_size, next_cursor, None, None),
+        }
+
+    async def stream_users(self) -> AsyncIterator[User]:
+        '''Iterate over every user with a server-side cursor'''
+
+        async for user_in_db in stream_scalars(self.session, select(UserModel).order_by(UserModel.id)):
+            yield self._to_entity(user_in_db)
+
+    @staticmethod
+    def _to_entity(user_in_db: UserModel) -> User:
+        return User(
+            id=user_in_db.id, 
+            name=user_in_db.name, 
+            email=user_in_db.email, 
+            age=user_in_db.age,
+            gender=user_in_db.gender,
+            phone_number=user_in_db.phone_number, 
+            password=user_in_db.password
+        )
+
+    @invalidate_cache(key_prefix='user', tags=('user:{user.id}',))
     async def update_user(self, user: User) -> None:
 
         stmt = select(UserModel).filter(UserModel.id == user.id)
@@ -86,10 +124,11 @@ class UserRepository(UserRepositoryInterface):
             user_model.gender = user.gender
             user_model.phone_number = user.phone_number
             user_model.password = user.password
-            await self.session.commit()
+            await self.session.flush()
 
         return None
     
+    @invalidate_cache(key_prefix='user', tags=('user:{user_id}',))
     async def delete_user(self, user_id: UUID) -> None:
         
         stmt = select(UserModel).filter(UserModel.id == user_id)
@@ -98,7 +137,7 @@ class UserRepository(UserRepositoryInterface):
         
         if user_model:
             await self.session.delete(user_model)
-            await self.session.commit()
+            await self.session.flush()
 
         return None
     
@@ -19,6 +19,7 @@ def cart_repository():
 def cart_item_repository():
     repo = Mock()
     repo.add_item = AsyncMock()
+    repo.add_items = AsyncMock()
     repo.find_item = AsyncMock()
     repo.find_items_by_cart_id = AsyncMock()
     repo.update_item = AsyncMock()
@@ -44,6 +45,7 @@ def product_repository():
     repo = Mock()
     repo.add_product = AsyncMock()
     repo.find_product = AsyncMock()
+    repo.find_products = AsyncMock()
     repo.find_product_by_name = AsyncMock()
     repo.update_product = AsyncMock()
     repo.list_products = AsyncMock()
@@ -39,15 +39,22 @@ class AddCartUseCase(UseCaseInterface):
 
         product_list = []
 
-        # validating if all products exists
+        # O mesmo produto repetido no pedido vira um único item (um por produto no carrinho)
+        quantities = {}
         for item in input.items:
-            product_found = await self.product_repository.find_product(product_id=item.product_id)
+            quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+
+        # validating if all products exists (one bulk lookup for the whole cart)
+        products_found = await self.product_repository.find_products(product_ids=list(quantities))
+
+        for product_id, quantity in quantities.items():
+            product_found = products_found.get(product_id)
 
             if not product_found:
-                raise ValueError(f"Product with code '{item.product_id}' not found")
+                raise ValueError(f"Product with code '{product_id}' not found")
             
-            total_price += product_found.price * item.quantity
-            product_list.append(ProductAndQuantity(product=product_found, quantity=item.quantity))
+            total_price += product_found.price * quantity
+            product_list.append(ProductAndQuantity(product=product_found, quantity=quantity))
 
 
         # creating cart
@@ -55,11 +62,14 @@ class AddCartUseCase(UseCaseInterface):
 
         cart = Cart(id=cart_id, user_id=user_id, total_price=total_price)
 
+        # cart and items are persisted in the same transaction
         await self.cart_repository.add_cart(cart=cart)
 
         # adding items to cart
-        for product in product_list:
-            await self.cart_item_repository.add_item(cart_item=CartItem(id=uuid.uuid4(), cart_id=cart_id, product_id=product.product.id, quantity=product.quantity))
+        await self.cart_item_repository.add_items(cart_items=[
+            CartItem(id=uuid.uuid4(), cart_id=cart_id, product_id=product.product.id, quantity=product.quantity)
+            for product in product_list
+        ])
         
         return AddCartOutputDto(id=cart.id, user_id=cart.user_id, total_price=cart.total_price)
     
\ No newline at end of file
@@ -25,7 +25,7 @@ def cart_repository():
 @pytest.fixture
 def cart_item_repository():
     repo = Mock()
-    repo.add_item = AsyncMock()
+    repo.add_items = AsyncMock()
     return repo
 
 @pytest.fixture
@@ -37,7 +37,7 @@ def user_repository():
 @pytest.fixture
 def product_repository():
     repo = Mock()
-    repo.find_product = AsyncMock()
+    repo.find_products = AsyncMock()
     return repo
 
 @pytest.fixture
@@ -54,7 +54,7 @@ async def test_add_cart_success(add_cart_usecase, cart_repository, cart_item_rep
     product = Product(id=product_id, name="Test Product", price=100.0, category=ProductCategory.SIDE_DISH)
     
     user_repository.find_user = async_return(user)
-    product_repository.find_product = async_return(product)
+    product_repository.find_products = async_return({product_id: product})
     
     input_dto = AddCartInputDto(items=[CartItemDto(product_id=product_id, quantity=2)])
     
@@ -66,13 +66,40 @@ async def test_add_cart_success(add_cart_usecase, cart_repository, cart_item_rep
     
     # Verificar que os métodos foram chamados com os parâmetros corretos
     user_repository.find_user.assert_awaited_once_with(user_id=user_id)
-    product_repository.find_product.assert_awaited_once_with(product_id=product_id)
+    product_repository.find_products.assert_awaited_once_with(product_ids=[product_id])
     
     # Usar assert_called com verificação de cart para add_cart
     # Uma vez que o objeto cart é criado internamente, podemos verificar apenas se foi chamado
     assert cart_repository.add_cart.await_count == 1
-    # Verificar se add_item foi chamado com os parâmetros corretos
-    assert cart_item_repository.add_item.await_count >= 1
+    # Itens gravados com um único INSERT
+    cart_item_repository.add_items.assert_awaited_once()
+    cart_items = cart_item_repository.add_items.await_args.kwargs["cart_items"]
+    assert [(item.product_id, item.quantity) for item in cart_items] == [(product_id, 2)]
+
+@pytest.mark.asyncio
+async def test_add_cart_merges_duplicated_products(add_cart_usecase, cart_item_repository, user_repository, product_repository):
+    user_id = uuid.uuid4()
+    user = User(id=user_id, name="Test User", email="test@example.com", age=25, gender=UserGender.MALE, phone_number="1234567890", password="password")
+    products = {
+        1: Product(id=1, name="Burger", price=10.0, category=ProductCategory.BURGER),
+        2: Product(id=2, name="Fries", price=5.0, category=ProductCategory.SIDE_DISH),
+    }
+    user_repository.find_user = async_return(user)
+    product_repository.find_products = async_return(products)
+
+    # O mesmo produto listado duas vezes (um item por produto no carrinho: uq_cart_items_cart_product)
+    input_dto = AddCartInputDto(items=[
+        CartItemDto(product_id=1, quantity=2),
+        CartItemDto(product_id=2, quantity=1),
+        CartItemDto(product_id=1, quantity=3),
+    ])
+
+    output_dto = await add_cart_usecase.execute(user_id=user_id, input=input_dto)
+
+    assert output_dto.total_price == 55.0
+    product_repository.find_products.assert_awaited_once_with(product_ids=[1, 2])
+    cart_items = cart_item_repository.add_items.await_args.kwargs["cart_items"]
+    assert [(item.product_id, item.quantity) for item in cart_items] == [(1, 5), (2, 1)]
 
 @pytest.mark.asyncio
 async def test_add_cart_user_not_found(add_cart_usecase, user_repository):
@@ -95,7 +122,7 @@ async def test_add_cart_product_not_found(add_cart_usecase, user_repository, pro
     user = User(id=user_id, name="Test User", email="test@example.com", age=age, gender=gender, phone_number="1234567890", password="password")
     
     user_repository.find_user = async_return(user)
-    product_repository.find_product = async_return(None)
+    product_repository.find_products = async_return({})
     
     input_dto = AddCartInputDto(items=[CartItemDto(product_id=product_id, quantity=2)])
     
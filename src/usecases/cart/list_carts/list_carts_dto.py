@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel
@@ -6,6 +6,8 @@ from pydantic import BaseModel
 
 class ListCartsInputDto(BaseModel):
     user_id: UUID
+    cursor: Optional[str] = None
+    page_size: int = 100
 
 class ListCartsDto(BaseModel):
     id: UUID
@@ -13,4 +15,5 @@ class ListCartsDto(BaseModel):
     total_price: float
 
 class ListCartsOutputDto(BaseModel):
-    carts: List[ListCartsDto]
\ No newline at end of file
+    carts: List[ListCartsDto]
+    next_cursor: Optional[str] = None
\ No newline at end of file
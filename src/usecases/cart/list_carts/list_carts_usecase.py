@@ -1,3 +1,5 @@
+from typing import AsyncIterator
+
 from domain.__seedwork.use_case_interface import UseCaseInterface
 from domain.cart.cart_repository_interface import CartRepositoryInterface
 from usecases.cart.list_carts.list_carts_dto import (ListCartsDto,
@@ -11,11 +13,16 @@ class ListCartsUseCase(UseCaseInterface):
 
     async def execute(self, input: ListCartsInputDto) -> ListCartsOutputDto:
 
-        list_carts_found = await self.cart_repository.list_carts(user_id=input.user_id)
+        result = await self.cart_repository.list_carts(user_id=input.user_id, cursor=input.cursor, page_size=input.page_size)
 
-        if not list_carts_found:
+        # Uma página vazia após um cursor válido apenas indica o fim da listagem
+        if not result or (not result["items"] and input.cursor is None):
             raise ValueError("No carts found")
         
-        list_carts_dto = [ListCartsDto(id=cart.id, user_id=cart.user_id, total_price=cart.total_price) for cart in list_carts_found]
+        list_carts_dto = [ListCartsDto(id=cart.id, user_id=cart.user_id, total_price=cart.total_price) for cart in result["items"]]
         
-        return ListCartsOutputDto(carts=list_carts_dto)
\ No newline at end of file
+        return ListCartsOutputDto(carts=list_carts_dto, next_cursor=result["pagination"]["next_cursor"])
+
+    async def stream(self, input: ListCartsInputDto) -> AsyncIterator[ListCartsDto]:
+        async for cart in self.cart_repository.stream_carts(user_id=input.user_id):
+            yield ListCartsDto(id=cart.id, user_id=cart.user_id, total_price=cart.total_price)
\ No newline at end of file
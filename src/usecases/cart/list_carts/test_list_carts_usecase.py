@@ -3,8 +3,8 @@ from uuid import uuid4
 
 import pytest
 
-from domain.__seedwork.test_utils import (async_return, async_side_effect,
-                                          run_async)
+from domain.__seedwork.test_utils import (async_iter, async_return,
+                                          async_side_effect, run_async)
 from domain.cart.cart_entity import Cart
 from usecases.cart.list_carts.list_carts_dto import (ListCartsInputDto,
                                                      ListCartsOutputDto)
@@ -27,7 +27,7 @@ async def test_list_carts_success(list_carts_usecase, cart_repository):
         Cart(id=cart_id, user_id=user_id, total_price=100.0),
         Cart(id=uuid4(), user_id=user_id, total_price=200.0)
     ]
-    cart_repository.list_carts = async_return(carts)
+    cart_repository.list_carts = async_return({"items": carts, "pagination": {"page_size": 100, "next_cursor": None, "total_count": None, "count_mode": None}})
     
     input_dto = ListCartsInputDto(user_id=user_id)
     
@@ -38,12 +38,12 @@ async def test_list_carts_success(list_carts_usecase, cart_repository):
     assert output_dto.carts[0].id == cart_id
     assert output_dto.carts[0].total_price == 100.0
     assert output_dto.carts[1].total_price == 200.0
-    cart_repository.list_carts.assert_awaited_once_with(user_id=user_id)
+    cart_repository.list_carts.assert_awaited_once_with(user_id=user_id, cursor=None, page_size=100)
 
 @pytest.mark.asyncio
 async def test_list_carts_empty(list_carts_usecase, cart_repository):
     user_id = uuid4()
-    cart_repository.list_carts = async_return(None)
+    cart_repository.list_carts = async_return({"items": [], "pagination": {"page_size": 100, "next_cursor": None, "total_count": None, "count_mode": None}})
     
     input_dto = ListCartsInputDto(user_id=user_id)
     
@@ -51,4 +51,24 @@ async def test_list_carts_empty(list_carts_usecase, cart_repository):
         # Substituindo run_async por await
         await list_carts_usecase.execute(input=input_dto)
     assert str(excinfo.value) == "No carts found"
-    cart_repository.list_carts.assert_awaited_once_with(user_id=user_id)
\ No newline at end of file
+    cart_repository.list_carts.assert_awaited_once_with(user_id=user_id, cursor=None, page_size=100)
+
+@pytest.mark.asyncio
+async def test_list_carts_last_page_empty(list_carts_usecase, cart_repository):
+    user_id = uuid4()
+    cart_repository.list_carts = async_return({"items": [], "pagination": {"page_size": 100, "next_cursor": None, "total_count": None, "count_mode": None}})
+
+    # Depois da última página a listagem apenas termina
+    output_dto = await list_carts_usecase.execute(input=ListCartsInputDto(user_id=user_id, cursor="abc"))
+
+    assert output_dto.carts == []
+    assert output_dto.next_cursor is None
+
+@pytest.mark.asyncio
+async def test_stream_carts(list_carts_usecase, cart_repository):
+    user_id = uuid4()
+    cart_repository.stream_carts = async_iter([Cart(id=uuid4(), user_id=user_id, total_price=100.0)])
+
+    carts = [cart_dto async for cart_dto in list_carts_usecase.stream(input=ListCartsInputDto(user_id=user_id))]
+
+    assert [cart_dto.total_price for cart_dto in carts] == [100.0]
@@ -3,11 +3,11 @@ from unittest.mock import AsyncMock, Mock, patch
 from uuid import uuid4
 
 import pytest
+from fastapi.responses import JSONResponse
 
 from domain.__seedwork.test_utils import (async_return, async_side_effect,
                                           run_async)
 from domain.cart.cart_entity import Cart
-from domain.cart_item.cart_item_entity import CartItem
 from domain.product.product_category_enum import ProductCategory
 from domain.product.product_entity import Product
 from usecases.cart.update_cart.update_cart_dto import (UpdateCartInputDto,
@@ -20,7 +20,8 @@ from usecases.cart.update_cart.update_cart_usecase import UpdateCartUseCase
 def cart_repository():
     repo = Mock()
     repo.find_cart = AsyncMock()
-    repo.find_items_by_cart_id = AsyncMock()
+    repo.update_cart_total = AsyncMock()
+    repo.remove_cart = AsyncMock()
     return repo
 
 @pytest.fixture
@@ -46,18 +47,12 @@ async def test_update_cart_success(update_cart_usecase, cart_repository, cart_it
     
     cart = Cart(id=cart_id, user_id=user_id, total_price=0.0)
     
-    # Criar um item de carrinho para evitar o erro "Cart items not found for this cart"
-    cart_item = CartItem(id=uuid4(), cart_id=cart_id, product_id=product_id, quantity=1)
-    
     cart_repository.find_cart = async_return(cart)
-    product_repository.find_product = async_return(product)
-    cart_item_repository.find_items_by_cart_id = async_return([cart_item])
-    cart_repository.update_cart = async_return(Cart(id=cart_id, user_id=user_id, total_price=product_price))
-    cart_item_repository.update_item = async_return(cart_item)
+    product_repository.find_products = async_return({product_id: product})
+    cart_repository.update_cart_total = async_return((Cart(id=cart_id, user_id=user_id, total_price=product_price), 1))
     
     input_dto = UpdateCartInputDto(items=[UpdateCartItemDto(product_id=product_id, quantity=1)])
     
-    # Substituindo run_async por await
     output_dto = await update_cart_usecase.execute(user_id=user_id, cart_id=cart_id, input=input_dto)
     
     assert output_dto.id == cart_id
@@ -65,8 +60,8 @@ async def test_update_cart_success(update_cart_usecase, cart_repository, cart_it
     assert output_dto.total_price == product_price
     
     assert cart_repository.find_cart.called
-    assert cart_item_repository.find_items_by_cart_id.called
-    assert cart_repository.update_cart.called
+    cart_repository.update_cart_total.assert_awaited_once_with(cart_id=cart_id)
+    cart_repository.remove_cart.assert_not_awaited()
 
 @pytest.mark.asyncio
 async def test_update_cart_cart_not_found(update_cart_usecase, cart_repository):
@@ -77,26 +72,100 @@ async def test_update_cart_cart_not_found(update_cart_usecase, cart_repository):
     input_dto = UpdateCartInputDto(items=[UpdateCartItemDto(product_id=product_id, quantity=1)])
     
     with pytest.raises(ValueError) as excinfo:
-        # Substituindo run_async por await
         await update_cart_usecase.execute(user_id=user_id, cart_id=cart_id, input=input_dto)
     
     assert str(excinfo.value) == f"Cart not found"
     cart_repository.find_cart.assert_awaited_once()
 
 @pytest.mark.asyncio
-async def test_update_cart_items_not_found(update_cart_usecase, cart_repository, cart_item_repository):
+async def test_update_cart_applies_changes_in_one_batch(update_cart_usecase, cart_repository, cart_item_repository, product_repository):
     user_id = uuid4()
     cart_id = uuid4()
-    product_id = random.randint(1,10)
-    cart = Cart(id=cart_id, user_id=user_id, total_price=0.0)
-    cart_repository.find_cart = async_return(cart)
-    cart_item_repository.find_items_by_cart_id = async_return([])
-    input_dto = UpdateCartInputDto(items=[UpdateCartItemDto(product_id=product_id, quantity=1)])
-    
+    products = {product_id: Product(id=product_id, name=f"Product {product_id}", price=10.0, category=ProductCategory.BURGER) for product_id in range(1, 51)}
+
+    cart_repository.find_cart = async_return(Cart(id=cart_id, user_id=user_id, total_price=30.0))
+    product_repository.find_products = async_return(products)
+    cart_repository.update_cart_total = async_return((Cart(id=cart_id, user_id=user_id, total_price=490.0), 49))
+
+    items = [UpdateCartItemDto(product_id=product_id, quantity=1) for product_id in range(1, 51)]
+    # o produto 1 é removido (a última quantidade enviada prevalece)
+    items.append(UpdateCartItemDto(product_id=1, quantity=0))
+    output_dto = await update_cart_usecase.execute(user_id=user_id, cart_id=cart_id, input=UpdateCartInputDto(items=items))
+
+    assert output_dto.total_price == 490.0
+    product_repository.find_products.assert_awaited_once_with(product_ids=list(range(1, 51)))
+    product_repository.find_product.assert_not_awaited()
+
+    cart_item_repository.apply_changes.assert_awaited_once()
+    changes = cart_item_repository.apply_changes.await_args.kwargs
+    assert changes["cart_id"] == cart_id
+    assert [(item.product_id, item.quantity) for item in changes["upserts"]] == [(product_id, 1) for product_id in range(2, 51)]
+    assert changes["removed_product_ids"] == [1]
+    cart_item_repository.add_item.assert_not_awaited()
+    cart_item_repository.update_item.assert_not_awaited()
+    cart_item_repository.remove_item.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_update_cart_removes_empty_cart(update_cart_usecase, cart_repository, cart_item_repository, product_repository):
+    user_id = uuid4()
+    cart_id = uuid4()
+    product = Product(id=1, name="Burger", price=30.0, category=ProductCategory.BURGER)
+    cart_repository.find_cart = async_return(Cart(id=cart_id, user_id=user_id, total_price=30.0))
+    product_repository.find_products = async_return({product.id: product})
+    cart_item_repository.apply_changes = async_return(1)
+    cart_repository.update_cart_total = async_return((Cart(id=cart_id, user_id=user_id, total_price=0.0), 0))
+
+    input_dto = UpdateCartInputDto(items=[UpdateCartItemDto(product_id=product.id, quantity=0)])
+    output = await update_cart_usecase.execute(user_id=user_id, cart_id=cart_id, input=input_dto)
+
+    assert isinstance(output, JSONResponse)
+    cart_repository.remove_cart.assert_awaited_once_with(cart_id=cart_id)
+
+@pytest.mark.asyncio
+async def test_update_cart_items_not_found(update_cart_usecase, cart_repository, cart_item_repository, product_repository):
+    user_id = uuid4()
+    cart_id = uuid4()
+    product = Product(id=1, name="Burger", price=30.0, category=ProductCategory.BURGER)
+    cart_repository.find_cart = async_return(Cart(id=cart_id, user_id=user_id, total_price=0.0))
+    product_repository.find_products = async_return({product.id: product})
+    # carrinho sem itens: nada foi removido e nenhum item restou
+    cart_item_repository.apply_changes = async_return(0)
+    cart_repository.update_cart_total = async_return((Cart(id=cart_id, user_id=user_id, total_price=0.0), 0))
+
+    input_dto = UpdateCartInputDto(items=[UpdateCartItemDto(product_id=product.id, quantity=0)])
     with pytest.raises(ValueError) as excinfo:
-        # Substituindo run_async por await
         await update_cart_usecase.execute(user_id=user_id, cart_id=cart_id, input=input_dto)
-    
-    assert str(excinfo.value) == f"Cart items not found for this cart"
-    cart_repository.find_cart.assert_awaited_once()
-    cart_item_repository.find_items_by_cart_id.assert_awaited_once()
\ No newline at end of file
+
+    assert str(excinfo.value) == "Cart items not found for this cart"
+    cart_repository.remove_cart.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_update_cart_fills_empty_cart(update_cart_usecase, cart_repository, cart_item_repository, product_repository):
+    user_id = uuid4()
+    cart_id = uuid4()
+    product = Product(id=1, name="Burger", price=30.0, category=ProductCategory.BURGER)
+    cart_repository.find_cart = async_return(Cart(id=cart_id, user_id=user_id, total_price=0.0))
+    product_repository.find_products = async_return({product.id: product})
+    cart_item_repository.apply_changes = async_return(0)
+    cart_repository.update_cart_total = async_return((Cart(id=cart_id, user_id=user_id, total_price=60.0), 1))
+
+    input_dto = UpdateCartInputDto(items=[UpdateCartItemDto(product_id=product.id, quantity=2)])
+    output_dto = await update_cart_usecase.execute(user_id=user_id, cart_id=cart_id, input=input_dto)
+
+    # os itens enviados são incluídos no carrinho vazio
+    assert output_dto.total_price == 60.0
+    cart_repository.remove_cart.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_update_cart_product_not_found(update_cart_usecase, cart_repository, cart_item_repository, product_repository):
+    user_id = uuid4()
+    cart_id = uuid4()
+    cart_repository.find_cart = async_return(Cart(id=cart_id, user_id=user_id, total_price=0.0))
+    product_repository.find_products = async_return({})
+    input_dto = UpdateCartInputDto(items=[UpdateCartItemDto(product_id=99, quantity=1)])
+
+    with pytest.raises(ValueError) as excinfo:
+        await update_cart_usecase.execute(user_id=user_id, cart_id=cart_id, input=input_dto)
+
+    assert str(excinfo.value) == "Product with code '99' not found"
+    cart_item_repository.apply_changes.assert_not_awaited()
@@ -4,7 +4,6 @@ from uuid import UUID
 from fastapi.responses import JSONResponse
 
 from domain.__seedwork.use_case_interface import UseCaseInterface
-from domain.cart.cart_entity import Cart
 from domain.cart.cart_repository_interface import CartRepositoryInterface
 from domain.cart_item.cart_item_entity import CartItem
 from domain.cart_item.cart_item_repository_interface import \
@@ -13,8 +12,6 @@ from domain.product.product_repository_interface import \
     ProductRepositoryInterface
 from usecases.cart.update_cart.update_cart_dto import (UpdateCartInputDto,
                                                        UpdateCartOutputDto)
-from usecases.product.find_product.find_product_validation import \
-    FindProductValidation
 
 
 class UpdateCartUseCase(UseCaseInterface):
@@ -31,45 +28,32 @@ class UpdateCartUseCase(UseCaseInterface):
         if not cart_found:
             raise ValueError("Cart not found")
         
-        cart_items_found = await self.cart_item_repository.find_items_by_cart_id(cart_id=cart_id)
-
-        if not cart_items_found:
+        # a última quantidade enviada para um produto prevalece
+        quantities = {item.product_id: item.quantity for item in input.items}
+
+        # validando se os produtos enviados existem (busca em lote)
+        products_found = await self.product_repository.find_products(product_ids=list(quantities))
+        for product_id in quantities:
+            if product_id not in products_found:
+                raise ValueError(f"Product with code '{product_id}' not found")
+
+        # aplica o diff do carrinho em lote: upsert das quantidades e remoção das zeradas
+        upserts = [
+            CartItem(id=uuid.uuid4(), cart_id=cart_id, product_id=product_id, quantity=quantity)
+            for product_id, quantity in quantities.items() if quantity != 0
+        ]
+        removed_product_ids = [product_id for product_id, quantity in quantities.items() if quantity == 0]
+        removed_items = await self.cart_item_repository.apply_changes(cart_id=cart_id, upserts=upserts, removed_product_ids=removed_product_ids)
+
+        # total recalculado no banco, junto com a quantidade de itens restantes
+        updated_cart, items_count = await self.cart_repository.update_cart_total(cart_id=cart_id)
+
+        # o carrinho já estava vazio e continua vazio: não havia itens para atualizar
+        if not items_count and not removed_items:
             raise ValueError("Cart items not found for this cart")
 
-
-        # validando se os produtos enviados existem
-        find_product_validation = FindProductValidation(product_repository=self.product_repository)
-        for item in input.items:
-            product_exists = await find_product_validation.validate_product_exists(product_id=item.product_id)
-            if not product_exists:
-                raise ValueError(f"Product with code '{item.product_id}' not found")
-
-        new_cart_items = []
-        for item in input.items:
-            cart_item = next((cart_item for cart_item in cart_items_found if cart_item.product_id == item.product_id), None)
-
-            if cart_item:
-                if item.quantity == 0:
-                    await self.cart_item_repository.remove_item(item_id=cart_item.id)
-                else:
-                    cart_item.quantity = item.quantity
-                    await self.cart_item_repository.update_item(item=cart_item)
-            else:
-                cart_item = CartItem(id=uuid.uuid4(), cart_id=cart_id, product_id=item.product_id, quantity=item.quantity)
-                await self.cart_item_repository.add_item(cart_item=cart_item)
-                new_cart_items.append(cart_item)
-
-        cart_items_found_after_update = await self.cart_item_repository.find_items_by_cart_id(cart_id=cart_id)
-
-        if not cart_items_found_after_update:
+        if not items_count:
             await self.cart_repository.remove_cart(cart_id=cart_id)
             return JSONResponse(content={"message": "All items were removed from cart. Cart was removed."}, status_code=200)
 
-        total_price = 0
-        for cart_item in cart_items_found_after_update:
-            product = await self.product_repository.find_product(product_id=cart_item.product_id)
-            total_price += cart_item.quantity * product.price
-
-        updated_cart = await self.cart_repository.update_cart(cart=Cart(id=cart_id, user_id=user_id, total_price=total_price))
-
         return UpdateCartOutputDto(id=updated_cart.id, user_id=updated_cart.user_id, total_price=updated_cart.total_price)
\ No newline at end of file
@@ -1,11 +1,12 @@
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel
 
 
-# class ListItemsInputDto(BaseModel):
-#     id: UUID
+class ListItemsInputDto(BaseModel):
+    cursor: Optional[str] = None
+    page_size: int = 100
 
 class ListItemsDto(BaseModel):
     id: UUID
@@ -14,4 +15,5 @@ class ListItemsDto(BaseModel):
     quantity: int
 
 class ListItemsOutputDto(BaseModel):
-    items: List[ListItemsDto]
\ No newline at end of file
+    items: List[ListItemsDto]
+    next_cursor: Optional[str] = None
\ No newline at end of file
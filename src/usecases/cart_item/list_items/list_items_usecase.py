@@ -1,7 +1,10 @@
+from typing import AsyncIterator
+
 from domain.__seedwork.use_case_interface import UseCaseInterface
 from domain.cart_item.cart_item_repository_interface import \
     CartItemRepositoryInterface
 from usecases.cart_item.list_items.list_items_dto import (ListItemsDto,
+                                                          ListItemsInputDto,
                                                           ListItemsOutputDto)
 
 
@@ -9,10 +12,14 @@ class ListItemsUseCase(UseCaseInterface):
     def __init__(self, cart_item_repository: CartItemRepositoryInterface):
         self.cart_item_repository = cart_item_repository
 
-    async def execute(self) -> ListItemsOutputDto:
-        
-        items = await self.cart_item_repository.list_items()
+    async def execute(self, input: ListItemsInputDto = None) -> ListItemsOutputDto:
+        input = input or ListItemsInputDto()
+        result = await self.cart_item_repository.list_items(cursor=input.cursor, page_size=input.page_size)
+
+        list_items = [ListItemsDto(id=item.id, cart_id=item.cart_id, product_id=item.product_id, quantity=item.quantity) for item in result["items"]]
 
-        list_items = [ListItemsDto(id=item.id, cart_id=item.cart_id, product_id=item.product_id, quantity=item.quantity) for item in items]
+        return ListItemsOutputDto(items=list_items, next_cursor=result["pagination"]["next_cursor"])
 
-        return ListItemsOutputDto(items=list_items)
\ No newline at end of file
+    async def stream(self) -> AsyncIterator[ListItemsDto]:
+        async for item in self.cart_item_repository.stream_items():
+            yield ListItemsDto(id=item.id, cart_id=item.cart_id, product_id=item.product_id, quantity=item.quantity)
\ No newline at end of file
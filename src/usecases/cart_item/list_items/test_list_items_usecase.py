@@ -4,8 +4,8 @@ from uuid import uuid4
 
 import pytest
 
-from domain.__seedwork.test_utils import (async_return, async_side_effect,
-                                          run_async)
+from domain.__seedwork.test_utils import (async_iter, async_return,
+                                          async_side_effect, run_async)
 from domain.cart_item.cart_item_entity import CartItem
 from usecases.cart_item.list_items.list_items_usecase import ListItemsUseCase
 
@@ -26,7 +26,7 @@ async def test_list_items_success(list_items_usecase, cart_item_repository):
         CartItem(id=uuid4(), cart_id=cart_id, product_id=product_id, quantity=2),
         CartItem(id=uuid4(), cart_id=cart_id, product_id=product_id, quantity=3)
     ]
-    cart_item_repository.list_items = async_return(cart_items)
+    cart_item_repository.list_items = async_return({"items": cart_items, "pagination": {"page_size": 100, "next_cursor": "next", "total_count": None, "count_mode": None}})
     
     # Substituindo run_async por await
     output_dto = await list_items_usecase.execute()
@@ -34,14 +34,24 @@ async def test_list_items_success(list_items_usecase, cart_item_repository):
     assert len(output_dto.items) == 2
     assert output_dto.items[0].quantity == 2
     assert output_dto.items[1].quantity == 3
-    cart_item_repository.list_items.assert_awaited_once_with()
+    assert output_dto.next_cursor == "next"
+    cart_item_repository.list_items.assert_awaited_once_with(cursor=None, page_size=100)
 
 @pytest.mark.asyncio
 async def test_list_items_empty(list_items_usecase, cart_item_repository):
-    cart_item_repository.list_items = async_return([])
+    cart_item_repository.list_items = async_return({"items": [], "pagination": {"page_size": 100, "next_cursor": None, "total_count": None, "count_mode": None}})
     
     # Substituindo run_async por await
     output_dto = await list_items_usecase.execute()
     
     assert len(output_dto.items) == 0
-    cart_item_repository.list_items.assert_awaited_once_with()
\ No newline at end of file
+    cart_item_repository.list_items.assert_awaited_once_with(cursor=None, page_size=100)
+
+@pytest.mark.asyncio
+async def test_stream_items(list_items_usecase, cart_item_repository):
+    cart_item = CartItem(id=uuid4(), cart_id=uuid4(), product_id=1, quantity=2)
+    cart_item_repository.stream_items = async_iter([cart_item])
+
+    items = [item_dto async for item_dto in list_items_usecase.stream()]
+
+    assert [item_dto.id for item_dto in items] == [cart_item.id]
@@ -15,7 +15,7 @@ class UpdateItemUseCase(UseCaseInterface):
         if cart_item is None:
             raise ValueError(f"Cart item with id '{cart_item_id}' not found")
 
-        cart_item.quantity = input.quantity
+        cart_item = cart_item.evolve(quantity=input.quantity)
 
         await self.cart_item_repository.update_item(item=cart_item)
 
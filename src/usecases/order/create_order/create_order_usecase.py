@@ -52,6 +52,7 @@ class CreateOrderUseCase(UseCaseInterface):
         if not cart:
             raise ValueError(f"Cart with id '{input.cart_id}' not found")
 
+        total_price = cart.total_price
         if input.offer_id is not None:
             offer = await self.offer_repository.find_offer(offer_id=input.offer_id)
             # offer_data = requests.get(f"http://localhost:8000/offer/{input.offer_id}").json()
@@ -68,9 +69,9 @@ class CreateOrderUseCase(UseCaseInterface):
             if not offer:
                 raise ValueError(f"Offer with id '{input.offer_id}' not found")
         
-            cart.total_price = offer.apply_discount(cart.total_price)
+            total_price = offer.apply_discount(total_price)
 
-        order = Order(id=uuid.uuid4(), user_id=user_id, cart_id=input.cart_id, total_price=cart.total_price, type=input.type, status=OrderStatus.PENDING, created_at=datetime.now(), updated_at=datetime.now(), offer_id=input.offer_id)
+        order = Order(id=uuid.uuid4(), user_id=user_id, cart_id=input.cart_id, total_price=total_price, type=input.type, status=OrderStatus.PENDING, created_at=datetime.now(), updated_at=datetime.now(), offer_id=input.offer_id)
 
         created_order: Order = await self.order_repository.create_order(order=order)
 
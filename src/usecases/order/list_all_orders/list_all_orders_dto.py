@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel
@@ -8,6 +8,12 @@ from domain.order.order_status_enum import OrderStatus
 from domain.order.order_type_enum import OrderType
 
 
+class ListAllOrdersInputDto(BaseModel):
+    cursor: Optional[str] = None
+    page_size: int = 50
+    status: Optional[OrderStatus] = None
+    count: Optional[str] = None
+
 class ListAllOrderDto(BaseModel):
     id: UUID
     user_id: UUID
@@ -20,4 +26,6 @@ class ListAllOrderDto(BaseModel):
     updated_at: datetime
 
 class ListAllOrdersOutputDto(BaseModel):
-    orders: List[ListAllOrderDto]
\ No newline at end of file
+    orders: List[ListAllOrderDto]
+    next_cursor: Optional[str] = None
+    total_count: Optional[int] = None
@@ -1,32 +1,38 @@
 from domain.__seedwork.use_case_interface import UseCaseInterface
 from domain.order.order_repository_interface import OrderRepositoryInterface
 from usecases.order.list_all_orders.list_all_orders_dto import (
-    ListAllOrderDto, ListAllOrdersOutputDto)
+    ListAllOrderDto, ListAllOrdersInputDto, ListAllOrdersOutputDto)
 
 
 class ListAllOrdersUseCase(UseCaseInterface):
     def __init__(self, order_repository: OrderRepositoryInterface):
         self.order_repository = order_repository
 
-    async def execute(self) -> ListAllOrdersOutputDto:
-        result = await self.order_repository.list_all_orders()
+    async def execute(self, input: ListAllOrdersInputDto = None) -> ListAllOrdersOutputDto:
+        input = input or ListAllOrdersInputDto()
+        result = await self.order_repository.list_all_orders(cursor=input.cursor, page_size=input.page_size, status=input.status, count=input.count)
 
-        if result is None or 'items' not in result or not result['items']:
+        if result is None or 'items' not in result:
             return ListAllOrdersOutputDto(orders=[])
 
         # Agora extraímos a lista de orders do campo 'items' do dicionário
         orders = result['items']
+        pagination = result.get('pagination', {})
         
-        return ListAllOrdersOutputDto(orders=[
-            ListAllOrderDto(
-                id=order.id, 
-                user_id=order.user_id, 
-                type=order.type, 
-                cart_id=order.cart_id, 
-                offer_id=order.offer_id, 
-                total_price=order.total_price, 
-                status=order.status, 
-                created_at=order.created_at, 
-                updated_at=order.updated_at
-            ) for order in orders
-        ])
\ No newline at end of file
+        return ListAllOrdersOutputDto(
+            orders=[
+                ListAllOrderDto(
+                    id=order.id, 
+                    user_id=order.user_id, 
+                    type=order.type, 
+                    cart_id=order.cart_id, 
+                    offer_id=order.offer_id, 
+                    total_price=order.total_price, 
+                    status=order.status, 
+                    created_at=order.created_at, 
+                    updated_at=order.updated_at
+                ) for order in orders
+            ],
+            next_cursor=pagination.get('next_cursor'),
+            total_count=pagination.get('total_count'),
+        )
\ No newline at end of file
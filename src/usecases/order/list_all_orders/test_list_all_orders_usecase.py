@@ -10,6 +10,8 @@ from domain.__seedwork.test_utils import (async_return, async_side_effect,
 from domain.order.order_entity import Order
 from domain.order.order_status_enum import OrderStatus
 from domain.order.order_type_enum import OrderType
+from usecases.order.list_all_orders.list_all_orders_dto import \
+    ListAllOrdersInputDto
 from usecases.order.list_all_orders.list_all_orders_usecase import \
     ListAllOrdersUseCase
 
@@ -76,3 +78,15 @@ async def test_list_all_orders_none(list_all_orders_usecase, order_repository):
     
     assert len(output_dto.orders) == 0
     order_repository.list_all_orders.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_list_all_orders_forwards_pagination(list_all_orders_usecase, order_repository):
+    order_repository.list_all_orders = AsyncMock(return_value={
+        "items": [],
+        "pagination": {"page_size": 10, "next_cursor": "next", "total_count": None, "count_mode": None, "status_filter": OrderStatus.PENDING.value}
+    })
+
+    output_dto = await list_all_orders_usecase.execute(input=ListAllOrdersInputDto(cursor="abc", page_size=10, status=OrderStatus.PENDING))
+
+    order_repository.list_all_orders.assert_awaited_once_with(cursor="abc", page_size=10, status=OrderStatus.PENDING, count=None)
+    assert output_dto.next_cursor == "next"
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel
@@ -10,6 +10,9 @@ from domain.order.order_type_enum import OrderType
 
 class ListOrdersInputDto(BaseModel):
     user_id: UUID
+    cursor: Optional[str] = None
+    page_size: int = 20
+    count: Optional[str] = None
 
 class ListOrderDto(BaseModel):
     id: UUID
@@ -23,4 +26,6 @@ class ListOrderDto(BaseModel):
     updated_at: datetime
 
 class ListOrdersOutputDto(BaseModel):
-    orders: List[ListOrderDto]
\ No newline at end of file
+    orders: List[ListOrderDto]
+    next_cursor: Optional[str] = None
+    total_count: Optional[int] = None
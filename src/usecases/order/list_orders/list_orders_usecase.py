@@ -11,9 +11,16 @@ class ListOrdersUseCase(UseCaseInterface):
 
     async def execute(self, input: ListOrdersInputDto) -> ListOrdersOutputDto:
 
-        orders = await self.order_repository.list_orders(user_id=input.user_id)
+        result = await self.order_repository.list_orders(user_id=input.user_id, cursor=input.cursor, page_size=input.page_size, count=input.count)
 
-        if not orders:
+        if not result:
             return ListOrdersOutputDto(orders=[])
+
+        orders = result['items']
+        pagination = result.get('pagination', {})
         
-        return ListOrdersOutputDto(orders=[ListOrderDto(id=order.id, user_id=order.user_id, type=order.type, cart_id=order.cart_id, total_price=order.total_price, status=order.status, created_at=order.created_at, updated_at=order.updated_at, offer_id=order.offer_id) for order in orders])
\ No newline at end of file
+        return ListOrdersOutputDto(
+            orders=[ListOrderDto(id=order.id, user_id=order.user_id, type=order.type, cart_id=order.cart_id, total_price=order.total_price, status=order.status, created_at=order.created_at, updated_at=order.updated_at, offer_id=order.offer_id) for order in orders],
+            next_cursor=pagination.get('next_cursor'),
+            total_count=pagination.get('total_count'),
+        )
\ No newline at end of file
@@ -29,7 +29,10 @@ async def test_list_orders_success(list_orders_usecase, order_repository):
     user_id = uuid4()
     order_id = uuid4()
     order = Order(id=order_id, user_id=user_id, cart_id=uuid4(), total_price=100.0, type=OrderType.IN_STORE, status=OrderStatus.PENDING, created_at=datetime.now(), updated_at=datetime.now(), offer_id=random.randint(1,100))
-    order_repository.list_orders = async_return([order])
+    order_repository.list_orders = async_return({
+        "items": [order],
+        "pagination": {"page_size": 20, "next_cursor": "next", "total_count": None, "count_mode": None}
+    })
     
     input_dto = ListOrdersInputDto(user_id=user_id)
     
@@ -40,16 +43,34 @@ async def test_list_orders_success(list_orders_usecase, order_repository):
     assert output_dto.orders[0].user_id == user_id
     assert output_dto.orders[0].type == OrderType.IN_STORE
     assert output_dto.orders[0].status == OrderStatus.PENDING
+    assert output_dto.next_cursor == "next"
     order_repository.list_orders.await_count == 1
 
 @pytest.mark.asyncio
 async def test_list_orders_empty(list_orders_usecase, order_repository):
     user_id = uuid4()
-    order_repository.list_orders = async_return([])
+    order_repository.list_orders = async_return({
+        "items": [],
+        "pagination": {"page_size": 20, "next_cursor": None, "total_count": 0, "count_mode": "exact"}
+    })
     
     input_dto = ListOrdersInputDto(user_id=user_id)
     
     output_dto = await list_orders_usecase.execute(input=input_dto)
     
     assert len(output_dto.orders) == 0
-    order_repository.list_orders.await_count == 1
\ No newline at end of file
+    assert output_dto.total_count == 0
+    order_repository.list_orders.await_count == 1
+
+@pytest.mark.asyncio
+async def test_list_orders_forwards_pagination(list_orders_usecase, order_repository):
+    user_id = uuid4()
+    order_repository.list_orders = AsyncMock(return_value={
+        "items": [],
+        "pagination": {"page_size": 5, "next_cursor": None, "total_count": 42, "count_mode": "estimated"}
+    })
+
+    output_dto = await list_orders_usecase.execute(input=ListOrdersInputDto(user_id=user_id, cursor="abc", page_size=5, count="estimated"))
+
+    order_repository.list_orders.assert_awaited_once_with(user_id=user_id, cursor="abc", page_size=5, count="estimated")
+    assert output_dto.total_count == 42
\ No newline at end of file
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel
@@ -8,6 +8,10 @@ from domain.payment.payment_method_enum import PaymentMethod
 from domain.payment.payment_status_enum import PaymentStatus
 
 
+class ListAllPaymentsInputDto(BaseModel):
+    cursor: Optional[str] = None
+    page_size: int = 100
+
 class ListAllPaymentsDto(BaseModel):
     id: UUID
     order_id: UUID
@@ -16,4 +20,5 @@ class ListAllPaymentsDto(BaseModel):
     status: PaymentStatus
 
 class ListAllPaymentsOutputDto(BaseModel):
-    payments: List[ListAllPaymentsDto]
\ No newline at end of file
+    payments: List[ListAllPaymentsDto]
+    next_cursor: Optional[str] = None
\ No newline at end of file
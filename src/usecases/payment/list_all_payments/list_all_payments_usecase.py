@@ -1,18 +1,33 @@
+from typing import AsyncIterator
+
 from domain.__seedwork.use_case_interface import UseCaseInterface
+from domain.payment.payment_entity import Payment
 from domain.payment.payment_repository_interface import \
     PaymentRepositoryInterface
 from usecases.payment.list_all_payments.list_all_payments_dto import (
-    ListAllPaymentsDto, ListAllPaymentsOutputDto)
+    ListAllPaymentsDto, ListAllPaymentsInputDto, ListAllPaymentsOutputDto)
 
 
 class ListAllPaymentsUseCase(UseCaseInterface):
     def __init__(self, payment_repository: PaymentRepositoryInterface):
         self.payment_repository = payment_repository
 
-    async def execute(self) -> ListAllPaymentsOutputDto:
-        payments = await self.payment_repository.list_all_payments()
+    async def execute(self, input: ListAllPaymentsInputDto = None) -> ListAllPaymentsOutputDto:
+        input = input or ListAllPaymentsInputDto()
+        result = await self.payment_repository.list_all_payments(cursor=input.cursor, page_size=input.page_size)
 
-        if payments is None:
+        if result is None:
             return ListAllPaymentsOutputDto(payments=[])
         
-        return ListAllPaymentsOutputDto(payments=[ListAllPaymentsDto(id=payment.id, order_id=payment.order_id, payment_method=payment.payment_method, payment_card_gateway=payment.payment_card_gateway, status=payment.status) for payment in payments])
\ No newline at end of file
+        return ListAllPaymentsOutputDto(
+            payments=[self._to_dto(payment) for payment in result["items"]],
+            next_cursor=result["pagination"]["next_cursor"],
+        )
+
+    async def stream(self) -> AsyncIterator[ListAllPaymentsDto]:
+        async for payment in self.payment_repository.stream_all_payments():
+            yield self._to_dto(payment)
+
+    @staticmethod
+    def _to_dto(payment: Payment) -> ListAllPaymentsDto:
+        return ListAllPaymentsDto(id=payment.id, order_id=payment.order_id, payment_method=payment.payment_method, payment_card_gateway=payment.payment_card_gateway, status=payment.status)
\ No newline at end of file
@@ -3,12 +3,14 @@ from uuid import uuid4
 
 import pytest
 
-from domain.__seedwork.test_utils import (async_return, async_side_effect,
-                                          run_async)
+from domain.__seedwork.test_utils import (async_iter, async_return,
+                                          async_side_effect, run_async)
 from domain.payment.payment_card_gateway_enum import PaymentCardGateway
 from domain.payment.payment_entity import Payment
 from domain.payment.payment_method_enum import PaymentMethod
 from domain.payment.payment_status_enum import PaymentStatus
+from usecases.payment.list_all_payments.list_all_payments_dto import \
+    ListAllPaymentsInputDto
 from usecases.payment.list_all_payments.list_all_payments_usecase import \
     ListAllPaymentsUseCase
 
@@ -28,7 +30,7 @@ async def test_list_all_payments_success(list_all_payments_usecase, payment_repo
     payment_id = uuid4()
     order_id = uuid4()
     payment = Payment(id=payment_id, user_id=uuid4(), order_id=order_id, payment_method=PaymentMethod.CARD, payment_card_gateway=PaymentCardGateway.ADYEN, status=PaymentStatus.PAID)
-    payment_repository.list_all_payments = async_return([payment])
+    payment_repository.list_all_payments = async_return({"items": [payment], "pagination": {"page_size": 100, "next_cursor": "next", "total_count": None, "count_mode": None}})
     
     output_dto = await list_all_payments_usecase.execute()
     
@@ -37,11 +39,12 @@ async def test_list_all_payments_success(list_all_payments_usecase, payment_repo
     assert output_dto.payments[0].order_id == order_id
     assert output_dto.payments[0].payment_method == PaymentMethod.CARD
     assert output_dto.payments[0].payment_card_gateway == PaymentCardGateway.ADYEN
+    assert output_dto.next_cursor == "next"
     payment_repository.list_all_payments.await_count == 1
 
 @pytest.mark.asyncio
 async def test_list_all_payments_empty(list_all_payments_usecase, payment_repository):
-    payment_repository.list_all_payments = async_return([])
+    payment_repository.list_all_payments = async_return({"items": [], "pagination": {"page_size": 100, "next_cursor": None, "total_count": None, "count_mode": None}})
     
     output_dto = await list_all_payments_usecase.execute()
     
@@ -56,3 +59,20 @@ async def test_list_all_payments_none(list_all_payments_usecase, payment_reposit
     
     assert len(output_dto.payments) == 0
     payment_repository.list_all_payments.await_count == 1
+
+@pytest.mark.asyncio
+async def test_list_all_payments_forwards_pagination(list_all_payments_usecase, payment_repository):
+    payment_repository.list_all_payments = async_return({"items": [], "pagination": {"page_size": 100, "next_cursor": None, "total_count": None, "count_mode": None}})
+
+    await list_all_payments_usecase.execute(input=ListAllPaymentsInputDto(cursor="abc", page_size=5))
+
+    payment_repository.list_all_payments.assert_awaited_once_with(cursor="abc", page_size=5)
+
+@pytest.mark.asyncio
+async def test_stream_all_payments(list_all_payments_usecase, payment_repository):
+    payment = Payment(id=uuid4(), user_id=uuid4(), order_id=uuid4(), payment_method=PaymentMethod.CARD, payment_card_gateway=PaymentCardGateway.ADYEN, status=PaymentStatus.PAID)
+    payment_repository.stream_all_payments = async_iter([payment])
+
+    payments = [payment_dto async for payment_dto in list_all_payments_usecase.stream()]
+
+    assert [payment_dto.id for payment_dto in payments] == [payment.id]
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel
@@ -10,6 +10,8 @@ from domain.payment.payment_status_enum import PaymentStatus
 
 class ListPaymentsInputDto(BaseModel):
     user_id: UUID
+    cursor: Optional[str] = None
+    page_size: int = 100
 
 class ListPaymentsDto(BaseModel):
     id: UUID
@@ -19,4 +21,5 @@ class ListPaymentsDto(BaseModel):
     status: PaymentStatus
 
 class ListPaymentsOutputDto(BaseModel):
-    payments: List[ListPaymentsDto]
\ No newline at end of file
+    payments: List[ListPaymentsDto]
+    next_cursor: Optional[str] = None
\ No newline at end of file
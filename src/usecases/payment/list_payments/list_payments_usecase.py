@@ -1,4 +1,7 @@
+from typing import AsyncIterator
+
 from domain.__seedwork.use_case_interface import UseCaseInterface
+from domain.payment.payment_entity import Payment
 from domain.payment.payment_repository_interface import \
     PaymentRepositoryInterface
 from usecases.payment.list_payments.list_payments_dto import (
@@ -11,11 +14,19 @@ class ListPaymentsUseCase(UseCaseInterface):
 
     async def execute(self, input: ListPaymentsInputDto) -> ListPaymentsOutputDto:
         
-        payments = await self.payment_repository.list_payments(user_id=input.user_id)
+        result = await self.payment_repository.list_payments(user_id=input.user_id, cursor=input.cursor, page_size=input.page_size)
 
-        if payments is None:
+        if result is None:
             return ListPaymentsOutputDto(payments=[])
 
-        list_payments = [ListPaymentsDto(id=payment.id, order_id=payment.order_id, payment_method=payment.payment_method, payment_card_gateway=payment.payment_card_gateway, status=payment.status) for payment in payments]
+        list_payments = [self._to_dto(payment) for payment in result["items"]]
         
-        return ListPaymentsOutputDto(payments=list_payments)
\ No newline at end of file
+        return ListPaymentsOutputDto(payments=list_payments, next_cursor=result["pagination"]["next_cursor"])
+
+    async def stream(self, input: ListPaymentsInputDto) -> AsyncIterator[ListPaymentsDto]:
+        async for payment in self.payment_repository.stream_payments(user_id=input.user_id):
+            yield self._to_dto(payment)
+
+    @staticmethod
+    def _to_dto(payment: Payment) -> ListPaymentsDto:
+        return ListPaymentsDto(id=payment.id, order_id=payment.order_id, payment_method=payment.payment_method, payment_card_gateway=payment.payment_card_gateway, status=payment.status)
\ No newline at end of file
@@ -3,8 +3,8 @@ from uuid import uuid4
 
 import pytest
 
-from domain.__seedwork.test_utils import (async_return, async_side_effect,
-                                          run_async)
+from domain.__seedwork.test_utils import (async_iter, async_return,
+                                          async_side_effect, run_async)
 from domain.payment.payment_card_gateway_enum import PaymentCardGateway
 from domain.payment.payment_entity import Payment
 from domain.payment.payment_method_enum import PaymentMethod
@@ -38,7 +38,7 @@ async def test_list_payments_success(list_payments_usecase, payment_repository):
         payment_card_gateway=PaymentCardGateway.ADYEN, 
         status=PaymentStatus.PAID
     )
-    payment_repository.list_payments = async_return([payment])
+    payment_repository.list_payments = async_return({"items": [payment], "pagination": {"page_size": 100, "next_cursor": None, "total_count": None, "count_mode": None}})
     
     input_dto = ListPaymentsInputDto(user_id=user_id)
     
@@ -50,19 +50,19 @@ async def test_list_payments_success(list_payments_usecase, payment_repository):
     assert output_dto.payments[0].payment_method == PaymentMethod.CARD
     assert output_dto.payments[0].payment_card_gateway == PaymentCardGateway.ADYEN
     assert output_dto.payments[0].status == PaymentStatus.PAID
-    payment_repository.list_payments.assert_awaited_once_with(user_id=user_id)
+    payment_repository.list_payments.assert_awaited_once_with(user_id=user_id, cursor=None, page_size=100)
 
 @pytest.mark.asyncio
 async def test_list_payments_empty(list_payments_usecase, payment_repository):
     user_id = uuid4()
-    payment_repository.list_payments = async_return([])
+    payment_repository.list_payments = async_return({"items": [], "pagination": {"page_size": 100, "next_cursor": None, "total_count": None, "count_mode": None}})
     
     input_dto = ListPaymentsInputDto(user_id=user_id)
     
     output_dto = await list_payments_usecase.execute(input=input_dto)
     
     assert len(output_dto.payments) == 0
-    payment_repository.list_payments.assert_awaited_once_with(user_id=user_id)
+    payment_repository.list_payments.assert_awaited_once_with(user_id=user_id, cursor=None, page_size=100)
 
 @pytest.mark.asyncio
 async def test_list_payments_none(list_payments_usecase, payment_repository):
@@ -74,4 +74,15 @@ async def test_list_payments_none(list_payments_usecase, payment_repository):
     output_dto = await list_payments_usecase.execute(input=input_dto)
     
     assert len(output_dto.payments) == 0
-    payment_repository.list_payments.assert_awaited_once_with(user_id=user_id)
+    payment_repository.list_payments.assert_awaited_once_with(user_id=user_id, cursor=None, page_size=100)
+
+@pytest.mark.asyncio
+async def test_stream_payments(list_payments_usecase, payment_repository):
+    user_id = uuid4()
+    payment = Payment(id=uuid4(), user_id=user_id, order_id=uuid4(), payment_method=PaymentMethod.CARD, payment_card_gateway=PaymentCardGateway.ADYEN, status=PaymentStatus.PAID)
+    payment_repository.stream_payments = async_iter([payment])
+
+    payments = [payment_dto async for payment_dto in list_payments_usecase.stream(input=ListPaymentsInputDto(user_id=user_id))]
+
+    assert [payment_dto.id for payment_dto in payments] == [payment.id]
+    payment_repository.stream_payments.assert_called_once_with(user_id=user_id)
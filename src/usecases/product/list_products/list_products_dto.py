@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 from pydantic import BaseModel
 
@@ -6,7 +6,8 @@ from domain.product.product_category_enum import ProductCategory
 
 
 class ListProductsInputDto(BaseModel):
-    pass
+    cursor: Optional[str] = None
+    page_size: int = 100
 
 class ListProductsDto(BaseModel):
     id: int
@@ -15,4 +16,5 @@ class ListProductsDto(BaseModel):
     category: ProductCategory
 
 class ListProductsOutputDto(BaseModel):
-    products: List[ListProductsDto]
\ No newline at end of file
+    products: List[ListProductsDto]
+    next_cursor: Optional[str] = None
\ No newline at end of file
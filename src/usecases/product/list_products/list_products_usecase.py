@@ -1,21 +1,27 @@
+from typing import AsyncIterator
+
 from domain.__seedwork.use_case_interface import UseCaseInterface
 from domain.product.product_repository_interface import \
     ProductRepositoryInterface
 from usecases.product.list_products.list_products_dto import (
-    ListProductsDto, ListProductsOutputDto)
+    ListProductsDto, ListProductsInputDto, ListProductsOutputDto)
 
 
 class ListProductsUseCase(UseCaseInterface):
     def __init__(self, product_repository: ProductRepositoryInterface):
         self.product_repository = product_repository
 
-    async def execute(self) -> ListProductsOutputDto:
-
-        products = await self.product_repository.list_products()
+    async def execute(self, input: ListProductsInputDto = None) -> ListProductsOutputDto:
+        input = input or ListProductsInputDto()
+        result = await self.product_repository.list_products(cursor=input.cursor, page_size=input.page_size)
 
-        if products is None:
+        if result is None:
             return ListProductsOutputDto(products=[])
 
-        products_list = [ListProductsDto(id=product.id, name=product.name, price=product.price, category=product.category) for product in products]
+        products_list = [ListProductsDto(id=product.id, name=product.name, price=product.price, category=product.category) for product in result["items"]]
+
+        return ListProductsOutputDto(products=products_list, next_cursor=result["pagination"]["next_cursor"])
 
-        return ListProductsOutputDto(products=products_list)
\ No newline at end of file
+    async def stream(self) -> AsyncIterator[ListProductsDto]:
+        async for product in self.product_repository.stream_products():
+            yield ListProductsDto(id=product.id, name=product.name, price=product.price, category=product.category)
\ No newline at end of file
@@ -4,10 +4,12 @@ from uuid import uuid4
 
 import pytest
 
-from domain.__seedwork.test_utils import (async_return, async_side_effect,
-                                          run_async)
+from domain.__seedwork.test_utils import (async_iter, async_return,
+                                          async_side_effect, run_async)
 from domain.product.product_category_enum import ProductCategory
 from domain.product.product_entity import Product
+from usecases.product.list_products.list_products_dto import \
+    ListProductsInputDto
 from usecases.product.list_products.list_products_usecase import \
     ListProductsUseCase
 
@@ -29,7 +31,7 @@ async def test_list_products_success(list_products_usecase, product_repository):
     product_price = 100.0
     product_category = ProductCategory.SIDE_DISH
     product = Product(id=product_id, name=product_name, price=product_price, category=product_category)
-    product_repository.list_products = async_return([product])
+    product_repository.list_products = async_return({"items": [product], "pagination": {"page_size": 100, "next_cursor": None, "total_count": None, "count_mode": None}})
     
     output_dto = await list_products_usecase.execute()
     
@@ -42,9 +44,27 @@ async def test_list_products_success(list_products_usecase, product_repository):
 
 @pytest.mark.asyncio
 async def test_list_products_empty(list_products_usecase, product_repository):
-    product_repository.list_products = async_return([])
+    product_repository.list_products = async_return({"items": [], "pagination": {"page_size": 100, "next_cursor": None, "total_count": None, "count_mode": None}})
     
     output_dto = await list_products_usecase.execute()
     
     assert len(output_dto.products) == 0
     product_repository.list_products.await_count == 1
+
+@pytest.mark.asyncio
+async def test_list_products_forwards_pagination(list_products_usecase, product_repository):
+    product_repository.list_products = async_return({"items": [], "pagination": {"page_size": 100, "next_cursor": "next", "total_count": None, "count_mode": None}})
+
+    output_dto = await list_products_usecase.execute(input=ListProductsInputDto(cursor="abc", page_size=5))
+
+    product_repository.list_products.assert_awaited_once_with(cursor="abc", page_size=5)
+    assert output_dto.next_cursor == "next"
+
+@pytest.mark.asyncio
+async def test_stream_products(list_products_usecase, product_repository):
+    product = Product(id=1, name="Test Product", price=100.0, category=ProductCategory.SIDE_DISH)
+    product_repository.stream_products = async_iter([product])
+
+    products = [product_dto async for product_dto in list_products_usecase.stream()]
+
+    assert [product_dto.name for product_dto in products] == ["Test Product"]
@@ -16,10 +16,8 @@ class UpdateProductUseCase(UseCaseInterface):
         if not product:
             raise ValueError(f"Product with id '{input.id}' not found")
 
-        product.id = input.id
-        product.name = input.name
-        product.price = input.price
-        product.category = input.category
+        # O produto encontrado pode ser a instância compartilhada pelo cache
+        product = product.evolve(id=input.id, name=input.name, price=input.price, category=input.category)
 
         await self.product_repository.update_product(product=product)
 
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel
@@ -7,7 +7,8 @@ from domain.user.user_gender_enum import UserGender
 
 
 class ListUsersInputDto(BaseModel):
-    pass
+    cursor: Optional[str] = None
+    page_size: int = 100
 
 class UserDto(BaseModel):
     id: UUID = None
@@ -20,4 +21,5 @@ class UserDto(BaseModel):
 
 class ListUsersOutputDto(BaseModel):
     users: List[UserDto]
+    next_cursor: Optional[str] = None
     
\ No newline at end of file
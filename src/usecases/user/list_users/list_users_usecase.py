@@ -1,8 +1,10 @@
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 from domain.__seedwork.use_case_interface import UseCaseInterface
+from domain.user.user_entity import User
 from domain.user.user_repository_interface import UserRepositoryInterface
-from usecases.user.list_users.list_users_dto import (ListUsersOutputDto,
+from usecases.user.list_users.list_users_dto import (ListUsersInputDto,
+                                                     ListUsersOutputDto,
                                                      UserDto)
 
 
@@ -11,13 +13,21 @@ class ListUsersUseCase(UseCaseInterface):
     def __init__(self, user_repository: UserRepositoryInterface):
         self.user_repository = user_repository
 
-    async def execute(self) -> Optional[ListUsersOutputDto]:
+    async def execute(self, input: ListUsersInputDto = None) -> Optional[ListUsersOutputDto]:
+        input = input or ListUsersInputDto()
+        result = await self.user_repository.list_users(cursor=input.cursor, page_size=input.page_size)
 
-        users = await self.user_repository.list_users()
-
-        if not users:
+        if not result or not result["items"]:
             return ListUsersOutputDto(users=[])
 
-        users_dto = [UserDto(id=user.id, name=user.name, email=user.email, age=user.age, gender=user.gender, phone_number=user.phone_number, password=user.password) for user in users]
+        users_dto = [self._to_dto(user) for user in result["items"]]
         
-        return ListUsersOutputDto(users=users_dto)
\ No newline at end of file
+        return ListUsersOutputDto(users=users_dto, next_cursor=result["pagination"]["next_cursor"])
+
+    async def stream(self) -> AsyncIterator[UserDto]:
+        async for user in self.user_repository.stream_users():
+            yield self._to_dto(user)
+
+    @staticmethod
+    def _to_dto(user: User) -> UserDto:
+        return UserDto(id=user.id, name=user.name, email=user.email, age=user.age, gender=user.gender, phone_number=user.phone_number, password=user.password)
\ No newline at end of file
@@ -3,10 +3,11 @@ from uuid import uuid4
 
 import pytest
 
-from domain.__seedwork.test_utils import (async_return, async_side_effect,
-                                          run_async)
+from domain.__seedwork.test_utils import (async_iter, async_return,
+                                          async_side_effect, run_async)
 from domain.user.user_entity import User
 from domain.user.user_gender_enum import UserGender
+from usecases.user.list_users.list_users_dto import ListUsersInputDto
 from usecases.user.list_users.list_users_usecase import ListUsersUseCase
 
 
@@ -22,7 +23,7 @@ def list_users_usecase(user_repository):
 async def test_list_users_success(list_users_usecase, user_repository):
     user_id = uuid4()
     user = User(id=user_id, name="Test User", email="test@example.com", age=30, gender=UserGender.MALE, phone_number="1234567890", password="password")
-    user_repository.list_users = async_return([user])
+    user_repository.list_users = async_return({"items": [user], "pagination": {"page_size": 100, "next_cursor": "next", "total_count": None, "count_mode": None}})
     
     # Substituindo run_async por await
     output_dto = await list_users_usecase.execute()
@@ -35,14 +36,32 @@ async def test_list_users_success(list_users_usecase, user_repository):
     assert output_dto.users[0].gender == UserGender.MALE
     assert output_dto.users[0].phone_number == "1234567890"
     assert output_dto.users[0].password == "password"
+    assert output_dto.next_cursor == "next"
     user_repository.list_users.await_count == 1
 
 @pytest.mark.asyncio
 async def test_list_users_empty(list_users_usecase, user_repository):
-    user_repository.list_users = async_return([])
+    user_repository.list_users = async_return({"items": [], "pagination": {"page_size": 100, "next_cursor": None, "total_count": None, "count_mode": None}})
     
     # Substituindo run_async por await
     output_dto = await list_users_usecase.execute()
     
     assert len(output_dto.users) == 0
-    assert user_repository.list_users.await_count == 1
\ No newline at end of file
+    assert user_repository.list_users.await_count == 1
+
+@pytest.mark.asyncio
+async def test_list_users_forwards_pagination(list_users_usecase, user_repository):
+    user_repository.list_users = async_return({"items": [], "pagination": {"page_size": 100, "next_cursor": None, "total_count": None, "count_mode": None}})
+
+    await list_users_usecase.execute(input=ListUsersInputDto(cursor="abc", page_size=5))
+
+    user_repository.list_users.assert_awaited_once_with(cursor="abc", page_size=5)
+
+@pytest.mark.asyncio
+async def test_stream_users(list_users_usecase, user_repository):
+    user = User(id=uuid4(), name="Test User", email="test@example.com", age=30, gender=UserGender.MALE, phone_number="1234567890", password="password")
+    user_repository.stream_users = async_iter([user])
+
+    users = [user_dto async for user_dto in list_users_usecase.stream()]
+
+    assert [user_dto.email for user_dto in users] == ["test@example.com"]